@@ -12,9 +12,10 @@ import pandas as pd
 from typing import List, Type, Dict, Any, Tuple
 
 from caladrius.api import utils
-from caladrius.graph.gremlin.client import GremlinClient
-from caladrius.graph.utils.heron import graph_check, paths_check
+from caladrius.graph.client import GraphClient
+from caladrius.graph.utils.heron import graph_check, paths_check, explicit_paths_enabled
 from caladrius.metrics.heron.client import HeronMetricsClient
+from caladrius.metrics.heron.snapshot import MetricsSnapshot
 from caladrius.model.topology.heron.base import HeronTopologyModel
 from caladrius.model.topology.heron.queueing_theory import get_start_end_times
 from caladrius.traffic_provider.predicted_traffic import PredictedTraffic
@@ -23,6 +24,27 @@ from caladrius.traffic_provider.current_traffic import CurrentTraffic
 LOG: logging.Logger = logging.getLogger(__name__)
 
 
+def request_model(model: HeronTopologyModel, model_config: Dict[str, Any],
+                  metrics: MetricsSnapshot,
+                  graph_client: GraphClient) -> HeronTopologyModel:
+    """ Creates a copy of the supplied configured model that uses the supplied
+    request scoped metrics snapshot in place of the shared metrics client. A
+    new instance is used so that concurrent requests do not share snapshots.
+
+    Arguments:
+        model (HeronTopologyModel): The configured model instance.
+        model_config (dict):    The topology model configuration.
+        metrics (MetricsSnapshot):  The metrics snapshot for the request.
+        graph_client (GraphClient):     The graph database client.
+
+    Returns:
+        HeronTopologyModel: A model instance of the same class as the supplied
+        model which uses the metrics snapshot.
+    """
+
+    return type(model)(model_config, metrics, graph_client)
+
+
 class HeronTopologyModels(Resource):
     """ Resource class for the Heron topology model information end point."""
 
@@ -49,10 +71,10 @@ class HeronCurrent(Resource):
 
     def __init__(self, model_classes: List[Type], model_config: Dict[str, Any],
                  metrics_client: HeronMetricsClient,
-                 graph_client: GremlinClient, tracker_url: str) -> None:
+                 graph_client: GraphClient, tracker_url: str) -> None:
 
         self.metrics_client: HeronMetricsClient = metrics_client
-        self.graph_client: GremlinClient = graph_client
+        self.graph_client: GraphClient = graph_client
 
         self.tracker_url: str = tracker_url
         self.model_config: Dict[str, Any] = model_config
@@ -133,11 +155,17 @@ class HeronCurrent(Resource):
         cluster = request.args.get("cluster")
         environ = request.args.get("environ")
 
+        # All the models run for this request share one metrics snapshot so
+        # each metric is only fetched once
+        metrics: MetricsSnapshot = MetricsSnapshot(
+            self.metrics_client, topology_id, cluster, environ)
+
         output = {}
         for model_name in models:
             LOG.info("Running topology performance model %s", model_name)
 
-            model = self.models[model_name]
+            model = request_model(self.models[model_name], self.model_config,
+                                  metrics, self.graph_client)
 
             try:
                 results: pd.DataFrame = model.predict_current_performance(
@@ -153,6 +181,8 @@ class HeronCurrent(Resource):
             else:
                 output[model_name] = results.to_json()
 
+        metrics.log_stats()
+
         if errors:
             return {"errors": errors}, 500
 
@@ -194,9 +224,11 @@ class HeronCurrent(Resource):
         graph_check(self.graph_client, self.model_config, self.tracker_url,
                     cluster, environ, topology_id)
 
-        # Make sure we have a file containing all paths for the job
-        paths_check(self.graph_client, self.model_config, cluster,
-                    environ, topology_id)
+        # Make sure we have a file containing all paths for the job, if the
+        # models are configured to enumerate them
+        if explicit_paths_enabled(self.model_config):
+            paths_check(self.graph_client, self.model_config, cluster,
+                        environ, topology_id)
 
         if "all" in request.args.getlist("model"):
             LOG.info("Running all configured Heron topology performance "
@@ -219,16 +251,23 @@ class HeronCurrent(Resource):
         model_kwargs["heron.statemgr.connection.string"] = self.model_config["heron.statemgr.connection.string"]
 
         start, end = get_start_end_times(**model_kwargs)
-        traffic_provider: CurrentTraffic = CurrentTraffic(self.metrics_client, self.graph_client, topology_id,
+
+        # The traffic provider and all the models share one metrics snapshot
+        # so each metric is only fetched once for this request
+        metrics: MetricsSnapshot = MetricsSnapshot(
+            self.metrics_client, topology_id, cluster, environ, start, end)
+
+        traffic_provider: CurrentTraffic = CurrentTraffic(metrics, self.graph_client, topology_id,
                                                           cluster, environ, start, end, {}, **model_kwargs)
         output = {}
         for model_name in models:
             LOG.info("Running topology performance model %s", model_name)
 
-            model = self.models[model_name]
+            model = request_model(self.models[model_name], self.model_config,
+                                  metrics, self.graph_client)
 
             try:
-                results: list = model.find_current_instance_waiting_times(topology_id=topology_id, cluster=cluster,
+                results: Any = model.find_current_instance_waiting_times(topology_id=topology_id, cluster=cluster,
                                                                           environ=environ,
                                                                           traffic_source=traffic_provider,
                                                                           start=start, end=end,
@@ -241,6 +280,8 @@ class HeronCurrent(Resource):
             else:
                 output[model_name] = json.dumps(results)
 
+        metrics.log_stats()
+
         if errors:
             return {"errors": errors}, 500
 
@@ -253,9 +294,9 @@ class HeronProposed(Resource):
 
     def __init__(self, model_classes: List[Type], model_config: Dict[str, Any], traffic_config: Dict[str, Any],
                  metrics_client: HeronMetricsClient,
-                 graph_client: GremlinClient, tracker_url: str) -> None:
+                 graph_client: GraphClient, tracker_url: str) -> None:
         self.metrics_client: HeronMetricsClient = metrics_client
-        self.graph_client: GremlinClient = graph_client
+        self.graph_client: GraphClient = graph_client
 
         self.tracker_url: str = tracker_url
         self.model_config: Dict[str, Any] = model_config
@@ -308,9 +349,11 @@ class HeronProposed(Resource):
         graph_check(self.graph_client, self.model_config, self.tracker_url,
                     cluster, environ, topology_id)
 
-        # Make sure we have a file containing all paths for the job
-        paths_check(self.graph_client, self.model_config, cluster,
-                    environ, topology_id)
+        # Make sure we have a file containing all paths for the job, if the
+        # models are configured to enumerate them
+        if explicit_paths_enabled(self.model_config):
+            paths_check(self.graph_client, self.model_config, cluster,
+                        environ, topology_id)
 
         if "all" in request.args.getlist("model"):
             LOG.info("Running all configured Heron topology performance "
@@ -330,16 +373,21 @@ class HeronProposed(Resource):
 
         start, end = get_start_end_times(**model_kwargs)
 
+        # The traffic provider and all the models share one metrics snapshot
+        # so each metric is only fetched once for this request
+        metrics: MetricsSnapshot = MetricsSnapshot(
+            self.metrics_client, topology_id, cluster, environ, start, end)
+
         # traffic source can be one of two values -- current or future. If it is of a future value, we must first
         # create an object that gathers together future traffic information. Otherwise, if it is current, then we
         # simply propose a packing plan based on current information
         if traffic_source == self.CURRENT:
-            traffic_provider: CurrentTraffic = CurrentTraffic(self.metrics_client, self.graph_client, topology_id,
+            traffic_provider: CurrentTraffic = CurrentTraffic(metrics, self.graph_client, topology_id,
                                                               cluster, environ, start, end, {}, **model_kwargs)
         elif traffic_source == self.FUTURE:
             # the predicted traffic variable is initialized by the future traffic. It contains functions to convert
             # the predicted traffic into arrival rates
-            traffic_provider: PredictedTraffic = PredictedTraffic(self.metrics_client, self.graph_client,
+            traffic_provider: PredictedTraffic = PredictedTraffic(metrics, self.graph_client,
                                                                   topology_id, cluster, environ, start, end,
                                                                   self.traffic_config, **model_kwargs)
 
@@ -356,7 +404,8 @@ class HeronProposed(Resource):
 
         for model_name in models:
             LOG.info("Running topology packing plan model %s", model_name)
-            model = self.models[model_name]
+            model = request_model(self.models[model_name], self.model_config,
+                                  metrics, self.graph_client)
             results: list = model.predict_packing_plan(topology_id=topology_id,
                                                        cluster=cluster,
                                                        environ=environ,
@@ -365,5 +414,7 @@ class HeronProposed(Resource):
                                                        traffic_provider=traffic_provider,
                                                        **model_kwargs)
 
+        metrics.log_stats()
+
         return results
 
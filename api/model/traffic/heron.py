@@ -13,7 +13,7 @@ from typing import List, Dict, Type, Any, Tuple
 from caladrius.api import utils
 from caladrius.metrics.heron.client import HeronMetricsClient
 from caladrius.model.traffic.heron.base import HeronTrafficModel
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 from caladrius.graph.utils.heron import graph_check
 
 LOG: logging.Logger = logging.getLogger(__name__)
@@ -45,10 +45,10 @@ class HeronTraffic(Resource):
 
     def __init__(self, model_classes: List[Type], model_config: Dict[str, Any],
                  metrics_client: HeronMetricsClient,
-                 graph_client: GremlinClient, tracker_url: str) -> None:
+                 graph_client: GraphClient, tracker_url: str) -> None:
 
         self.metrics_client: HeronMetricsClient = metrics_client
-        self.graph_client: GremlinClient = graph_client
+        self.graph_client: GraphClient = graph_client
 
         self.tracker_url: str = tracker_url
         self.model_config: Dict[str, Any] = model_config
@@ -14,8 +14,12 @@ from flask_restful import Api
 
 from caladrius import loader
 from caladrius.config.keys import ConfKeys
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.common import http_session
+from caladrius.common.heron import tracker
+from caladrius.graph.client import GraphClient
+from caladrius.graph.utils import path_store
 from caladrius.metrics.heron.client import HeronMetricsClient
+from caladrius.metrics.heron.prefetch import PrefetchingMetricsClient
 from caladrius.api.model.topology.heron import \
     HeronTopologyModels, HeronCurrent, HeronProposed
 from caladrius.api.model.traffic.heron import HeronTraffic, HeronTrafficModels
@@ -40,11 +44,33 @@ def create_router(config: Dict[str, Any]) -> Flask:
     router: Flask = Flask("caladrius")
     api: Api = Api(router)
 
+    # ### HTTP SESSION ###
+
+    http_session.configure(
+        connect_timeout=config.get(ConfKeys.HTTP_CONNECT_TIMEOUT.value),
+        read_timeout=config.get(ConfKeys.HTTP_READ_TIMEOUT.value),
+        pool_connections=config.get(ConfKeys.HTTP_POOL_CONNECTIONS.value),
+        pool_maxsize=config.get(ConfKeys.HTTP_POOL_MAXSIZE.value),
+        retries=config.get(ConfKeys.HTTP_RETRIES.value),
+        backoff_factor=config.get(ConfKeys.HTTP_BACKOFF_FACTOR.value))
+
+    # ### HERON TRACKER PLAN CACHE ###
+
+    tracker.PLAN_CACHE.configure(
+        ttl=config.get(ConfKeys.HERON_TRACKER_PLAN_CACHE_TTL.value),
+        max_size=config.get(ConfKeys.HERON_TRACKER_PLAN_CACHE_SIZE.value))
+
+    # ### TOPOLOGY PATH STORE ###
+
+    path_store.PATH_STORE.configure(
+        root_dir=config.get(ConfKeys.PATH_STORE_DIR.value),
+        cache_size=config.get(ConfKeys.PATH_STORE_CACHE_SIZE.value))
+
     # ### GRAPH CLIENT ###
 
     # TODO: Consider making a copy of this for each model/resource to prevent
     # locking issue if we go multi-threaded
-    graph_client: GremlinClient = \
+    graph_client: GraphClient = \
         loader.get_class(config["graph.client"])(config["graph.client.config"])
 
     # ### HERON METRICS CLIENT ###
@@ -55,6 +81,9 @@ def create_router(config: Dict[str, Any]) -> Flask:
         loader.get_class(config["heron.metrics.client"])(
             config["heron.metrics.client.config"])
 
+    if isinstance(heron_metrics_client, PrefetchingMetricsClient):
+        heron_metrics_client.start()
+
     # ### TRAFFIC MODEL ENDPOINTS ###
 
     heron_traffic_model_classes: List[Type] = \
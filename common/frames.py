@@ -0,0 +1,105 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module provides general helper classes and methods for building
+pandas DataFrames. """
+
+import logging
+
+from typing import Dict, List, Any, Optional
+
+import pandas as pd
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+
+class FrameAccumulator(object):
+    """ Collects DataFrames and individual rows and combines them into a single
+    DataFrame with one concatenation at the end. This avoids the quadratic
+    cost of growing a DataFrame by repeated calls to DataFrame.append, which
+    copies the entire frame each time.
+
+    Usage::
+
+        accumulator = FrameAccumulator(columns=["task", "latency_ms"])
+        for task, data in latencies.groupby("task"):
+            accumulator.append_row({"task": task,
+                                    "latency_ms": data.latency_ms.mean()})
+        output = accumulator.to_frame()
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None) -> None:
+        """ Arguments:
+                columns (list): Optional list of column names. If supplied
+                                the output DataFrame will have these columns
+                                in this order, even if nothing was added.
+        """
+        self.columns: Optional[List[str]] = columns
+        self._parts: List[pd.DataFrame] = []
+        self._rows: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts) + len(self._rows)
+
+    def _flush_rows(self) -> None:
+        """ Converts any buffered rows into a DataFrame part. This keeps the
+        rows in the order they were added relative to any appended frames."""
+
+        if self._rows:
+            self._parts.append(pd.DataFrame(self._rows, columns=self.columns))
+            self._rows = []
+
+    def append(self, frame: Optional[pd.DataFrame]) -> None:
+        """ Adds the supplied DataFrame to the accumulated parts. None values
+        and empty frames are ignored.
+
+        Arguments:
+            frame (pandas.DataFrame):   The DataFrame to be added.
+        """
+
+        if frame is None or frame.empty:
+            return
+
+        self._flush_rows()
+        self._parts.append(frame)
+
+    def append_row(self, row: Dict[str, Any]) -> None:
+        """ Adds a single row to the accumulated output.
+
+        Arguments:
+            row (dict): A dictionary mapping from column name to value.
+        """
+
+        self._rows.append(row)
+
+    def to_frame(self, ignore_index: bool = True,
+                 sort: bool = False) -> pd.DataFrame:
+        """ Combines all the accumulated parts into a single DataFrame.
+
+        Arguments:
+            ignore_index (bool):    Flag indicating if the index of the
+                                    accumulated frames should be discarded
+                                    (the default) or kept.
+            sort (bool):    Flag indicating if the columns of the output
+                            should be sorted when the parts have differing
+                            columns.
+
+        Returns:
+            pandas.DataFrame:   The combination of all the accumulated parts.
+            If nothing was accumulated an empty DataFrame (with the configured
+            columns if supplied) is returned.
+        """
+
+        self._flush_rows()
+
+        if not self._parts:
+            return pd.DataFrame(columns=self.columns)
+
+        if len(self._parts) == 1:
+            output: pd.DataFrame = self._parts[0]
+            if ignore_index:
+                output = output.reset_index(drop=True)
+            return output
+
+        return pd.concat(self._parts, ignore_index=ignore_index, sort=sort)
@@ -0,0 +1,420 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains an asyncio counterpart to the methods of the tracker
+module for requesting topology plans and metrics from the Heron Tracker REST
+API. Requests are issued through a pooled aiohttp session and the number of
+requests in flight is bounded by a semaphore, so many requests (eg. a metrics
+timeline per topology component) can be awaited concurrently without
+exhausting the Tracker or the connection pool.
+
+Plans fetched by this module share the process wide plan cache of the tracker
+module and request latencies are recorded alongside those of the shared HTTP
+session.
+"""
+
+import time
+import asyncio
+import logging
+
+from typing import List, Dict, Union, Any, Optional, Tuple
+
+import aiohttp
+
+from caladrius.common import http_session
+from caladrius.common.heron import tracker
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# pylint: disable=too-many-arguments
+
+# The default maximum number of requests in flight for each client
+DEFAULT_MAX_CONCURRENCY: int = 10
+
+PARAMS = List[Tuple[str, Union[str, int]]]
+
+
+def _to_params(params: Dict[str, Any]) -> PARAMS:
+    """ Converts the supplied query parameters into the list of pairs used by
+    aiohttp. Parameters with a None value are dropped and list values are
+    repeated, matching the behaviour of the requests library. """
+
+    output: PARAMS = []
+
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            output.extend((key, item) for item in value)
+        else:
+            output.append((key, value))
+
+    return output
+
+
+class AsyncTracker(object):
+    """ Asyncio client for the Heron Tracker REST API. The client should be
+    used as an asynchronous context manager, which opens the underlying
+    session on entry and closes it on exit::
+
+        async with AsyncTracker(tracker_url) as tracker_client:
+            logical_plan = await tracker_client.get_logical_plan(
+                cluster, environ, topology)
+
+    The timeouts, connection pool size and retry settings are taken from the
+    shared HTTP session settings (see caladrius.common.http_session). A client
+    must only be used from the event loop it was opened in.
+    """
+
+    def __init__(self, tracker_url: str,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 settings: Optional[http_session.SessionSettings] = None
+                 ) -> None:
+        """ Arguments:
+                tracker_url (str):  The base url string for the Heron Tracker
+                                    instance.
+                max_concurrency (int):  The maximum number of requests that
+                                        can be in flight at once.
+                settings (SessionSettings): Optional HTTP settings to use in
+                                            place of the shared session
+                                            settings.
+        """
+        self.tracker_url: str = tracker_url
+        self.max_concurrency: int = max(1, int(max_concurrency))
+        self.settings: http_session.SessionSettings = \
+            settings or http_session.settings()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._plan_locks: Dict[Tuple[str, ...], asyncio.Lock] = {}
+
+    async def open(self) -> None:
+        """ Opens the HTTP session used by this client. This must be called
+        from within the event loop the client will be used in. """
+
+        if self._session is not None:
+            return
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(
+                connect=self.settings.connect_timeout,
+                sock_read=self.settings.read_timeout),
+            connector=aiohttp.TCPConnector(
+                limit_per_host=self.settings.pool_maxsize))
+
+    async def close(self) -> None:
+        """ Closes the HTTP session used by this client. """
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncTracker":
+
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+
+        await self.close()
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """ Issues a GET request for the supplied Tracker API path and returns
+        the result section of the response. Requests that fail to connect,
+        time out or return one of the retry status codes are retried with
+        exponential back off.
+
+        Raises:
+            aiohttp.ClientResponseError:    If a non 200 status code is
+                                            returned after all retries.
+            aiohttp.ClientError:    If the request fails to connect after all
+                                    retries.
+        """
+
+        if self._session is None:
+            msg: str = ("The asyncio Heron Tracker client must be opened "
+                        "before requests are made")
+            LOG.error(msg)
+            raise RuntimeError(msg)
+
+        url: str = self.tracker_url + path
+        query: PARAMS = _to_params(params)
+
+        attempt: int = 0
+        while True:
+
+            start: float = time.perf_counter()
+            error: bool = True
+            try:
+                async with self._semaphore:
+                    async with self._session.get(url, params=query) as resp:
+                        if (resp.status in http_session.RETRY_STATUS_CODES
+                                and attempt < self.settings.retries):
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info, resp.history,
+                                status=resp.status, message=resp.reason)
+                        resp.raise_for_status()
+                        result: Dict[str, Any] = \
+                            (await resp.json(content_type=None))["result"]
+                        error = False
+                        return result
+            except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError,
+                    asyncio.TimeoutError) as err:
+                retryable: bool = (
+                    not isinstance(err, aiohttp.ClientResponseError) or
+                    err.status in http_session.RETRY_STATUS_CODES)
+                if not retryable or attempt >= self.settings.retries:
+                    raise
+            finally:
+                http_session.record_latency(url, time.perf_counter() - start,
+                                            error)
+
+            attempt += 1
+            backoff: float = (self.settings.backoff_factor *
+                              (2 ** (attempt - 1)))
+            LOG.debug("Retrying GET request to %s in %.2f seconds (retry %d "
+                      "of %d)", url, backoff, attempt, self.settings.retries)
+            await asyncio.sleep(backoff)
+
+    async def _request_plan(self, plan_type: str, cluster: str, environ: str,
+                            topology: str) -> Dict[str, Any]:
+
+        LOG.info("Fetching %s plan for topology: %s", plan_type, topology)
+
+        try:
+            return await self._get(f"/topologies/{plan_type}plan",
+                                   {"cluster": cluster, "environ": environ,
+                                    "topology": topology})
+        except aiohttp.ClientResponseError as err:
+            LOG.error("%s plan request for topology: %s , cluster: %s, "
+                      "environment: %s failed with error code: %s",
+                      plan_type.capitalize(), topology, cluster, environ,
+                      str(err.status))
+            raise err
+
+    async def _get_plan(self, plan_type: str, cluster: str, environ: str,
+                        topology: str, use_cache: bool) -> Dict[str, Any]:
+        """ Gets the specified plan type from the process wide plan cache or,
+        if it is not cached or the cache is not to be used, from the Heron
+        Tracker API. Concurrent calls for the same plan wait for a single
+        request. """
+
+        if not use_cache:
+            return await self._request_plan(plan_type, cluster, environ,
+                                            topology)
+
+        key: Tuple[str, ...] = (plan_type, self.tracker_url, cluster, environ,
+                                topology)
+
+        plan: Optional[Dict[str, Any]] = tracker.PLAN_CACHE.get(key)
+        if plan is not None:
+            return plan
+
+        if key not in self._plan_locks:
+            self._plan_locks[key] = asyncio.Lock()
+
+        async with self._plan_locks[key]:
+            plan = tracker.PLAN_CACHE.get(key)
+            if plan is None:
+                plan = await self._request_plan(plan_type, cluster, environ,
+                                                topology)
+                tracker.PLAN_CACHE.put(key, plan)
+
+        return plan
+
+    async def get_logical_plan(self, cluster: str, environ: str,
+                               topology: str, use_cache: bool = True
+                               ) -> Dict[str, Any]:
+        """ Get the logical plan dictionary from the heron tracker API.
+
+        Arguments:
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            topology (str): The topology name.
+            use_cache (bool):   Flag indicating if the plan can be served from
+                                the process wide plan cache (the default).
+
+        Returns:
+            Dict[str, Any]:   A dictionary containing details of the spouts
+            and bolts.
+
+        Raises:
+            aiohttp.ClientResponseError:    If a non 200 status code is
+                                            returned.
+        """
+
+        return await self._get_plan("logical", cluster, environ, topology,
+                                    use_cache)
+
+    async def get_physical_plan(self, cluster: str, environ: str,
+                                topology: str, use_cache: bool = True
+                                ) -> Dict[str, Any]:
+        """ Get the physical plan dictionary from the heron tracker API.
+
+        Arguments:
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            topology (str): The topology name.
+            use_cache (bool):   Flag indicating if the plan can be served from
+                                the process wide plan cache (the default).
+
+        Returns:
+            Dict[str, Any]: A dictionary containing details of the containers
+            and stream managers for the specified topology.
+
+        Raises:
+            aiohttp.ClientResponseError:    If a non 200 status code is
+                                            returned.
+        """
+
+        return await self._get_plan("physical", cluster, environ, topology,
+                                    use_cache)
+
+    async def get_packing_plan(self, cluster: str, environ: str,
+                               topology: str, use_cache: bool = True
+                               ) -> Dict[str, Any]:
+        """ Get the packing plan dictionary from the heron tracker API.
+
+        Arguments:
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            topology (str): The topology name.
+            use_cache (bool):   Flag indicating if the plan can be served from
+                                the process wide plan cache (the default).
+
+        Returns:
+            Dict[str, Any]: A dictionary containing details of the containers
+            for the specified topology, in terms of their resource
+            allocations.
+
+        Raises:
+            aiohttp.ClientResponseError:    If a non 200 status code is
+                                            returned.
+        """
+
+        return await self._get_plan("packing", cluster, environ, topology,
+                                    use_cache)
+
+    async def get_metrics_timeline(self, cluster: str, environ: str,
+                                   topology: str, component: str,
+                                   start_time: int, end_time: int,
+                                   metrics: Union[str, List[str]]
+                                   ) -> Dict[str, Any]:
+        """ Gets metrics timelines for the specified component in the
+        specified topology. Metrics are aggregated into one minute intervals
+        keyed by POSIX UTC timestamps (in seconds) for the start of each
+        interval.
+
+        Arguments:
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            topology (str): The topology name.
+            component (str): The name of the topology component.
+            start_time (int):   The start point of the timeline. This should
+                                be a UTC POSIX timestamp in seconds.
+            end_time (int): The end point of the timeline. This should be a
+                            UTC POSIX timestamp in seconds.
+            metrics (str or list):  A metrics name or list of metrics names to
+                                    be returned.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing metrics timelines for the
+            specified topology  component.
+
+        Raises:
+            aiohttp.ClientResponseError:    If a non 200 status code is
+                                            returned.
+        """
+
+        duration: int = end_time - start_time
+
+        if duration > 10800:
+            LOG.warning("Duration of metrics timeline interval for metrics: "
+                        "%s of topology: %s was greater than the 3 hours of "
+                        "data stored by the Topology Master", str(metrics),
+                        topology)
+
+        result: Dict[str, Any] = await self._get(
+            "/topologies/metricstimeline",
+            {"cluster": cluster, "environ": environ, "topology": topology,
+             "component": component, "starttime": start_time,
+             "endtime": end_time, "metricname": metrics})
+
+        LOG.info("Fetched timeline(s) for metric(s): %s of component: %s from "
+                 "topology: %s over a period of %d seconds", str(metrics),
+                 component, topology, duration)
+
+        return result
+
+    async def issue_metrics_query(self, cluster: str, environ: str,
+                                  topology: str, start_time: int,
+                                  end_time: int, query: str
+                                  ) -> Dict[str, Any]:
+        """ Issues the supplied query and runs it against the metrics for the
+        supplied topology in the interval defined by the start and end times.
+        For query syntax see:
+
+        https://apache.github.io/incubator-heron/docs/operators/heron-tracker-api/#metricsquery
+
+        Arguments:
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            topology (str): The topology name.
+            start_time (int):   The start point of the timeline. This should
+                                be a UTC POSIX timestamp in seconds.
+            end_time (int): The end point of the timeline. This should be a
+                            UTC POSIX timestamp in seconds.
+            query (str):    The query string to be issued to the Tracker API.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the query results.
+
+        Raises:
+            aiohttp.ClientResponseError:    If a non 200 status code is
+                                            returned.
+        """
+
+        duration: int = end_time - start_time
+
+        if duration > 10800:
+            LOG.warning("Duration of metrics timeline interval for metrics "
+                        "query: %s for topology: %s was greater than the 3 "
+                        "hours of data stored by the Topology Master", query,
+                        topology)
+
+        result: Dict[str, Any] = await self._get(
+            "/topologies/metricsquery",
+            {"cluster": cluster, "environ": environ, "topology": topology,
+             "starttime": start_time, "endtime": end_time, "query": query})
+
+        LOG.info("Fetched results of query: %s from topology: %s over a "
+                 "period of %d seconds", query, topology, duration)
+
+        return result
+
+
+def run(coroutine: Any) -> Any:
+    """ Runs the supplied coroutine to completion in a new event loop and
+    returns its result. This allows the asyncio clients to be called from
+    synchronous code, such as the API's worker threads, which do not have a
+    running event loop.
+
+    Arguments:
+        coroutine:  The coroutine to be run.
+
+    Returns:
+        The result of the coroutine.
+    """
+
+    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
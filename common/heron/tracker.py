@@ -6,18 +6,30 @@
 the Heron Tracker services REST API:
 https://twitter.github.io/heron/docs/operators/heron-tracker-api/
 """
+import time
 import logging
+import threading
 
-from typing import List, Dict, Union, Any, Tuple, cast
+import datetime as dt
+
+from collections import OrderedDict
+from typing import List, Dict, Union, Any, Tuple, Callable, Optional, cast
 
 import requests
 
 import pandas as pd
 
+from caladrius.common import http_session
+
 LOG: logging.Logger = logging.getLogger(__name__)
 
 # pylint: disable=too-many-arguments
 
+# The default number of seconds plans are cached for
+DEFAULT_PLAN_CACHE_TTL: float = 300.0
+# The default maximum number of plans held in the plan cache
+DEFAULT_PLAN_CACHE_SIZE: int = 256
+
 
 def get_topologies(tracker_url: str, cluster: str = None,
                    environ: str = None) -> pd.DataFrame:
@@ -47,9 +59,8 @@ def get_topologies(tracker_url: str, cluster: str = None,
 
     topo_url: str = tracker_url + "/topologies"
 
-    response: requests.Response = requests.get(topo_url,
-                                               params={"cluster": cluster,
-                                                       "environ": environ})
+    response: requests.Response = http_session.get(
+        topo_url, params={"cluster": cluster, "environ": environ})
     try:
         response.raise_for_status()
     except requests.HTTPError as err:
@@ -76,8 +87,243 @@ def get_topologies(tracker_url: str, cluster: str = None,
     return pd.DataFrame(output)
 
 
+class PlanCache(object):
+    """ Thread safe, process wide cache for the topology plans returned by the
+    Heron Tracker API. Entries are keyed by plan type, tracker url, cluster,
+    environment and topology. They expire after a time to live (TTL) and the
+    least recently used entries are evicted once the cache is full.
+
+    Entries for a topology are also invalidated when a change in the
+    timestamp of its physical plan in Zookeeper is reported via the
+    update_pplan_timestamp method.
+
+    Cached plans are shared between callers and must be treated as read only.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_PLAN_CACHE_TTL,
+                 max_size: int = DEFAULT_PLAN_CACHE_SIZE) -> None:
+        """ Arguments:
+                ttl (float):    The number of seconds a plan is kept for. A
+                                value of zero or less disables caching.
+                max_size (int): The maximum number of plans held in the cache.
+        """
+        self.ttl: float = ttl
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._fetch_locks: Dict[Tuple[str, ...], threading.Lock] = {}
+        self._pplan_timestamps: Dict[Tuple[str, str], dt.datetime] = {}
+
+    def configure(self, ttl: float = None, max_size: int = None) -> None:
+        """ Updates the TTL and/or maximum size of the cache. Existing entries
+        are evicted if they no longer fit.
+
+        Arguments:
+            ttl (float):    The number of seconds a plan is kept for.
+            max_size (int): The maximum number of plans held in the cache.
+        """
+
+        with self._lock:
+            if ttl is not None:
+                self.ttl = float(ttl)
+            if max_size is not None:
+                self.max_size = int(max_size)
+            self._evict()
+
+        LOG.info("Tracker plan cache configured with a TTL of %.1f seconds "
+                 "and a maximum size of %d plans", self.ttl, self.max_size)
+
+    def _evict(self) -> None:
+        """ Removes the least recently used entries until the cache is within
+        its size limit. Must be called with the lock held. """
+
+        while len(self._entries) > max(self.max_size, 0):
+            self._entries.popitem(last=False)
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """ Gets the plan for the supplied key if it is present and has not
+        expired, otherwise None is returned. """
+
+        with self._lock:
+            entry: Optional[Tuple[float, Dict[str, Any]]] = \
+                self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            fetched, plan = entry
+
+            if time.monotonic() - fetched > self.ttl:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return plan
+
+    def put(self, key: Tuple[str, ...], plan: Dict[str, Any]) -> None:
+        """ Adds the supplied plan to the cache under the supplied key. """
+
+        if self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), plan)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_fetch(self, key: Tuple[str, ...],
+                     fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """ Gets the plan for the supplied key from the cache or, if it is not
+        present, calls the supplied fetch function and caches the result.
+        Concurrent callers missing on the same key will wait for a single
+        fetch rather than each issuing their own request. """
+
+        plan: Optional[Dict[str, Any]] = self.get(key)
+
+        if plan is not None:
+            with self._lock:
+                self.hits += 1
+            return plan
+
+        with self._lock:
+            fetch_lock: threading.Lock = \
+                self._fetch_locks.setdefault(key, threading.Lock())
+
+        try:
+            with fetch_lock:
+                # Another thread may have fetched the plan while we waited
+                with self._lock:
+                    entry: Optional[Tuple[float, Dict[str, Any]]] = \
+                        self._entries.get(key)
+                    if (entry is not None and
+                            time.monotonic() - entry[0] <= self.ttl):
+                        self.hits += 1
+                        return entry[1]
+
+                    self.misses += 1
+
+                plan = fetch()
+                self.put(key, plan)
+        finally:
+            with self._lock:
+                self._fetch_locks.pop(key, None)
+
+        return plan
+
+    def invalidate(self, topology: str = None, cluster: str = None,
+                   environ: str = None) -> int:
+        """ Removes all entries matching the supplied topology, cluster and
+        environment. Arguments that are not supplied match any value, so
+        calling this method with no arguments clears the cache.
+
+        Returns:
+            int:    The number of entries removed.
+        """
+
+        with self._lock:
+            keys: List[Tuple[str, ...]] = [
+                key for key in self._entries
+                if ((topology is None or key[4] == topology) and
+                    (cluster is None or key[2] == cluster) and
+                    (environ is None or key[3] == environ))]
+
+            for key in keys:
+                del self._entries[key]
+
+        return len(keys)
+
+    def update_pplan_timestamp(self, zk_connection: str, topology: str,
+                               timestamp: dt.datetime, cluster: str = None,
+                               environ: str = None) -> bool:
+        """ Records the last update timestamp of the physical plan of the
+        supplied topology in the supplied Zookeeper cluster. If this differs
+        from the previously recorded timestamp then the cached plans for the
+        topology in the supplied cluster and environment are invalidated.
+
+        Arguments:
+            zk_connection (str):    The connection string for the zookeeper
+                                    cluster the timestamp came from.
+            topology (str): The topology name.
+            timestamp (datetime):   The physical plan update timestamp.
+            cluster (str):  Optional cluster the topology is running in. If
+                            not supplied the plans of topologies with the
+                            same name in every cluster are invalidated.
+            environ (str):  Optional environment the topology is running in.
+                            If not supplied the plans of topologies with the
+                            same name in every environment are invalidated.
+
+        Returns:
+            bool:   True if cached plans were invalidated, False otherwise.
+        """
+
+        with self._lock:
+            previous: Optional[dt.datetime] = self._pplan_timestamps.get(
+                (zk_connection, topology))
+            self._pplan_timestamps[(zk_connection, topology)] = timestamp
+
+        if previous is None or previous == timestamp:
+            return False
+
+        removed: int = self.invalidate(topology=topology, cluster=cluster,
+                                       environ=environ)
+
+        LOG.info("Physical plan of topology %s was updated at %s, removed %d "
+                 "cached plans", topology, timestamp.isoformat(), removed)
+
+        return True
+
+
+PLAN_CACHE: PlanCache = PlanCache()
+
+
+def _request_plan(plan_type: str, tracker_url: str, cluster: str,
+                  environ: str, topology: str) -> Dict[str, Any]:
+    """ Requests the specified plan type (logical, physical or packing) from
+    the heron tracker API.
+
+    Raises:
+        requests.HTTPError: If a non 200 status code is returned.
+    """
+
+    LOG.info("Fetching %s plan for topology: %s", plan_type, topology)
+
+    plan_url: str = tracker_url + f"/topologies/{plan_type}plan"
+
+    response: requests.Response = http_session.get(
+        plan_url, params={"cluster": cluster, "environ": environ,
+                          "topology": topology})
+
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as err:
+        LOG.error("%s plan request for topology: %s , cluster: %s, "
+                  "environment: %s failed with error code: %s",
+                  plan_type.capitalize(), topology, cluster, environ,
+                  str(response.status_code))
+        raise err
+
+    return response.json()["result"]
+
+
+def _get_plan(plan_type: str, tracker_url: str, cluster: str, environ: str,
+              topology: str, use_cache: bool) -> Dict[str, Any]:
+    """ Gets the specified plan type from the plan cache or, if it is not
+    cached or the cache is not to be used, from the heron tracker API. """
+
+    if not use_cache:
+        return _request_plan(plan_type, tracker_url, cluster, environ,
+                             topology)
+
+    return PLAN_CACHE.get_or_fetch(
+        (plan_type, tracker_url, cluster, environ, topology),
+        lambda: _request_plan(plan_type, tracker_url, cluster, environ,
+                              topology))
+
+
 def get_logical_plan(tracker_url: str, cluster: str, environ: str,
-                     topology: str) -> Dict[str, Any]:
+                     topology: str, use_cache: bool = True) -> Dict[str, Any]:
     """ Get the logical plan dictionary from the heron tracker API.
 
     Arguments:
@@ -86,6 +332,8 @@ def get_logical_plan(tracker_url: str, cluster: str, environ: str,
         environ (str):  The environment the topology is running in (eg. prod,
                         devel, test, etc).
         topology (str): The topology name.
+        use_cache (bool):   Flag indicating if the plan can be served from the
+                            process wide plan cache (the default).
 
     Returns:
         Dict[str, Any]:   A dictionary containing details of the spouts and
@@ -95,28 +343,13 @@ def get_logical_plan(tracker_url: str, cluster: str, environ: str,
         requests.HTTPError: If a non 200 status code is returned.
     """
 
-    LOG.info("Fetching logical plan for topology: %s", topology)
-
-    logical_url: str = tracker_url + "/topologies/logicalplan"
-
-    response: requests.Response = requests.get(logical_url,
-                                               params={"cluster": cluster,
-                                                       "environ": environ,
-                                                       "topology": topology})
-
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as err:
-        LOG.error("Logical plan request for topology: %s , cluster: %s, "
-                  "environment: %s failed with error code: %s", topology,
-                  cluster, environ, str(response.status_code))
-        raise err
-
-    return response.json()["result"]
+    return _get_plan("logical", tracker_url, cluster, environ, topology,
+                     use_cache)
 
 
 def get_physical_plan(tracker_url: str, cluster: str, environ: str,
-                      topology: str) -> Dict[str, Any]:
+                      topology: str, use_cache: bool = True
+                      ) -> Dict[str, Any]:
     """ Get the physical plan dictionary from the heron tracker API.
 
     Arguments:
@@ -125,6 +358,8 @@ def get_physical_plan(tracker_url: str, cluster: str, environ: str,
         environ (str):  The environment the topology is running in (eg. prod,
                         devel, test, etc).
         topology (str): The topology name.
+        use_cache (bool):   Flag indicating if the plan can be served from the
+                            process wide plan cache (the default).
 
     Returns:
         Dict[str, Any]: A dictionary containing details of the containers and
@@ -134,28 +369,12 @@ def get_physical_plan(tracker_url: str, cluster: str, environ: str,
         requests.HTTPError: If a non 200 status code is returned.
     """
 
-    LOG.info("Fetching physical plan for topology: %s", topology)
-
-    physical_url: str = tracker_url + "/topologies/physicalplan"
-
-    response: requests.Response = requests.get(physical_url,
-                                               params={"cluster": cluster,
-                                                       "environ": environ,
-                                                       "topology": topology})
-
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as err:
-        LOG.error("Physical plan request for topology: %s , cluster: %s, "
-                  "environment: %s failed with error code: %s", topology,
-                  cluster, environ, str(response.status_code))
-        raise err
-
-    return response.json()["result"]
+    return _get_plan("physical", tracker_url, cluster, environ, topology,
+                     use_cache)
 
 
 def get_packing_plan(tracker_url: str, cluster: str, environ: str,
-                      topology: str) -> Dict[str, Any]:
+                     topology: str, use_cache: bool = True) -> Dict[str, Any]:
     """ Get the packing plan dictionary from the heron tracker API.
 
     Arguments:
@@ -164,6 +383,8 @@ def get_packing_plan(tracker_url: str, cluster: str, environ: str,
         environ (str):  The environment the topology is running in (eg. prod,
                         devel, test, etc).
         topology (str): The topology name.
+        use_cache (bool):   Flag indicating if the plan can be served from the
+                            process wide plan cache (the default).
 
     Returns:
         Dict[str, Any]: A dictionary containing details of the containers
@@ -173,24 +394,8 @@ def get_packing_plan(tracker_url: str, cluster: str, environ: str,
         requests.HTTPError: If a non 200 status code is returned.
     """
 
-    LOG.info("Fetching packing plan for topology: %s", topology)
-
-    packing_url: str = tracker_url + "/topologies/packingplan"
-
-    response: requests.Response = requests.get(packing_url,
-                                               params={"cluster": cluster,
-                                                       "environ": environ,
-                                                       "topology": topology})
-
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as err:
-        LOG.error("Packing plan request for topology: %s , cluster: %s, "
-                  "environment: %s failed with error code: %s", topology,
-                  cluster, environ, str(response.status_code))
-        raise err
-
-    return response.json()["result"]
+    return _get_plan("packing", tracker_url, cluster, environ, topology,
+                     use_cache)
 
 
 def parse_instance_name(instance_name: str) -> Dict[str, Union[str, int]]:
@@ -242,10 +447,9 @@ def get_topology_info(tracker_url: str, cluster: str, environ: str,
 
     info_url: str = tracker_url + "/topologies/info"
 
-    response: requests.Response = requests.get(info_url,
-                                               params={"cluster": cluster,
-                                                       "environ": environ,
-                                                       "topology": topology})
+    response: requests.Response = http_session.get(
+        info_url, params={"cluster": cluster, "environ": environ,
+                          "topology": topology})
 
     response.raise_for_status()
 
@@ -286,7 +490,8 @@ def get_metrics(tracker_url: str, cluster: str, environ: str, topology: str,
 
     metrics_url: str = tracker_url + "/topologies/metrics"
 
-    response: requests.Response = requests.get(metrics_url, params=payload)
+    response: requests.Response = http_session.get(
+        metrics_url, params=payload)
 
     response.raise_for_status()
 
@@ -340,8 +545,8 @@ def get_metrics_timeline(tracker_url: str, cluster: str, environ: str,
 
     metrics_timeline_url: str = tracker_url + "/topologies/metricstimeline"
 
-    response: requests.Response = requests.get(metrics_timeline_url,
-                                               params=payload)
+    response: requests.Response = http_session.get(
+        metrics_timeline_url, params=payload)
     response.raise_for_status()
 
     LOG.info("Fetched timeline(s) for metric(s): %s of component: %s from "
@@ -392,8 +597,8 @@ def issue_metrics_query(tracker_url: str, cluster: str, environ: str,
 
     metrics_query_url: str = tracker_url + "/topologies/metricsquery"
 
-    response: requests.Response = requests.get(metrics_query_url,
-                                               params=payload)
+    response: requests.Response = http_session.get(
+        metrics_query_url, params=payload)
     response.raise_for_status()
 
     LOG.info("Fetched results of query: %s from topology: %s over a "
@@ -16,6 +16,9 @@ import requests
 
 from kazoo.client import KazooClient
 
+from caladrius.common import http_session
+from caladrius.common.heron import tracker
+
 LOG: logging.Logger = logging.getLogger(__name__)
 
 TOPO_UPDATED_SEARCH_STR: str = \
@@ -28,7 +31,8 @@ NO_MINS_DATE_FORMAT_2: str = "%b %d, %Y %I %p"
 
 
 def last_topo_update_ts_html(zk_connection: str, zk_root_node: str,
-                             topology_id: str, zk_time_offset: int = 0
+                             topology_id: str, zk_time_offset: int = 0,
+                             cluster: str = None, environ: str = None
                              ) -> dt.datetime:
     """ This method will attempt to obtain a timestamp of the most recent
     physical plan uploaded to the zookeeper cluster. To do this it simply
@@ -44,6 +48,11 @@ def last_topo_update_ts_html(zk_connection: str, zk_root_node: str,
                               clock in hours from UTC. If not supplied it will
                               be assumed that the times given by zookeeper are
                               in UTC.
+        cluster (str):  Optional cluster the topology is running in, used to
+                        limit which cached Heron Tracker plans are
+                        invalidated when the physical plan has changed.
+        environ (str):  Optional environment the topology is running in, used
+                        in the same way as the cluster.
 
     Returns:
         A timezone aware datetime object representing the time of the last
@@ -62,7 +71,7 @@ def last_topo_update_ts_html(zk_connection: str, zk_root_node: str,
     zk_str: str = \
         f"http://{zk_connection}/tree{zk_root_node}/pplans/{topology_id}/"
 
-    response: requests.Response = requests.get(zk_str)
+    response: requests.Response = http_session.get(zk_str)
 
     response.raise_for_status()
 
@@ -100,11 +109,18 @@ def last_topo_update_ts_html(zk_connection: str, zk_root_node: str,
 
     last_updated_tz: dt.datetime = last_updated.replace(tzinfo=zk_tz)
 
+    # Cached Tracker plans for this topology are stale if the physical plan
+    # has changed since it was last checked
+    tracker.PLAN_CACHE.update_pplan_timestamp(zk_connection, topology_id,
+                                              last_updated_tz, cluster,
+                                              environ)
+
     return last_updated_tz
 
 
 def last_topo_update_ts(zk_connection: str, zk_root_node: str,
-                        topology_id: str, zk_time_offset: int = 0
+                        topology_id: str, zk_time_offset: int = 0,
+                        cluster: str = None, environ: str = None
                         ) -> dt.datetime:
     """ This method will attempt to obtain a datetime object for the ctime
     (creation time) timestamp of the most recent physical plan uploaded to the
@@ -119,6 +135,11 @@ def last_topo_update_ts(zk_connection: str, zk_root_node: str,
                               clock in hours from UTC. If not supplied it will
                               be assumed that the times given by zookeeper are
                               in UTC.
+        cluster (str):  Optional cluster the topology is running in, used to
+                        limit which cached Heron Tracker plans are
+                        invalidated when the physical plan has changed.
+        environ (str):  Optional environment the topology is running in, used
+                        in the same way as the cluster.
 
     Returns:
         A timezone aware datetime object representing the time of the last
@@ -161,4 +182,8 @@ def last_topo_update_ts(zk_connection: str, zk_root_node: str,
 
     last_updated_tz: dt.datetime = last_updated.replace(tzinfo=zk_tz)
 
+    tracker.PLAN_CACHE.update_pplan_timestamp(zk_connection, topology_id,
+                                              last_updated_tz, cluster,
+                                              environ)
+
     return last_updated_tz
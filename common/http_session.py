@@ -0,0 +1,230 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module provides a shared, thread safe HTTP session layer for all the
+REST calls made by caladrius (Heron Tracker, Zookeeper UI etc). A single
+pooled requests session is used so that connections to each host are kept
+alive and reused, requests are retried with back off and the latency of each
+endpoint is recorded. """
+
+import time
+import logging
+import threading
+
+from collections import defaultdict
+from typing import Dict, Any, NamedTuple, DefaultDict, Union
+from urllib.parse import urlsplit
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Status codes that will trigger a retry
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+class SessionSettings(NamedTuple):
+    """ The settings used to create the shared session. """
+
+    # Seconds to wait for a connection to be established
+    connect_timeout: float = 5.0
+    # Seconds to wait for a response once connected
+    read_timeout: float = 60.0
+    # The number of hosts whose connection pools are kept
+    pool_connections: int = 10
+    # The maximum number of connections kept open to each host
+    pool_maxsize: int = 20
+    # The number of times a failed request is retried
+    retries: int = 3
+    # Retries wait for backoff_factor * (2 ^ (retry number - 1)) seconds
+    backoff_factor: float = 0.5
+
+
+class EndpointStats(object):
+    """ Latency counters for a single endpoint. """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.errors: int = 0
+        self.total_secs: float = 0.0
+        self.max_secs: float = 0.0
+
+    def record(self, duration: float, error: bool) -> None:
+        """ Records a single request against this endpoint. """
+
+        self.count += 1
+        self.total_secs += duration
+        self.max_secs = max(self.max_secs, duration)
+        if error:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Union[int, float]]:
+        """ Returns the counters as a dictionary. """
+
+        return {"count": self.count, "errors": self.errors,
+                "total_secs": self.total_secs,
+                "mean_secs": (self.total_secs / self.count
+                              if self.count else 0.0),
+                "max_secs": self.max_secs}
+
+
+_LOCK: threading.Lock = threading.Lock()
+_SETTINGS: SessionSettings = SessionSettings()
+_SESSION: requests.Session = None
+_STATS: DefaultDict[str, EndpointStats] = defaultdict(EndpointStats)
+
+
+def _create_session(settings: SessionSettings) -> requests.Session:
+    """ Creates a requests session with pooled, retrying adapters for HTTP and
+    HTTPS using the supplied settings. """
+
+    retry: Retry = Retry(total=settings.retries, connect=settings.retries,
+                         read=settings.retries,
+                         backoff_factor=settings.backoff_factor,
+                         status_forcelist=RETRY_STATUS_CODES,
+                         raise_on_status=False)
+
+    adapter: HTTPAdapter = HTTPAdapter(
+        pool_connections=settings.pool_connections,
+        pool_maxsize=settings.pool_maxsize, max_retries=retry)
+
+    session: requests.Session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def configure(**kwargs: Union[int, float]) -> SessionSettings:
+    """ Updates the settings of the shared session. Any keyword arguments
+    matching the fields of SessionSettings replace the current values. The
+    session will be recreated with the new settings on its next use.
+
+    Returns:
+        SessionSettings:    The updated settings.
+
+    Raises:
+        TypeError:  If an unknown setting is supplied.
+    """
+
+    global _SETTINGS, _SESSION
+
+    unknown = set(kwargs) - set(SessionSettings._fields)
+    if unknown:
+        msg: str = f"Unknown HTTP session settings: {sorted(unknown)}"
+        LOG.error(msg)
+        raise TypeError(msg)
+
+    updates: Dict[str, Union[int, float]] = \
+        {key: value for key, value in kwargs.items() if value is not None}
+
+    with _LOCK:
+        _SETTINGS = _SETTINGS._replace(**updates)
+        old_session: requests.Session = _SESSION
+        _SESSION = None
+
+    if old_session is not None:
+        old_session.close()
+
+    LOG.info("HTTP session configured with: %s", str(_SETTINGS))
+
+    return _SETTINGS
+
+
+def settings() -> SessionSettings:
+    """ Returns the current settings of the shared session. """
+
+    return _SETTINGS
+
+
+def get_session() -> requests.Session:
+    """ Returns the shared session, creating it if required. """
+
+    global _SESSION
+
+    with _LOCK:
+        if _SESSION is None:
+            _SESSION = _create_session(_SETTINGS)
+        return _SESSION
+
+
+def _endpoint(url: str) -> str:
+    """ Returns the endpoint (host and path) of the supplied url. """
+
+    parts = urlsplit(url)
+    return parts.netloc + parts.path
+
+
+def get(url: str, params: Dict[str, Any] = None,
+        **kwargs: Any) -> requests.Response:
+    """ Issues a GET request to the supplied url using the shared session. The
+    configured timeouts are used unless a timeout keyword argument is
+    supplied. The request latency is recorded against the url's endpoint.
+
+    Arguments:
+        url (str):  The url to request.
+        params (dict):  Optional query parameters.
+        **kwargs:   Additional keyword arguments passed to requests.
+
+    Returns:
+        requests.Response:  The response to the request.
+
+    Raises:
+        requests.RequestException:  If the request fails after all retries.
+    """
+
+    kwargs.setdefault("timeout", (_SETTINGS.connect_timeout,
+                                  _SETTINGS.read_timeout))
+
+    start: float = time.perf_counter()
+    error: bool = True
+    try:
+        response: requests.Response = get_session().get(url, params=params,
+                                                        **kwargs)
+        error = not response.ok
+        return response
+    finally:
+        record_latency(url, time.perf_counter() - start, error)
+
+
+def record_latency(url: str, duration: float, error: bool) -> None:
+    """ Records the latency of a single request to the supplied url against
+    its endpoint. This is used for requests that are not issued through the
+    shared session (eg. by the asyncio Heron Tracker client) so that their
+    latencies are reported alongside those of the shared session.
+
+    Arguments:
+        url (str):  The requested url.
+        duration (float):   The duration of the request in seconds.
+        error (bool):   True if the request failed.
+    """
+
+    with _LOCK:
+        _STATS[_endpoint(url)].record(duration, error)
+    LOG.debug("GET request to %s took %.3f seconds", url, duration)
+
+
+def latency_stats() -> Dict[str, Dict[str, Union[int, float]]]:
+    """ Returns the latency counters for each endpoint requested through the
+    shared session.
+
+    Returns:
+        dict:   A dictionary mapping from endpoint (host and path) to a
+        dictionary with the request count, error count, total, mean and
+        maximum latency in seconds.
+    """
+
+    with _LOCK:
+        return {endpoint: stats.to_dict()
+                for endpoint, stats in _STATS.items()}
+
+
+def reset_latency_stats() -> None:
+    """ Clears all the endpoint latency counters. """
+
+    with _LOCK:
+        _STATS.clear()
@@ -12,6 +12,46 @@ class ConfKeys(Enum):
     """ Main enum class containing configuration keys for caladrius"""
 
     HERON_TRACKER_URL: str = "heron.tracker.url"
+    HERON_TRACKER_PLAN_CACHE_TTL: str = "heron.tracker.plan.cache.ttl.secs"
+    HERON_TRACKER_PLAN_CACHE_SIZE: str = "heron.tracker.plan.cache.max.size"
     HERON_TMASTER_METRICS_MAX_HOURS: str = "heron.tmaster.metrics.max.hours"
+    HERON_TMASTER_METRICS_FETCH_WORKERS: str = \
+        "heron.tmaster.metrics.fetch.workers"
+    HERON_TMASTER_METRICS_MAX_CONCURRENCY: str = \
+        "heron.tmaster.metrics.max.concurrency"
+    HERON_TMASTER_METRICS_CACHE_DIR: str = "heron.tmaster.metrics.cache.dir"
+
+    HERON_METRICS_CACHE_DIR: str = "heron.metrics.cache.dir"
+    HERON_METRICS_CACHE_METRICS: str = "heron.metrics.cache.metrics"
+    HERON_METRICS_CACHE_SETTLE_SECS: str = "heron.metrics.cache.settle.secs"
+    HERON_METRICS_CACHE_COMPRESSION: str = "heron.metrics.cache.compression"
+
+    HERON_METRICS_RECORDING_DIR: str = "heron.metrics.recording.dir"
+    HERON_METRICS_RECORDING_COMPRESSION: str = \
+        "heron.metrics.recording.compression"
+
+    HERON_METRICS_PREFETCH_TOPOLOGIES: str = "heron.metrics.prefetch.topologies"
+    HERON_METRICS_PREFETCH_METRICS: str = "heron.metrics.prefetch.metrics"
+    HERON_METRICS_PREFETCH_WINDOW_MINS: str = \
+        "heron.metrics.prefetch.window.mins"
+    HERON_METRICS_PREFETCH_INTERVAL_SECS: str = \
+        "heron.metrics.prefetch.interval.secs"
+
+    WRAPPED_CLIENT: str = "wrapped.client"
+    WRAPPED_CLIENT_CONFIG: str = "wrapped.client.config"
 
     GREMLIN_SERVER_URL: str = "gremlin.server.url"
+    GREMLIN_BATCH_SIZE: str = "gremlin.batch.size"
+    GREMLIN_EDGE_BATCH_SIZE: str = "gremlin.edge.batch.size"
+
+    GRAPH_MEMORY_SNAPSHOT_DIR: str = "graph.memory.snapshot.dir"
+
+    PATH_STORE_DIR: str = "path.store.dir"
+    PATH_STORE_CACHE_SIZE: str = "path.store.cache.size"
+
+    HTTP_CONNECT_TIMEOUT: str = "http.connect.timeout.secs"
+    HTTP_READ_TIMEOUT: str = "http.read.timeout.secs"
+    HTTP_POOL_CONNECTIONS: str = "http.pool.connections"
+    HTTP_POOL_MAXSIZE: str = "http.pool.maxsize"
+    HTTP_RETRIES: str = "http.retries"
+    HTTP_BACKOFF_FACTOR: str = "http.retry.backoff.factor"
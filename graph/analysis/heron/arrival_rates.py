@@ -9,20 +9,13 @@ import logging
 
 import datetime as dt
 
-from typing import List, Dict, Tuple, Union, DefaultDict, cast
+from typing import List, Dict, Set, Tuple, Union, DefaultDict, cast
 from collections import defaultdict
 from functools import lru_cache
 
 import pandas as pd
 
-from gremlin_python.process.graph_traversal import \
-    (GraphTraversalSource, not_, out, outE, loops, constant, properties, inV,
-     outV, in_)
-from gremlin_python.process.traversal import P
-from gremlin_python.structure.graph import Vertex
-from gremlin_python import statics
-
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient, LOGICAL_EDGE
 from caladrius.metrics.heron.client import HeronMetricsClient
 from caladrius.graph.analysis.heron.io_ratios import lstsq_io_ratios
 
@@ -33,71 +26,62 @@ from caladrius.metrics.heron.topology.routing_probabilities import \
 # Type definitions
 ARRIVAL_RATES = DefaultDict[int, DefaultDict[Tuple[str, str], float]]
 OUTPUT_RATES = DefaultDict[int, Dict[str, float]]
+EDGE_MAP = DefaultDict[int, List[LOGICAL_EDGE]]
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
 
-def get_levels(topo_traversal: GraphTraversalSource) -> List[List[Vertex]]:
-    """ Gets the levels of the logical graph. The traversal starts with the
+def get_levels(spout_tasks: List[int],
+               out_edges: Dict[int, List[LOGICAL_EDGE]]) -> List[List[int]]:
+    """ Gets the levels of the logical graph. The search starts with the
     source spouts and performs a breadth first search through the logically
-    connected vertices.
+    connected instances, with each instance placed in the level at which it
+    is first reached.
 
     Arguments:
-        topo_traversal (GraphTraversalSource):  A traversal source instance
-                                                mapped to the topology subgraph
-                                                whose levels are to be
-                                                calculated.
+        spout_tasks (list): The task IDs of the topology's spout instances.
+        out_edges (dict):   A dictionary mapping from task ID to the list of
+                            logical connections leaving that instance.
 
     Returns:
-        A list where each entry is a list of Vertex instances representing a
-        level within the logical graph. The first level will be the spout
+        A list where each entry is a list of task IDs representing a level
+        within the logical graph. The first level will be the spout
         instances.
     """
 
-    # Only load the static enums we need so we don't pollute the globals dict
-    keys = statics.staticEnums["keys"]
-    values = statics.staticEnums["values"]
-    local_scope = statics.staticEnums["local"]
-
-    # Repeatedly traverse the tree defined by the logical connections, grouping
-    # each group (or set because we us de-duplicate) of vertices by their depth
-    # in the tree. This depth is based the current number of times the repeat
-    # step has run (loops). So you end up with a map of integer depth to list
-    # of vertices which is emitted by the cap step. After this we just put the
-    # Hash Map in key order (ascending) and then take only the values (the
-    # lists of vertices) and unfold them into a list.
-    # The first group by(-1) statement is so that the spout vertices are
-    # included at the top of the list
-    levels: List[List[Vertex]] = (
-        topo_traversal.V().hasLabel("spout")
-        .group("m").by(constant(-1))
-        .repeat(out("logically_connected").dedup().group("m").by(loops()))
-        .until(not_(outE("logically_connected")))
-        .cap("m")
-        .order(local_scope).by(keys)
-        .select(values).unfold().toList())
-
-    return levels
+    levels: List[List[int]] = [list(spout_tasks)]
+    visited: Set[int] = set(spout_tasks)
+
+    while levels[-1]:
+        level: List[int] = []
+        for task_id in levels[-1]:
+            for out_edge in out_edges.get(task_id, []):
+                destination_task: int = cast(int, out_edge["destination_task"])
+                if destination_task not in visited:
+                    visited.add(destination_task)
+                    level.append(destination_task)
+        levels.append(level)
+
+    # Remove the empty level that ended the search
+    return levels[:-1]
 
 
 @lru_cache()
 def _setup_arrival_calcs(metrics_client: HeronMetricsClient,
-                         graph_client: GremlinClient,
+                         graph_client: GraphClient,
                          topology_id: str, cluster: str, environ: str,
                          topology_ref: str, start: dt.datetime,
                          end: dt.datetime, io_bucket_length: int,
                          tracker_url: str, **kwargs: Union[str, int, float]
-                         ) -> Tuple[pd.DataFrame, List[List[Vertex]],
-                                    pd.DataFrame, Dict[Vertex, List[int]],
-                                    Dict[Vertex, List[int]]]:
+                         ) -> Tuple[pd.DataFrame, List[List[int]],
+                                    pd.DataFrame, Dict[str, List[int]],
+                                    Dict[str, List[int]], EDGE_MAP,
+                                    EDGE_MAP]:
     """ Helper method which sets up the data needed for the arrival rate
     calculations. This is a separate cached method as these data are not
     effected by the traffic (spout_state) and so do not need to be recalculated
     for a new traffic level for the same topology id/ref. """
 
-    topo_traversal: GraphTraversalSource = \
-        graph_client.topology_subgraph(topology_id, topology_ref)
-
     # Calculate the routing probabilities for the defined metric gathering
     # period
     i2i_rps: pd.Series = (calculate_inter_instance_rps(
@@ -105,10 +89,25 @@ def _setup_arrival_calcs(metrics_client: HeronMetricsClient,
         **kwargs).set_index(["source_task", "destination_task", "stream"])
      ["routing_probability"])
 
-    # Get the vertex levels for the logical graph tree
+    # Index the logical connections by their source and destination tasks
+    out_edges: EDGE_MAP = defaultdict(list)
+    in_edges: EDGE_MAP = defaultdict(list)
+
+    for logical_edge in graph_client.get_logical_edges(topology_id,
+                                                       topology_ref):
+        out_edges[cast(int, logical_edge["source_task"])].append(logical_edge)
+        in_edges[cast(int, logical_edge["destination_task"])].append(
+            logical_edge)
+
+    spout_tasks: List[int] = sorted(
+        cast(int, instance["task_id"]) for instance
+        in graph_client.get_instances(topology_id, topology_ref)
+        if instance["label"] == "spout")
+
+    # Get the instance levels for the logical graph tree
     LOG.info("Calculating levels for topology %s reference %s", topology_id,
              topology_ref)
-    levels: List[List[Vertex]] = get_levels(topo_traversal)
+    levels: List[List[int]] = get_levels(spout_tasks, out_edges)
     LOG.debug("Found %d levels is topology %s reference %s", len(levels),
               topology_id, topology_ref)
 
@@ -121,50 +120,21 @@ def _setup_arrival_calcs(metrics_client: HeronMetricsClient,
                                                     "source_component"]
                                                    )["coefficient"]
 
-    # Get the details of the incoming and outgoing physical connections for
-    # stream manager in the topology
-
-    # Get a dictionary mapping from stream manager id string to a list of the
-    # instances (within each container) that will send tuples to each stream
-    # manager
-    sending_instances: Dict[Vertex, List[int]] = \
-        (topo_traversal.V().hasLabel("stream_manager")
-         .group().by("id").by(in_("physically_connected")
-                              .hasLabel(P.within("spout", "bolt"))
-                              .values("task_id")
-                              .fold())
-         .next())
-
-    # Get a dictionary mapping from stream manager id string to a list of the
-    # instances (within each container) that will receive tuples from each
-    # stream manager
-    receiving_instances: Dict[Vertex, List[int]] = \
-        (topo_traversal.V().hasLabel("stream_manager")
-         .group().by("id").by(out("physically_connected")
-                              .hasLabel("bolt").values("task_id").fold())
-         .next())
+    # Get dictionaries mapping from stream manager id string to a list of the
+    # instances (within each container) that will send tuples to and receive
+    # tuples from each stream manager
+    sending_instances, receiving_instances = \
+        graph_client.get_stream_manager_instances(topology_id, topology_ref)
 
     return (i2i_rps, levels, coefficients, sending_instances,
-            receiving_instances)
+            receiving_instances, out_edges, in_edges)
 
 
-def _calculate_arrivals(topo_traversal: GraphTraversalSource,
-                        source_vertex: Vertex, arrival_rates: ARRIVAL_RATES,
+def _calculate_arrivals(out_edges: List[LOGICAL_EDGE],
+                        arrival_rates: ARRIVAL_RATES,
                         output_rates: DefaultDict[int, Dict[str, float]],
                         i2i_rps: pd.DataFrame) -> ARRIVAL_RATES:
 
-    # Get all downstream edges and vertices for this source vertex
-    out_edges: List[Dict[str, Union[str, int, float]]] = \
-        (topo_traversal.V(source_vertex).outE("logically_connected")
-         .project("source_task", "source_component", "stream_name",
-                  "destination_task", "destination_component")
-         .by(outV().properties("task_id").value())
-         .by(outV().properties("component").value())
-         .by(properties("stream").value())
-         .by(inV().properties("task_id").value())
-         .by(inV().properties("component").value())
-         .toList())
-
     if not out_edges:
         return arrival_rates
 
@@ -175,7 +145,7 @@ def _calculate_arrivals(topo_traversal: GraphTraversalSource,
               source_component, source_task)
 
     for out_edge in out_edges:
-        stream: str = cast(str, out_edge["stream_name"])
+        stream: str = cast(str, out_edge["stream"])
         try:
             stream_output: float = cast(float,
                                         output_rates[source_task][stream])
@@ -213,34 +183,23 @@ def _calculate_arrivals(topo_traversal: GraphTraversalSource,
     return arrival_rates
 
 
-def _calculate_outputs(topo_traversal: GraphTraversalSource,
-                       source_vertex: Vertex,
+def _calculate_outputs(source_task: int, in_edges: List[LOGICAL_EDGE],
+                       out_edges: List[LOGICAL_EDGE],
                        arrival_rates: ARRIVAL_RATES,
                        output_rates: DefaultDict[int, Dict[str, float]],
                        coefficients: pd.Series,
                        ) -> DefaultDict[int, Dict[str, float]]:
 
-    source_task: int = (topo_traversal.V(source_vertex)
-                        .properties("task_id").value().next())
+    in_streams: List[Tuple[str, str]] = list(dict.fromkeys(
+        (cast(str, in_edge["stream"]), cast(str, in_edge["source_component"]))
+        for in_edge in in_edges))
 
-    in_streams: List[Dict[str, str]] = \
-        (topo_traversal.V(source_vertex).inE("logically_connected")
-         .project("stream_name", "source_component")
-         .by(properties("stream").value())
-         .by(outV().properties("component").value())
-         .dedup()
-         .toList())
-
-    out_streams: List[str] = \
-        (topo_traversal.V(source_vertex)
-         .outE("logically_connected").values("stream")
-         .dedup().toList())
+    out_streams: List[str] = list(dict.fromkeys(
+        cast(str, out_edge["stream"]) for out_edge in out_edges))
 
     for out_stream in out_streams:
         output_rate: float = 0.0
-        for in_stream in in_streams:
-            in_stream_name: str = in_stream["stream_name"]
-            source_component: str = in_stream["source_component"]
+        for in_stream_name, source_component in in_streams:
 
             stream_arrivals: float = \
                 arrival_rates[source_task][(in_stream_name,
@@ -328,7 +287,7 @@ def _calc_strmgr_in_out(sending_instances: Dict[str, List[int]],
     return pd.DataFrame(strmgr_output)
 
 
-def calculate(graph_client: GremlinClient, metrics_client: HeronMetricsClient,
+def calculate(graph_client: GraphClient, metrics_client: HeronMetricsClient,
               topology_id: str, cluster: str, environ: str, topology_ref: str,
               start: dt.datetime, end: dt.datetime, io_bucket_length: int,
               tracker_url: str, spout_state: Dict[int, Dict[str, float]],
@@ -337,8 +296,8 @@ def calculate(graph_client: GremlinClient, metrics_client: HeronMetricsClient,
     """
 
     Arguments:
-        graph_client (GremlinClient):   The client instance for the graph
-                                        database.
+        graph_client (GraphClient): The client instance for the graph
+                                    database.
         metrics_client (HeronMetricsClient):    The client instance for the
                                                 metrics database.
         topology_id (str):  The topology identification string.
@@ -383,13 +342,10 @@ def calculate(graph_client: GremlinClient, metrics_client: HeronMetricsClient,
              topology_ref, (end-start).total_seconds(), start.isoformat(),
              end.isoformat())
 
-    i2i_rps, levels, coefficients, sending_instances, receiving_instances = \
-        _setup_arrival_calcs(metrics_client, graph_client, topology_id,
-                             cluster, environ, topology_ref, start, end,
-                             io_bucket_length, tracker_url, **kwargs)
-
-    topo_traversal: GraphTraversalSource = \
-        graph_client.topology_subgraph(topology_id, topology_ref)
+    (i2i_rps, levels, coefficients, sending_instances, receiving_instances,
+     out_edges, in_edges) = _setup_arrival_calcs(
+         metrics_client, graph_client, topology_id, cluster, environ,
+         topology_ref, start, end, io_bucket_length, tracker_url, **kwargs)
 
     arrival_rates: ARRIVAL_RATES = defaultdict(lambda: defaultdict(float))
     output_rates: OUTPUT_RATES = defaultdict(dict)
@@ -405,19 +361,20 @@ def calculate(graph_client: GremlinClient, metrics_client: HeronMetricsClient,
         if level_number != 0:
             # If this is not a spout level then we need to calculate the output
             # from the instances in this level.
-            for source_vertex in level:
+            for source_task in level:
 
-                output_rates = _calculate_outputs(topo_traversal,
-                                                  source_vertex, arrival_rates,
-                                                  output_rates, coefficients)
+                output_rates = _calculate_outputs(
+                    source_task, in_edges.get(source_task, []),
+                    out_edges.get(source_task, []), arrival_rates,
+                    output_rates, coefficients)
 
         # Calculate the arrival rates at the instances down stream on the next
         # level down
-        for source_vertex in level:
+        for source_task in level:
 
-            arrival_rates = _calculate_arrivals(topo_traversal, source_vertex,
-                                                arrival_rates, output_rates,
-                                                i2i_rps)
+            arrival_rates = _calculate_arrivals(
+                out_edges.get(source_task, []), arrival_rates, output_rates,
+                i2i_rps)
 
     # At this stage we have the output and arrival amount for all logically
     # connected elements. We now need to map these on to the stream managers to
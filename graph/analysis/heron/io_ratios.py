@@ -9,23 +9,23 @@ import logging
 
 import datetime as dt
 
-from typing import Dict, Union, List, Tuple
+from typing import Dict, Set, Union, List, Tuple
 
 import pandas as pd
 import numpy as np
 
 from caladrius.metrics.heron.client import HeronMetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient, LOGICAL_EDGE
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
 
-def get_in_out_components(graph_client: GremlinClient,
+def get_in_out_components(graph_client: GraphClient,
                           topology_id: str) -> List[str]:
     """ Gets a list of components that have both incoming and outgoing streams.
 
     Arguments:
-        graph_client (GremlinClient):   The client instance for the graph
+        graph_client (GraphClient):     The client instance for the graph
                                         database.
         topology_id (str):  The topology identification string.
 
@@ -33,19 +33,21 @@ def get_in_out_components(graph_client: GremlinClient,
         A list of component name strings.
     """
 
-    in_out_comps: List[str] = (graph_client.graph_traversal.V()
-                               .hasLabel("bolt").has("topology_id",
-                                                     topology_id)
-                               .inE("logically_connected")
-                               .inV().as_("in_out")
-                               .outE("logically_connected")
-                               .select("in_out").by("component")
-                               .dedup().toList())
+    logical_edges: List[LOGICAL_EDGE] = \
+        graph_client.get_logical_edges(topology_id)
+
+    destinations: Dict[str, None] = dict.fromkeys(
+        str(edge["destination_component"]) for edge in logical_edges)
+    sources: Set[str] = {str(edge["source_component"])
+                         for edge in logical_edges}
+
+    in_out_comps: List[str] = [component for component in destinations
+                               if component in sources]
     return in_out_comps
 
 
 def lstsq_io_ratios(metrics_client: HeronMetricsClient,
-                    graph_client: GremlinClient, topology_id: str,
+                    graph_client: GraphClient, topology_id: str,
                     cluster: str, environ: str,
                     start: dt.datetime, end: dt.datetime, bucket_length: int,
                     **kwargs: Union[str, int, float]) -> pd.DataFrame:
@@ -62,7 +64,7 @@ def lstsq_io_ratios(metrics_client: HeronMetricsClient,
     Arguments:
         metrics_client (HeronMetricsClient):    The client instance for the
                                                 metrics database.
-        graph_client (GremlinClient):   The client instance for the graph
+        graph_client (GraphClient):     The client instance for the graph
                                         database.
         topology_id (str):  The topology identification string.
         start (dt.datetime):    The UTC datetime object for the start of the
@@ -94,9 +96,16 @@ def lstsq_io_ratios(metrics_client: HeronMetricsClient,
              "and %s", topology_id, (end-start).total_seconds(),
              start.isoformat(), end.isoformat())
 
+    # Metrics clients that support it will aggregate the emit counts into
+    # buckets on the server, so fewer points are transferred and re-sampled
+    # below
     emit_counts: pd.DataFrame = metrics_client.get_emit_counts(
-        topology_id, cluster, environ, start, end, **kwargs)
+        topology_id, cluster, environ, start, end,
+        bucket_length=bucket_length, **kwargs)
 
+    # The execute counts are only used to filter the arrivals, which are
+    # merged with them on their exact timestamps, so neither can be bucketed
+    # before the merge
     arrived_tuples: pd.DataFrame = metrics_client.get_tuple_arrivals_at_stmgr(
         topology_id, cluster, environ, start, end, **kwargs)
 
@@ -125,7 +134,7 @@ def lstsq_io_ratios(metrics_client: HeronMetricsClient,
         (emit_counts.set_index(["task", "timestamp"])
          .groupby([pd.Grouper(level="task"),
                    pd.Grouper(freq=f"{bucket_length}S", level='timestamp'),
-                   "component", "outgoing_stream"])
+                   "component", "outgoing_stream"], observed=True)
          ["emit_count"]
          .sum().reset_index())
 
@@ -133,7 +142,8 @@ def lstsq_io_ratios(metrics_client: HeronMetricsClient,
         (arrived_tuples.set_index(["task", "timestamp"])
          .groupby([pd.Grouper(level="task"),
                    pd.Grouper(freq=f"{bucket_length}S", level='timestamp'),
-                   "component", "incoming_stream", "source_component"])
+                   "component", "incoming_stream", "source_component"],
+                  observed=True)
          ["num-tuples"]
          .sum().reset_index())
 
@@ -144,7 +154,8 @@ def lstsq_io_ratios(metrics_client: HeronMetricsClient,
     # row per time bucket) as the input total for each input stream
     component: str
     in_data: pd.DataFrame
-    for component, in_data in arrived_tuples_ts.groupby(["component"]):
+    for component, in_data in arrived_tuples_ts.groupby(["component"],
+                                                              observed=True):
         in_stream_counts: pd.DataFrame = \
             (in_data.set_index(["task", "timestamp", "incoming_stream",
                                 "source_component"])
@@ -162,7 +173,8 @@ def lstsq_io_ratios(metrics_client: HeronMetricsClient,
         out_stream: str
         data: pd.DataFrame
         for (task, out_stream), data in merged.groupby(["task",
-                                                        "outgoing_stream"]):
+                                                        "outgoing_stream"],
+                                                       observed=True):
 
             LOG.debug("Processing instance %d output stream %s", task,
                       out_stream)
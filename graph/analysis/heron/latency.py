@@ -0,0 +1,332 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains methods for calculating the end to end latencies of a
+topology by dynamic programming over the directed acyclic graph formed by the
+logical connections between its instances. Every instance is visited once in
+topological order, so the cost is linear in the number of instances and
+connections rather than in the number of spout to sink paths, which grows
+exponentially with the fan out of the topology. """
+
+import heapq
+import logging
+
+from collections import deque
+from typing import List, Dict, Set, Tuple, Any, Optional, Deque, cast
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# A task to downstream task adjacency dictionary, as returned by the graph
+# client's get_logical_adjacency method
+ADJACENCY = Dict[int, List[int]]
+
+# A summary of the latencies of the paths starting or ending at an instance:
+# a dictionary with "task", "path_count", "min_latency", "mean_latency",
+# "max_latency" and "critical_path" keys
+LATENCY_SUMMARY = Dict[str, Any]
+
+# One of the k longest paths from an instance to a sink: the latency of the
+# path, the next task on the path and the rank of the path's remainder in the
+# next task's list (both None at a sink)
+RANKED_PATH = Tuple[float, Optional[int], Optional[int]]
+
+
+def topological_order(adjacency: ADJACENCY, sources: List[int]) -> List[int]:
+    """ Orders the instances reachable from the supplied source instances so
+    that every instance comes after all of its upstream instances, using
+    Kahn's algorithm.
+
+    Arguments:
+        adjacency (dict):   The task to downstream task adjacency dictionary.
+        sources (list): The task IDs to start from, normally the spouts.
+
+    Returns:
+        A list of the reachable task IDs in topological order.
+
+    Raises:
+        RuntimeError:   If the reachable logical connections contain a cycle.
+    """
+
+    reachable: Set[int] = set(sources)
+    stack: List[int] = list(sources)
+    while stack:
+        for destination in adjacency.get(stack.pop(), []):
+            if destination not in reachable:
+                reachable.add(destination)
+                stack.append(destination)
+
+    in_degree: Dict[int, int] = {task: 0 for task in reachable}
+    for task in reachable:
+        for destination in adjacency.get(task, []):
+            in_degree[destination] += 1
+
+    # Seed the queue in the order the sources were supplied so the order is
+    # deterministic
+    queue: Deque[int] = deque(task for task in dict.fromkeys(sources)
+                              if in_degree[task] == 0)
+    order: List[int] = []
+
+    while queue:
+        task: int = queue.popleft()
+        order.append(task)
+        for destination in adjacency.get(task, []):
+            in_degree[destination] -= 1
+            if in_degree[destination] == 0:
+                queue.append(destination)
+
+    if len(order) < len(reachable):
+        msg: str = (f"The logical connections between "
+                    f"{len(reachable) - len(order)} instances form a cycle, "
+                    f"end to end latencies can only be calculated for "
+                    f"acyclic topologies")
+        LOG.error(msg)
+        raise RuntimeError(msg)
+
+    return order
+
+
+def path_counts(adjacency: ADJACENCY, sources: List[int]) -> Dict[int, int]:
+    """ Counts the paths from each instance reachable from the supplied
+    source instances to the sinks of the topology, without enumerating them.
+
+    Arguments:
+        adjacency (dict):   The task to downstream task adjacency dictionary.
+        sources (list): The task IDs to start from, normally the spouts.
+
+    Returns:
+        A dictionary mapping from the task ID of every reachable instance to
+        the number of paths from it to a sink.
+
+    Raises:
+        RuntimeError:   If the reachable logical connections contain a cycle.
+    """
+
+    counts: Dict[int, int] = {}
+
+    for task in reversed(topological_order(adjacency, sources)):
+        destinations: List[int] = adjacency.get(task, [])
+        counts[task] = (sum(counts[dest] for dest in destinations)
+                        if destinations else 1)
+
+    return counts
+
+
+def check_task_costs(task_costs: Dict[int, float], tasks: List[int]) -> None:
+    """ Checks that every one of the supplied tasks has a cost. Missing costs
+    are not counted as zero, as that would silently understate the end to end
+    latencies, so the explicit path latencies fail in the same way.
+
+    Arguments:
+        task_costs (dict):  A dictionary mapping from task ID to the latency a
+                            tuple accrues at that instance.
+        tasks (list):   The task IDs that need a cost.
+
+    Raises:
+        RuntimeError:   If any of the tasks has no cost.
+    """
+
+    missing: List[int] = sorted(task for task in tasks
+                                if task not in task_costs)
+    if missing:
+        msg: str = (f"No execute latency or waiting time available for tasks: "
+                    f"{missing}")
+        LOG.error(msg)
+        raise RuntimeError(msg)
+
+
+def _follow(pointers: Dict[int, Optional[int]], task: int) -> List[int]:
+
+    path: List[int] = [task]
+    next_task: Optional[int] = pointers[task]
+    while next_task is not None:
+        path.append(next_task)
+        next_task = pointers[next_task]
+
+    return path
+
+
+def summarise_latencies(adjacency: ADJACENCY, spouts: List[int],
+                        task_costs: Dict[int, float]
+                        ) -> Dict[str, List[LATENCY_SUMMARY]]:
+    """ Calculates the minimum, mean and maximum end to end latency of the
+    paths ending at each sink and starting at each spout of the topology,
+    along with the critical (highest latency) path for each, without
+    enumerating the paths. The latency of a path is the sum of the costs of
+    the instances on it, including the spout and the sink. The mean is taken
+    over every distinct path, so it matches the mean of the explicitly
+    enumerated path latencies.
+
+    Arguments:
+        adjacency (dict):   The task to downstream task adjacency dictionary.
+                            Instances with no downstream tasks are sinks.
+        spouts (list):  The task IDs of the spout instances.
+        task_costs (dict):  A dictionary mapping from task ID to the latency a
+                            tuple accrues at that instance, normally the
+                            execute latency plus the mean queue waiting time.
+                            Every instance must have a cost.
+
+    Returns:
+        A dictionary with "sinks" and "spouts" keys, each holding a list of
+        latency summary dictionaries (with "task", "path_count",
+        "min_latency", "mean_latency", "max_latency" and "critical_path"
+        keys) sorted by task ID.
+
+    Raises:
+        RuntimeError:   If the logical connections contain a cycle or an
+                        instance has no cost.
+    """
+
+    order: List[int] = topological_order(adjacency, spouts)
+
+    check_task_costs(task_costs, order)
+    cost: Dict[int, float] = {task: task_costs[task] for task in order}
+
+    # Forward pass: the paths from any spout ending at each instance
+    count: Dict[int, int] = {task: 0 for task in order}
+    total: Dict[int, float] = {task: 0.0 for task in order}
+    longest: Dict[int, float] = {}
+    shortest: Dict[int, float] = {}
+    upstream: Dict[int, Optional[int]] = {}
+
+    for spout in spouts:
+        count[spout] = 1
+        longest[spout] = shortest[spout] = 0.0
+        upstream[spout] = None
+
+    for task in order:
+        # All upstream instances have been visited so add this instance's cost
+        total[task] += count[task] * cost[task]
+        longest[task] += cost[task]
+        shortest[task] += cost[task]
+
+        for destination in adjacency.get(task, []):
+            count[destination] += count[task]
+            total[destination] += total[task]
+            if (destination not in longest or
+                    longest[task] > longest[destination]):
+                longest[destination] = longest[task]
+                upstream[destination] = task
+            if (destination not in shortest or
+                    shortest[task] < shortest[destination]):
+                shortest[destination] = shortest[task]
+
+    # Backward pass: the paths from each instance ending at any sink
+    down_count: Dict[int, int] = {}
+    down_total: Dict[int, float] = {}
+    down_longest: Dict[int, float] = {}
+    down_shortest: Dict[int, float] = {}
+    downstream: Dict[int, Optional[int]] = {}
+
+    for task in reversed(order):
+        destinations: List[int] = adjacency.get(task, [])
+        downstream[task] = None
+
+        if not destinations:
+            down_count[task] = 1
+            down_longest[task] = down_shortest[task] = 0.0
+            down_total[task] = 0.0
+        else:
+            down_count[task] = sum(down_count[dest] for dest in destinations)
+            down_total[task] = sum(down_total[dest] for dest in destinations)
+            down_shortest[task] = min(down_shortest[dest]
+                                      for dest in destinations)
+            down_longest[task] = down_longest[destinations[0]]
+            downstream[task] = destinations[0]
+            for destination in destinations[1:]:
+                if down_longest[destination] > down_longest[task]:
+                    down_longest[task] = down_longest[destination]
+                    downstream[task] = destination
+
+        down_total[task] += down_count[task] * cost[task]
+        down_longest[task] += cost[task]
+        down_shortest[task] += cost[task]
+
+    sinks: List[LATENCY_SUMMARY] = [
+        {"task": task, "path_count": count[task],
+         "min_latency": shortest[task],
+         "mean_latency": total[task] / count[task],
+         "max_latency": longest[task],
+         "critical_path": list(reversed(_follow(upstream, task)))}
+        for task in sorted(order) if not adjacency.get(task)]
+
+    spout_summaries: List[LATENCY_SUMMARY] = [
+        {"task": task, "path_count": down_count[task],
+         "min_latency": down_shortest[task],
+         "mean_latency": down_total[task] / down_count[task],
+         "max_latency": down_longest[task],
+         "critical_path": _follow(downstream, task)}
+        for task in sorted(set(spouts))]
+
+    LOG.info("Summarised the end to end latencies of %d paths over %d "
+             "instances", sum(summary["path_count"] for summary in sinks),
+             len(order))
+
+    return {"sinks": sinks, "spouts": spout_summaries}
+
+
+def longest_paths(adjacency: ADJACENCY, spouts: List[int],
+                  task_costs: Dict[int, float], top_k: int
+                  ) -> List[Dict[str, Any]]:
+    """ Finds the top_k highest latency paths from the spouts to the sinks of
+    the topology. Each instance keeps only the k longest paths from itself to
+    a sink, so this takes O((V + E) k log k) time rather than enumerating
+    every path.
+
+    Arguments:
+        adjacency (dict):   The task to downstream task adjacency dictionary.
+        spouts (list):  The task IDs of the spout instances.
+        task_costs (dict):  A dictionary mapping from task ID to the latency a
+                            tuple accrues at that instance. Every instance
+                            must have a cost.
+        top_k (int):    The maximum number of paths to return.
+
+    Returns:
+        A list of up to top_k dictionaries with "path" (a tuple of task IDs)
+        and "latency" keys, in descending order of latency. This matches the
+        format of the explicit path latencies.
+
+    Raises:
+        RuntimeError:   If the logical connections contain a cycle or an
+                        instance has no cost.
+    """
+
+    if top_k <= 0:
+        return []
+
+    order: List[int] = topological_order(adjacency, spouts)
+
+    check_task_costs(task_costs, order)
+
+    best: Dict[int, List[RANKED_PATH]] = {}
+
+    for task in reversed(order):
+        cost: float = task_costs[task]
+        destinations: List[int] = adjacency.get(task, [])
+
+        if not destinations:
+            best[task] = [(cost, None, None)]
+            continue
+
+        best[task] = heapq.nlargest(
+            top_k, ((ranked[0] + cost, destination, rank)
+                    for destination in destinations
+                    for rank, ranked in enumerate(best[destination])),
+            key=lambda ranked: ranked[0])
+
+    starts: List[Tuple[float, int, int]] = heapq.nlargest(
+        top_k, ((ranked[0], spout, rank)
+                for spout in dict.fromkeys(spouts)
+                for rank, ranked in enumerate(best[spout])),
+        key=lambda start: start[0])
+
+    paths: List[Dict[str, Any]] = []
+    for latency, spout, rank in starts:
+        path: List[int] = [spout]
+        ranked: RANKED_PATH = best[spout][rank]
+        while ranked[1] is not None:
+            path.append(ranked[1])
+            ranked = best[ranked[1]][cast(int, ranked[2])]
+        paths.append({"path": tuple(path), "latency": latency})
+
+    return paths
@@ -9,17 +9,13 @@ import logging
 
 import datetime as dt
 
-from typing import List, Dict, Union
+from typing import List, Dict
 
 import pandas as pd
 
-from gremlin_python.process.traversal import P
-from gremlin_python.process.graph_traversal import __
-from gremlin_python.process.graph_traversal import GraphTraversalSource
-from gremlin_python.structure.graph import Edge
-
 from caladrius.metrics.heron.client import HeronMetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient, LOGICAL_EDGE, \
+    ROUTING_PROBABILITY
 from caladrius.metrics.heron.topology.routing_probabilities \
     import calculate_inter_instance_rps
 
@@ -27,17 +23,17 @@ LOG: logging.Logger = logging.getLogger(__name__)
 
 
 def get_comp_links_by_grouping(
-        graph_traversal: GraphTraversalSource, grouping: str
+        logical_edges: List[LOGICAL_EDGE], grouping: str
         ) -> List[Dict[str, str]]:
     """ Gets a list of component connection dictionaries. These describe all
     source->stream->destination connections with the specified grouping value
-    in the topology available via the supplied graph traversal source.
+    in the supplied logical connections.
 
     Arguments:
-        graph_traversal (GraphTraversalSource): A GraphTraversalSource instance
-                                                linked to the topology subgraph
-                                                whose connections are to be
-                                                queried.
+        logical_edges (list):   The logical connections of the topology whose
+                                component connections are required, as
+                                returned by the graph client's
+                                get_logical_edges method.
         grouping (str): The stream grouping of the connections to be returned.
 
     Returns:
@@ -45,23 +41,23 @@ def get_comp_links_by_grouping(
         "destination" keys of the component and stream name respectively.
     """
 
-    component_connections: List[Dict[str, str]] = \
-        (graph_traversal.V().hasLabel(P.within("bolt", "spout")).as_("source")
-         .outE("logically_connected").has("grouping", grouping).as_("stream")
-         .inV().as_("destination").select("source", "stream", "destination")
-         .by("component").by("stream").by("component").dedup().toList())
+    component_connections: Dict[tuple, None] = dict.fromkeys(
+        (edge["source_component"], edge["stream"],
+         edge["destination_component"])
+        for edge in logical_edges if edge["grouping"] == grouping)
 
-    return component_connections
+    return [{"source": source, "stream": stream, "destination": destination}
+            for source, stream, destination in component_connections]
 
 
-def set_shuffle_routing_probs(graph_client: GremlinClient,
+def set_shuffle_routing_probs(graph_client: GraphClient,
                               topology_id: str, topology_ref: str) -> None:
     """ This method will set the routing probability for shuffle connections in
     the graph with the supplied topology ID and reference.
 
     Arguments:
-        graph_client (GremlinClient):   The client instance for the graph
-                                        database.
+        graph_client (GraphClient): The client instance for the graph
+                                    database.
         topology_id (str):  The topology identification string.
         topology_ref (str): The topology reference string.
     """
@@ -70,32 +66,36 @@ def set_shuffle_routing_probs(graph_client: GremlinClient,
              "connections in the graph of topology %s reference %s",
              topology_id, topology_ref)
 
-    topology_traversal: GraphTraversalSource = \
-        graph_client.topology_subgraph(topology_id, topology_ref)
+    # Count the instances of each component
+    component_counts: Dict[str, int] = {}
+    for instance in graph_client.get_instances(topology_id, topology_ref):
+        component: str = str(instance["component"])
+        component_counts[component] = component_counts.get(component, 0) + 1
+
+    routing_probs: List[ROUTING_PROBABILITY] = []
+
+    for edge in graph_client.get_logical_edges(topology_id, topology_ref):
+
+        if edge["grouping"] != "SHUFFLE":
+            continue
 
-    for comp_conn in get_comp_links_by_grouping(topology_traversal, "SHUFFLE"):
+        # The shuffle grouped connections routing probability is based on the
+        # number of downstream instances for this connection
+        routing_probs.append({
+            "source_task": edge["source_task"],
+            "stream": edge["stream"],
+            "destination_task": edge["destination_task"],
+            "routing_probability":
+                1 / component_counts[str(edge["destination_component"])]})
 
-        LOG.debug("Calculating routing probabilities for logical connections "
-                  "between instances of %s and %s on the %s stream",
-                  comp_conn["source"], comp_conn["destination"],
-                  comp_conn["stream"])
+    LOG.debug("Setting routing probabilities for %d shuffle grouped logical "
+              "connections", len(routing_probs))
 
-        # Calculate the shuffle grouped connections routing probability based
-        # on the number of downstream instances for this connections
-        shuffle_rp: float = (topology_traversal.V()
-                             .has("component", comp_conn["destination"])
-                             .count().math("1/_").next())
+    graph_client.set_routing_probabilities(topology_id, topology_ref,
+                                           routing_probs)
 
-        # Apply the calculated routing probability to all logical connections
-        # with this stream name between the source and destination instances
-        # of the these components
-        (topology_traversal.V().has("component", comp_conn["source"])
-         .outE("logically_connected").has("stream", comp_conn["stream"])
-         .property("routing_probability", shuffle_rp)
-         .inV().has("component", comp_conn["destination"])
-         .iterate())
 
-def set_fields_routing_probs(graph_client: GremlinClient,
+def set_fields_routing_probs(graph_client: GraphClient,
                              metrics_client: HeronMetricsClient,
                              topology_id: str, topology_ref: str,
                              start: dt.datetime, end: dt.datetime) -> None:
@@ -104,8 +104,8 @@ def set_fields_routing_probs(graph_client: GremlinClient,
     probabilities are calculated using metrics from the defined time window.
 
     Arguments:
-        graph_client (GremlinClient):   The client instance for the graph
-                                        database.
+        graph_client (GraphClient): The client instance for the graph
+                                    database.
         metrics_client (HeronMetricsClient): The client instance for metrics
                                              database.
         topology_id (str):  The topology identification string.
@@ -120,9 +120,6 @@ def set_fields_routing_probs(graph_client: GremlinClient,
              "reference %s using metrics data from %s to %s", topology_id,
              topology_ref, start.isoformat(), end.isoformat())
 
-    topology_traversal: GraphTraversalSource = \
-        graph_client.topology_subgraph(topology_id, topology_ref)
-
     i_to_i_rps: pd.DataFrame = calculate_inter_instance_rps(metrics_client,
                                                             topology_id, start,
                                                             end)
@@ -132,22 +129,18 @@ def set_fields_routing_probs(graph_client: GremlinClient,
                          inplace=True)
 
     # Get a list of all fields grouped connections in the physical graph
-    fields_connections: List[Dict[str, Union[int, str, Edge]]] = \
-        (topology_traversal.V()
-         .outE("logically_connected")
-         .has("grouping", "FIELDS")
-         .project("source_task", "stream", "edge", "destination_task")
-         .by(__.outV().properties("task_id").value())
-         .by(__.properties("stream").value())
-         .by()
-         .by(__.inV().properties("task_id").value())
-         .toList())
+    fields_connections: List[LOGICAL_EDGE] = [
+        edge for edge in graph_client.get_logical_edges(topology_id,
+                                                        topology_ref)
+        if edge["grouping"] == "FIELDS"]
 
     LOG.debug("Processing %d fields grouped connections for topology %s "
               "reference %s", len(fields_connections), topology_id,
               topology_ref)
 
-    connection: Dict[str, Union[int, str, Edge]]
+    routing_probs: List[ROUTING_PROBABILITY] = []
+
+    connection: LOGICAL_EDGE
     for connection in fields_connections:
 
         LOG.debug("Processing connection from instance %d to %d on stream %s",
@@ -159,5 +152,11 @@ def set_fields_routing_probs(graph_client: GremlinClient,
                                               connection["destination_task"]]
                                ["routing_probability"])
 
-        (topology_traversal.E(connection["edge"])
-         .property("routing_probability", routing_prob).next())
+        routing_probs.append({
+            "source_task": connection["source_task"],
+            "stream": connection["stream"],
+            "destination_task": connection["destination_task"],
+            "routing_probability": routing_prob})
+
+    graph_client.set_routing_probabilities(topology_id, topology_ref,
+                                           routing_probs)
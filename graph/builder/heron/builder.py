@@ -10,11 +10,11 @@ import logging
 
 import datetime as dt
 
-from typing import List, Dict, Union, Any
+from typing import List, Dict, Union, Any, Optional, Iterator, Tuple
 
 from gremlin_python.process.traversal import P
 from gremlin_python.process.graph_traversal import \
-    GraphTraversalSource, out, outV, addE, inV
+    GraphTraversal, GraphTraversalSource, outV, inV, select, V
 from gremlin_python.structure.graph import Vertex, Edge
 
 from caladrius.common.heron import tracker
@@ -28,48 +28,96 @@ LOG: logging.Logger = logging.getLogger(__name__)
 # pylint: disable = too-many-arguments
 
 
-def _create_stream_managers(graph_client: GremlinClient, topology_id: str,
-                            topology_ref: str, physical_plan: Dict[str, Any]
-                            ) -> None:
+def _batches(items: List[Any], batch_size: int) -> Iterator[List[Any]]:
+    """ Splits the supplied list into consecutive batches of at most the
+    supplied size. """
 
-    LOG.info("Creating stream managers and container vertices")
+    for index in range(0, len(items), batch_size):
+        yield items[index:index + batch_size]
 
-    counter: int = 0
 
-    for stream_manager in physical_plan["stmgrs"].values():
+def _add_vertices(graph_client: GremlinClient, topology_id: str,
+                  topology_ref: str, label: str,
+                  vertices: List[Dict[str, Any]], property_keys: List[str],
+                  container_key: Optional[str] = None) -> int:
+    """ Creates a vertex with the supplied label for each of the supplied
+    property maps, sending the maps to the graph database in batches of the
+    graph client's batch size so that each batch is created by a single
+    traversal. The topology ID and reference properties are added to every
+    vertex.
+
+    Arguments:
+        graph_client (GremlinClient):   The client instance for the graph
+                                        database.
+        topology_id (str):  The topology identification string.
+        topology_ref (str): The unique reference string for this topology
+                            physical graph.
+        label (str):    The vertex label.
+        vertices (list):    A list of property maps, one for each vertex.
+        property_keys (list):   The keys of the property maps that are added
+                                to the vertices as properties.
+        container_key (str):    Optional key of the property maps holding the
+                                ID of the container the vertex is within. If
+                                supplied each vertex is connected to its
+                                container vertex (which must already exist)
+                                by an "is_within" edge.
+
+    Returns:
+        int:    The number of vertices created.
+    """
+
+    for batch in _batches(vertices, graph_client.batch_size):
 
-        # Create the stream manager vertex
-        LOG.debug("Creating vertex for stream manager: %s",
-                  stream_manager["id"])
+        traversal: GraphTraversal = (graph_client.graph_traversal
+                                     .inject(batch).unfold().as_("vertex")
+                                     .addV(label))
 
-        strmg: Vertex = (graph_client.graph_traversal
-                         .addV("stream_manager")
-                         .property("id", stream_manager["id"])
-                         .property("host", stream_manager["host"])
-                         .property("port", stream_manager["port"])
-                         .property("topology_id", topology_id)
-                         .property("topology_ref", topology_ref)
-                         .next())
+        for key in property_keys:
+            traversal = traversal.property(key,
+                                           select("vertex").select(key))
 
-        # Create the stream manager vertex
-        container: int = int(stream_manager["id"].split("-")[1])
+        traversal = (traversal.property("topology_id", topology_id)
+                     .property("topology_ref", topology_ref))
 
-        LOG.debug("Creating vertex for container: %d", container)
+        if container_key:
+            # Look up the container vertex whose id matches the container
+            # entry of this vertex's property map
+            traversal = traversal.addE("is_within").to(
+                V().hasLabel("container")
+                .has("topology_id", topology_id)
+                .has("topology_ref", topology_ref)
+                .where(P.eq("vertex"))
+                .by("id").by(select(container_key)))
 
-        cont: Vertex = (graph_client.graph_traversal
-                        .addV("container")
-                        .property("id", container)
-                        .property("topology_id", topology_id)
-                        .property("topology_ref", topology_ref)
-                        .next())
+        traversal.iterate()
 
-        # Connect the stream manager to the container
-        LOG.debug("Connecting stream manager %s to be within container %d",
-                  stream_manager["id"], container)
-        (graph_client.graph_traversal.V(strmg).addE("is_within").to(cont)
-         .next())
+        LOG.debug("Created batch of %d %s vertices", len(batch), label)
 
-        counter += 1
+    return len(vertices)
+
+
+def _create_stream_managers(graph_client: GremlinClient, topology_id: str,
+                            topology_ref: str, physical_plan: Dict[str, Any]
+                            ) -> None:
+
+    LOG.info("Creating stream managers and container vertices")
+
+    stream_managers: List[Dict[str, Any]] = [
+        {"id": stream_manager["id"],
+         "host": stream_manager["host"],
+         "port": stream_manager["port"],
+         "container": int(stream_manager["id"].split("-")[1])}
+        for stream_manager in physical_plan["stmgrs"].values()]
+
+    # The container vertices are created first so that the stream managers
+    # can be connected to them as they are created
+    _add_vertices(graph_client, topology_id, topology_ref, "container",
+                  [{"id": stream_manager["container"]}
+                   for stream_manager in stream_managers], ["id"])
+
+    counter: int = _add_vertices(
+        graph_client, topology_id, topology_ref, "stream_manager",
+        stream_managers, ["id", "host", "port"], container_key="container")
 
     LOG.info("Created %d container and stream manager vertices", counter)
 
@@ -81,10 +129,9 @@ def _create_spouts(graph_client: GremlinClient, topology_id: str,
 
     LOG.info("Creating spout instance vertices")
 
-    # Create the spouts
     physical_spouts: Dict[str, List[str]] = physical_plan["spouts"]
 
-    counter: int = 0
+    spouts: List[Dict[str, Any]] = []
 
     for spout_name, spout_data in logical_plan["spouts"].items():
         LOG.debug("Creating vertices for instances of spout component: %s",
@@ -94,36 +141,19 @@ def _create_spouts(graph_client: GremlinClient, topology_id: str,
             instance: Dict[str, Union[str, int]] = \
                     tracker.parse_instance_name(instance_name)
 
-            LOG.debug("Creating vertex for spout instance: %s", instance_name)
-
-            stream_manager_id: str = \
-                physical_plan["instances"][instance_name]["stmgrId"]
-
-            spout: Vertex = (graph_client.graph_traversal
-                             .addV("spout")
-                             .property("container", instance["container"])
-                             .property("task_id", instance["task_id"])
-                             .property("component", spout_name)
-                             .property("stream_manager", stream_manager_id)
-                             .property("spout_type",
-                                       spout_data["spout_type"])
-                             .property("spout_source",
-                                       spout_data["spout_source"])
-                             .property("topology_id", topology_id)
-                             .property("topology_ref", topology_ref)
-                             .next())
-
-            # Connect the spout to its container vertex
-            (graph_client.graph_traversal.V(spout).addE("is_within")
-             .to(graph_client.graph_traversal.V()
-                 .hasLabel("container")
-                 .has("topology_id", topology_id)
-                 .has("topology_ref", topology_ref)
-                 .has("id", instance["container"])
-                 )
-             .next())
-
-            counter += 1
+            spouts.append({
+                "container": instance["container"],
+                "task_id": instance["task_id"],
+                "component": spout_name,
+                "stream_manager":
+                    physical_plan["instances"][instance_name]["stmgrId"],
+                "spout_type": spout_data["spout_type"],
+                "spout_source": spout_data["spout_source"]})
+
+    counter: int = _add_vertices(
+        graph_client, topology_id, topology_ref, "spout", spouts,
+        ["container", "task_id", "component", "stream_manager", "spout_type",
+         "spout_source"], container_key="container")
 
     LOG.info("Created %d spout instances", counter)
 
@@ -137,7 +167,7 @@ def _create_bolts(graph_client: GremlinClient, topology_id: str,
 
     physical_bolts: Dict[str, List[str]] = physical_plan["bolts"]
 
-    counter: int = 0
+    bolts: List[Dict[str, Any]] = []
 
     for bolt_name in logical_plan["bolts"]:
         LOG.debug("Creating vertices for instances of bolt component: %s",
@@ -147,33 +177,17 @@ def _create_bolts(graph_client: GremlinClient, topology_id: str,
             instance: Dict[str, Union[str, int]] = \
                 tracker.parse_instance_name(instance_name)
 
-            LOG.debug("Creating vertex for bolt instance: %s",
-                      instance_name)
-
-            stream_manager_id: str = \
-                physical_plan["instances"][instance_name]["stmgrId"]
-
-            bolt: Vertex = (graph_client.graph_traversal
-                            .addV("bolt")
-                            .property("container", instance["container"])
-                            .property("task_id", instance["task_id"])
-                            .property("component", bolt_name)
-                            .property("stream_manager", stream_manager_id)
-                            .property("topology_id", topology_id)
-                            .property("topology_ref", topology_ref)
-                            .next())
-
-            # Connect the bolt to its container vertex
-            (graph_client.graph_traversal.V(bolt).addE("is_within")
-             .to(graph_client.graph_traversal.V()
-                 .hasLabel("container")
-                 .has("topology_id", topology_id)
-                 .has("topology_ref", topology_ref)
-                 .has("id", instance["container"])
-                 )
-             .next())
-
-            counter += 1
+            bolts.append({
+                "container": instance["container"],
+                "task_id": instance["task_id"],
+                "component": bolt_name,
+                "stream_manager":
+                    physical_plan["instances"][instance_name]["stmgrId"]})
+
+    counter: int = _add_vertices(
+        graph_client, topology_id, topology_ref, "bolt", bolts,
+        ["container", "task_id", "component", "stream_manager"],
+        container_key="container")
 
     LOG.info("Created %d bolt instances", counter)
 
@@ -190,6 +204,16 @@ def _create_logical_connections(graph_client: GremlinClient, topology_id: str,
     topo_traversal: GraphTraversalSource = \
         graph_client.topology_subgraph(topology_id, topology_ref)
 
+    # The task IDs of each component's instances
+    task_ids: Dict[str, List[int]] = {}
+
+    def get_task_ids(component: str) -> List[int]:
+        if component not in task_ids:
+            task_ids[component] = (topo_traversal.V()
+                                   .has("component", component)
+                                   .values("task_id").toList())
+        return task_ids[component]
+
     counter: int = 0
 
     for bolt_name, bolt_data in logical_plan["bolts"].items():
@@ -197,32 +221,68 @@ def _create_logical_connections(graph_client: GremlinClient, topology_id: str,
         LOG.debug("Adding logical connections for instances of "
                   "destination bolt: %s", bolt_name)
 
-        # Get a list of all instance vertices for this bolt
-        destination_instances: List[Vertex] = (
-            topo_traversal.V()
-            .has("component", bolt_name)
-            .toList())
+        num_destinations: int = len(get_task_ids(bolt_name))
+
+        if not num_destinations:
+            continue
 
         for incoming_stream in bolt_data["inputs"]:
-            source_instances: List[Vertex] = (
-                topo_traversal.V()
-                .has("component", incoming_stream["component_name"])
-                .toList())
-
-            for destination in destination_instances:
-                for source in source_instances:
-                    (topo_traversal.V(source)
-                     .addE("logically_connected")
-                     .property("stream",
-                               incoming_stream["stream_name"])
-                     .property("grouping", incoming_stream["grouping"])
-                     .to(destination).next())
-
-                    counter += 1
+
+            source_tasks: List[int] = \
+                get_task_ids(incoming_stream["component_name"])
+
+            # Every source instance is connected to every destination
+            # instance, server side, with each traversal creating up to the
+            # edge batch size of edges
+            sources_per_batch: int = \
+                max(1, graph_client.edge_batch_size // num_destinations)
+
+            for batch in _batches(source_tasks, sources_per_batch):
+                counter += (
+                    topo_traversal.V()
+                    .has("component", incoming_stream["component_name"])
+                    .has("task_id", P.within(batch)).as_("source")
+                    .V().has("component", bolt_name)
+                    .addE("logically_connected").from_("source")
+                    .property("stream", incoming_stream["stream_name"])
+                    .property("grouping", incoming_stream["grouping"])
+                    .count().next())
 
     LOG.info("Created %d logical connections", counter)
 
 
+def _add_edges(graph_client: GremlinClient, label: str,
+               connections: List[Tuple[Vertex, Vertex]]) -> int:
+    """ Creates an edge with the supplied label for each of the supplied
+    (source, destination) vertex pairs. The edges are created in batches of
+    the graph client's batch size, with each batch chained into a single
+    traversal that looks up the vertices by their IDs.
+
+    Arguments:
+        graph_client (GremlinClient):   The client instance for the graph
+                                        database.
+        label (str):    The edge label.
+        connections (list): A list of (source, destination) vertex tuples.
+
+    Returns:
+        int:    The number of edges created.
+    """
+
+    for batch in _batches(connections, graph_client.batch_size):
+
+        # A single traverser is carried from each addE step to the next V
+        # step so that each edge is only created once
+        traversal: GraphTraversal = graph_client.graph_traversal.inject(0)
+
+        for source, destination in batch:
+            traversal = (traversal.V(source).addE(label)
+                         .to(V(destination)))
+
+        traversal.iterate()
+
+    return len(connections)
+
+
 def _create_physical_connections(graph_client: GremlinClient, topology_id: str,
                                  topology_ref: str) -> None:
 
@@ -232,76 +292,71 @@ def _create_physical_connections(graph_client: GremlinClient, topology_id: str,
     topo_traversal: GraphTraversalSource = \
         graph_client.topology_subgraph(topology_id, topology_ref)
 
-    # First get all logically connected pairs of vertex and their associated
-    # containers and stream managers
-    logical_edges: List[Dict[str, Union[Vertex, Edge]]] = (
+    # Map from stream manager ID to stream manager vertex
+    stream_managers: Dict[str, Vertex] = {
+        stream_manager["id"]: stream_manager["vertex"]
+        for stream_manager in (topo_traversal.V().hasLabel("stream_manager")
+                               .project("id", "vertex").by("id").by()
+                               .toList())}
+
+    # Get all logically connected pairs of instances along with the IDs of
+    # their stream managers
+    logical_edges: List[Dict[str, Union[str, Vertex, Edge]]] = (
         topo_traversal.V().hasLabel(P.within("bolt", "spout"))
         .outE("logically_connected")
-        .project("source_instance", "source_container",
-                 "source_stream_manager", "l_edge", "destination_instance",
-                 "destination_container", "destination_stream_manager")
+        .project("source_instance", "source_stream_manager", "l_edge",
+                 "destination_instance", "destination_stream_manager")
         .by(outV())
-        .by(outV().out("is_within"))
-        .by(outV().out("is_within").in_("is_within")
-            .hasLabel("stream_manager"))
+        .by(outV().values("stream_manager"))
         .by()
         .by(inV())
-        .by(inV().out("is_within"))
-        .by(inV().out("is_within").in_("is_within")
-            .hasLabel("stream_manager"))
+        .by(inV().values("stream_manager"))
         .toList())
 
     LOG.debug("Processing %d logical connected vertices", len(logical_edges))
 
+    # Each physical connection is only created once, in the order it is
+    # first required
+    connections: Dict[Tuple[Vertex, Vertex], None] = {}
+    edge_types: Dict[str, List[Edge]] = {"local": [], "remote": []}
+
     for logical_edge in logical_edges:
         source: Vertex = logical_edge["source_instance"]
-        source_container: Vertex = logical_edge["source_container"]
-        source_stream_manager: Vertex = logical_edge["source_stream_manager"]
         destination: Vertex = logical_edge["destination_instance"]
-        destination_container: Vertex = logical_edge["destination_container"]
+        source_stream_manager: Vertex = \
+            stream_managers[logical_edge["source_stream_manager"]]
         destination_stream_manager: Vertex = \
-            logical_edge["destination_stream_manager"]
-        l_edge: Edge = logical_edge["l_edge"]
+            stream_managers[logical_edge["destination_stream_manager"]]
 
-        # Connect the source instance to its stream manager, checking first
-        # if the connection already exists
-        (graph_client.graph_traversal.V(source)
-         .coalesce(out("physically_connected").is_(source_stream_manager),
-                   addE("physically_connected").to(source_stream_manager))
-         .next())
+        # Connect the source instance to its stream manager
+        connections[(source, source_stream_manager)] = None
 
-        if source_container == destination_container:
+        if source_stream_manager == destination_stream_manager:
 
             # If the source and destination instances are in the same
-            # container then they share the same stream manager so just use
-            # the source stream manager found above. Connect the source
-            # stream manager to the destination instance
-
-            (graph_client.graph_traversal.V(source_stream_manager)
-             .coalesce(out("physically_connected").is_(destination),
-                       addE("physically_connected").to(destination))
-             .next())
-
-            # Set the logical edge for this pair to "local"
-            graph_client.graph_traversal.E(l_edge).property("type",
-                                                            "local").next()
+            # container then they share the same stream manager. Connect the
+            # source stream manager to the destination instance
+            connections[(source_stream_manager, destination)] = None
+            edge_types["local"].append(logical_edge["l_edge"])
 
         else:
-            # Connect the two stream managers (if they aren't already)
-            (graph_client.graph_traversal.V(source_stream_manager)
-             .coalesce(
-                 out("physically_connected").is_(destination_stream_manager),
-                 addE("physically_connected").to(destination_stream_manager))
-             .next())
+            # Connect the two stream managers and the destination stream
+            # manager to the destination instance
+            connections[(source_stream_manager,
+                         destination_stream_manager)] = None
+            connections[(destination_stream_manager, destination)] = None
+            edge_types["remote"].append(logical_edge["l_edge"])
+
+    counter: int = _add_edges(graph_client, "physically_connected",
+                              list(connections))
 
-            (graph_client.graph_traversal.V(destination_stream_manager)
-             .coalesce(out("physically_connected").is_(destination),
-                       addE("physically_connected").to(destination))
-             .next())
+    # Set the type of each logical edge
+    for edge_type, edges in edge_types.items():
+        for batch in _batches(edges, graph_client.batch_size):
+            (graph_client.graph_traversal.E(*batch)
+             .property("type", edge_type).iterate())
 
-            # Set the logical edge for this pair to "remote"
-            graph_client.graph_traversal.E(l_edge).property("type",
-                                                            "remote").next()
+    LOG.info("Created %d physical connections", counter)
 
 
 def create_physical_graph(graph_client: GremlinClient,
@@ -357,7 +412,7 @@ def create_physical_graph(graph_client: GremlinClient,
 
     _create_physical_connections(graph_client, topology_id, topology_ref)
 
-    LOG.info("Physical graph construction completed after %d seconds",
+    LOG.info("Physical graph construction completed after %.2f seconds",
              (dt.datetime.now() - start).total_seconds())
 
 
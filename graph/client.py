@@ -0,0 +1,226 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" Module containing the abstract base class for the graph clients, which
+store the physical graphs of topologies and answer the queries the graph
+analysis and modelling code makes of them. """
+
+import logging
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Union, Optional, Tuple
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# An instance vertex: a dictionary with "task_id", "component", "label"
+# ("spout" or "bolt"), "container" and "stream_manager" keys
+INSTANCE = Dict[str, Union[str, int]]
+
+# A logical connection: a dictionary with "source_task", "source_component",
+# "stream", "grouping", "destination_task" and "destination_component" keys
+LOGICAL_EDGE = Dict[str, Union[str, int]]
+
+# A routing probability: a dictionary with "source_task", "stream",
+# "destination_task" and "routing_probability" keys
+ROUTING_PROBABILITY = Dict[str, Union[str, int, float]]
+
+
+class GraphClient(ABC):
+    """ Abstract base class for all graph clients. Each physical graph is
+    identified by its topology ID and a topology reference string, so that
+    several versions of a topology's physical plan can be stored at once. """
+
+    @abstractmethod
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.config = config
+
+    @abstractmethod
+    def __hash__(self) -> int:
+        pass
+
+    @abstractmethod
+    def __eq__(self, other: object) -> bool:
+        pass
+
+    @abstractmethod
+    def topology_ref_exists(self, topology_id: str, topology_ref: str) -> bool:
+        """ Checks whether a graph with the supplied topology id and reference
+        exists.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            topology_ref (str): The reference string to check for.
+
+        Returns:
+            Boolean flag indicating if a graph with the supplied ID and
+            reference is present (True) or not (False).
+        """
+        pass
+
+    def raise_if_missing(self, topology_id: str, topology_ref: str) -> None:
+        """ Checks whether a graph with the supplied topology id and reference
+        exists and raises a error if it doesn't.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            topology_ref (str): The reference string to check for.
+
+        Raises:
+            RuntimeError:   If a graph with the supplied topology ID and
+                            reference is not present.
+        """
+        if not self.topology_ref_exists(topology_id, topology_ref):
+            msg: str = (f"Topology: {topology_id} reference: {topology_ref} "
+                        f"is not present in the graph database")
+            LOG.error(msg)
+            raise RuntimeError(msg)
+
+    @abstractmethod
+    def get_topology_refs(self, topology_id: str) -> List[str]:
+        """ Gets the references of all the graphs of the supplied topology.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+
+        Returns:
+            A list of topology reference strings.
+        """
+        pass
+
+    @abstractmethod
+    def build_physical_graph(self, topology_id: str, topology_ref: str,
+                             logical_plan: Dict[str, Any],
+                             physical_plan: Dict[str, Any]) -> None:
+        """ Builds the physical graph of the specified topology, attaching the
+        supplied reference to it.
+
+        Arguments:
+            topology_id (str):  The topology identification string
+            topology_ref (str): The unique reference string for this topology
+                                physical graph.
+            logical_plan (dict):    Dictionary describing the logical plan of
+                                    the topology. This should match the format
+                                    of the logical plan returned by the Heron
+                                    tracker API.
+            physical_plan (dict):   Dictionary describing the physical plan of
+                                    the topology. This should match the format
+                                    of the physical plan returned by the Heron
+                                    tracker API.
+        Raises:
+            RuntimeError:   If a graph with the supplied topology ID and
+                            reference already exists.
+        """
+        pass
+
+    @abstractmethod
+    def get_instances(self, topology_id: str,
+                      topology_ref: Optional[str] = None) -> List[INSTANCE]:
+        """ Gets the spout and bolt instances of the specified topology.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            topology_ref (str): Optional topology reference string. If not
+                                supplied the instances of every graph of the
+                                topology are returned.
+
+        Returns:
+            A list of instance dictionaries with "task_id", "component",
+            "label" ("spout" or "bolt"), "container" and "stream_manager"
+            keys.
+        """
+        pass
+
+    @abstractmethod
+    def get_downstream_tasks(self, topology_id: str, task_id: int,
+                             topology_ref: Optional[str] = None) -> List[int]:
+        """ Gets the task IDs of the instances logically connected downstream
+        of the supplied instance.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            task_id (int):  The task ID of the source instance.
+            topology_ref (str): Optional topology reference string. If not
+                                supplied every graph of the topology is
+                                searched.
+
+        Returns:
+            A list of unique downstream task IDs.
+        """
+        pass
+
+    @abstractmethod
+    def get_logical_adjacency(self, topology_id: str,
+                              topology_ref: Optional[str] = None
+                              ) -> Dict[int, List[int]]:
+        """ Gets the task to task adjacency of the logical connections of the
+        specified topology, fetched in a single query.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            topology_ref (str): Optional topology reference string. If not
+                                supplied the connections of every graph of the
+                                topology are returned.
+
+        Returns:
+            A dictionary mapping from the task ID of every instance with
+            outgoing logical connections to a list of the unique task IDs
+            downstream of it.
+        """
+        pass
+
+    @abstractmethod
+    def get_logical_edges(self, topology_id: str,
+                          topology_ref: Optional[str] = None
+                          ) -> List[LOGICAL_EDGE]:
+        """ Gets the logical connections between the instances of the
+        specified topology.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            topology_ref (str): Optional topology reference string. If not
+                                supplied the connections of every graph of the
+                                topology are returned.
+
+        Returns:
+            A list of connection dictionaries with "source_task",
+            "source_component", "stream", "grouping", "destination_task" and
+            "destination_component" keys.
+        """
+        pass
+
+    @abstractmethod
+    def get_stream_manager_instances(
+            self, topology_id: str, topology_ref: str
+            ) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        """ Gets the instances that send tuples to and receive tuples from
+        each stream manager of the specified topology graph.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            topology_ref (str): The topology reference string.
+
+        Returns:
+            A 2-tuple of dictionaries mapping from stream manager ID string to
+            a list of task IDs. The first holds the instances sending tuples
+            to each stream manager and the second the instances receiving
+            tuples from it.
+        """
+        pass
+
+    @abstractmethod
+    def set_routing_probabilities(
+            self, topology_id: str, topology_ref: str,
+            routing_probabilities: List[ROUTING_PROBABILITY]) -> None:
+        """ Sets the routing probability of the supplied logical connections
+        in the specified topology graph.
+
+        Arguments:
+            topology_id (str):  The topology identification string.
+            topology_ref (str): The topology reference string.
+            routing_probabilities (list):   A list of dictionaries with
+                                            "source_task", "stream",
+                                            "destination_task" and
+                                            "routing_probability" keys.
+        """
+        pass
@@ -9,25 +9,40 @@ import logging
 import errno
 
 from socket import error as socket_error
+from typing import Dict, List, Any, Optional, Tuple
 
-from gremlin_python.structure.graph import Graph
-from gremlin_python.process.graph_traversal import has, GraphTraversalSource
+from gremlin_python.structure.graph import Graph, Edge
+from gremlin_python.process.traversal import P, T
+from gremlin_python.process.graph_traversal import \
+    has, in_, out, outV, inV, GraphTraversal, GraphTraversalSource
 from gremlin_python.process.strategies import SubgraphStrategy
 from gremlin_python.driver.driver_remote_connection \
         import DriverRemoteConnection
 
 from caladrius.config.keys import ConfKeys
+from caladrius.graph.client import (
+    GraphClient, INSTANCE, LOGICAL_EDGE, ROUTING_PROBABILITY)
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
+# The default number of graph elements written by a single batched traversal
+DEFAULT_BATCH_SIZE: int = 200
 
-class GremlinClient(object):
+# The default number of edges created server side by a single traversal
+DEFAULT_EDGE_BATCH_SIZE: int = 10000
+
+
+class GremlinClient(GraphClient):
     """ Client class for the TinkerPop Gremlin Server """
 
     def __init__(self, config: dict, graph_name: str = "g") -> None:
-        self.config: dict = config
+        super().__init__(config)
         self.gremlin_server_url: str = \
             self.config[ConfKeys.GREMLIN_SERVER_URL.value]
+        self.batch_size: int = max(1, int(self.config.get(
+            ConfKeys.GREMLIN_BATCH_SIZE.value, DEFAULT_BATCH_SIZE)))
+        self.edge_batch_size: int = max(1, int(self.config.get(
+            ConfKeys.GREMLIN_EDGE_BATCH_SIZE.value, DEFAULT_EDGE_BATCH_SIZE)))
 
         # Create remote graph traversal object
         LOG.info("Connecting to graph database at: %s",
@@ -104,24 +119,6 @@ class GremlinClient(object):
 
         return False
 
-    def raise_if_missing(self, topology_id: str, topology_ref: str) -> None:
-        """ Checks weather vertices exist in the graph database with the
-        supplied topology id and ref values and raises a error if they don't.
-
-        Arguments:
-            topology_id (str):  The topology identification string.
-            topology_ref (str): The reference string to check for.
-
-        Raises:
-            RuntimeError:   If vertices with the supplied topology ID and
-                            reference are not present in the graph database.
-        """
-        if not self.topology_ref_exists(topology_id, topology_ref):
-            msg: str = (f"Topology: {topology_id} reference: {topology_ref} "
-                        f"is not present in the graph database")
-            LOG.error(msg)
-            raise RuntimeError(msg)
-
     def topology_subgraph(self, topology_id: str,
                           topology_ref: str) -> GraphTraversalSource:
         """ Gets a gremlin graph traversal source limited to the sub-graph of
@@ -146,3 +143,151 @@ class GremlinClient(object):
                                  .has("topology_id", topology_id)))
 
         return topo_graph_traversal
+
+    def _instance_traversal(self, topology_id: str,
+                            topology_ref: Optional[str]) -> GraphTraversal:
+
+        traversal: GraphTraversal = (self.graph_traversal.V()
+                                     .hasLabel(P.within("spout", "bolt"))
+                                     .has("topology_id", topology_id))
+
+        if topology_ref:
+            traversal = traversal.has("topology_ref", topology_ref)
+
+        return traversal
+
+    def get_topology_refs(self, topology_id: str) -> List[str]:
+
+        return (self.graph_traversal.V().has("topology_id", topology_id)
+                .values("topology_ref").dedup().toList())
+
+    def build_physical_graph(self, topology_id: str, topology_ref: str,
+                             logical_plan: Dict[str, Any],
+                             physical_plan: Dict[str, Any]) -> None:
+
+        # The builder uses this module so it is imported here to avoid a
+        # circular import
+        from caladrius.graph.builder.heron import builder
+
+        builder.create_physical_graph(self, topology_id, topology_ref,
+                                      logical_plan, physical_plan)
+
+    def get_instances(self, topology_id: str,
+                      topology_ref: Optional[str] = None) -> List[INSTANCE]:
+
+        return (self._instance_traversal(topology_id, topology_ref)
+                .project("task_id", "component", "label", "container",
+                         "stream_manager")
+                .by("task_id").by("component").by(T.label).by("container")
+                .by("stream_manager")
+                .toList())
+
+    def get_downstream_tasks(self, topology_id: str, task_id: int,
+                             topology_ref: Optional[str] = None) -> List[int]:
+
+        return (self._instance_traversal(topology_id, topology_ref)
+                .has("task_id", task_id)
+                .out("logically_connected").values("task_id").dedup()
+                .toList())
+
+    def get_logical_adjacency(self, topology_id: str,
+                              topology_ref: Optional[str] = None
+                              ) -> Dict[int, List[int]]:
+
+        connections: List[Dict[str, int]] = (
+            self._instance_traversal(topology_id, topology_ref)
+            .outE("logically_connected")
+            .project("s", "d")
+            .by(outV().values("task_id"))
+            .by(inV().values("task_id"))
+            .toList())
+
+        adjacency: Dict[int, Dict[int, None]] = {}
+        for connection in connections:
+            adjacency.setdefault(connection["s"], {})[connection["d"]] = None
+
+        return {source: list(destinations)
+                for source, destinations in adjacency.items()}
+
+    def get_logical_edges(self, topology_id: str,
+                          topology_ref: Optional[str] = None
+                          ) -> List[LOGICAL_EDGE]:
+
+        return (self._instance_traversal(topology_id, topology_ref)
+                .outE("logically_connected")
+                .project("source_task", "source_component", "stream",
+                         "grouping", "destination_task",
+                         "destination_component")
+                .by(outV().values("task_id"))
+                .by(outV().values("component"))
+                .by("stream")
+                .by("grouping")
+                .by(inV().values("task_id"))
+                .by(inV().values("component"))
+                .toList())
+
+    def get_stream_manager_instances(
+            self, topology_id: str, topology_ref: str
+            ) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+
+        topo_traversal: GraphTraversalSource = \
+            self.topology_subgraph(topology_id, topology_ref)
+
+        sending_instances: Dict[str, List[int]] = \
+            (topo_traversal.V().hasLabel("stream_manager")
+             .group().by("id").by(in_("physically_connected")
+                                  .hasLabel(P.within("spout", "bolt"))
+                                  .values("task_id")
+                                  .fold())
+             .next())
+
+        receiving_instances: Dict[str, List[int]] = \
+            (topo_traversal.V().hasLabel("stream_manager")
+             .group().by("id").by(out("physically_connected")
+                                  .hasLabel("bolt").values("task_id").fold())
+             .next())
+
+        return sending_instances, receiving_instances
+
+    def set_routing_probabilities(
+            self, topology_id: str, topology_ref: str,
+            routing_probabilities: List[ROUTING_PROBABILITY]) -> None:
+
+        topo_traversal: GraphTraversalSource = \
+            self.topology_subgraph(topology_id, topology_ref)
+
+        edges: Dict[Tuple[int, str, int], Edge] = {
+            (edge["source_task"], edge["stream"], edge["destination_task"]):
+            edge["edge"]
+            for edge in (topo_traversal.V()
+                         .outE("logically_connected")
+                         .project("source_task", "stream", "edge",
+                                  "destination_task")
+                         .by(outV().values("task_id"))
+                         .by("stream")
+                         .by()
+                         .by(inV().values("task_id"))
+                         .toList())}
+
+        # Edges sharing a routing probability, as all the edges between two
+        # shuffle grouped components do, are updated by the same traversals
+        edges_by_probability: Dict[float, List[Edge]] = {}
+
+        for routing_prob in routing_probabilities:
+            key: Tuple[int, str, int] = (routing_prob["source_task"],
+                                         routing_prob["stream"],
+                                         routing_prob["destination_task"])
+            if key not in edges:
+                LOG.warning("There is no logical connection from task %d to "
+                            "task %d on stream %s in topology %s reference %s",
+                            key[0], key[2], key[1], topology_id, topology_ref)
+                continue
+            edges_by_probability.setdefault(
+                float(routing_prob["routing_probability"]), []).append(
+                    edges[key])
+
+        for probability, prob_edges in edges_by_probability.items():
+            for start in range(0, len(prob_edges), self.batch_size):
+                (self.graph_traversal
+                 .E(*prob_edges[start:start + self.batch_size])
+                 .property("routing_probability", probability).iterate())
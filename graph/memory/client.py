@@ -0,0 +1,424 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a graph client that holds the physical graphs of
+topologies in the memory of the Caladrius process, as an alternative to a
+Gremlin Server for single node deployments. The graphs can optionally be
+snapshot to disk so that they survive restarts. """
+
+import os
+import glob
+import json
+import logging
+import tempfile
+import threading
+
+import datetime as dt
+
+from typing import Dict, List, Any, Optional, Tuple, Union, cast
+from urllib.parse import quote
+
+import numpy as np
+
+from caladrius.common.heron import tracker
+from caladrius.config.keys import ConfKeys
+from caladrius.graph.client import (
+    GraphClient, INSTANCE, LOGICAL_EDGE, ROUTING_PROBABILITY)
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+GRAPH_KEY = Tuple[str, str]
+
+
+class TopologyGraph(object):
+    """ The physical graph of a single version of a topology. The instances
+    are held as property dictionaries and the logical connections as arrays of
+    source and destination task IDs, sorted by source task so that the
+    downstream instances of a task are a contiguous slice. Physical
+    connections are implied by the stream manager of each instance. """
+
+    def __init__(self, topology_id: str, topology_ref: str,
+                 instances: List[INSTANCE],
+                 stream_managers: List[Dict[str, Any]],
+                 sources: List[int], destinations: List[int],
+                 streams: List[str], groupings: List[str],
+                 routing_probabilities: Optional[List[float]] = None) -> None:
+        """ Arguments:
+                topology_id (str):  The topology identification string.
+                topology_ref (str): The topology reference string.
+                instances (list):   The instance property dictionaries.
+                stream_managers (list): The stream manager property
+                                        dictionaries.
+                sources (list): The source task ID of each logical connection.
+                destinations (list):    The destination task ID of each
+                                        logical connection.
+                streams (list): The stream name of each logical connection.
+                groupings (list):   The grouping of each logical connection.
+                routing_probabilities (list):   Optional routing probability
+                                                of each logical connection,
+                                                NaN where it is not set.
+        """
+        self.topology_id: str = topology_id
+        self.topology_ref: str = topology_ref
+        self.instances: List[INSTANCE] = instances
+        self.stream_managers: List[Dict[str, Any]] = stream_managers
+
+        self.tasks: Dict[int, INSTANCE] = {
+            int(instance["task_id"]): instance for instance in instances}
+
+        order: np.ndarray = np.argsort(np.asarray(sources, dtype=np.int64),
+                                       kind="stable")
+
+        self.sources: np.ndarray = \
+            np.asarray(sources, dtype=np.int64)[order]
+        self.destinations: np.ndarray = \
+            np.asarray(destinations, dtype=np.int64)[order]
+        self.streams: List[str] = [streams[index] for index in order]
+        self.groupings: List[str] = [groupings[index] for index in order]
+
+        if routing_probabilities is None:
+            self.routing_probabilities: np.ndarray = \
+                np.full(self.sources.size, np.nan)
+        else:
+            self.routing_probabilities = np.asarray(
+                routing_probabilities, dtype=np.float64)[order]
+
+    @classmethod
+    def from_plans(cls, topology_id: str, topology_ref: str,
+                   logical_plan: Dict[str, Any],
+                   physical_plan: Dict[str, Any]) -> "TopologyGraph":
+        """ Creates the physical graph of a topology from its logical and
+        physical plans, in the format returned by the Heron Tracker API. """
+
+        stream_managers: List[Dict[str, Any]] = [
+            {"id": stream_manager["id"],
+             "host": stream_manager["host"],
+             "port": stream_manager["port"],
+             "container": int(stream_manager["id"].split("-")[1])}
+            for stream_manager in physical_plan["stmgrs"].values()]
+
+        instances: List[INSTANCE] = []
+        component_tasks: Dict[str, List[int]] = {}
+
+        for label, components in (("spout", physical_plan["spouts"]),
+                                  ("bolt", physical_plan["bolts"])):
+            for component in logical_plan[label + "s"]:
+                component_tasks[component] = []
+                for instance_name in components[component]:
+                    instance: Dict[str, Union[str, int]] = \
+                        tracker.parse_instance_name(instance_name)
+                    instances.append({
+                        "task_id": instance["task_id"],
+                        "component": component,
+                        "label": label,
+                        "container": instance["container"],
+                        "stream_manager":
+                            physical_plan["instances"][instance_name]
+                            ["stmgrId"]})
+                    component_tasks[component].append(instance["task_id"])
+
+        sources: List[int] = []
+        destinations: List[int] = []
+        streams: List[str] = []
+        groupings: List[str] = []
+
+        for bolt_name, bolt_data in logical_plan["bolts"].items():
+            for incoming_stream in bolt_data["inputs"]:
+                for destination in component_tasks[bolt_name]:
+                    for source in component_tasks[
+                            incoming_stream["component_name"]]:
+                        sources.append(source)
+                        destinations.append(destination)
+                        streams.append(incoming_stream["stream_name"])
+                        groupings.append(incoming_stream["grouping"])
+
+        return cls(topology_id, topology_ref, instances, stream_managers,
+                   sources, destinations, streams, groupings)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TopologyGraph":
+        """ Creates a graph from a dictionary created by the to_dict method.
+        """
+
+        edges: Dict[str, List[Any]] = data["logical_edges"]
+
+        return cls(data["topology_id"], data["topology_ref"],
+                   data["instances"], data["stream_managers"],
+                   edges["sources"], edges["destinations"], edges["streams"],
+                   edges["groupings"],
+                   [np.nan if prob is None else prob
+                    for prob in edges["routing_probabilities"]])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Converts the graph into a JSON serialisable dictionary. """
+
+        return {
+            "topology_id": self.topology_id,
+            "topology_ref": self.topology_ref,
+            "instances": self.instances,
+            "stream_managers": self.stream_managers,
+            "logical_edges": {
+                "sources": self.sources.tolist(),
+                "destinations": self.destinations.tolist(),
+                "streams": self.streams,
+                "groupings": self.groupings,
+                "routing_probabilities": [
+                    None if np.isnan(prob) else prob
+                    for prob in self.routing_probabilities.tolist()]}}
+
+    def downstream_tasks(self, task_id: int) -> List[int]:
+        """ Gets the unique task IDs logically connected downstream of the
+        supplied task, in the order they were connected. """
+
+        start: int = int(np.searchsorted(self.sources, task_id, "left"))
+        end: int = int(np.searchsorted(self.sources, task_id, "right"))
+
+        return list(dict.fromkeys(self.destinations[start:end].tolist()))
+
+    def logical_adjacency(self) -> Dict[int, List[int]]:
+        """ Gets a dictionary mapping from each task with outgoing logical
+        connections to its unique downstream task IDs. """
+
+        sources, starts = np.unique(self.sources, return_index=True)
+        ends: np.ndarray = np.append(starts[1:], self.sources.size)
+
+        return {source: list(dict.fromkeys(
+                    self.destinations[start:end].tolist()))
+                for source, start, end
+                in zip(sources.tolist(), starts.tolist(), ends.tolist())}
+
+    def logical_edges(self) -> List[LOGICAL_EDGE]:
+        """ Gets the logical connection dictionaries of the graph. """
+
+        return [{"source_task": source,
+                 "source_component": self.tasks[source]["component"],
+                 "stream": stream,
+                 "grouping": grouping,
+                 "destination_task": destination,
+                 "destination_component":
+                     self.tasks[destination]["component"]}
+                for source, destination, stream, grouping
+                in zip(self.sources.tolist(), self.destinations.tolist(),
+                       self.streams, self.groupings)]
+
+    def stream_manager_instances(
+            self) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        """ Gets the instances sending tuples to and receiving tuples from
+        each stream manager. Every instance with an outgoing logical
+        connection sends to its own stream manager and every instance with an
+        incoming logical connection receives from its own stream manager. """
+
+        sending: Dict[str, List[int]] = \
+            {stream_manager["id"]: [] for stream_manager in self.stream_managers}
+        receiving: Dict[str, List[int]] = \
+            {stream_manager["id"]: [] for stream_manager in self.stream_managers}
+
+        for task_id in np.unique(self.sources).tolist():
+            sending[self.tasks[task_id]["stream_manager"]].append(task_id)
+
+        for task_id in np.unique(self.destinations).tolist():
+            receiving[self.tasks[task_id]["stream_manager"]].append(task_id)
+
+        return sending, receiving
+
+    def set_routing_probabilities(
+            self, routing_probabilities: List[ROUTING_PROBABILITY]) -> None:
+        """ Sets the routing probabilities of the supplied logical
+        connections. """
+
+        index: Dict[Tuple[int, str, int], int] = {
+            key: position for position, key in enumerate(zip(
+                self.sources.tolist(), self.streams,
+                self.destinations.tolist()))}
+
+        for routing_prob in routing_probabilities:
+            key: Tuple[int, str, int] = (routing_prob["source_task"],
+                                         routing_prob["stream"],
+                                         routing_prob["destination_task"])
+            if key not in index:
+                LOG.warning("There is no logical connection from task %d to "
+                            "task %d on stream %s in topology %s reference %s",
+                            key[0], key[2], key[1], self.topology_id,
+                            self.topology_ref)
+                continue
+            self.routing_probabilities[index[key]] = \
+                float(routing_prob["routing_probability"])
+
+
+class InMemoryGraphClient(GraphClient):
+    """ Graph client that holds the physical graphs in memory, answering the
+    graph queries without any network round trips. If the
+    "graph.memory.snapshot.dir" configuration key is set, each graph is
+    written as a JSON snapshot to that directory whenever it changes and the
+    snapshots are loaded when the client is created. """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        super().__init__(config)
+
+        self.snapshot_dir: Optional[str] = \
+            config.get(ConfKeys.GRAPH_MEMORY_SNAPSHOT_DIR.value)
+
+        self.graphs: Dict[GRAPH_KEY, TopologyGraph] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        if self.snapshot_dir:
+            self._load_snapshots()
+
+        LOG.info("Created in memory graph client holding %d graphs",
+                 len(self.graphs))
+
+    def __hash__(self) -> int:
+
+        return id(self)
+
+    def __eq__(self, other: object) -> bool:
+
+        return self is other
+
+    def _snapshot_path(self, topology_id: str, topology_ref: str) -> str:
+
+        return os.path.join(cast(str, self.snapshot_dir),
+                            quote(topology_id, safe=""),
+                            quote(topology_ref, safe="") + ".json")
+
+    def _load_snapshots(self) -> None:
+
+        for path in sorted(glob.glob(os.path.join(
+                cast(str, self.snapshot_dir), "*", "*.json"))):
+            try:
+                with open(path) as snapshot:
+                    graph: TopologyGraph = \
+                        TopologyGraph.from_dict(json.load(snapshot))
+            except (OSError, ValueError, KeyError) as err:
+                LOG.warning("Unable to load graph snapshot %s: %s", path,
+                            str(err))
+                continue
+
+            self.graphs[(graph.topology_id, graph.topology_ref)] = graph
+
+    def _save_snapshot(self, graph: TopologyGraph) -> None:
+
+        if not self.snapshot_dir:
+            return
+
+        path: str = self._snapshot_path(graph.topology_id, graph.topology_ref)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so that a partially written
+        # snapshot is never loaded
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                             suffix=".tmp")
+        with os.fdopen(handle, "w") as snapshot:
+            json.dump(graph.to_dict(), snapshot)
+        os.replace(temp_path, path)
+
+        LOG.debug("Saved snapshot of topology %s reference %s graph to %s",
+                  graph.topology_id, graph.topology_ref, path)
+
+    def _get_graphs(self, topology_id: str,
+                    topology_ref: Optional[str]) -> List[TopologyGraph]:
+
+        with self._lock:
+            if topology_ref:
+                graph: Optional[TopologyGraph] = \
+                    self.graphs.get((topology_id, topology_ref))
+                return [graph] if graph else []
+
+            return [graph for (graph_id, _), graph in self.graphs.items()
+                    if graph_id == topology_id]
+
+    def topology_ref_exists(self, topology_id: str, topology_ref: str) -> bool:
+
+        with self._lock:
+            return (topology_id, topology_ref) in self.graphs
+
+    def get_topology_refs(self, topology_id: str) -> List[str]:
+
+        return [graph.topology_ref
+                for graph in self._get_graphs(topology_id, None)]
+
+    def build_physical_graph(self, topology_id: str, topology_ref: str,
+                             logical_plan: Dict[str, Any],
+                             physical_plan: Dict[str, Any]) -> None:
+
+        if self.topology_ref_exists(topology_id, topology_ref):
+            msg: str = (f"A graph of topology {topology_id} with reference "
+                        f"{topology_ref} is already present in the graph "
+                        f"database.")
+            LOG.error(msg)
+            raise RuntimeError(msg)
+
+        LOG.info("Building physical graph for topology %s with reference %s",
+                 topology_id, topology_ref)
+
+        start: dt.datetime = dt.datetime.now()
+
+        graph: TopologyGraph = TopologyGraph.from_plans(
+            topology_id, topology_ref, logical_plan, physical_plan)
+
+        with self._lock:
+            self.graphs[(topology_id, topology_ref)] = graph
+
+        self._save_snapshot(graph)
+
+        LOG.info("Physical graph construction completed after %.2f seconds",
+                 (dt.datetime.now() - start).total_seconds())
+
+    def get_instances(self, topology_id: str,
+                      topology_ref: Optional[str] = None) -> List[INSTANCE]:
+
+        return [dict(instance)
+                for graph in self._get_graphs(topology_id, topology_ref)
+                for instance in graph.instances]
+
+    def get_downstream_tasks(self, topology_id: str, task_id: int,
+                             topology_ref: Optional[str] = None) -> List[int]:
+
+        downstream: Dict[int, None] = {}
+        for graph in self._get_graphs(topology_id, topology_ref):
+            downstream.update(dict.fromkeys(graph.downstream_tasks(task_id)))
+
+        return list(downstream)
+
+    def get_logical_adjacency(self, topology_id: str,
+                              topology_ref: Optional[str] = None
+                              ) -> Dict[int, List[int]]:
+
+        adjacency: Dict[int, Dict[int, None]] = {}
+        for graph in self._get_graphs(topology_id, topology_ref):
+            for source, destinations in graph.logical_adjacency().items():
+                adjacency.setdefault(source, {}).update(
+                    dict.fromkeys(destinations))
+
+        return {source: list(destinations)
+                for source, destinations in adjacency.items()}
+
+    def get_logical_edges(self, topology_id: str,
+                          topology_ref: Optional[str] = None
+                          ) -> List[LOGICAL_EDGE]:
+
+        return [edge for graph in self._get_graphs(topology_id, topology_ref)
+                for edge in graph.logical_edges()]
+
+    def get_stream_manager_instances(
+            self, topology_id: str, topology_ref: str
+            ) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+
+        self.raise_if_missing(topology_id, topology_ref)
+
+        return self._get_graphs(topology_id, topology_ref)[0]\
+            .stream_manager_instances()
+
+    def set_routing_probabilities(
+            self, topology_id: str, topology_ref: str,
+            routing_probabilities: List[ROUTING_PROBABILITY]) -> None:
+
+        self.raise_if_missing(topology_id, topology_ref)
+
+        graph: TopologyGraph = self._get_graphs(topology_id, topology_ref)[0]
+
+        with self._lock:
+            graph.set_routing_probabilities(routing_probabilities)
+
+        self._save_snapshot(graph)
@@ -7,114 +7,119 @@ the graph database."""
 
 import logging
 import datetime as dt
-import os
-import json
-from collections import defaultdict
-from multiprocessing import Process, Queue
-from string import Template
-from typing import List, Dict, Any, Optional, Tuple
-from gremlin_python.process.graph_traversal import outE
-
-from caladrius.graph.gremlin.client import GremlinClient
-from caladrius.graph.builder.heron import builder
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+from caladrius.graph.client import GraphClient
+from caladrius.graph.utils.path_store import PATH_STORE, PathKey, PathSet
 from caladrius.common.heron import tracker
 from caladrius.common.heron import zookeeper
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
-# The format is paths/topologyname_cluster_environ_time.json
-file_path_template = Template("paths/$topology-$cluster-$environ-$time.json")
-
-
-def find_all_paths(parent_to_child, start, path=[], path_dict=defaultdict()):
-    """This is a recursive function that finds all paths from the given start node to
-    sinks and returns them."""
-    p = path.copy()
-    p.append(start)
-    if start not in parent_to_child:
-        return p, path_dict
-    paths = []
-    for node in parent_to_child[start]:
-        if node in path_dict:
-            new_paths = path_dict[node]
-        else:
-            new_paths, path_dict = find_all_paths(parent_to_child, node, p, path_dict)
-            path_dict[node] = new_paths.copy()
-        if type(new_paths[0]) is int:
-            # there is only one downstream path from current node
-            paths.append(new_paths)
-        else:
-            # there are multiple downstream paths from current node
-            for new_path in new_paths:
-                paths.append(new_path)
-    # LOG.info("Returning paths for node: %d", start)
-    return paths, path_dict
-
-
-def path_helper(parent_to_child: dict, spouts: List) -> List:
-    """This is a helper function that creates a separate process for every spout
-    and uses that process to calculate all paths to sinks for that spout. This function is
-    expected to be compute intensive and so, multi-processing is required."""
-    paths: List = []
-    path_dict = defaultdict()
-    for spout in spouts:
-        results, path_dict = find_all_paths(parent_to_child, spout, path_dict=path_dict)
-        for result in results:
-            paths.append(result)
-    return paths
+# The paths of each topology are versioned by the time its physical plan was
+# last updated
+PATHS_VERSION_FORMAT: str = "%Y-%m-%dT%H_%M_%S"
+
+# The topology model configuration key setting the number of worker processes
+# used to enumerate the paths of a topology
+PATHS_WORKERS_KEY: str = "paths.enumeration.workers"
+
+# The topology model configuration key selecting how end to end latencies are
+# calculated, and the key setting how many of the highest latency paths are
+# reported in the "dag" mode
+LATENCY_MODE_KEY: str = "end.to.end.latency.mode"
+LATENCY_TOP_K_KEY: str = "end.to.end.latency.top.k"
+DAG_LATENCY_MODE: str = "dag"
+PATHS_LATENCY_MODE: str = "paths"
+
+
+def get_spout_adjacency(graph_client: GraphClient, topology_id: str
+                        ) -> Tuple[Dict[int, List[int]], List[int]]:
+    """ Fetches the task to downstream task adjacency of the topology's logical
+    connections, along with the spout instances that paths start from.
+
+    Arguments:
+        graph_client (GraphClient):   The client instance for the graph
+                                      database.
+        topology_id (str):  The topology ID string.
+
+    Returns:
+        A 2-tuple of the adjacency dictionary and the sorted task IDs of the
+        spout instances with downstream instances.
+    """
+
+    parent_to_child: Dict[int, List[int]] = graph_client.get_logical_adjacency(topology_id)
+
+    # only spouts with downstream instances start a path
+    spout_tasks: List[int] = sorted(instance["task_id"] for instance in graph_client.get_instances(topology_id)
+                                    if instance["label"] == "spout" and instance["task_id"] in parent_to_child)
+
+    return parent_to_child, spout_tasks
 
 
-def get_all_paths(graph_client: GremlinClient, topology_id: str) -> List[List[str]]:
-    """ This function first gets all spouts from gremlin. Then it creates a dictionary,
-    mapping all tasks to downstream tasks. It passes this dictionary along to another function
-    that calculates all paths from the provided spouts to sinks.
+def iter_all_paths(graph_client: GraphClient, topology_id: str,
+                   workers: Optional[int] = None) -> Iterator[PathSet]:
+    """ This function fetches the task to downstream task adjacency of the topology's
+    logical connections from the graph client in a single query and enumerates all paths
+    from the spouts to sinks, using a pool of worker processes if there are enough paths.
+    The paths are yielded in groups as each unit of work finishes.
 
     Arguments:
-        graph_client (GremlinClient): The client instance for the graph
+        graph_client (GraphClient):   The client instance for the graph
                                       database.
         topology_id (str):  The topology ID string.
+        workers (int):  The number of worker processes used to enumerate the
+                        paths. Defaults to the number of CPUs.
+
+    Returns:
+        An iterator over path sets which together hold all possible paths from
+        sources to sinks.
+    """
+
+    # imported here so the dag latency mode never loads the parallel path enumerator
+    from caladrius.graph.utils.paths import iter_path_sets
+
+    parent_to_child, spout_tasks = get_spout_adjacency(graph_client, topology_id)
+
+    LOG.info("Graph size: %d spout instances, %d instances with downstream connections",
+             len(spout_tasks), len(parent_to_child))
+
+    return iter_path_sets(parent_to_child, spout_tasks, workers)
+
+
+def get_all_paths(graph_client: GraphClient, topology_id: str,
+                  workers: Optional[int] = None) -> PathSet:
+    """ This function finds all paths from the spouts to sinks of the topology's logical
+    connections, in memory (see iter_all_paths).
+
+    Arguments:
+        graph_client (GraphClient):   The client instance for the graph
+                                      database.
+        topology_id (str):  The topology ID string.
+        workers (int):  The number of worker processes used to enumerate the
+                        paths. Defaults to the number of CPUs.
 
     Returns:
         All possible paths from sources to sinks.
     """
-    LOG.info("Graph size: %d vertices %d edges",
-             graph_client.graph_traversal.V().count().toList()[0],
-             graph_client.graph_traversal.E().count().toList()[0])
-    conn_type = "logically_connected"
     start: dt.datetime = dt.datetime.now()
 
-    spouts = graph_client.graph_traversal.V().has("topology_id", topology_id).\
-        hasLabel("spout").where(outE(conn_type)).dedup().toList()
-    spout_tasks = []
-    parent_to_child = dict()
-    for spout in spouts:
-        downstream_task_vertices = [spout]
-        spout_tasks.append(graph_client.graph_traversal.V(spout).properties('task_id').value().next())
-        while len(downstream_task_vertices) != 0:
-            for vertex in downstream_task_vertices:
-                vertex_task_id = graph_client.graph_traversal.V(vertex).properties('task_id').value().next()
-                downstream_task_vertices = graph_client.graph_traversal.V(vertex).out(conn_type).dedup().toList()
-                downstream_task_ids = graph_client.graph_traversal.V(vertex).out(conn_type).properties(
-                    'task_id').value().dedup().toList()
-                if len(downstream_task_vertices) != 0:
-                    parent_to_child[vertex_task_id] = downstream_task_ids
-
-    paths: List = path_helper(parent_to_child, spout_tasks)
+    paths: PathSet = PathSet.concatenate(iter_all_paths(graph_client, topology_id, workers))
 
     LOG.info("Number of paths returned: %d", len(paths))
     end: dt.datetime = dt.datetime.now()
-    LOG.info("Time spent in fetching all paths: %d seconds", (end - start).total_seconds())
+    LOG.info("Time spent in fetching all paths: %.3f seconds", (end - start).total_seconds())
 
     return paths
 
 
-def get_current_refs(graph_client: GremlinClient,
+def get_current_refs(graph_client: GraphClient,
                      topology_id: str) -> List[str]:
     """ Gets a list of topology reference strings for graphs with the supplied
     topology id.
 
     Arguments:
-        graph_client (GremlinClient): The client instance for the graph
+        graph_client (GraphClient):   The client instance for the graph
                                       database.
         topology_id (str):  The topology ID string.
 
@@ -122,20 +127,18 @@ def get_current_refs(graph_client: GremlinClient,
         A list of topology reference strings.
     """
 
-    refs: List[str] = (graph_client.graph_traversal.V()
-                       .has("topology_id", topology_id)
-                       .values("topology_ref").dedup().toList())
+    refs: List[str] = graph_client.get_topology_refs(topology_id)
 
     return [ref for ref in refs if "current" in ref]
 
 
-def most_recent_graph_ref(graph_client: GremlinClient, topology_id: str
+def most_recent_graph_ref(graph_client: GraphClient, topology_id: str
                           ) -> Optional[Tuple[str, dt.datetime]]:
     """ Gets the most recent topology reference, for the supplied topology ID
     in a tuple with the creation datetime object.
 
     Arguments:
-        graph_client (GremlinClient): The client instance for the graph
+        graph_client (GraphClient):   The client instance for the graph
                                       database.
         topology_id (str):  The topology ID string.
 
@@ -167,21 +170,22 @@ def most_recent_graph_ref(graph_client: GremlinClient, topology_id: str
 def _physical_plan_still_current(topology_id: str,
                                  most_recent_graph_ts: dt.datetime,
                                  zk_connection: str, zk_root_node: str,
-                                 zk_time_offset: int) -> bool:
+                                 zk_time_offset: int, cluster: str = None,
+                                 environ: str = None) -> bool:
 
     LOG.info("Checking if the physical plan in the graph database for "
              "topology: %s is still current", topology_id)
 
     recent_topo_update_ts: dt.datetime = \
         zookeeper.last_topo_update_ts_html(zk_connection, zk_root_node, topology_id,
-                                      zk_time_offset)
+                                      zk_time_offset, cluster, environ)
 
     if most_recent_graph_ts > recent_topo_update_ts:
         return True
 
     return False
 
-def _build_graph(graph_client: GremlinClient, tracker_url: str, cluster: str,
+def _build_graph(graph_client: GraphClient, tracker_url: str, cluster: str,
                  environ: str, topology_id: str, ref_prefix: str = "current"
                  ) -> str:
 
@@ -194,14 +198,17 @@ def _build_graph(graph_client: GremlinClient, tracker_url: str, cluster: str,
     physical_plan: Dict[str, Any] = \
         tracker.get_physical_plan(tracker_url, cluster, environ, topology_id)
 
-    builder.create_physical_graph(graph_client, topology_id,
-                                  topology_ref, logical_plan,
-                                  physical_plan)
+    graph_client.build_physical_graph(topology_id, topology_ref, logical_plan,
+                                      physical_plan)
 
     return topology_ref
 
 
-def read_paths(zk_config: Dict[str, any], topology_id: str, cluster: str, environ: str,) -> List:
+def _paths_key(zk_config: Dict[str, Any], topology_id: str, cluster: str,
+               environ: str) -> PathKey:
+    """ Creates the path store key for the current version of the topology's
+    physical plan, identified by the time it was last updated in ZooKeeper. """
+
     zookeeper_url = zk_config["heron.statemgr.connection.string"]
     parts = zookeeper_url.split(".")
     parts[1] = cluster
@@ -209,24 +216,68 @@ def read_paths(zk_config: Dict[str, any], topology_id: str, cluster: str, enviro
 
     recent_topo_update_ts: dt.datetime = zookeeper.last_topo_update_ts_html(zookeeper_url,
                                                                        zk_config["heron.statemgr.root.path"],
-                                                                       topology_id, zk_config["zk.time.offset"])
-    file_name = file_path_template.substitute(topology=topology_id,
-                                              cluster=cluster,
-                                              environ=environ,
-                                              time=recent_topo_update_ts.strftime('%m_%d_%Y_%I_%M_%S'))
+                                                                       topology_id, zk_config["zk.time.offset"],
+                                                                       cluster, environ)
+
+    return PathKey(topology_id, cluster, environ, recent_topo_update_ts.strftime(PATHS_VERSION_FORMAT))
 
-    with open(file_name) as file:
-        path_data = json.load(file)
 
-    return path_data["paths"]
+def read_paths(zk_config: Dict[str, Any], topology_id: str, cluster: str, environ: str) -> PathSet:
+    """ Reads all paths of the current version of the topology's physical plan
+    from the path store. The paths are memory mapped and only converted to lists
+    of task IDs as they are used.
+
+    Arguments:
+        zk_config (dict):   A dictionary containing ZK config information.
+                            "heron.statemgr.connection.string" and
+                            "heron.statemgr.root.path" should be present.
+        topology_id (str):  The topology ID string.
+        cluster (str):  The name of the cluster the topology is running on.
+        environ (str):  The environment the topology is running in.
+
+    Returns:
+        The path set of the topology.
+
+    Raises:
+        RuntimeError:   If the paths have not been stored by paths_check.
+    """
+
+    key: PathKey = _paths_key(zk_config, topology_id, cluster, environ)
+
+    paths: Optional[PathSet] = PATH_STORE.read(key)
+    if paths is None:
+        msg: str = (f"No paths are stored for topology: {topology_id} "
+                    f"version: {key.version}")
+        LOG.error(msg)
+        raise RuntimeError(msg)
+
+    return paths
 
 
-def paths_check(graph_client: GremlinClient, zk_config: Dict[str, any],
-                cluster: str, environ: str, topology_id: str):
-    """ Checks to see if we have a file containing all paths for the topology)
+def explicit_paths_enabled(model_config: Dict[str, Any]) -> bool:
+    """ Checks whether the topology models are configured to enumerate every
+    path of a topology (the "paths" end to end latency mode) rather than
+    summarising the latencies over the topology graph (the default "dag"
+    mode).
+
+    Arguments:
+        model_config (dict):    The topology model configuration.
+
+    Returns:
+        True if the paths of each topology need to be enumerated.
+    """
+
+    return model_config.get(LATENCY_MODE_KEY, DAG_LATENCY_MODE) == PATHS_LATENCY_MODE
+
+
+def paths_check(graph_client: GraphClient, zk_config: Dict[str, Any],
+                cluster: str, environ: str, topology_id: str) -> None:
+    """ Checks to see if the path store holds all paths for the current version
+    of the topology's physical plan and, if not, finds and stores them. The
+    paths of any previous versions are removed from the store.
 
         Arguments:
-            graph_client (GremlinClient): The client instance for the graph
+            graph_client (GraphClient):   The client instance for the graph
                                           database.
             zk_config (dict):   A dictionary containing ZK config information.
                                 "heron.statemgr.connection.string" and
@@ -236,33 +287,17 @@ def paths_check(graph_client: GremlinClient, zk_config: Dict[str, any],
             topology_id (str):  The topology ID string.
         """
 
-    zookeeper_url = zk_config["heron.statemgr.connection.string"]
-    parts = zookeeper_url.split(".")
-    parts[1] = cluster
-    zookeeper_url = ".".join(parts)
-
-    LOG.info(zookeeper_url)
-    recent_topo_update_ts: dt.datetime =  zookeeper.last_topo_update_ts_html(zookeeper_url,
-                                                                        zk_config["heron.statemgr.root.path"],
-                                                                        topology_id, zk_config["zk.time.offset"])
-
-    # test to see if a file exists with the right name
-    file_name = file_path_template.substitute(topology=topology_id,
-                                              cluster=cluster,
-                                              environ=environ,
-                                              time=recent_topo_update_ts.strftime('%m_%d_%Y_%I_%M_%S'))
-
-    LOG.info("Paths file: %s", file_name)
-    if not os.path.exists(file_name):
-        # fetch paths and then write to file
-        all_paths = get_all_paths(graph_client, topology_id)
+    key: PathKey = _paths_key(zk_config, topology_id, cluster, environ)
 
-        # writing
-        with open(file_name, "w+") as file:
-            json.dump({'paths': all_paths}, file)
+    LOG.info("Paths version: %s", key.version)
+    if not PATH_STORE.exists(key):
+        # stream the paths into the store as they are found
+        workers: Optional[int] = zk_config.get(PATHS_WORKERS_KEY)
+        PATH_STORE.write(key, iter_all_paths(graph_client, topology_id,
+                                             int(workers) if workers else None))
 
 
-def graph_check(graph_client: GremlinClient, zk_config: Dict[str, Any],
+def graph_check(graph_client: GraphClient, zk_config: Dict[str, Any],
                 tracker_url: str, cluster: str, environ: str,
                 topology_id: str) -> str:
     """ Checks to see if the specified topology has an entry in the graph
@@ -271,7 +306,7 @@ def graph_check(graph_client: GremlinClient, zk_config: Dict[str, Any],
     supplied config object)
 
     Arguments:
-        graph_client (GremlinClient): The client instance for the graph
+        graph_client (GraphClient):   The client instance for the graph
                                       database.
         zk_config (dict):   A dictionary containing ZK config information.
                             "heron.statemgr.connection.string" and
@@ -308,7 +343,7 @@ def graph_check(graph_client: GremlinClient, zk_config: Dict[str, Any],
             topology_id, most_recent_graph[1],
             zookeeper_url,
             zk_config["heron.statemgr.root.path"],
-            zk_config["zk.time.offset"]):
+            zk_config["zk.time.offset"], cluster, environ):
 
         LOG.info("The physical plan for topology %s has changed since "
                  "the last physical graph (reference: %s) was built",
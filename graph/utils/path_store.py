@@ -0,0 +1,457 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a compact, on disk store for the spout to sink paths
+of topologies. Each set of paths is stored in compressed sparse row (CSR)
+form: a flat int32 array of the task IDs on every path and an array of the
+offsets at which each path starts (int32 unless there are more than 2^31
+tasks in total). The arrays are saved as .npy files and memory mapped when
+read, so a path set is never parsed and only the pages that are used are
+loaded. Path sets can be written as a stream of smaller path sets, whose
+tasks are appended to the stored file as they arrive. """
+
+import os
+import struct
+import logging
+import itertools
+import threading
+
+from collections import OrderedDict
+from typing import List, Iterable, Iterator, Sequence, Optional, NamedTuple, \
+    Union, Any, overload
+from urllib.parse import quote
+
+import numpy as np
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+DEFAULT_PATH_STORE_DIR: str = "paths"
+DEFAULT_PATH_STORE_CACHE_SIZE: int = 8
+
+TASKS_SUFFIX: str = ".tasks.npy"
+OFFSETS_SUFFIX: str = ".offsets.npy"
+
+# The number of paths converted to an array at a time while writing
+WRITE_CHUNK_SIZE: int = 65536
+
+INT32_MAX: int = np.iinfo(np.int32).max
+
+# The length of the .npy header written for streamed task arrays. This is
+# fixed so the header can be rewritten in place once the length is known.
+STREAM_HEADER_LEN: int = 128
+
+
+class PathKey(NamedTuple):
+    """ Identifies the paths of a single version of a topology's physical
+    plan. """
+
+    topology_id: str
+    cluster: str
+    environ: str
+    version: str
+
+
+def _npy_header(dtype: np.dtype, length: int) -> bytes:
+    """ Creates a .npy (version 1.0) header of STREAM_HEADER_LEN bytes for a
+    one dimensional array of the supplied type and length. """
+
+    prefix: bytes = np.lib.format.magic(1, 0)
+    header: bytes = repr({"descr": np.lib.format.dtype_to_descr(dtype),
+                          "fortran_order": False,
+                          "shape": (length,)}).encode("latin1")
+
+    # The header is padded with spaces and ends with a newline
+    header_len: int = STREAM_HEADER_LEN - len(prefix) - 2
+
+    return (prefix + struct.pack("<H", header_len) +
+            header.ljust(header_len - 1) + b"\n")
+
+
+class PathSet(object):
+    """ The spout to sink paths of a topology, held as CSR arrays. Paths are
+    only converted to lists of task IDs as they are accessed, so iterating
+    over a memory mapped path set does not load it all into memory. """
+
+    def __init__(self, tasks: np.ndarray, offsets: np.ndarray) -> None:
+        """ Arguments:
+                tasks (np.ndarray): The task IDs on every path, in path order.
+                offsets (np.ndarray):   The index in tasks at which each path
+                                        starts, followed by the length of
+                                        tasks.
+        """
+        self.tasks: np.ndarray = tasks
+        self.offsets: np.ndarray = offsets
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[Sequence[int]]) -> "PathSet":
+        """ Creates a path set from the supplied paths. The paths are
+        consumed lazily, in chunks, so they can be supplied by a generator.
+
+        Arguments:
+            paths (Iterable):   The paths as sequences of task IDs.
+
+        Returns:
+            A new path set.
+
+        Raises:
+            RuntimeError:   If a task ID does not fit in an int32.
+        """
+
+        task_chunks: List[np.ndarray] = []
+        length_chunks: List[np.ndarray] = []
+
+        chunk: List[Sequence[int]] = []
+        for path in paths:
+            chunk.append(path)
+            if len(chunk) == WRITE_CHUNK_SIZE:
+                cls._add_chunk(chunk, task_chunks, length_chunks)
+                chunk = []
+        cls._add_chunk(chunk, task_chunks, length_chunks)
+
+        return cls._from_chunks(task_chunks, length_chunks)
+
+    @classmethod
+    def concatenate(cls, path_sets: Iterable["PathSet"]) -> "PathSet":
+        """ Joins the supplied path sets, in order, into a single path set.
+
+        Arguments:
+            path_sets (Iterable):   The path sets to join.
+
+        Returns:
+            A new path set.
+        """
+
+        task_chunks: List[np.ndarray] = []
+        length_chunks: List[np.ndarray] = []
+
+        for path_set in path_sets:
+            task_chunks.append(np.asarray(path_set.tasks, dtype=np.int32))
+            length_chunks.append(path_set.lengths().astype(np.int64))
+
+        return cls._from_chunks(task_chunks, length_chunks)
+
+    @classmethod
+    def _from_chunks(cls, task_chunks: List[np.ndarray],
+                     length_chunks: List[np.ndarray]) -> "PathSet":
+
+        if not task_chunks:
+            return cls(np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int32))
+
+        lengths: np.ndarray = np.concatenate(length_chunks)
+        # Offsets only need 64 bits for more than 2^31 tasks in total
+        offsets: np.ndarray = np.zeros(
+            len(lengths) + 1,
+            dtype=np.int32 if lengths.sum() <= INT32_MAX else np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        return cls(np.concatenate(task_chunks), offsets)
+
+    @staticmethod
+    def _add_chunk(chunk: List[Sequence[int]], task_chunks: List[np.ndarray],
+                   length_chunks: List[np.ndarray]) -> None:
+
+        lengths: np.ndarray = np.fromiter((len(path) for path in chunk),
+                                          dtype=np.int64, count=len(chunk))
+        tasks: np.ndarray = np.fromiter(
+            (task for path in chunk for task in path), dtype=np.int64,
+            count=int(lengths.sum()))
+
+        if tasks.size and (tasks.min() < 0 or tasks.max() > INT32_MAX):
+            msg: str = ("Task IDs must be between 0 and the int32 maximum to "
+                        "be stored as paths")
+            LOG.error(msg)
+            raise RuntimeError(msg)
+
+        task_chunks.append(tasks.astype(np.int32))
+        length_chunks.append(lengths)
+
+    def __len__(self) -> int:
+
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> List[int]:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[List[int]]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]
+                    ) -> Union[List[int], List[List[int]]]:
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+
+        return self.tasks[self.offsets[index]:
+                          self.offsets[index + 1]].tolist()
+
+    def __iter__(self) -> Iterator[List[int]]:
+
+        for start, end in zip(self.offsets[:-1].tolist(),
+                              self.offsets[1:].tolist()):
+            yield self.tasks[start:end].tolist()
+
+    def lengths(self) -> np.ndarray:
+        """ Returns an array of the number of tasks on each path. """
+
+        return np.diff(self.offsets)
+
+
+class PathStore(object):
+    """ Thread safe, process wide store for the paths of topologies. Path
+    sets are written under the store's root directory, in a directory for
+    each topology, and the most recently used path sets are kept open in a
+    least recently used (LRU) cache. Writing the paths of a new version of a
+    topology's physical plan removes the files of the versions it supersedes.
+    """
+
+    def __init__(self, root_dir: str = DEFAULT_PATH_STORE_DIR,
+                 cache_size: int = DEFAULT_PATH_STORE_CACHE_SIZE) -> None:
+        """ Arguments:
+                root_dir (str): The directory the paths are stored under.
+                cache_size (int):   The maximum number of path sets held
+                                    open in memory.
+        """
+        self.root_dir: str = root_dir
+        self.cache_size: int = cache_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: threading.RLock = threading.RLock()
+        self._cache: OrderedDict = OrderedDict()
+
+    def configure(self, root_dir: str = None, cache_size: int = None) -> None:
+        """ Updates the root directory and/or the cache size of the store.
+        Cached path sets are dropped if the root directory changes.
+
+        Arguments:
+            root_dir (str): The directory the paths are stored under.
+            cache_size (int):   The maximum number of path sets held open in
+                                memory.
+        """
+
+        with self._lock:
+            if root_dir is not None and root_dir != self.root_dir:
+                self.root_dir = root_dir
+                self._cache.clear()
+            if cache_size is not None:
+                self.cache_size = int(cache_size)
+            self._evict()
+
+        LOG.info("Path store configured with root directory %s and a cache "
+                 "of %d path sets", self.root_dir, self.cache_size)
+
+    def _evict(self) -> None:
+        """ Removes the least recently used path sets until the cache is within
+        its size limit. Must be called with the lock held. """
+
+        while len(self._cache) > max(self.cache_size, 0):
+            self._cache.popitem(last=False)
+
+    def _topology_dir(self, key: PathKey) -> str:
+
+        return os.path.join(self.root_dir, quote(key.cluster, safe=""),
+                            quote(key.environ, safe=""),
+                            quote(key.topology_id, safe=""))
+
+    def _file_stem(self, key: PathKey) -> str:
+
+        return os.path.join(self._topology_dir(key),
+                            quote(key.version, safe=""))
+
+    def exists(self, key: PathKey) -> bool:
+        """ Checks whether the paths for the supplied key have been stored.
+
+        Arguments:
+            key (PathKey):  The topology plan version to check for.
+
+        Returns:
+            True if the paths are present in the store.
+        """
+
+        with self._lock:
+            if key in self._cache:
+                return True
+
+        # The offsets are written last so their presence marks a complete set
+        return os.path.exists(self._file_stem(key) + OFFSETS_SUFFIX)
+
+    def write(self, key: PathKey,
+              paths: Union[PathSet, Iterable[PathSet],
+                           Iterable[Sequence[int]]]) -> PathSet:
+        """ Writes the supplied paths to the store, replacing any existing
+        paths for the same key atomically. The files of any other versions of
+        the topology are then removed.
+
+        If an iterable of path sets is supplied, the tasks of each path set
+        are appended to the stored tasks file as it arrives, so the path sets
+        can be produced (and released) one at a time. Only the path lengths
+        are kept until the offsets are written, last.
+
+        Arguments:
+            key (PathKey):  The topology plan version the paths belong to.
+            paths (Iterable):   A path set, an iterable of path sets (whose
+                                paths are stored in order) or an iterable of
+                                paths, each a sequence of task IDs.
+
+        Returns:
+            The memory mapped path set as read back from the store.
+
+        Raises:
+            RuntimeError:   If a task ID does not fit in an int32.
+        """
+
+        path_sets: Iterator[PathSet]
+
+        if isinstance(paths, PathSet):
+            path_sets = iter([paths])
+        else:
+            items: Iterator = iter(paths)
+            first: Optional[Any] = next(items, None)
+            if first is None:
+                path_sets = iter([])
+            elif isinstance(first, PathSet):
+                path_sets = itertools.chain([first], items)
+            else:
+                path_sets = iter([PathSet.from_paths(
+                    itertools.chain([first], items))])
+
+        stem: str = self._file_stem(key)
+        os.makedirs(os.path.dirname(stem), exist_ok=True)
+
+        # The temporary files are unique to this writer as the path sets are
+        # written without holding the lock
+        tmp_suffix: str = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        tasks_tmp: str = stem + TASKS_SUFFIX + tmp_suffix
+        offsets_tmp: str = stem + OFFSETS_SUFFIX + tmp_suffix
+
+        num_tasks: int = 0
+        length_chunks: List[np.ndarray] = []
+
+        try:
+            with open(tasks_tmp, "wb") as tasks_file:
+                tasks_file.write(_npy_header(np.dtype(np.int32), 0))
+                for path_set in path_sets:
+                    tasks: np.ndarray = np.ascontiguousarray(
+                        path_set.tasks, dtype="<i4")
+                    tasks_file.write(tasks.tobytes())
+                    num_tasks += tasks.size
+                    length_chunks.append(path_set.lengths().astype(np.int64))
+                tasks_file.seek(0)
+                tasks_file.write(_npy_header(np.dtype(np.int32), num_tasks))
+
+            # Offsets only need 64 bits for more than 2^31 tasks in total
+            lengths: np.ndarray = (np.concatenate(length_chunks)
+                                   if length_chunks
+                                   else np.zeros(0, dtype=np.int64))
+            offsets: np.ndarray = np.zeros(
+                len(lengths) + 1,
+                dtype=np.int32 if num_tasks <= INT32_MAX else np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            del length_chunks, lengths
+
+            with open(offsets_tmp, "wb") as offsets_file:
+                np.save(offsets_file, offsets)
+
+            with self._lock:
+                self._cache.pop(key, None)
+                # The offsets are replaced last so their presence marks a
+                # complete set
+                os.replace(tasks_tmp, stem + TASKS_SUFFIX)
+                os.replace(offsets_tmp, stem + OFFSETS_SUFFIX)
+        finally:
+            for tmp_path in (tasks_tmp, offsets_tmp):
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        LOG.info("Stored %d paths (%d tasks) for topology %s version %s",
+                 len(offsets) - 1, num_tasks, key.topology_id, key.version)
+
+        self.collect(key)
+
+        return self.read(key)
+
+    def read(self, key: PathKey) -> Optional[PathSet]:
+        """ Reads the paths for the supplied key, memory mapping the stored
+        arrays. Recently read path sets are served from the cache.
+
+        Arguments:
+            key (PathKey):  The topology plan version to read.
+
+        Returns:
+            The path set or None if the paths have not been stored.
+        """
+
+        with self._lock:
+            path_set: Optional[PathSet] = self._cache.get(key)
+            if path_set is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return path_set
+
+            self.misses += 1
+
+            if not self.exists(key):
+                return None
+
+            stem: str = self._file_stem(key)
+            path_set = PathSet(np.load(stem + TASKS_SUFFIX, mmap_mode="r"),
+                               np.load(stem + OFFSETS_SUFFIX, mmap_mode="r"))
+
+            self._cache[key] = path_set
+            self._evict()
+
+        return path_set
+
+    def collect(self, key: PathKey) -> int:
+        """ Removes the stored paths of every version of the supplied key's
+        topology, other than the key's own version.
+
+        Arguments:
+            key (PathKey):  The topology plan version to keep.
+
+        Returns:
+            The number of files removed.
+        """
+
+        topology_dir: str = self._topology_dir(key)
+        keep: str = os.path.basename(self._file_stem(key))
+
+        removed: int = 0
+
+        with self._lock:
+            for cached in [cached for cached in self._cache
+                           if cached[:3] == key[:3] and cached != key]:
+                del self._cache[cached]
+
+            if not os.path.isdir(topology_dir):
+                return removed
+
+            for file_name in os.listdir(topology_dir):
+                # The kept version's files include any temporary files of
+                # writes in progress
+                if file_name.startswith((keep + TASKS_SUFFIX,
+                                         keep + OFFSETS_SUFFIX)):
+                    continue
+                try:
+                    os.remove(os.path.join(topology_dir, file_name))
+                except OSError as err:
+                    LOG.warning("Unable to remove superseded paths file %s: "
+                                "%s", file_name, str(err))
+                else:
+                    removed += 1
+
+        if removed:
+            LOG.info("Removed %d paths files of superseded versions of "
+                     "topology %s", removed, key.topology_id)
+
+        return removed
+
+
+PATH_STORE: PathStore = PathStore()
@@ -0,0 +1,283 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains methods for enumerating every spout to sink path of a
+topology's logical connections. Large enumerations are split into units of
+work, each the prefix of a group of paths, which are run by a pool of worker
+processes. The adjacency is shipped to the workers once, in a temporary memory
+mapped file, and the paths of each unit are returned as compact arrays in the
+same order as a sequential walk would produce them. """
+
+import os
+import logging
+import tempfile
+import itertools
+import multiprocessing
+
+from typing import List, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from caladrius.graph.analysis.heron.latency import ADJACENCY, path_counts
+from caladrius.graph.utils.path_store import PathSet
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Enumerations with fewer paths than this are not worth starting worker
+# processes for
+DEFAULT_PARALLEL_MIN_PATHS: int = 200000
+
+# The work is split into roughly this many units per worker so that units
+# with more paths than others do not leave workers idle
+UNITS_PER_WORKER: int = 8
+
+# The adjacency of the topology being enumerated, set in each worker process
+# by _attach_adjacency
+_WORKER_ADJACENCY: Optional[ADJACENCY] = None
+
+
+def iter_paths(parent_to_child: ADJACENCY, start: int,
+               prefix: Optional[List[int]] = None) -> Iterator[List[int]]:
+    """ Lazily walks all paths from the given start instance to the sinks,
+    depth first and in the order of each instance's downstream tasks.
+
+    Arguments:
+        parent_to_child (dict): The task to downstream task adjacency
+                                dictionary. Instances with no downstream
+                                tasks are sinks.
+        start (int):    The task ID the paths start from.
+        prefix (list):  Optional task IDs to prepend to every path.
+
+    Returns:
+        An iterator over the paths, each a list of task IDs.
+    """
+
+    path: List[int] = list(prefix) if prefix else []
+    path.append(start)
+
+    if not parent_to_child.get(start):
+        yield path
+        return
+
+    stack: List[Iterator[int]] = [iter(parent_to_child[start])]
+
+    while stack:
+        child: Optional[int] = next(stack[-1], None)
+
+        if child is None:
+            stack.pop()
+            path.pop()
+            continue
+
+        path.append(child)
+        children: Optional[List[int]] = parent_to_child.get(child)
+
+        if children:
+            stack.append(iter(children))
+        else:
+            yield list(path)
+            path.pop()
+
+
+def find_all_paths(parent_to_child: ADJACENCY, start: int) -> List[List[int]]:
+    """ Finds all paths from the given start instance to the sinks.
+
+    Arguments:
+        parent_to_child (dict): The task to downstream task adjacency
+                                dictionary.
+        start (int):    The task ID the paths start from.
+
+    Returns:
+        A list of the paths, each a list of task IDs.
+    """
+
+    return list(iter_paths(parent_to_child, start))
+
+
+def split_work(parent_to_child: ADJACENCY, spouts: List[int],
+               counts: Dict[int, int], max_paths: int) -> List[List[int]]:
+    """ Splits the enumeration of the paths from the supplied spouts into
+    units of work of up to max_paths paths where possible. Each unit is a
+    path prefix and covers every path that starts with it. A spout's prefix
+    is replaced by one prefix for each of its downstream tasks, and so on down
+    the subtree, until each prefix covers few enough paths.
+
+    Arguments:
+        parent_to_child (dict): The task to downstream task adjacency
+                                dictionary.
+        spouts (list):  The task IDs of the spout instances.
+        counts (dict):  A dictionary mapping from task ID to the number of
+                        paths from that instance to the sinks.
+        max_paths (int):    The target maximum number of paths in a unit.
+
+    Returns:
+        A list of path prefixes. Enumerating each in turn produces the paths
+        in the same order as walking from each spout in turn.
+    """
+
+    units: List[List[int]] = []
+
+    for spout in spouts:
+        pending: List[List[int]] = [[spout]]
+        while pending:
+            prefix: List[int] = pending.pop()
+            children: Optional[List[int]] = parent_to_child.get(prefix[-1])
+            if children and counts[prefix[-1]] > max_paths:
+                # Reversed so the first downstream task is taken next
+                pending.extend(prefix + [child]
+                               for child in reversed(children))
+            else:
+                units.append(prefix)
+
+    return units
+
+
+def _share_adjacency(parent_to_child: ADJACENCY) -> Tuple[str, int, int]:
+    """ Writes the supplied adjacency to a temporary .npy file, as a CSR array
+    of the source tasks, the offsets of their downstream tasks and the
+    downstream tasks themselves. The caller removes the file. """
+
+    sources: List[int] = sorted(parent_to_child)
+    lengths: np.ndarray = np.fromiter(
+        (len(parent_to_child[source]) for source in sources), dtype=np.int64,
+        count=len(sources))
+    num_edges: int = int(lengths.sum())
+
+    csr: np.ndarray = np.empty(2 * len(sources) + 1 + num_edges,
+                               dtype=np.int64)
+    csr[:len(sources)] = sources
+    csr[len(sources)] = 0
+    np.cumsum(lengths, out=csr[len(sources) + 1:2 * len(sources) + 1])
+    csr[2 * len(sources) + 1:] = np.fromiter(
+        itertools.chain.from_iterable(parent_to_child[source]
+                                      for source in sources),
+        dtype=np.int64, count=num_edges)
+
+    handle, path = tempfile.mkstemp(prefix="caladrius-adjacency-",
+                                    suffix=".npy")
+    with os.fdopen(handle, "wb") as adjacency_file:
+        np.save(adjacency_file, csr)
+
+    return path, len(sources), num_edges
+
+
+def _attach_adjacency(path: str, num_sources: int, num_edges: int) -> None:
+    """ Worker process initialiser which rebuilds the adjacency dictionary
+    from the memory mapped adjacency file. """
+
+    global _WORKER_ADJACENCY    # pylint: disable=global-statement
+
+    csr: np.ndarray = np.load(path, mmap_mode="r")
+    sources: List[int] = csr[:num_sources].tolist()
+    offsets: List[int] = csr[num_sources:2 * num_sources + 1].tolist()
+    destinations: List[int] = csr[2 * num_sources + 1:
+                                  2 * num_sources + 1 + num_edges].tolist()
+    del csr
+
+    _WORKER_ADJACENCY = {
+        source: destinations[offsets[i]:offsets[i + 1]]
+        for i, source in enumerate(sources)}
+
+
+def _enumerate_unit(prefix: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """ Worker process task which enumerates the paths starting with the
+    supplied prefix, returning them as CSR arrays. """
+
+    assert _WORKER_ADJACENCY is not None
+
+    path_set: PathSet = PathSet.from_paths(
+        iter_paths(_WORKER_ADJACENCY, prefix[-1], prefix[:-1]))
+
+    return path_set.tasks, path_set.offsets
+
+
+def iter_path_sets(parent_to_child: ADJACENCY, spouts: List[int],
+                   workers: Optional[int] = None,
+                   min_parallel_paths: int = DEFAULT_PARALLEL_MIN_PATHS
+                   ) -> Iterator[PathSet]:
+    """ Enumerates all paths from the supplied spouts to the sinks, yielding
+    them in groups as they are found. If there are enough paths, the work is
+    split between a pool of worker processes. Either way the paths are
+    produced in the same order as walking from each spout in turn.
+
+    Arguments:
+        parent_to_child (dict): The task to downstream task adjacency
+                                dictionary.
+        spouts (list):  The task IDs of the spout instances.
+        workers (int):  The number of worker processes. Defaults to the
+                        number of CPUs.
+        min_parallel_paths (int):   The number of paths below which the
+                                    enumeration is run in this process.
+
+    Returns:
+        An iterator over path sets, which together hold every path.
+
+    Raises:
+        RuntimeError:   If the logical connections contain a cycle.
+    """
+
+    counts: Dict[int, int] = path_counts(parent_to_child, spouts)
+    total: int = sum(counts[spout] for spout in spouts)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or total < min_parallel_paths:
+        LOG.info("Enumerating %d paths in a single process", total)
+        yield PathSet.from_paths(itertools.chain.from_iterable(
+            iter_paths(parent_to_child, spout) for spout in spouts))
+        return
+
+    units: List[List[int]] = split_work(
+        parent_to_child, spouts, counts,
+        max(1, total // (workers * UNITS_PER_WORKER)))
+
+    LOG.info("Enumerating %d paths in %d units of work using %d worker "
+             "processes", total, len(units), workers)
+
+    path, num_sources, num_edges = _share_adjacency(parent_to_child)
+
+    try:
+        # Worker processes are spawned rather than forked as the caller may
+        # have other threads running
+        pool = multiprocessing.get_context("spawn").Pool(
+            processes=workers, initializer=_attach_adjacency,
+            initargs=(path, num_sources, num_edges))
+        try:
+            # imap returns the units' results in order as they finish
+            for tasks, offsets in pool.imap(_enumerate_unit, units):
+                yield PathSet(tasks, offsets)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+    finally:
+        os.remove(path)
+
+
+def path_helper(parent_to_child: ADJACENCY, spouts: List[int],
+                workers: Optional[int] = None,
+                min_parallel_paths: int = DEFAULT_PARALLEL_MIN_PATHS
+                ) -> PathSet:
+    """ Finds all paths from the supplied spouts to the sinks, using a pool of
+    worker processes if there are enough of them (see iter_path_sets).
+
+    Arguments:
+        parent_to_child (dict): The task to downstream task adjacency
+                                dictionary.
+        spouts (list):  The task IDs of the spout instances.
+        workers (int):  The number of worker processes. Defaults to the
+                        number of CPUs.
+        min_parallel_paths (int):   The number of paths below which the
+                                    enumeration is run in this process.
+
+    Returns:
+        A path set holding every path, in the order of the supplied spouts.
+
+    Raises:
+        RuntimeError:   If the logical connections contain a cycle.
+    """
+
+    return PathSet.concatenate(iter_path_sets(parent_to_child, spouts,
+                                              workers, min_parallel_paths))
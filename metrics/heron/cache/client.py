@@ -0,0 +1,158 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a Heron metrics client that wraps another Heron
+metrics client, keeping the metrics it returns in a persistent on disk store.
+Later queries only request the minutes of their window that are not already
+stored. As the stored metrics are kept indefinitely, history builds up beyond
+the retention period of metrics sources like the Topology Master. """
+
+import time
+import json
+import hashlib
+import logging
+
+import datetime as dt
+
+from typing import Any, Optional, Set, List, Tuple
+
+import pandas as pd
+
+from caladrius.config.keys import ConfKeys
+from caladrius.metrics.heron.client import HeronMetricsClient
+from caladrius.metrics.heron.wrapper import HeronMetricsClientWrapper
+from caladrius.metrics.heron.cache.store import (ParquetMetricsStore,
+                                                 MetricKey, from_epoch_secs)
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR: str = "/tmp/caladrius/metrics"
+
+# The metrics whose results are minute aligned timeseries and so can be
+# stored. Other queries are passed straight to the wrapped client.
+DEFAULT_CACHED_METRICS: List[str] = [
+    "get_service_times", "get_receive_counts", "get_emit_counts",
+    "get_execute_counts", "get_complete_latencies"]
+
+# The number of seconds after the end of a minute before its metrics are
+# treated as final
+DEFAULT_SETTLE_SECS: int = 120
+
+
+def metric_name(metric: str, **kwargs: Any) -> str:
+    """ Creates the stored metric name for the supplied query method name and
+    keyword arguments. Queries with different keyword arguments are stored
+    separately.
+
+    Arguments:
+        metric (str):   The name of the query method.
+        **kwargs:   The keyword arguments of the query.
+
+    Returns:
+        str:    The stored metric name.
+    """
+
+    if not kwargs:
+        return metric
+
+    digest: str = hashlib.sha1(json.dumps(
+        kwargs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    return f"{metric}-{digest[:12]}"
+
+
+class CachingMetricsClient(HeronMetricsClientWrapper):
+    """ Heron metrics client that stores the results of the wrapped client in
+    a persistent Parquet metrics store and only fetches the minutes of each
+    query window that are not already stored.
+
+    The client is configured with the following keys, along with the
+    "wrapped.client" and "wrapped.client.config" keys defining the wrapped
+    client:
+
+    * heron.metrics.cache.dir: The directory the metrics are stored under.
+    * heron.metrics.cache.metrics: The query methods whose results are stored.
+    * heron.metrics.cache.settle.secs: The number of seconds after the end of
+      a minute before its metrics are treated as final and not fetched again.
+    * heron.metrics.cache.compression: The Parquet compression codec.
+    """
+
+    def __init__(self, config: dict,
+                 client: Optional[HeronMetricsClient] = None) -> None:
+        super().__init__(config, client)
+
+        self.store: ParquetMetricsStore = ParquetMetricsStore(
+            config.get(ConfKeys.HERON_METRICS_CACHE_DIR.value,
+                       DEFAULT_CACHE_DIR),
+            config.get(ConfKeys.HERON_METRICS_CACHE_COMPRESSION.value,
+                       "snappy"))
+        self.cached_metrics: Set[str] = set(config.get(
+            ConfKeys.HERON_METRICS_CACHE_METRICS.value,
+            DEFAULT_CACHED_METRICS))
+        self.settle_secs: int = int(config.get(
+            ConfKeys.HERON_METRICS_CACHE_SETTLE_SECS.value,
+            DEFAULT_SETTLE_SECS))
+
+        LOG.info("Created caching metrics client storing metrics at %s for "
+                 "wrapped client: %s", self.store.root_dir,
+                 type(self.client).__name__)
+
+    def __hash__(self) -> int:
+
+        return hash((type(self).__name__, hash(self.client),
+                     self.store.root_dir))
+
+    def __eq__(self, other: object) -> bool:
+
+        if not isinstance(other, CachingMetricsClient):
+            return False
+
+        return (self.client == other.client and
+                self.store.root_dir == other.store.root_dir)
+
+    def _dispatch(self, metric: str, topology_id: str, cluster: str,
+                  environ: str, start: Optional[dt.datetime],
+                  end: Optional[dt.datetime], **kwargs: Any) -> pd.DataFrame:
+
+        # Server side aggregated queries have buckets that do not line up
+        # with the per minute coverage of the store
+        if (metric not in self.cached_metrics or start is None or
+                end is None or kwargs.get("bucket_length")):
+            return super()._dispatch(metric, topology_id, cluster, environ,
+                                     start, end, **kwargs)
+
+        key: MetricKey = MetricKey(topology_id, cluster, environ,
+                                   metric_name(metric, **kwargs))
+
+        # Holding the metric lock while fetching stops concurrent queries
+        # requesting the same missing minutes from the wrapped client
+        with self.store.lock(key):
+
+            missing: List[Tuple[int, int]] = \
+                self.store.missing_windows(key, start, end)
+
+            LOG.info("Fetching %d missing window(s) of %s for topology %s",
+                     len(missing), metric, topology_id)
+
+            for window_start, window_end in missing:
+
+                fetched_at: float = time.time()
+
+                try:
+                    fetched: pd.DataFrame = super()._dispatch(
+                        metric, topology_id, cluster, environ,
+                        from_epoch_secs(window_start),
+                        from_epoch_secs(window_end), **kwargs)
+                except RuntimeError as err:
+                    LOG.warning("Unable to fetch %s for topology %s from %s "
+                                "to %s: %s", metric, topology_id,
+                                from_epoch_secs(window_start).isoformat(),
+                                from_epoch_secs(window_end).isoformat(),
+                                str(err))
+                    continue
+
+                self.store.write(key, fetched, window_start, window_end,
+                                 int(fetched_at) - self.settle_secs)
+
+            return self.store.read(key, start, end)
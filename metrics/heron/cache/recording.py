@@ -0,0 +1,186 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains Heron metrics clients for recording the metrics
+returned by another Heron metrics client to Parquet files and replaying them
+later without access to the original metrics source. A recording of a
+modelling request allows the models to be benchmarked and profiled with
+deterministic inputs and no network calls. """
+
+import logging
+import warnings
+
+import datetime as dt
+
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from caladrius.config.keys import ConfKeys
+from caladrius.metrics.heron.client import HeronMetricsClient
+from caladrius.metrics.heron.wrapper import HeronMetricsClientWrapper
+from caladrius.metrics.heron.cache.client import metric_name
+from caladrius.metrics.heron.cache.store import (
+    ParquetMetricsStore, MetricKey, MINUTE_SECS, to_epoch_secs,
+    from_epoch_secs)
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+DEFAULT_RECORDING_DIR: str = "/tmp/caladrius/recordings"
+
+
+def create_store(config: dict) -> ParquetMetricsStore:
+    """ Creates the metrics store for the recording defined in the supplied
+    client configuration. """
+
+    return ParquetMetricsStore(
+        config.get(ConfKeys.HERON_METRICS_RECORDING_DIR.value,
+                   DEFAULT_RECORDING_DIR),
+        config.get(ConfKeys.HERON_METRICS_RECORDING_COMPRESSION.value,
+                   "gzip"))
+
+
+class RecordingMetricsClient(HeronMetricsClientWrapper):
+    """ Heron metrics client that returns the results of the wrapped client
+    unchanged, writing each of them to a Parquet metrics store so that they
+    can be replayed by the ReplayMetricsClient.
+
+    The client is configured with the following keys, along with the
+    "wrapped.client" and "wrapped.client.config" keys defining the wrapped
+    client:
+
+    * heron.metrics.recording.dir: The directory the recording is written to.
+    * heron.metrics.recording.compression: The Parquet compression codec.
+    """
+
+    def __init__(self, config: dict,
+                 client: Optional[HeronMetricsClient] = None) -> None:
+        super().__init__(config, client)
+
+        self.store: ParquetMetricsStore = create_store(config)
+
+        LOG.info("Created recording metrics client writing metrics to %s for "
+                 "wrapped client: %s", self.store.root_dir,
+                 type(self.client).__name__)
+
+    def __hash__(self) -> int:
+
+        return hash((type(self).__name__, hash(self.client),
+                     self.store.root_dir))
+
+    def __eq__(self, other: object) -> bool:
+
+        if not isinstance(other, RecordingMetricsClient):
+            return False
+
+        return (self.client == other.client and
+                self.store.root_dir == other.store.root_dir)
+
+    def _dispatch(self, metric: str, topology_id: str, cluster: str,
+                  environ: str, start: Optional[dt.datetime],
+                  end: Optional[dt.datetime], **kwargs: Any) -> pd.DataFrame:
+
+        frame: pd.DataFrame = super()._dispatch(metric, topology_id, cluster,
+                                                environ, start, end, **kwargs)
+
+        if not isinstance(frame, pd.DataFrame):
+            return frame
+
+        key: MetricKey = MetricKey(topology_id, cluster, environ,
+                                   metric_name(metric, **kwargs))
+
+        if (start is None or end is None or
+                "timestamp" not in frame.columns):
+            self.store.write_frame(key, frame)
+        else:
+            # Every minute of the window is recorded, including the minute
+            # containing the (inclusive) end of the window
+            window_start: int = \
+                to_epoch_secs(start) // MINUTE_SECS * MINUTE_SECS
+            window_end: int = \
+                to_epoch_secs(end) // MINUTE_SECS * MINUTE_SECS + MINUTE_SECS
+            self.store.write(key, frame, window_start, window_end,
+                             window_end)
+
+        LOG.debug("Recorded %d rows of %s for topology %s", frame.shape[0],
+                  metric, topology_id)
+
+        return frame
+
+
+class ReplayMetricsClient(HeronMetricsClientWrapper):
+    """ Heron metrics client that serves the metrics written by the
+    RecordingMetricsClient. It has no wrapped client, every query is answered
+    from the recording alone, and it can be loaded in place of any other
+    client via the "heron.metrics.client" configuration key.
+
+    Timeseries metrics are sliced to the requested window, so a single long
+    recording can serve queries for any window it covers. Queries must use the
+    same keyword arguments as the recorded queries.
+
+    The client is configured with the "heron.metrics.recording.dir" key.
+    """
+
+    def __init__(self, config: dict) -> None:
+        # There is no wrapped client so the wrapper's initialiser, which
+        # creates one, is skipped
+        HeronMetricsClient.__init__(self, config)
+        self.client: Optional[HeronMetricsClient] = None
+
+        self.store: ParquetMetricsStore = create_store(config)
+
+        LOG.info("Created replay metrics client reading metrics from %s",
+                 self.store.root_dir)
+
+    def __getattr__(self, name: str) -> Any:
+
+        raise AttributeError(name)
+
+    def __hash__(self) -> int:
+
+        return hash((type(self).__name__, self.store.root_dir))
+
+    def __eq__(self, other: object) -> bool:
+
+        if not isinstance(other, ReplayMetricsClient):
+            return False
+
+        return self.store.root_dir == other.store.root_dir
+
+    def _dispatch(self, metric: str, topology_id: str, cluster: str,
+                  environ: str, start: Optional[dt.datetime],
+                  end: Optional[dt.datetime], **kwargs: Any) -> pd.DataFrame:
+
+        key: MetricKey = MetricKey(topology_id, cluster, environ,
+                                   metric_name(metric, **kwargs))
+
+        frame: Optional[pd.DataFrame] = self.store.read_frame(key)
+        if frame is not None:
+            return frame
+
+        covered: np.ndarray = self.store.covered_minutes(key)
+
+        if covered.size == 0:
+            msg: str = (f"No recording of {metric} with arguments {kwargs} "
+                        f"for topology {topology_id} on cluster {cluster} in "
+                        f"environment {environ} was found in "
+                        f"{self.store.root_dir}")
+            LOG.error(msg)
+            raise RuntimeError(msg)
+
+        if start is None:
+            start = from_epoch_secs(covered[0])
+        if end is None:
+            end = from_epoch_secs(covered[-1] + MINUTE_SECS - 1)
+
+        if self.store.missing_windows(key, start, end):
+            missing_msg: str = (f"The recording of {metric} for topology "
+                                f"{topology_id} does not cover the whole "
+                                f"window from {start.isoformat()} to "
+                                f"{end.isoformat()}")
+            LOG.warning(missing_msg)
+            warnings.warn(missing_msg, RuntimeWarning)
+
+        return self.store.read(key, start, end)
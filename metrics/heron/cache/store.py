@@ -0,0 +1,368 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a persistent, on disk store for Heron metrics
+DataFrames. Metrics are stored in Parquet files keyed by topology, metric and
+component. The store records which minutes of each metric have been fetched so
+that only the missing minutes of a query window need to be requested from the
+metrics source. """
+
+import os
+import logging
+import threading
+
+import datetime as dt
+
+from typing import Dict, List, Tuple, NamedTuple, Optional
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from caladrius.common.frames import FrameAccumulator
+from caladrius.metrics.heron import schema
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Stored metrics are aligned to minute long periods
+MINUTE_SECS: int = 60
+
+# Name of the component partition used for metrics with no component column
+ALL_COMPONENTS: str = "__all__"
+
+COVERAGE_FILE: str = "_coverage.parquet"
+FRAME_FILE: str = "_frame.parquet"
+COMPONENT_PREFIX: str = "component="
+PARTITION_FORMAT: str = "%Y%m%d%H"
+
+
+class MetricKey(NamedTuple):
+    """ Identifies a single stored metric for a topology. """
+
+    topology_id: str
+    cluster: str
+    environ: str
+    metric: str
+
+
+def to_utc_naive(time: dt.datetime) -> dt.datetime:
+    """ Converts the supplied datetime to a naive datetime in UTC. Naive
+    datetimes are assumed to already be in UTC. """
+
+    if time.tzinfo is not None:
+        return time.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+    return time
+
+
+def to_epoch_secs(time: dt.datetime) -> int:
+    """ Converts the supplied datetime to integer seconds since the epoch.
+    Naive datetimes are assumed to be in UTC. """
+
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=dt.timezone.utc)
+
+    return int(time.timestamp())
+
+
+def from_epoch_secs(secs: int) -> dt.datetime:
+    """ Converts the supplied seconds since the epoch to a timezone aware UTC
+    datetime. """
+
+    return dt.datetime.fromtimestamp(int(secs), tz=dt.timezone.utc)
+
+
+def contiguous_windows(minutes: np.ndarray) -> List[Tuple[int, int]]:
+    """ Groups the supplied sorted minute start times into runs of consecutive
+    minutes.
+
+    Arguments:
+        minutes (numpy.ndarray):    Sorted array of minute start times in
+                                    seconds since the epoch.
+
+    Returns:
+        list:   A list of (start, end) tuples, in seconds since the epoch, for
+        each run of consecutive minutes. The end is exclusive.
+    """
+
+    if minutes.size == 0:
+        return []
+
+    breaks: np.ndarray = np.flatnonzero(np.diff(minutes) != MINUTE_SECS) + 1
+    starts: np.ndarray = minutes[np.concatenate(([0], breaks))]
+    ends: np.ndarray = minutes[np.concatenate((breaks - 1,
+                                               [minutes.size - 1]))]
+
+    return [(int(start), int(end) + MINUTE_SECS)
+            for start, end in zip(starts, ends)]
+
+
+class ParquetMetricsStore(object):
+    """ Stores metrics DataFrames on disk as Parquet files. The files are laid
+    out as::
+
+        <root>/<cluster>/<environ>/<topology>/<metric>/_coverage.parquet
+        <root>/<cluster>/<environ>/<topology>/<metric>/component=<name>/
+            <YYYYmmddHH>.parquet
+        <root>/<cluster>/<environ>/<topology>/<metric>/_frame.parquet
+
+    Rows are assigned to hourly files by their minute aligned timestamp and
+    the coverage file records every minute that has been fetched from the
+    metrics source, whether or not it contained any measurements. Metrics
+    that are not timeseries are stored whole in the frame file.
+
+    The store is safe to use from multiple threads of a single process.
+    """
+
+    def __init__(self, root_dir: str, compression: str = "snappy") -> None:
+        """ Arguments:
+                root_dir (str): The directory the metrics are stored under.
+                compression (str):  The Parquet compression codec.
+        """
+        self.root_dir: str = root_dir
+        self.compression: str = compression
+        self._locks_lock: threading.Lock = threading.Lock()
+        self._locks: Dict[MetricKey, threading.RLock] = {}
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def lock(self, key: MetricKey) -> threading.RLock:
+        """ Returns the re-entrant lock guarding the files of the supplied
+        metric. """
+
+        with self._locks_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.RLock()
+            return self._locks[key]
+
+    def _metric_dir(self, key: MetricKey) -> str:
+
+        return os.path.join(self.root_dir, quote(key.cluster, safe=""),
+                            quote(key.environ, safe=""),
+                            quote(key.topology_id, safe=""),
+                            quote(key.metric, safe=""))
+
+    def _write_parquet(self, frame: pd.DataFrame, path: str) -> None:
+        """ Writes the supplied frame to the supplied path, replacing any
+        existing file atomically. """
+
+        tmp_path: str = path + ".tmp"
+        frame.to_parquet(tmp_path, engine="pyarrow",
+                         compression=self.compression, index=False)
+        os.replace(tmp_path, path)
+
+    def covered_minutes(self, key: MetricKey) -> np.ndarray:
+        """ Gets the minutes of the supplied metric that have been stored.
+
+        Arguments:
+            key (MetricKey):    The metric to be checked.
+
+        Returns:
+            numpy.ndarray:  A sorted array of minute start times, in seconds
+            since the epoch.
+        """
+
+        path: str = os.path.join(self._metric_dir(key), COVERAGE_FILE)
+
+        with self.lock(key):
+            if not os.path.exists(path):
+                return np.empty(0, dtype=np.int64)
+
+            return pd.read_parquet(path, engine="pyarrow")["minute"].values
+
+    def missing_windows(self, key: MetricKey, start: dt.datetime,
+                        end: dt.datetime) -> List[Tuple[int, int]]:
+        """ Gets the periods of the supplied window for which the metric has
+        not yet been stored.
+
+        Arguments:
+            key (MetricKey):    The metric to be checked.
+            start (datetime):   The start of the window.
+            end (datetime): The end of the window.
+
+        Returns:
+            list:   A list of (start, end) tuples, in seconds since the epoch,
+            for each run of consecutive missing minutes. The end is exclusive.
+        """
+
+        first: int = to_epoch_secs(start) // MINUTE_SECS * MINUTE_SECS
+        last: int = to_epoch_secs(end) // MINUTE_SECS * MINUTE_SECS
+
+        minutes: np.ndarray = np.arange(first, last + MINUTE_SECS,
+                                        MINUTE_SECS, dtype=np.int64)
+        missing: np.ndarray = np.setdiff1d(minutes, self.covered_minutes(key),
+                                           assume_unique=True)
+
+        return contiguous_windows(missing)
+
+    def write(self, key: MetricKey, frame: pd.DataFrame, start: int, end: int,
+              settled_before: int) -> None:
+        """ Stores the supplied metrics, fetched for the supplied window,
+        replacing any rows previously stored for that window. The minutes of
+        the window that ended before the supplied settled time are marked as
+        covered, later minutes may still receive measurements and so will be
+        fetched again by later queries.
+
+        Arguments:
+            key (MetricKey):    The metric being stored.
+            frame (pandas.DataFrame):   The metrics fetched for the window.
+                                        This should have a timestamp column of
+                                        naive UTC datetimes.
+            start (int):    The start of the fetched window in seconds since
+                            the epoch. This should be minute aligned.
+            end (int):  The exclusive end of the fetched window in seconds
+                        since the epoch. This should be minute aligned.
+            settled_before (int):   Seconds since the epoch before which the
+                                    metrics source will not add any more
+                                    measurements.
+        """
+
+        metric_dir: str = self._metric_dir(key)
+        window_start: pd.Timestamp = pd.Timestamp(start, unit="s")
+        window_end: pd.Timestamp = pd.Timestamp(end, unit="s")
+
+        with self.lock(key):
+
+            os.makedirs(metric_dir, exist_ok=True)
+
+            if frame is not None and not frame.empty:
+
+                in_window: pd.DataFrame = frame[
+                    (frame["timestamp"] >= window_start) &
+                    (frame["timestamp"] < window_end)]
+
+                if "component" in in_window.columns:
+                    components: pd.Series = in_window["component"]
+                else:
+                    components = pd.Series(ALL_COMPONENTS,
+                                           index=in_window.index)
+
+                hours: pd.Series = in_window["timestamp"].dt.floor("H")
+
+                for (component, hour), part in in_window.groupby(
+                        [components, hours], sort=False, observed=True):
+                    self._write_partition(metric_dir, component, hour, part,
+                                          window_start, window_end)
+
+            minutes: np.ndarray = np.arange(start, end, MINUTE_SECS,
+                                            dtype=np.int64)
+            minutes = minutes[minutes + MINUTE_SECS <= settled_before]
+
+            if minutes.size:
+                coverage: np.ndarray = np.union1d(self.covered_minutes(key),
+                                                  minutes)
+                self._write_parquet(pd.DataFrame({"minute": coverage}),
+                                    os.path.join(metric_dir, COVERAGE_FILE))
+
+        LOG.debug("Stored %s metrics for topology %s from %s to %s",
+                  key.metric, key.topology_id, window_start.isoformat(),
+                  window_end.isoformat())
+
+    def _write_partition(self, metric_dir: str, component: str,
+                         hour: pd.Timestamp, part: pd.DataFrame,
+                         window_start: pd.Timestamp,
+                         window_end: pd.Timestamp) -> None:
+        """ Merges the supplied rows into the hourly file of the supplied
+        component, replacing any existing rows in the supplied window. """
+
+        component_dir: str = os.path.join(
+            metric_dir, COMPONENT_PREFIX + quote(str(component), safe=""))
+        os.makedirs(component_dir, exist_ok=True)
+
+        path: str = os.path.join(component_dir,
+                                 hour.strftime(PARTITION_FORMAT) + ".parquet")
+
+        if os.path.exists(path):
+            existing: pd.DataFrame = pd.read_parquet(path, engine="pyarrow")
+            existing = existing[(existing["timestamp"] < window_start) |
+                                (existing["timestamp"] >= window_end)]
+            part = pd.concat([existing, part], ignore_index=True, sort=False)
+
+        self._write_parquet(
+            part.sort_values("timestamp", kind="mergesort"), path)
+
+    def write_frame(self, key: MetricKey, frame: pd.DataFrame) -> None:
+        """ Stores the supplied DataFrame whole, replacing any frame previously
+        stored under the key. This is used for metrics that are not minute
+        aligned timeseries and so cannot be stored by window.
+
+        Arguments:
+            key (MetricKey):    The metric being stored.
+            frame (pandas.DataFrame):   The metrics to be stored.
+        """
+
+        metric_dir: str = self._metric_dir(key)
+
+        with self.lock(key):
+            os.makedirs(metric_dir, exist_ok=True)
+            self._write_parquet(frame, os.path.join(metric_dir, FRAME_FILE))
+
+    def read_frame(self, key: MetricKey) -> Optional[pd.DataFrame]:
+        """ Reads the DataFrame stored whole under the supplied key.
+
+        Arguments:
+            key (MetricKey):    The metric to be read.
+
+        Returns:
+            pandas.DataFrame:   The stored DataFrame or None if no frame has
+            been stored under the key.
+        """
+
+        path: str = os.path.join(self._metric_dir(key), FRAME_FILE)
+
+        with self.lock(key):
+            if not os.path.exists(path):
+                return None
+
+            return schema.coerce(pd.read_parquet(path, engine="pyarrow"))
+
+    def read(self, key: MetricKey, start: dt.datetime,
+             end: dt.datetime) -> pd.DataFrame:
+        """ Reads the stored metrics for the supplied window.
+
+        Arguments:
+            key (MetricKey):    The metric to be read.
+            start (datetime):   The start of the window (inclusive).
+            end (datetime): The end of the window (inclusive).
+
+        Returns:
+            pandas.DataFrame:   The stored rows whose timestamps are within
+            the window, ordered by component and then timestamp. If nothing is
+            stored an empty DataFrame is returned.
+        """
+
+        metric_dir: str = self._metric_dir(key)
+        window_start: pd.Timestamp = pd.Timestamp(to_utc_naive(start))
+        window_end: pd.Timestamp = pd.Timestamp(to_utc_naive(end))
+
+        file_names: List[str] = [
+            hour.strftime(PARTITION_FORMAT) + ".parquet"
+            for hour in pd.date_range(window_start.floor("H"), window_end,
+                                      freq="H")]
+
+        output: FrameAccumulator = FrameAccumulator()
+
+        with self.lock(key):
+
+            if not os.path.exists(metric_dir):
+                return pd.DataFrame()
+
+            for component_dir in sorted(os.listdir(metric_dir)):
+
+                if not component_dir.startswith(COMPONENT_PREFIX):
+                    continue
+
+                for file_name in file_names:
+                    path: str = os.path.join(metric_dir, component_dir,
+                                             file_name)
+                    if os.path.exists(path):
+                        part: pd.DataFrame = pd.read_parquet(path,
+                                                             engine="pyarrow")
+                        output.append(part[
+                            (part["timestamp"] >= window_start) &
+                            (part["timestamp"] <= window_end)])
+
+        # Categorical columns read from different files have different
+        # categories and so are combined as strings
+        return schema.coerce(output.to_frame())
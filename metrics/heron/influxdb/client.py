@@ -6,21 +6,29 @@
 InfluxDB server"""
 
 import re
+import json
 import logging
 import warnings
 
 import datetime as dt
 
-from typing import Union, List, DefaultDict, Dict, Optional, Any
+from typing import (Union, List, DefaultDict, Dict, Optional, Any, Tuple,
+                    Iterator)
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from collections import defaultdict
+from contextlib import closing
 
+import requests
 import pandas as pd
 
 from influxdb import InfluxDBClient
-from influxdb.resultset import ResultSet
+from influxdb.exceptions import InfluxDBClientError, InfluxDBServerError
 
+from caladrius.common import http_session
+from caladrius.common.frames import FrameAccumulator
 from caladrius.common.heron import tracker
+from caladrius.metrics.heron import schema
 from caladrius.metrics.heron.client import HeronMetricsClient
 
 LOG: logging.Logger = logging.getLogger(__name__)
@@ -30,6 +38,18 @@ INFLUX_TIME_FORMAT: str = "%Y-%m-%dT%H:%M:%S.%fZ"
 INSTANCE_NAME_RE_STR: str = r"container_(?P<container>\d+)_.*_(?P<task>\d+)"
 INSTANCE_NAME_RE: re.Pattern = re.compile(INSTANCE_NAME_RE_STR)
 
+# By default each metric is fetched with a single query
+DEFAULT_QUERY_WORKERS: int = 1
+
+# By default query results are streamed in chunks of this many points
+DEFAULT_CHUNK_SIZE: int = 10000
+
+# The InfluxQL functions that can be used to aggregate measurements on the
+# server
+AGGREGATIONS: Dict[str, str] = {"mean": "MEAN", "median": "MEDIAN",
+                                "sum": "SUM", "min": "MIN", "max": "MAX",
+                                "count": "COUNT", "last": "LAST"}
+
 
 @lru_cache(maxsize=128, typed=False)
 def create_db_name(
@@ -62,7 +82,12 @@ def convert_rfc339_to_datetime(time_str: str) -> dt.datetime:
         datetime.datetime:  A naive datetime object.
     """
 
-    return dt.datetime.strptime(time_str, INFLUX_TIME_FORMAT)
+    try:
+        return dt.datetime.strptime(time_str, INFLUX_TIME_FORMAT)
+    except ValueError:
+        # InfluxDB drops trailing zero fractional seconds (as for the start
+        # of aggregation buckets) and can return nanosecond precision
+        return pd.Timestamp(time_str).tz_convert(None).to_pydatetime()
 
 
 def convert_datetime_to_rfc3339(dt_obj: dt.datetime) -> str:
@@ -79,6 +104,225 @@ def convert_datetime_to_rfc3339(dt_obj: dt.datetime) -> str:
     return dt_obj.strftime(INFLUX_TIME_FORMAT)
 
 
+def aggregation_arguments(kwargs: Dict[str, Any], default_aggregation: str
+                          ) -> Tuple[Optional[int], Optional[str]]:
+    """ Extracts and checks the optional server side aggregation arguments
+    from the supplied query keyword arguments.
+
+    Arguments:
+        kwargs (dict):  The keyword arguments supplied to a query method. If
+                        these contain a "bucket_length" (in seconds) the
+                        measurements will be aggregated into buckets of that
+                        length by the InfluxDB server. The aggregation
+                        function can be set with the "aggregation" key.
+        default_aggregation (str):  The aggregation function used if a bucket
+                                    length is supplied without one.
+
+    Returns:
+        tuple:  The bucket length in seconds and the aggregation function
+        name. Both are None if no bucket length was supplied.
+
+    Raises:
+        RuntimeError:   If the bucket length is not a positive integer or the
+                        aggregation function is not supported.
+    """
+
+    bucket_length: Optional[Union[str, int, float]] = \
+        kwargs.get("bucket_length")
+
+    if bucket_length is None:
+        return None, None
+
+    if int(bucket_length) <= 0 or int(bucket_length) != float(bucket_length):
+        msg: str = (f"The bucket length must be a positive whole number of "
+                    f"seconds, not {bucket_length}")
+        LOG.error(msg)
+        raise RuntimeError(msg)
+
+    aggregation: str = str(kwargs.get("aggregation",
+                                      default_aggregation)).lower()
+
+    if aggregation not in AGGREGATIONS:
+        agg_msg: str = (f"Aggregation function {aggregation} is not "
+                        f"supported. Supported functions are: "
+                        f"{list(AGGREGATIONS.keys())}")
+        LOG.error(agg_msg)
+        raise RuntimeError(agg_msg)
+
+    return int(bucket_length), aggregation
+
+
+def create_select_query(measurement: str, start_time: str, end_time: str,
+                        bucket_length: Optional[int] = None,
+                        aggregation: Optional[str] = None,
+                        end_inclusive: bool = True) -> str:
+    """ Creates the InfluxQL statement for selecting the instance measurements
+    of the supplied measurement within the supplied time period. If a bucket
+    length is supplied the measurements of each instance are aggregated into
+    buckets of that length by the InfluxDB server, so only the aggregated
+    points are returned.
+
+    Arguments:
+        measurement (str):  The name of the measurement to be queried or an
+                            InfluxQL regex (eg. /emit\-count\/+.*/) matching
+                            the names of several measurements. The results of
+                            a regex query contain a series for each matching
+                            measurement.
+        start_time (str):   RFC3339 timestamp for the start of the period.
+        end_time (str): RFC3339 timestamp for the end of the period.
+        bucket_length (int):    Optional length, in seconds, of the time
+                                buckets the measurements should be aggregated
+                                into.
+        aggregation (str):  The name of the aggregation function (a key of
+                            AGGREGATIONS) to apply to each bucket. Required if
+                            a bucket length is supplied.
+        end_inclusive (bool):   Flag indicating if measurements at the end
+                                time should be included (the default).
+
+    Returns:
+        str:    The InfluxQL query string.
+    """
+
+    if not (measurement.startswith("/") and measurement.endswith("/")):
+        measurement = f"\"{measurement}\""
+
+    end_op: str = "<=" if end_inclusive else "<"
+
+    if not bucket_length:
+        return (f"SELECT Component, Instance, value "
+                f"FROM {measurement} "
+                f"WHERE time >= '{start_time}' "
+                f"AND time {end_op} '{end_time}'")
+
+    # Component and Instance are tags, so grouping by them returns one series
+    # per instance. Empty buckets are not returned.
+    return (f"SELECT {AGGREGATIONS[aggregation]}(value) AS value "
+            f"FROM {measurement} "
+            f"WHERE time >= '{start_time}' "
+            f"AND time {end_op} '{end_time}' "
+            f"GROUP BY time({bucket_length}s), Component, Instance "
+            f"fill(none)")
+
+
+def split_window(start: dt.datetime, end: dt.datetime, parts: int,
+                 alignment: int = 60) -> List[Tuple[dt.datetime, dt.datetime]]:
+    """ Splits the supplied time window into, at most, the supplied number of
+    consecutive sub windows. The boundaries between sub windows are aligned
+    to the supplied number of seconds, so that aggregation buckets of that
+    length are never split.
+
+    Arguments:
+        start (datetime):   The start of the window.
+        end (datetime): The end of the window.
+        parts (int):    The maximum number of sub windows.
+        alignment (int):    The number of seconds the sub window boundaries
+                            should be a multiple of (from the epoch).
+
+    Returns:
+        list:   A list of (start, end) tuples. Each sub window ends where the
+        next begins.
+    """
+
+    # Naive datetimes are UTC, so they must not be treated as local times
+    start_secs: float = start.replace(
+        tzinfo=start.tzinfo or dt.timezone.utc).timestamp()
+    end_secs: float = end.replace(
+        tzinfo=end.tzinfo or dt.timezone.utc).timestamp()
+    step: float = (end_secs - start_secs) / max(parts, 1)
+
+    boundaries: List[float] = sorted({
+        (start_secs + step * part) // alignment * alignment
+        for part in range(1, max(parts, 1))})
+    boundaries = [boundary for boundary in boundaries
+                  if start_secs < boundary < end_secs]
+
+    times: List[dt.datetime] = (
+        [start] +
+        [dt.datetime.fromtimestamp(boundary, tz=start.tzinfo)
+         if start.tzinfo else dt.datetime.utcfromtimestamp(boundary)
+         for boundary in boundaries] +
+        [end])
+
+    return list(zip(times[:-1], times[1:]))
+
+
+def series_to_frame(series: Dict[str, Any],
+                    value_type: type = float) -> pd.DataFrame:
+    """ Converts a single series of an InfluxDB query response into a typed
+    DataFrame. The frame is built directly from the column and value arrays of
+    the series, the instance names are parsed and the RFC3339 timestamps
+    converted for all the points at once.
+
+    Arguments:
+        series (dict):  The series as returned by the InfluxDB HTTP API, with
+                        "columns" and "values" keys and a "tags" key if the
+                        query grouped by Component and Instance. The columns
+                        should include time and value, and Component and
+                        Instance unless these are tags.
+        value_type (type):  The type (int or float) of the values.
+
+    Returns:
+        pandas.DataFrame:   A DataFrame with time (naive UTC datetimes),
+        component, task, container and value columns. Points whose instance
+        name could not be parsed or that have no value are dropped.
+    """
+
+    values: List[List[Any]] = series.get("values") or []
+
+    if not values:
+        return pd.DataFrame()
+
+    tags: Dict[str, str] = series.get("tags") or {}
+
+    frame: pd.DataFrame = pd.DataFrame.from_records(
+        values, columns=series["columns"])
+
+    if "Component" in tags:
+        frame["component"] = tags["Component"]
+    else:
+        frame["component"] = frame["Component"]
+
+    if "Instance" in tags:
+        instances: pd.Series = pd.Series(tags["Instance"], index=frame.index)
+    else:
+        instances = frame["Instance"]
+
+    details: pd.DataFrame = instances.str.extract(INSTANCE_NAME_RE_STR,
+                                                  expand=True)
+
+    valid: pd.Series = details["task"].notnull() & frame["value"].notnull()
+
+    if not valid.all():
+        unparsed: pd.Series = instances[details["task"].isnull()]
+        if not unparsed.empty:
+            LOG.warning("Could not parse %d instance name(s), for example: "
+                        "%s", len(unparsed), unparsed.iloc[0])
+        frame = frame[valid].copy()
+        details = details[valid]
+
+    frame["task"] = details["task"].astype("int64")
+    frame["container"] = details["container"].astype("int64")
+    frame["time"] = pd.to_datetime(frame["time"], utc=True).dt.tz_convert(None)
+    frame["value"] = pd.to_numeric(frame["value"]).astype(
+        "int64" if value_type is int else "float64")
+
+    return frame
+
+
+def _influx_session_kwargs() -> Dict[str, Union[int, float]]:
+    """ Returns the InfluxDBClient connection keyword arguments matching the
+    settings of the shared HTTP session. The InfluxDB client manages its own
+    pooled session, so the pool size, timeout and retries are passed on. """
+
+    session_settings: http_session.SessionSettings = http_session.settings()
+
+    # The InfluxDB client counts the total number of attempts and treats zero
+    # as retrying forever
+    return {"timeout": session_settings.read_timeout,
+            "retries": session_settings.retries + 1,
+            "pool_size": session_settings.pool_maxsize}
+
+
 class HeronInfluxDBClient(HeronMetricsClient):
 
     """ Class for extracting Heron metrics from a InfluxDB server """
@@ -108,7 +352,7 @@ class HeronInfluxDBClient(HeronMetricsClient):
                      config["influx.user"], self.host)
             self.client: InfluxDBClient = InfluxDBClient(
                 host=self.host, port=self.port, username=self.username,
-                password=self.password)
+                password=self.password, **_influx_session_kwargs())
 
         elif "influx.user" in config and "influx.password" not in config:
 
@@ -126,13 +370,23 @@ class HeronInfluxDBClient(HeronMetricsClient):
         else:
             LOG.info("Creating InfluxDB client for sever on host: %s",
                      self.host)
-            self.client: InfluxDBClient = InfluxDBClient(host=self.host,
-                                                         port=self.port)
+            self.client: InfluxDBClient = InfluxDBClient(
+                host=self.host, port=self.port, **_influx_session_kwargs())
 
         self.metric_name_cache: DefaultDict[str,
                                             DefaultDict[str, List[str]]] = \
             defaultdict(lambda: defaultdict(list))
 
+        # The number of sub windows each query window is split into, these
+        # are queried concurrently
+        self.query_workers: int = max(1, int(config.get(
+            "influx.query.workers", DEFAULT_QUERY_WORKERS)))
+
+        # The number of points per chunk when streaming query results, zero
+        # disables streaming
+        self.chunk_size: int = max(0, int(config.get(
+            "influx.query.chunk.size", DEFAULT_CHUNK_SIZE)))
+
     def __hash__(self) -> int:
 
         if self.username and self.password:
@@ -238,6 +492,183 @@ class HeronInfluxDBClient(HeronMetricsClient):
 
         return self.metric_name_cache[metric_name][database]
 
+    def stream_series(self, query_str: str, database: str
+                      ) -> Iterator[Dict[str, Any]]:
+        """ Issues the supplied query with a chunked response and yields the
+        series of each chunk as it is read from the server. The response is
+        streamed, so only the chunk currently being read is held in memory.
+        The InfluxDBClient query method cannot be used for this as it reads
+        every chunk into a single result set before returning.
+
+        A series may be split across several chunks, each part is yielded
+        separately.
+
+        Arguments:
+            query_str (str):    The InfluxQL query.
+            database (str): The name of the influx database to be queried.
+
+        Returns:
+            Iterator[dict]: An iterator over the series dictionaries (with
+            name, tags, columns and values keys) of the response.
+
+        Raises:
+            InfluxDBServerError:    If the server returns an error code.
+            InfluxDBClientError:    If the query fails.
+        """
+
+        params: Dict[str, Union[str, int]] = {
+            "q": query_str, "db": database, "chunked": "true",
+            "chunk_size": self.chunk_size}
+
+        auth: Optional[Tuple[str, str]] = None
+        if self.username and self.password:
+            auth = (self.username, self.password)
+
+        response: requests.Response = http_session.get(
+            f"http://{self.host}:{self.port}/query", params=params, auth=auth,
+            stream=True)
+
+        with closing(response):
+
+            if 500 <= response.status_code < 600:
+                raise InfluxDBServerError(response.content)
+            elif response.status_code != 200:
+                raise InfluxDBClientError(response.content,
+                                          response.status_code)
+
+            for line in response.iter_lines():
+
+                if not line:
+                    continue
+
+                chunk: Dict[str, Any] = json.loads(line.decode("utf-8"))
+
+                if "error" in chunk:
+                    raise InfluxDBClientError(chunk["error"])
+
+                for result in chunk.get("results", []):
+                    if "error" in result:
+                        raise InfluxDBClientError(result["error"])
+                    yield from result.get("series", [])
+
+    def query_metric(self, database: str, metric_name: str,
+                     metric_regex: str, start: dt.datetime, end: dt.datetime,
+                     name_fields: Tuple[str, ...], value_column: str,
+                     value_type: type = float, time_column: str = "timestamp",
+                     bucket_length: Optional[int] = None,
+                     aggregation: Optional[str] = None) -> pd.DataFrame:
+        """ Queries all the measurements matching the supplied regex with a
+        single InfluxQL statement and converts the results into a DataFrame
+        with a row per instance measurement.
+
+        If the client is configured with more than one query worker, the
+        window is split into that many sub windows which are queried
+        concurrently. If a chunk size is configured the results are streamed
+        from the server in chunks (see stream_series) and each chunk is
+        converted into typed columns before the next is read, so the raw
+        points of the whole window are never held in memory at once.
+
+        Arguments:
+            database (str): The name of the influx database to be queried.
+            metric_name (str):  The name of the metric being queried (this is
+                                used for logging).
+            metric_regex (str): The InfluxQL regex matching the measurement
+                                names of the metric.
+            start (datetime):   The start of the query window.
+            end (datetime): The end of the query window.
+            name_fields (tuple):    The column names for the parts of the
+                                    measurement names after the metric name
+                                    (eg. ("source_component", "stream") for
+                                    execute-latency/<source>/<stream>).
+            value_column (str): The column name for the measurement values.
+            value_type (type):  The type (int or float) of the measurement
+                                values.
+            time_column (str):  The column name for the timestamps.
+            bucket_length (int):    Optional length, in seconds, of the time
+                                    buckets the measurements should be
+                                    aggregated into by the InfluxDB server.
+            aggregation (str):  The aggregation function for each bucket.
+
+        Returns:
+            pandas.DataFrame:   A DataFrame with the time, component, task,
+            container, stream (and source_component if in the name fields)
+            and value columns. Rows are ordered by sub window and then by
+            series.
+
+        Raises:
+            RuntimeError:   If the specified database has no measurements
+                            matching the supplied metric regex.
+        """
+
+        windows: List[Tuple[dt.datetime, dt.datetime]] = split_window(
+            start, end, self.query_workers, bucket_length or 60)
+
+        columns: List[str] = (
+            [time_column, "component", "task", "container"] +
+            [field for field in ("stream", "source_component")
+             if field in name_fields] +
+            [value_column])
+
+        def run_query(window: Tuple[dt.datetime, dt.datetime]
+                      ) -> Tuple[int, List[pd.DataFrame]]:
+
+            query_str: str = create_select_query(
+                metric_regex, convert_datetime_to_rfc3339(window[0]),
+                convert_datetime_to_rfc3339(window[1]), bucket_length,
+                aggregation, end_inclusive=(window[1] == end))
+
+            LOG.debug("Querying %s measurements with influx QL statement: %s",
+                      metric_name, query_str)
+
+            if self.chunk_size:
+                series_iter: Iterator[Dict[str, Any]] = \
+                    self.stream_series(query_str, database)
+            else:
+                series_iter = iter(self.client.query(
+                    query_str, database=database).raw.get("series", []))
+
+            num_series: int = 0
+            frames: List[pd.DataFrame] = []
+
+            for series in series_iter:
+
+                num_series += 1
+
+                frame: pd.DataFrame = series_to_frame(series, value_type)
+
+                if frame.empty:
+                    continue
+
+                for field, value in zip(name_fields,
+                                        series["name"].split("/")[1:]):
+                    frame[field] = value
+
+                frames.append(frame.rename(
+                    columns={"time": time_column, "value": value_column}
+                )[columns])
+
+            return num_series, frames
+
+        if len(windows) == 1:
+            window_results: List[Tuple[int, List[pd.DataFrame]]] = \
+                [run_query(windows[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(windows)) as executor:
+                window_results = list(executor.map(run_query, windows))
+
+        if not any(num_series for num_series, _ in window_results):
+            # Raises a RuntimeError if the metric has no measurements at all,
+            # otherwise there were simply no points in the window
+            self.get_metric_measurement_names(database, metric_name,
+                                              metric_regex)
+
+        output: FrameAccumulator = FrameAccumulator(columns=columns)
+
+        for _, frames in window_results:
+            for frame in frames:
+                output.append(frame)
+
+        return output.to_frame()
 
     def get_service_times(self, topology_id: str, cluster: str, environ: str,
                           start: dt.datetime, end: dt.datetime,
@@ -253,6 +684,14 @@ class HeronInfluxDBClient(HeronMetricsClient):
                                         the metrics gathering period.
             end (datetime.datetime):    UTC datetime instance for the end of
                                         the metrics gathering period.
+            **bucket_length (int):  Optional length, in seconds, of the time
+                                    buckets the measurements should be
+                                    aggregated into by the InfluxDB server.
+                                    The timestamp of each row is then the
+                                    start of its bucket.
+            **aggregation (str):    The function used to aggregate each
+                                    bucket (a key of AGGREGATIONS). Defaults
+                                    to "mean".
 
         Returns:
             pandas.DataFrame:   A DataFrame containing the service time
@@ -268,8 +707,8 @@ class HeronInfluxDBClient(HeronMetricsClient):
               that lead to this metric came from,
             * source_component: The name of the component the stream's source
               instance belongs to,
-            * execute_latency: The average execute latency during the metric
-                               sample period.
+            * latency_ms: The average execute latency during the metric
+                          sample period.
         """
 
         start_time: str = convert_datetime_to_rfc3339(start)
@@ -283,54 +722,17 @@ class HeronInfluxDBClient(HeronMetricsClient):
                  "%s", topology_id, cluster, environ,
                  (end-start).total_seconds(), start_time, end_time)
 
-        self.client.switch_database(database)
-
         metric_name: str = "execute-latency"
         metric_regex: str = "/execute\-latency\/+.*\/+.*/"
 
-        measurement_names: List[str] = self.get_metric_measurement_names(
-            database, metric_name, metric_regex)
-
-        output: List[Dict[str, Union[str, int, dt.datetime]]] = []
-
-        for measurement_name in measurement_names:
-
-            _, source_component, stream = measurement_name.split("/")
-
-            query_str: str = (f"SELECT Component, Instance, value "
-                              f"FROM \"{measurement_name}\" "
-                              f"WHERE time >= '{start_time}' "
-                              f"AND time <= '{end_time}'")
+        bucket_length, aggregation = aggregation_arguments(kwargs, "mean")
 
-            LOG.debug("Querying %s measurements with influx QL statement: %s",
-                      metric_name, query_str)
-
-            results: ResultSet = self.client.query(query_str)
-
-            for point in results.get_points():
-
-                instance: Optional[re.Match] = re.search(
-                    INSTANCE_NAME_RE, point["Instance"])
-
-                if instance:
-                    instance_dict: Dict[str, str] = instance.groupdict()
-                else:
-                    LOG.warning("Could not parse instance name: %s",
-                                point["Instance"])
-                    continue
-
-                row: Dict[str, Union[str, int, dt.datetime]] = {
-                    "time": convert_rfc339_to_datetime(point["time"]),
-                    "component": point["Component"],
-                    "task": int(instance_dict["task"]),
-                    "container": int(instance_dict["container"]),
-                    "stream": stream,
-                    "source_component": source_component,
-                    "execute_latency": float(point["value"])}
-
-                output.append(row)
-
-        return pd.DataFrame(output)
+        return schema.validate(self.query_metric(
+            database, metric_name, metric_regex, start, end,
+            name_fields=("source_component", "stream"), value_column="latency_ms",
+            value_type=float, time_column="timestamp",
+            bucket_length=bucket_length, aggregation=aggregation),
+            "get_service_times")
 
     def get_emit_counts(self, topology_id: str, cluster: str, environ: str,
                         start: dt.datetime, end: dt.datetime,
@@ -346,6 +748,14 @@ class HeronInfluxDBClient(HeronMetricsClient):
                                         the metrics gathering period.
             end (datetime.datetime):    UTC datetime instance for the end of
                                         the metrics gathering period.
+            **bucket_length (int):  Optional length, in seconds, of the time
+                                    buckets the measurements should be
+                                    aggregated into by the InfluxDB server.
+                                    The timestamp of each row is then the
+                                    start of its bucket.
+            **aggregation (str):    The function used to aggregate each
+                                    bucket (a key of AGGREGATIONS). Defaults
+                                    to "sum".
 
         Returns:
             pandas.DataFrame:   A DataFrame containing the emit count
@@ -373,53 +783,17 @@ class HeronInfluxDBClient(HeronMetricsClient):
                  "%s", topology_id, cluster, environ,
                  (end-start).total_seconds(), start_time, end_time)
 
-        self.client.switch_database(database)
-
         metric_name: str = "emit-count"
         metric_regex: str = "/emit\-count\/+.*/"
 
-        measurement_names: List[str] = self.get_metric_measurement_names(
-            database, metric_name, metric_regex)
+        bucket_length, aggregation = aggregation_arguments(kwargs, "sum")
 
-        output: List[Dict[str, Union[str, int, dt.datetime]]] = []
-
-        for measurement_name in measurement_names:
-
-            _, stream = measurement_name.split("/")
-
-            query_str: str = (f"SELECT Component, Instance, value "
-                              f"FROM \"{measurement_name}\" "
-                              f"WHERE time >= '{start_time}' "
-                              f"AND time <= '{end_time}'")
-
-            LOG.debug("Querying %s measurements with influx QL statement: %s",
-                      metric_name, query_str)
-
-            results: ResultSet = self.client.query(query_str)
-
-            for point in results.get_points():
-
-                instance: Optional[re.Match] = re.search(
-                    INSTANCE_NAME_RE, point["Instance"])
-
-                if instance:
-                    instance_dict: Dict[str, str] = instance.groupdict()
-                else:
-                    LOG.warning("Could not parse instance name: %s",
-                                point["Instance"])
-                    continue
-
-                row: Dict[str, Union[str, int, dt.datetime]] = {
-                    "timestamp": convert_rfc339_to_datetime(point["time"]),
-                    "component": point["Component"],
-                    "task": int(instance_dict["task"]),
-                    "container": int(instance_dict["container"]),
-                    "stream": stream,
-                    "emit_count": int(point["value"])}
-
-                output.append(row)
-
-        return pd.DataFrame(output)
+        return schema.validate(self.query_metric(
+            database, metric_name, metric_regex, start, end,
+            name_fields=("stream",), value_column="emit_count",
+            value_type=int, time_column="timestamp",
+            bucket_length=bucket_length, aggregation=aggregation),
+            "get_emit_counts")
 
     def get_execute_counts(self, topology_id: str, cluster: str, environ: str,
                            start: dt.datetime, end: dt.datetime,
@@ -435,6 +809,14 @@ class HeronInfluxDBClient(HeronMetricsClient):
                                         the metrics gathering period.
             end (datetime.datetime):    UTC datetime instance for the end of
                                         the metrics gathering period.
+            **bucket_length (int):  Optional length, in seconds, of the time
+                                    buckets the measurements should be
+                                    aggregated into by the InfluxDB server.
+                                    The timestamp of each row is then the
+                                    start of its bucket.
+            **aggregation (str):    The function used to aggregate each
+                                    bucket (a key of AGGREGATIONS). Defaults
+                                    to "sum".
 
         Returns:
             pandas.DataFrame:   A DataFrame containing the service time
@@ -464,54 +846,17 @@ class HeronInfluxDBClient(HeronMetricsClient):
                  "%s", topology_id, cluster, environ,
                  (end-start).total_seconds(), start_time, end_time)
 
-        self.client.switch_database(database)
-
         metric_name: str = "execute-count"
         metric_regex: str = "/execute\-count\/+.*\/+.*/"
 
-        measurement_names: List[str] = self.get_metric_measurement_names(
-            database, metric_name, metric_regex)
-
-        output: List[Dict[str, Union[str, int, dt.datetime]]] = []
-
-        for measurement_name in measurement_names:
-
-            _, source_component, stream = measurement_name.split("/")
-
-            query_str: str = (f"SELECT Component, Instance, value "
-                              f"FROM \"{measurement_name}\" "
-                              f"WHERE time >= '{start_time}' "
-                              f"AND time <= '{end_time}'")
-
-            LOG.debug("Querying %s measurements with influx QL statement: %s",
-                      metric_name, query_str)
-
-            results: ResultSet = self.client.query(query_str)
-
-            for point in results.get_points():
-
-                instance: Optional[re.Match] = re.search(
-                    INSTANCE_NAME_RE, point["Instance"])
-
-                if instance:
-                    instance_dict: Dict[str, str] = instance.groupdict()
-                else:
-                    LOG.warning("Could not parse instance name: %s",
-                                point["Instance"])
-                    continue
-
-                row: Dict[str, Union[str, int, dt.datetime]] = {
-                    "timestamp": convert_rfc339_to_datetime(point["time"]),
-                    "component": point["Component"],
-                    "task": int(instance_dict["task"]),
-                    "container": int(instance_dict["container"]),
-                    "stream": stream,
-                    "source_component": source_component,
-                    "execute_count": int(point["value"])}
+        bucket_length, aggregation = aggregation_arguments(kwargs, "sum")
 
-                output.append(row)
-
-        return pd.DataFrame(output)
+        return schema.validate(self.query_metric(
+            database, metric_name, metric_regex, start, end,
+            name_fields=("source_component", "stream"), value_column="execute_count",
+            value_type=int, time_column="timestamp",
+            bucket_length=bucket_length, aggregation=aggregation),
+            "get_execute_counts")
 
     def get_complete_latencies(self, topology_id: str, cluster: str,
                                environ: str, start: dt.datetime,
@@ -531,6 +876,14 @@ class HeronInfluxDBClient(HeronMetricsClient):
                                     metrics gathering period.
             end (datetime):  utc datetime instance for the end of the
                                 metrics gathering period.
+            **bucket_length (int):  Optional length, in seconds, of the time
+                                    buckets the measurements should be
+                                    aggregated into by the InfluxDB server.
+                                    The timestamp of each row is then the
+                                    start of its bucket.
+            **aggregation (str):    The function used to aggregate each
+                                    bucket (a key of AGGREGATIONS). Defaults
+                                    to "mean".
 
         Returns:
             pandas.DataFrame: A DataFrame containing the service time
@@ -587,53 +940,17 @@ class HeronInfluxDBClient(HeronMetricsClient):
                  "and %s", topology_id, cluster, environ,
                  (end-start).total_seconds(), start_time, end_time)
 
-        self.client.switch_database(database)
-
         metric_name: str = "complete-latency"
         metric_regex: str = "/complete\-latency\/+.*/"
 
-        measurement_names: List[str] = self.get_metric_measurement_names(
-            database, metric_name, metric_regex)
-
-        output: List[Dict[str, Union[str, int, dt.datetime]]] = []
-
-        for measurement_name in measurement_names:
-
-            _, stream = measurement_name.split("/")
-
-            query_str: str = (f"SELECT Component, Instance, value "
-                              f"FROM \"{measurement_name}\" "
-                              f"WHERE time >= '{start_time}' "
-                              f"AND time <= '{end_time}'")
-
-            LOG.debug("Querying %s measurements with influx QL statement: %s",
-                      metric_name, query_str)
-
-            results: ResultSet = self.client.query(query_str)
-
-            for point in results.get_points():
-
-                instance: Optional[re.Match] = re.search(
-                    INSTANCE_NAME_RE, point["Instance"])
-
-                if instance:
-                    instance_dict: Dict[str, str] = instance.groupdict()
-                else:
-                    LOG.warning("Could not parse instance name: %s",
-                                point["Instance"])
-                    continue
-
-                row: Dict[str, Union[str, int, dt.datetime]] = {
-                    "timestamp": convert_rfc339_to_datetime(point["time"]),
-                    "component": point["Component"],
-                    "task": int(instance_dict["task"]),
-                    "container": int(instance_dict["container"]),
-                    "stream": stream,
-                    "latency_ms": float(point["value"])}
-
-                output.append(row)
+        bucket_length, aggregation = aggregation_arguments(kwargs, "mean")
 
-        return pd.DataFrame(output)
+        return schema.validate(self.query_metric(
+            database, metric_name, metric_regex, start, end,
+            name_fields=("stream",), value_column="latency_ms",
+            value_type=float, time_column="timestamp",
+            bucket_length=bucket_length, aggregation=aggregation),
+            "get_complete_latencies")
 
     def get_arrival_rates(self, topology_id: str, cluster: str, environ: str,
                           start: dt.datetime, end: dt.datetime,
@@ -0,0 +1,246 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a Heron metrics client that keeps a rolling window of
+the metrics of a configured list of watched topologies in memory. A
+background thread polls the wrapped client at the Topology Master's metric
+granularity, so that model requests for the watched topologies are served
+from memory rather than waiting on the metrics source. """
+
+import logging
+import threading
+
+import datetime as dt
+
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+
+import pandas as pd
+
+from caladrius.config.keys import ConfKeys
+from caladrius.metrics.heron import schema
+from caladrius.metrics.heron.client import HeronMetricsClient
+from caladrius.metrics.heron.wrapper import HeronMetricsClientWrapper
+from caladrius.metrics.heron.cache.store import to_utc_naive
+from caladrius.metrics.heron.tmaster.client import DEFAULT_METRIC_PERIOD
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# The metrics kept in memory for each watched topology by default
+DEFAULT_PREFETCH_METRICS: List[str] = [
+    "get_service_times", "get_emit_counts", "get_execute_counts",
+    "get_complete_latencies", "get_tuple_arrivals_at_stmgr"]
+
+# Query keyword arguments that change the measurements returned by the metrics
+# source. The models pass their own request arguments (source hours, ZooKeeper
+# settings etc) through to the metrics client, these are ignored by the
+# metrics sources and so do not stop a query being served from memory.
+QUERY_KWARGS: Tuple[str, ...] = ("bucket_length", "aggregation", "sink")
+
+# The default length of the rolling window, this matches the retention period
+# of the Topology Master
+DEFAULT_WINDOW_MINS: int = 180
+
+# Each poll fetches the last few minutes again as their measurements may not
+# have been complete when they were last fetched
+REFETCH_SECS: int = 2 * DEFAULT_METRIC_PERIOD
+
+HOT_KEY = Tuple[str, str, str, str]
+
+
+class HotWindow(NamedTuple):
+    """ The in memory window of a single metric of a watched topology. """
+
+    frame: pd.DataFrame
+    # Naive UTC timestamps for the start of the window and the time it was
+    # last fetched up to
+    start: pd.Timestamp
+    end: pd.Timestamp
+
+
+class PrefetchingMetricsClient(HeronMetricsClientWrapper):
+    """ Heron metrics client that keeps a rolling window of the metrics of
+    each watched topology in memory, refreshed by a background thread. Queries
+    for a watched topology and metric whose window is within the in memory
+    window (and that have none of the QUERY_KWARGS keyword arguments) are
+    answered from memory, all other queries are passed to the wrapped client.
+
+    The client is configured with the following keys:
+
+    * heron.metrics.prefetch.topologies: A list of dictionaries with the
+      "cluster", "environ" and "topology" of each watched topology.
+    * heron.metrics.prefetch.metrics: The query methods kept in memory.
+    * heron.metrics.prefetch.window.mins: The length of the rolling window.
+    * heron.metrics.prefetch.interval.secs: The number of seconds between
+      polls of the wrapped client.
+    """
+
+    def __init__(self, config: dict,
+                 client: Optional[HeronMetricsClient] = None) -> None:
+        super().__init__(config, client)
+
+        self.watched: List[Tuple[str, str, str]] = [
+            (target["cluster"], target["environ"], target["topology"])
+            for target in config.get(
+                ConfKeys.HERON_METRICS_PREFETCH_TOPOLOGIES.value, [])]
+        self.metrics: List[str] = list(config.get(
+            ConfKeys.HERON_METRICS_PREFETCH_METRICS.value,
+            DEFAULT_PREFETCH_METRICS))
+        self.window: pd.Timedelta = pd.Timedelta(minutes=int(config.get(
+            ConfKeys.HERON_METRICS_PREFETCH_WINDOW_MINS.value,
+            DEFAULT_WINDOW_MINS)))
+        self.interval: float = float(config.get(
+            ConfKeys.HERON_METRICS_PREFETCH_INTERVAL_SECS.value,
+            DEFAULT_METRIC_PERIOD))
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        self._windows: Dict[HOT_KEY, HotWindow] = {}
+        self._stop: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        LOG.info("Created prefetching metrics client watching %d topologies "
+                 "with a %s rolling window for wrapped client: %s",
+                 len(self.watched), str(self.window),
+                 type(self.client).__name__)
+
+    def __hash__(self) -> int:
+
+        return id(self)
+
+    def __eq__(self, other: object) -> bool:
+
+        return self is other
+
+    def start(self) -> None:
+        """ Starts the background thread polling the wrapped client. The first
+        poll is made immediately. """
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name="caladrius-metrics-prefetch",
+                                        daemon=True)
+        self._thread.start()
+
+        LOG.info("Started metrics prefetching every %.0f seconds for "
+                 "topologies: %s", self.interval, str(self.watched))
+
+    def stop(self) -> None:
+        """ Stops the background thread, waiting for any poll in progress to
+        finish. """
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def refresh(self, now: Optional[dt.datetime] = None) -> None:
+        """ Polls the wrapped client for the metrics of every watched
+        topology, adding the new measurements to the in memory windows and
+        dropping measurements that have left the window. Failed queries are
+        logged and the previous window is kept.
+
+        Arguments:
+            now (datetime): Optional time to refresh up to. Defaults to the
+                            current time.
+        """
+
+        if now is None:
+            now = dt.datetime.now(dt.timezone.utc)
+
+        end: pd.Timestamp = pd.Timestamp(to_utc_naive(now))
+        start: pd.Timestamp = end - self.window
+
+        for cluster, environ, topology_id in self.watched:
+            for metric in list(self.metrics):
+
+                key: HOT_KEY = (topology_id, cluster, environ, metric)
+
+                with self._lock:
+                    previous: Optional[HotWindow] = self._windows.get(key)
+
+                fetch_start: pd.Timestamp = start
+                if previous is not None:
+                    fetch_start = max(
+                        start,
+                        previous.end - pd.Timedelta(seconds=REFETCH_SECS))
+
+                try:
+                    fetched: pd.DataFrame = super()._dispatch(
+                        metric, topology_id, cluster, environ,
+                        fetch_start.to_pydatetime().replace(
+                            tzinfo=dt.timezone.utc),
+                        now)
+                except NotImplementedError:
+                    # Not every metrics source supplies every default metric
+                    LOG.info("Wrapped client %s does not supply %s, it will "
+                             "not be prefetched", type(self.client).__name__,
+                             metric)
+                    self.metrics.remove(metric)
+                    continue
+                except Exception as err:    # pylint: disable=broad-except
+                    LOG.warning("Prefetching %s for topology %s failed: %s",
+                                metric, topology_id, str(err))
+                    continue
+
+                frame: pd.DataFrame = fetched
+                if previous is not None and not previous.frame.empty:
+                    # The re-fetched measurements replace the earlier ones
+                    frame = schema.coerce(schema.deduplicate(pd.concat(
+                        [previous.frame[previous.frame["timestamp"] >= start],
+                         fetched], ignore_index=True, sort=False)))
+
+                with self._lock:
+                    self._windows[key] = HotWindow(frame, start, end)
+
+                LOG.debug("Prefetched %s for topology %s, %d measurements "
+                          "in memory", metric, topology_id, frame.shape[0])
+
+    def _dispatch(self, metric: str, topology_id: str, cluster: str,
+                  environ: str, start: Optional[dt.datetime],
+                  end: Optional[dt.datetime], **kwargs: Any) -> pd.DataFrame:
+
+        hot: Optional[HotWindow] = None
+
+        if (start is not None and end is not None and
+                not any(kwargs.get(key) for key in QUERY_KWARGS)):
+            with self._lock:
+                hot = self._windows.get((topology_id, cluster, environ,
+                                         metric))
+
+        if hot is not None:
+
+            query_start: pd.Timestamp = pd.Timestamp(to_utc_naive(start))
+            query_end: pd.Timestamp = pd.Timestamp(to_utc_naive(end))
+
+            # Measurements after the last poll will not have been reported by
+            # the metrics source yet
+            if (query_start >= hot.start and query_end <= hot.end +
+                    pd.Timedelta(seconds=self.interval)):
+
+                with self._lock:
+                    self.hits += 1
+
+                if hot.frame.empty:
+                    return hot.frame.copy()
+
+                return hot.frame[(hot.frame["timestamp"] >= query_start) &
+                                 (hot.frame["timestamp"] <= query_end)
+                                 ].reset_index(drop=True)
+
+        with self._lock:
+            self.misses += 1
+
+        return super()._dispatch(metric, topology_id, cluster, environ, start,
+                                 end, **kwargs)
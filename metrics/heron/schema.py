@@ -0,0 +1,165 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module defines the canonical schema of the metrics DataFrames returned
+by the Heron metrics clients, along with helpers for validating frames and
+coercing them to the compact canonical column types.
+
+Repeated string columns (component, stream etc) are categorical, instance IDs
+are 32 bit integers and measurements are 32 bit floats. Counts are kept as 64
+bit integers so that large totals are exact. Timestamps are naive UTC
+datetime64 columns. """
+
+import logging
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+CATEGORY: str = "category"
+ID: str = "int32"
+MEASUREMENT: str = "float32"
+COUNT: str = "int64"
+# pandas versions before 2.0 only support nanosecond resolution datetime
+# columns, this has the same size as second resolution
+TIMESTAMP: str = "datetime64[ns]"
+
+# The canonical type of every known metrics column
+COLUMN_TYPES: Dict[str, str] = {
+    "timestamp": TIMESTAMP,
+    "component": CATEGORY,
+    "stream": CATEGORY,
+    "source_component": CATEGORY,
+    "incoming_stream": CATEGORY,
+    "outgoing_stream": CATEGORY,
+    "task": ID,
+    "container": ID,
+    "latency_ms": MEASUREMENT,
+    "arrival_rate": MEASUREMENT,
+    "emit_count": COUNT,
+    "execute_count": COUNT,
+    "receive_count": COUNT,
+}
+
+# The columns identifying a single measurement of a metric
+MEASUREMENT_KEYS: List[str] = ["timestamp", "component", "task", "stream",
+                               "source_component"]
+
+# The columns each query method of a Heron metrics client should return
+METRIC_COLUMNS: Dict[str, List[str]] = {
+    "get_service_times": ["timestamp", "component", "task", "container",
+                          "stream", "source_component", "latency_ms"],
+    "get_emit_counts": ["timestamp", "component", "task", "container",
+                        "stream", "emit_count"],
+    "get_execute_counts": ["timestamp", "component", "task", "container",
+                           "stream", "source_component", "execute_count"],
+    "get_complete_latencies": ["timestamp", "component", "task", "container",
+                               "stream", "latency_ms"],
+}
+
+
+def coerce(frame: pd.DataFrame,
+           column_types: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """ Converts the known columns of the supplied metrics DataFrame to their
+    canonical types. Columns that are not in the schema are left unchanged, as
+    are integer columns that contain missing values.
+
+    Arguments:
+        frame (pandas.DataFrame):   The metrics DataFrame to be converted.
+        column_types (dict):    Optional dictionary mapping from column name to
+                                type, used in place of COLUMN_TYPES.
+
+    Returns:
+        pandas.DataFrame:   A DataFrame with the canonical column types. If no
+        columns needed converting the supplied frame is returned.
+    """
+
+    if frame is None or frame.empty:
+        return frame
+
+    if column_types is None:
+        column_types = COLUMN_TYPES
+
+    conversions: Dict[str, str] = {}
+
+    for column, column_type in column_types.items():
+
+        if column not in frame.columns:
+            continue
+
+        if str(frame[column].dtype) == column_type:
+            continue
+
+        if column_type in (ID, COUNT) and frame[column].isnull().any():
+            LOG.debug("Column %s contains missing values and will not be "
+                      "converted to %s", column, column_type)
+            continue
+
+        conversions[column] = column_type
+
+    if not conversions:
+        return frame
+
+    return frame.astype(conversions)
+
+
+def validate(frame: pd.DataFrame, metric: str) -> pd.DataFrame:
+    """ Checks that the supplied DataFrame, returned by the named query method,
+    has the required columns and converts it to the canonical types.
+
+    Arguments:
+        frame (pandas.DataFrame):   The metrics DataFrame to be checked.
+        metric (str):   The name of the query method that returned the frame
+                        (eg. "get_service_times"). Frames from methods without
+                        defined columns are only converted.
+
+    Returns:
+        pandas.DataFrame:   The DataFrame with the canonical column types.
+
+    Raises:
+        RuntimeError:   If a non empty frame is missing any of the required
+                        columns for the query method.
+    """
+
+    if frame is None or frame.empty:
+        return frame
+
+    missing: List[str] = [column for column in METRIC_COLUMNS.get(metric, [])
+                          if column not in frame.columns]
+
+    if missing:
+        msg: str = (f"Metrics returned by {metric} are missing the required "
+                    f"columns: {missing}")
+        LOG.error(msg)
+        raise RuntimeError(msg)
+
+    return coerce(frame)
+
+
+def deduplicate(frame: pd.DataFrame) -> pd.DataFrame:
+    """ Removes repeated measurements from a metrics DataFrame that has been
+    combined from overlapping windows. Rows are identified by whichever of the
+    MEASUREMENT_KEYS columns the frame has and the last of any repeated rows
+    is kept.
+
+    Arguments:
+        frame (pandas.DataFrame):   The metrics DataFrame.
+
+    Returns:
+        pandas.DataFrame:   The DataFrame without repeated measurements.
+    """
+
+    if frame is None or frame.empty:
+        return frame
+
+    keys: List[str] = [column for column in MEASUREMENT_KEYS
+                       if column in frame.columns]
+
+    if not keys:
+        return frame
+
+    return (frame.drop_duplicates(subset=keys, keep="last")
+            .reset_index(drop=True))
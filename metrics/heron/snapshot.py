@@ -0,0 +1,199 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a request scoped Heron metrics client that memoizes
+the metrics returned by another Heron metrics client. A single snapshot is
+shared by every stage of a modelling request (traffic providers, queueing
+models, predictors etc) so that each metric is only fetched once per request.
+"""
+
+import json
+import logging
+import threading
+
+import datetime as dt
+
+from typing import Dict, Any, Optional, Tuple, Union
+
+import pandas as pd
+
+from caladrius.metrics.heron.client import HeronMetricsClient
+from caladrius.metrics.heron.wrapper import HeronMetricsClientWrapper
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = Tuple[str, str, str, str, Optional[str], Optional[str], str]
+
+# The query methods whose metrics are fetched together, with a single request
+# per component, from clients that provide a get_metric_families method (eg.
+# the Topology Master client). Mapped to their metric family names.
+FAMILY_METRICS: Dict[str, str] = {"get_service_times": "service_times",
+                                  "get_execute_counts": "execute_counts",
+                                  "get_emit_counts": "emit_counts"}
+
+
+def _time_key(time: Optional[dt.datetime]) -> Optional[str]:
+    """ Converts the supplied datetime into a string key. Naive datetimes are
+    assumed to be in UTC, so that naive and timezone aware datetimes for the
+    same instant have the same key. """
+
+    if time is None:
+        return None
+
+    if time.tzinfo is not None:
+        time = time.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+    return time.isoformat()
+
+
+class MetricsSnapshot(HeronMetricsClientWrapper):
+    """ Heron metrics client that lazily loads metrics from the wrapped client
+    and memoizes them for the lifetime of the snapshot. Snapshots are intended
+    to be created for each request, for a single topology and metrics window,
+    and passed to every stage of that request in place of the shared metrics
+    client.
+
+    Each query is memoized on its method name and all of its arguments, so
+    queries for different windows do not share results. Every call returns a
+    copy of the memoized DataFrame as callers are free to modify the frames
+    they are given.
+
+    If the wrapped client provides a get_metric_families method, the first
+    query for any of the FAMILY_METRICS fetches all of them together and the
+    others are then served from the snapshot.
+    """
+
+    def __init__(self, client: HeronMetricsClient, topology_id: str,
+                 cluster: str, environ: str,
+                 start: Optional[dt.datetime] = None,
+                 end: Optional[dt.datetime] = None) -> None:
+        """ Arguments:
+                client (HeronMetricsClient):    The metrics client to be
+                                                wrapped.
+                topology_id (str):  The topology identification string.
+                cluster (str):  The cluster the topology is running in.
+                environ (str):  The environment the topology is running in.
+                start (datetime):   Optional start of the request's metrics
+                                    window. Queries without a start time use
+                                    this.
+                end (datetime): Optional end of the request's metrics window.
+                                Queries without an end time use this.
+        """
+        super().__init__({}, client)
+
+        self.topology_id: str = topology_id
+        self.cluster: str = cluster
+        self.environ: str = environ
+        self.start: Optional[dt.datetime] = start
+        self.end: Optional[dt.datetime] = end
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        self._fetch_locks: Dict[SNAPSHOT_KEY, threading.Lock] = {}
+        self._frames: Dict[SNAPSHOT_KEY, pd.DataFrame] = {}
+
+    def __hash__(self) -> int:
+
+        return id(self)
+
+    def __eq__(self, other: object) -> bool:
+
+        return self is other
+
+    def _fetches_families(self) -> bool:
+        """ Returns True if the wrapped client itself (rather than a client it
+        wraps in turn) provides the get_metric_families method. Wrapper
+        clients pass unknown attributes through to their wrapped client, which
+        would bypass their own behaviour. """
+
+        return callable(getattr(type(self.client), "get_metric_families",
+                                None))
+
+    def _dispatch(self, metric: str, topology_id: str, cluster: str,
+                  environ: str, start: Optional[dt.datetime],
+                  end: Optional[dt.datetime], **kwargs: Any) -> pd.DataFrame:
+
+        if start is None:
+            start = self.start
+        if end is None:
+            end = self.end
+
+        key: SNAPSHOT_KEY = (
+            metric, topology_id, cluster, environ, _time_key(start),
+            _time_key(end), json.dumps(kwargs, sort_keys=True, default=str))
+
+        fetch_families: bool = (metric in FAMILY_METRICS and
+                                start is not None and end is not None and
+                                self._fetches_families())
+
+        # The family metrics share a fetch lock as they are fetched together
+        lock_key: SNAPSHOT_KEY = \
+            ("get_metric_families",) + key[1:] if fetch_families else key
+
+        with self._lock:
+            if lock_key not in self._fetch_locks:
+                self._fetch_locks[lock_key] = threading.Lock()
+            fetch_lock: threading.Lock = self._fetch_locks[lock_key]
+
+        # Only one stage fetches each metric, others wait for its result
+        with fetch_lock:
+
+            frame: Optional[pd.DataFrame] = self._frames.get(key)
+
+            with self._lock:
+                if frame is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+
+            if frame is None and fetch_families:
+                LOG.debug("Metrics snapshot miss for %s of topology %s, "
+                          "fetching metric families: %s", metric, topology_id,
+                          str(list(FAMILY_METRICS.values())))
+                families: Dict[str, pd.DataFrame] = \
+                    self.client.get_metric_families(
+                        topology_id, cluster, environ, start, end,
+                        list(FAMILY_METRICS.values()), **kwargs)
+                for family_metric, family_name in FAMILY_METRICS.items():
+                    self._frames[(family_metric,) + key[1:]] = \
+                        families[family_name]
+                frame = self._frames[key]
+            elif frame is None:
+                LOG.debug("Metrics snapshot miss for %s of topology %s",
+                          metric, topology_id)
+                frame = super()._dispatch(metric, topology_id, cluster,
+                                          environ, start, end, **kwargs)
+                self._frames[key] = frame
+            else:
+                LOG.debug("Metrics snapshot hit for %s of topology %s",
+                          metric, topology_id)
+
+        if isinstance(frame, pd.DataFrame):
+            return frame.copy()
+
+        return frame
+
+    def stats(self) -> Dict[str, Union[int, str]]:
+        """ Returns the hit and miss counts of this snapshot.
+
+        Returns:
+            dict:   A dictionary with the topology ID, hit count, miss count
+            and the number of memoized metrics.
+        """
+
+        with self._lock:
+            return {"topology_id": self.topology_id, "hits": self.hits,
+                    "misses": self.misses, "metrics": len(self._frames)}
+
+    def log_stats(self) -> None:
+        """ Logs the hit and miss counts of this snapshot. """
+
+        stats: Dict[str, Union[int, str]] = self.stats()
+
+        LOG.info("Metrics snapshot for topology %s on cluster %s in "
+                 "environment %s: %d hits, %d misses, %d metrics memoized",
+                 self.topology_id, self.cluster, self.environ, stats["hits"],
+                 stats["misses"], stats["metrics"])
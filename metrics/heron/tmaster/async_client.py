@@ -0,0 +1,237 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a variant of the Topology Master metrics client that
+uses the asyncio Heron Tracker client to request the metrics timelines of all
+of a topology's components concurrently. """
+
+import asyncio
+import logging
+
+import datetime as dt
+
+from typing import Dict, List, Any, Union, Optional, Tuple
+
+import aiohttp
+import pandas as pd
+
+from caladrius.common.heron import async_tracker
+from caladrius.common.heron.async_tracker import AsyncTracker
+from caladrius.config.keys import ConfKeys
+from caladrius.metrics.heron.tmaster.client import (
+    HeronTMasterClient, time_check, _check_families, family_metric_names,
+    timelines_to_families, component_families, combine_families,
+    check_reliability_mode)
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# pylint: disable=too-many-arguments
+
+
+class AsyncHeronTMasterClient(HeronTMasterClient):
+    """ Topology Master metrics client that requests the metrics timelines of
+    every component of a topology concurrently, using asyncio rather than a
+    thread pool. The number of Heron Tracker requests in flight at once is
+    bounded by the "heron.tmaster.metrics.max.concurrency" configuration key.
+
+    The query methods keep the synchronous interface of the other metrics
+    clients, each call runs its requests in its own event loop. Callers that
+    already have an event loop can await the *_async methods directly.
+    """
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.max_concurrency: int = max(1, int(config.get(
+            ConfKeys.HERON_TMASTER_METRICS_MAX_CONCURRENCY.value,
+            async_tracker.DEFAULT_MAX_CONCURRENCY)))
+
+        LOG.info("Topology Master metrics will be requested with up to %d "
+                 "concurrent Heron Tracker requests", self.max_concurrency)
+
+    def __eq__(self, other: object) -> bool:
+
+        if not isinstance(other, AsyncHeronTMasterClient):
+            return False
+
+        return self.tracker_url == other.tracker_url
+
+    def __hash__(self) -> int:
+
+        return hash(self.tracker_url)
+
+    async def get_component_metric_families_async(
+            self, tracker_client: AsyncTracker, topology_id: str,
+            cluster: str, environ: str, component_name: str, start: int,
+            end: int, families: List[str],
+            logical_plan: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+        """ Asyncio version of the get_component_metric_families method,
+        which requests the metrics through the supplied asyncio Heron Tracker
+        client.
+
+        Arguments:
+            tracker_client (AsyncTracker):  An open asyncio Heron Tracker
+                                            client.
+            topology_id (str):    The topology identification string.
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in.
+            component_name (str):   The name of the component whose metrics
+                                    are required.
+            start (int):    Start time as a UTC POSIX time integer.
+            end (int):  End time as a UTC POSIX time integer.
+            families (list):    The names of the metric families (keys of
+                                METRIC_FAMILIES) to be fetched.
+            logical_plan (dict):    Optional logical plan of the topology. If
+                                    not supplied it will be requested.
+
+        Returns:
+            dict:   A dictionary mapping from metric family name to a DataFrame
+            containing that family's measurements.
+
+        Raises:
+            RuntimeError:   If an unknown metric family is supplied.
+        """
+
+        _check_families(families)
+
+        if not logical_plan:
+            LOG.debug("Logical plan not supplied, fetching from Heron Tracker")
+            logical_plan = await tracker_client.get_logical_plan(
+                cluster, environ, topology_id)
+
+        metrics, prefixes = family_metric_names(logical_plan, component_name,
+                                                families)
+
+        results: Optional[Dict[str, Any]] = None
+
+        if metrics:
+            results = await tracker_client.get_metrics_timeline(
+                cluster, environ, topology_id, component_name, start, end,
+                metrics)
+
+        return timelines_to_families(results, families, prefixes)
+
+    async def get_metric_families_async(
+            self, topology_id: str, cluster: str, environ: str,
+            start: dt.datetime, end: dt.datetime, families: List[str],
+            **kwargs: Union[str, int, float]) -> Dict[str, pd.DataFrame]:
+        """ Asyncio version of the get_metric_families method for a single
+        window, which should be within the Topology Master's retention period.
+        The metrics timelines of all the components are requested
+        concurrently. Components whose requests fail with a HTTP error are
+        skipped.
+
+        Arguments:
+            topology_id (str):    The topology identification string.
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in.
+            start (datetime):    utc datetime instance for the start of the
+                                 metrics gathering period.
+            end (datetime):  utc datetime instance for the end of the
+                             metrics gathering period.
+            families (list):    The names of the metric families (keys of
+                                METRIC_FAMILIES) to be fetched.
+
+        Returns:
+            dict:   A dictionary mapping from metric family name to a DataFrame
+            containing that family's measurements, in the same format as
+            returned by the corresponding get_* method.
+
+        Raises:
+            RuntimeError:   If an unknown metric family is supplied.
+        """
+
+        return (await self._window_families_async(
+            topology_id, cluster, environ, start, end, families))[0]
+
+    async def _window_families_async(
+            self, topology_id: str, cluster: str, environ: str,
+            start: dt.datetime, end: dt.datetime, families: List[str],
+            max_concurrency: Optional[int] = None
+            ) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+        """ Fetches the metric families for a single window, returning the
+        families and a list of the names of the components whose requests
+        failed. At most the supplied number of requests (defaulting to the
+        configured maximum concurrency) are in flight at once. """
+
+        _check_families(families)
+
+        LOG.info("Getting metric families: %s for topology %s over a %d "
+                 "second period from %s to %s", str(families), topology_id,
+                 (end-start).total_seconds(), start.isoformat(),
+                 end.isoformat())
+
+        time_check(start, end, self.time_limit_hrs)
+
+        start_time: int = int(round(start.timestamp()))
+        end_time: int = int(round(end.timestamp()))
+
+        async with AsyncTracker(
+                self.tracker_url,
+                max_concurrency or self.max_concurrency) as tracker_client:
+
+            logical_plan: Dict[str, Any] = \
+                await tracker_client.get_logical_plan(cluster, environ,
+                                                      topology_id)
+
+            fetch_families: List[str] = list(families)
+
+            if "complete_latencies" in fetch_families:
+                physical_plan: Dict[str, Any] = \
+                    await tracker_client.get_physical_plan(cluster, environ,
+                                                           topology_id)
+                if not check_reliability_mode(physical_plan, topology_id):
+                    fetch_families.remove("complete_latencies")
+
+            comp_families: Dict[str, List[str]] = component_families(
+                logical_plan, fetch_families)
+
+            results: List[Any] = await asyncio.gather(
+                *[self.get_component_metric_families_async(
+                    tracker_client, topology_id, cluster, environ, component,
+                    start_time, end_time, component_fams, logical_plan)
+                  for component, component_fams in comp_families.items()],
+                return_exceptions=True)
+
+        output: List[Dict[str, pd.DataFrame]] = []
+        failed: List[str] = []
+
+        for component, result in zip(comp_families, results):
+            if isinstance(result, aiohttp.ClientResponseError):
+                LOG.warning("Fetching %s for component %s failed with status "
+                            "code %s", ", ".join(fetch_families), component,
+                            str(result.status))
+                failed.append(component)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                output.append(result)
+
+        return combine_families(families, output), failed
+
+    def get_component_metric_families(
+            self, topology_id: str, cluster: str, environ: str,
+            component_name: str, start: int, end: int, families: List[str],
+            logical_plan: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+
+        async def fetch() -> Dict[str, pd.DataFrame]:
+            async with AsyncTracker(self.tracker_url,
+                                    self.max_concurrency) as tracker_client:
+                return await self.get_component_metric_families_async(
+                    tracker_client, topology_id, cluster, environ,
+                    component_name, start, end, families, logical_plan)
+
+        return async_tracker.run(fetch())
+
+    def _get_window_families(self, topology_id: str, cluster: str,
+                             environ: str, start: dt.datetime,
+                             end: dt.datetime, families: List[str],
+                             workers: Optional[int] = None
+                             ) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+
+        return async_tracker.run(self._window_families_async(
+            topology_id, cluster, environ, start, end, families, workers))
+
+    def _max_requests(self) -> int:
+
+        return self.max_concurrency
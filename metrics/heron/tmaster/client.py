@@ -5,19 +5,29 @@
 """ This module contains classes and methods for extracting metrics from the
 Heron Topology Master instance. """
 
+import time
 import logging
 import warnings
 
 import datetime as dt
 
-from typing import Dict, List, Any, Callable, Union, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, Future
+from itertools import chain
+from typing import (Dict, List, Any, Callable, Union, Tuple, Optional,
+                    NamedTuple)
 
+import numpy as np
 import pandas as pd
 
 from requests.exceptions import HTTPError
 
+from caladrius.metrics.heron import schema
 from caladrius.metrics.heron.client import HeronMetricsClient
+from caladrius.metrics.heron.cache.store import (
+    ParquetMetricsStore, MetricKey, MINUTE_SECS, to_epoch_secs,
+    from_epoch_secs, contiguous_windows)
 from caladrius.common.heron import tracker
+from caladrius.common.frames import FrameAccumulator
 from caladrius.config.keys import ConfKeys
 
 LOG: logging.Logger = logging.getLogger(__name__)
@@ -30,6 +40,13 @@ ROW_DICT = Dict[str, Union[str, int, float, dt.datetime, None]]
 # The TMaster metrics are aggregated into minute long periods by default
 DEFAULT_METRIC_PERIOD: int = 60
 
+# By default component metrics are fetched one at a time
+DEFAULT_FETCH_WORKERS: int = 1
+
+# The number of seconds after the end of a minute before its cached metrics
+# are treated as final
+DEFAULT_CACHE_SETTLE_SECS: int = 120
+
 
 def time_check(start: dt.datetime, end: dt.datetime,
                time_limit_hrs: float) -> None:
@@ -83,13 +100,16 @@ def time_check(start: dt.datetime, end: dt.datetime,
 
 def instance_timelines_to_dataframe(
         instance_timelines: dict, stream: Optional[str], measurement_name: str,
-        conversion_func: Callable[[str], Union[str, int, float]] = None,
+        conversion_func: Callable[[pd.Series], pd.Series] = None,
         source_component: str = None) -> pd.DataFrame:
     """ Converts the timeline dictionaries of a *single metric* into a single
     combined DataFrame for all instances. All timestamps are converted to UTC
     Python datetime objects and the returned DataFrame (for each instance) is
     sorted by ascending date.
 
+    The DataFrame is built column wise: each instance name is parsed once,
+    timestamps are converted in bulk and the rows are sorted in a single pass.
+
     Arguments:
         instance_timelines (dict):  A dictionary of instance metric timelines,
                                     where each key is an instance name linking
@@ -100,69 +120,339 @@ def instance_timelines_to_dataframe(
                                 This will be used as the measurement column
                                 heading.
         conversion_func (function): An optional function for converting the
-                                    measurement in the timeline. If not
-                                    supplied the measurement will be left as a
-                                    string.
+                                    measurements in the timeline. It is
+                                    supplied with a float Series of the
+                                    measurements (with "nan" entries as NaN)
+                                    and should return the converted Series. If
+                                    not supplied the measurements will be left
+                                    as strings.
+        source_component (str): Optional name of the component the stream
+                                originates from.
 
     Returns:
         pandas.DataFrame: A DataFrame containing the timelines of all instances
         in the supplied dictionary.
     """
 
-    output: List[ROW_DICT] = []
+    timelines: List[Dict[str, str]] = list(instance_timelines.values())
+
+    lengths: np.ndarray = np.array([len(timeline) for timeline in timelines],
+                                   dtype=np.int64)
+
+    if lengths.sum() == 0:
+        return pd.DataFrame()
+
+    details: List[Dict[str, Union[str, int]]] = \
+        [tracker.parse_instance_name(instance_name)
+         for instance_name in instance_timelines]
+
+    timestamps: np.ndarray = np.fromiter(
+        map(int, chain.from_iterable(timelines)), dtype=np.int64,
+        count=lengths.sum())
+
+    measurement_strs: np.ndarray = np.array(
+        list(chain.from_iterable(timeline.values()
+                                 for timeline in timelines)), dtype=object)
+
+    if conversion_func:
+        # Any "nan" measurements are coerced to NaN by the numeric conversion
+        measurements: pd.Series = conversion_func(
+            pd.to_numeric(pd.Series(measurement_strs), errors="coerce"))
+    else:
+        is_nan: pd.Series = \
+            pd.Series(measurement_strs).str.contains("nan", regex=False)
+        measurements = pd.Series(np.where(is_nan, None, measurement_strs),
+                                 dtype=object)
+
+    # Because the original dicts returned by the tracker are unsorted we need
+    # to sort the rows by instance and then by ascending time
+    instance_index: np.ndarray = np.repeat(np.arange(len(timelines)), lengths)
+    order: np.ndarray = np.lexsort((timestamps, instance_index))
+    instance_index = instance_index[order]
+
+    output: Dict[str, Any] = {
+        "timestamp": pd.to_datetime(timestamps[order], unit="s"),
+        "container": np.array([detail["container"] for detail in details],
+                              dtype=np.int64)[instance_index],
+        "task": np.array([detail["task_id"] for detail in details],
+                         dtype=np.int64)[instance_index],
+        "component": np.array([detail["component"] for detail in details],
+                              dtype=object)[instance_index],
+        measurement_name: measurements.values[order]}
+
+    if stream:
+        output["stream"] = stream
+
+    if source_component:
+        output["source_component"] = source_component
+
+    return pd.DataFrame(output)
+
+
+def str_nano_to_float_milli(nano_str: str) -> float:
+    """ Converts a string of a nano measurement into a millisecond float value.
+    """
+
+    return float(nano_str) / 1000000.0
+
+
+def nano_to_milli(measurements: pd.Series) -> pd.Series:
+    """ Converts a Series of nano second measurements into millisecond float
+    values. """
+
+    return measurements / 1000000.0
+
+
+def to_counts(measurements: pd.Series) -> pd.Series:
+    """ Converts a Series of count measurements to integers. If any of the
+    measurements are missing (NaN) the truncated values are left as floats. """
+
+    if measurements.isnull().any():
+        return np.trunc(measurements)
+
+    return measurements.astype(np.int64)
+
+
+class MetricFamily(NamedTuple):
+    """ Description of a family of Topology Master metrics that are reported
+    per stream by each instance. """
+
+    # The metric name prefix used by the Topology Master
+    prefix: str
+    # The name of the measurement column in the output DataFrame
+    measurement_name: str
+    # Function for converting the measurements (see
+    # instance_timelines_to_dataframe)
+    conversion_func: Callable[[pd.Series], pd.Series]
+    # True if the metric is reported per incoming source and stream
+    # (<prefix>/<source>/<stream>), False if per outgoing stream
+    # (<prefix>/<stream>)
+    incoming: bool
+    # The component types of the logical plan that report this metric
+    component_types: Tuple[str, ...]
+
+
+METRIC_FAMILIES: Dict[str, MetricFamily] = {
+    "service_times": MetricFamily("__execute-latency", "latency_ms",
+                                  nano_to_milli, True, ("bolts",)),
+    "execute_counts": MetricFamily("__execute-count", "execute_count",
+                                   to_counts, True, ("bolts",)),
+    "emit_counts": MetricFamily("__emit-count", "emit_count", to_counts,
+                                False, ("spouts", "bolts")),
+    "complete_latencies": MetricFamily("__complete-latency", "latency_ms",
+                                       nano_to_milli, False, ("spouts",)),
+}
+
+
+def _check_families(families: List[str]) -> None:
+    """ Checks that all the supplied metric family names are known.
+
+    Raises:
+        RuntimeError:   If any of the supplied families are not keys of
+                        METRIC_FAMILIES.
+    """
+
+    unknown: List[str] = [family for family in families
+                          if family not in METRIC_FAMILIES]
+    if unknown:
+        msg: str = (f"Unknown metric families: {unknown}. Available families "
+                    f"are: {list(METRIC_FAMILIES.keys())}")
+        LOG.error(msg)
+        raise RuntimeError(msg)
+
+
+def family_metric_names(logical_plan: Dict[str, Any], component_name: str,
+                        families: List[str]
+                        ) -> Tuple[List[str], Dict[str, str]]:
+    """ Creates the Topology Master metric names for each of the supplied
+    metric families of the specified component.
+
+    Arguments:
+        logical_plan (dict):    The logical plan of the topology.
+        component_name (str):   The name of the component.
+        families (list):    The names of the metric families (keys of
+                            METRIC_FAMILIES).
+
+    Returns:
+        tuple:  A list of the metric names to be requested and a dictionary
+        mapping from each metric name prefix to its family name.
+    """
+
+    metrics: List[str] = []
+    prefixes: Dict[str, str] = {}
 
-    instance_name: str
-    timeline: Dict[str, str]
-    for instance_name, timeline in instance_timelines.items():
+    family_name: str
+    for family_name in families:
 
-        details = tracker.parse_instance_name(instance_name)
-        instance_list: List[ROW_DICT] = []
+        family: MetricFamily = METRIC_FAMILIES[family_name]
+        prefixes[family.prefix] = family_name
 
-        timestamp_str: str
-        measurement_str: str
-        for timestamp_str, measurement_str in timeline.items():
+        if family.incoming:
+            metrics.extend(
+                family.prefix + "/" + source + "/" + stream
+                for source, stream in tracker.incoming_sources_and_streams(
+                    logical_plan, component_name))
+        else:
+            metrics.extend(
+                family.prefix + "/" + stream
+                for stream in tracker.get_outgoing_streams(
+                    logical_plan, component_name))
 
-            timestamp: dt.datetime = \
-                    dt.datetime.utcfromtimestamp(int(timestamp_str))
+    return metrics, prefixes
 
-            if "nan" in measurement_str:
-                measurement: Union[str, int, float, None] = None
+
+def timelines_to_families(results: Optional[Dict[str, Any]],
+                          families: List[str], prefixes: Dict[str, str]
+                          ) -> Dict[str, pd.DataFrame]:
+    """ Splits the results of a metrics timeline request, for the metrics of
+    one or more metric families, into a DataFrame for each family.
+
+    Arguments:
+        results (dict): The results returned by the Heron Tracker metrics
+                        timeline endpoint or None if no request was made.
+        families (list):    The names of the requested metric families.
+        prefixes (dict):    Dictionary mapping from metric name prefix to
+                            family name (see family_metric_names).
+
+    Returns:
+        dict:   A dictionary mapping from metric family name to a DataFrame
+        containing that family's measurements.
+    """
+
+    stream_frames: List[Dict[str, pd.DataFrame]] = []
+
+    if results:
+
+        for stream_metric, instance_timelines in results["timeline"].items():
+
+            metric_list: List[str] = stream_metric.split("/")
+            family_name: str = prefixes[metric_list[0]]
+            family: MetricFamily = METRIC_FAMILIES[family_name]
+
+            if family.incoming:
+                source: Optional[str] = metric_list[1]
+                stream: str = metric_list[2]
             else:
-                if conversion_func:
-                    measurement = conversion_func(measurement_str)
-                else:
-                    measurement = measurement_str
+                source = None
+                stream = metric_list[-1]
 
-            row: ROW_DICT = {
-                "timestamp": timestamp,
-                "container": details["container"],
-                "task": details["task_id"],
-                "component": details["component"],
-                measurement_name: measurement}
+            stream_frame: pd.DataFrame = instance_timelines_to_dataframe(
+                instance_timelines, stream, family.measurement_name,
+                family.conversion_func, source)
 
-            if stream:
-                row["stream"] = stream
+            stream_frames.append({family_name: stream_frame})
 
-            if source_component:
-                row["source_component"] = source_component
+    return combine_families(families, stream_frames)
 
-            instance_list.append(row)
 
-        # Because the original dict returned by the tracker is
-        # unsorted we need to sort the rows by ascending time
-        instance_list.sort(
-            key=lambda instance: instance["timestamp"])
+def component_families(logical_plan: Dict[str, Any], families: List[str]
+                       ) -> Dict[str, List[str]]:
+    """ Works out which of the supplied metric families are reported by each
+    component of the topology.
 
-        output.extend(instance_list)
+    Arguments:
+        logical_plan (dict):    The logical plan of the topology.
+        families (list):    The names of the metric families.
 
-    return pd.DataFrame(output)
+    Returns:
+        dict:   A dictionary mapping from component name to the list of the
+        supplied families it reports. Components reporting none of the
+        families are omitted.
+    """
 
+    output: Dict[str, List[str]] = {}
 
-def str_nano_to_float_milli(nano_str: str) -> float:
-    """ Converts a string of a nano measurement into a millisecond float value.
+    component_type: str
+    for component_type in ("spouts", "bolts"):
+        for component in logical_plan[component_type]:
+            comp_families: List[str] = [
+                family_name for family_name in families
+                if component_type in
+                METRIC_FAMILIES[family_name].component_types]
+            if comp_families:
+                output[component] = comp_families
+
+    return output
+
+
+def combine_families(families: List[str],
+                     component_frames: List[Dict[str, pd.DataFrame]]
+                     ) -> Dict[str, pd.DataFrame]:
+    """ Combines the per component metric family DataFrames into a single,
+    canonically typed, DataFrame for each family.
+
+    Arguments:
+        families (list):    The names of the metric families.
+        component_frames (list):    A list of dictionaries mapping from family
+                                    name to DataFrame, one for each component.
+
+    Returns:
+        dict:   A dictionary mapping from each metric family name to a
+        DataFrame. Families with no measurements have an empty DataFrame.
     """
 
-    return float(nano_str) / 1000000.0
+    output: Dict[str, FrameAccumulator] = \
+        {family_name: FrameAccumulator() for family_name in families}
+
+    for frames in component_frames:
+        for family_name, family_frame in frames.items():
+            output[family_name].append(family_frame)
+
+    return {family_name: schema.validate(accumulator.to_frame(),
+                                         "get_" + family_name)
+            for family_name, accumulator in output.items()}
+
+
+def check_reliability_mode(physical_plan: Dict[str, Any],
+                           topology_id: str) -> bool:
+    """ Checks that the topology with the supplied physical plan will actually
+    have complete latencies. Only ATLEAST_ONCE and EXACTLY_ONCE will have
+    complete latency values as acking is disabled for ATMOST_ONCE.
+
+    Returns:
+        bool:   True if complete latencies are available, False otherwise.
+
+    Raises:
+        RuntimeWarning: If the topology has a reliability mode that does not
+                        enable complete latency.
+    """
+
+    if (physical_plan["config"]
+            ["topology.reliability.mode"] == "ATMOST_ONCE"):
+        rm_msg: str = (f"Topology {topology_id} reliability mode is set "
+                       f"to ATMOST_ONCE. Complete latency is not "
+                       f"available for these types of topologies")
+        LOG.warning(rm_msg)
+        warnings.warn(rm_msg, RuntimeWarning)
+        return False
+
+    return True
+
+
+def split_retention_windows(start: int, end: int, retention_secs: int
+                            ) -> List[Tuple[int, int]]:
+    """ Splits the supplied window into sub windows that are no longer than
+    the Topology Master's retention period. The sub window boundaries are
+    aligned to multiples of the retention period since the epoch, so that the
+    same sub windows recur across requests.
+
+    Arguments:
+        start (int):    The start of the window in seconds since the epoch.
+        end (int):  The end of the window in seconds since the epoch.
+        retention_secs (int):   The retention period in seconds.
+
+    Returns:
+        list:   A list of (start, end) tuples, in seconds since the epoch, for
+        each sub window. Neighbouring sub windows share their boundary.
+    """
+
+    boundaries: List[int] = list(range(
+        start // retention_secs * retention_secs + retention_secs, end,
+        retention_secs))
+
+    points: List[int] = [start] + boundaries + [end]
+
+    return list(zip(points[:-1], points[1:]))
 
 
 class HeronTMasterClient(HeronMetricsClient):
@@ -174,9 +464,23 @@ class HeronTMasterClient(HeronMetricsClient):
         self.tracker_url = config[ConfKeys.HERON_TRACKER_URL.value]
         self.time_limit_hrs = \
             config.get(ConfKeys.HERON_TMASTER_METRICS_MAX_HOURS.value, 3)
+        self.fetch_workers: int = max(1, int(config.get(
+            ConfKeys.HERON_TMASTER_METRICS_FETCH_WORKERS.value,
+            DEFAULT_FETCH_WORKERS)))
+        self.retention_secs: int = int(float(self.time_limit_hrs) * 3600)
+
+        cache_dir: Optional[str] = \
+            config.get(ConfKeys.HERON_TMASTER_METRICS_CACHE_DIR.value)
+        self.cache_store: Optional[ParquetMetricsStore] = \
+            ParquetMetricsStore(cache_dir) if cache_dir else None
 
         LOG.info("Created Topology Master metrics client using Heron Tracker "
-                 "at: %s", self.tracker_url)
+                 "at: %s with %d fetch worker(s)", self.tracker_url,
+                 self.fetch_workers)
+
+        if self.cache_store:
+            LOG.info("Topology Master metrics will be cached at: %s",
+                     self.cache_store.root_dir)
 
     def __hash__(self) -> int:
 
@@ -208,6 +512,389 @@ class HeronTMasterClient(HeronMetricsClient):
 
         return logical_plan, start_time, end_time
 
+    def _fetch_components(self, fetch_method: Callable[..., Any],
+                          metric_description: str, topology_id: str,
+                          cluster: str, environ: str, components: List[str],
+                          start: int, end: int,
+                          logical_plan: Dict[str, Any],
+                          workers: Optional[int] = None
+                          ) -> Tuple[List[Any], List[str]]:
+        """ Helper method for running the supplied per-component fetch method
+        against each of the supplied components. The requests are issued
+        through a thread pool bounded by the supplied number of workers.
+        Components whose requests fail with a HTTP error are skipped and
+        reported in the returned list of failed components.
+
+        Arguments:
+            fetch_method (function):    One of the get_component_* methods of
+                                        this client.
+            metric_description (str):   Description of the metric being
+                                        fetched, used for logging failures.
+            topology_id (str):    The topology identification string.
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in.
+            components (list):  The names of the components to be queried.
+            start (int):    Start time for the query as a UTC POSIX time
+                            integer.
+            end (int):  End time for the query as a UTC POSIX time integer.
+            logical_plan (dict):    The logical plan of the topology.
+            workers (int):  Optional maximum number of concurrent requests.
+                            Defaults to the configured number of fetch
+                            workers.
+
+        Returns:
+            tuple:  A list of the fetch method results, one for each component
+            that returned metrics, in the same order as the supplied
+            components list, and a list of the names of the components whose
+            requests failed.
+        """
+
+        workers = min(workers or self.fetch_workers, max(len(components), 1))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures: List[Future] = [
+                executor.submit(fetch_method, topology_id, cluster, environ,
+                                component, start, end, logical_plan)
+                for component in components]
+
+        output: List[pd.DataFrame] = []
+        failed: List[str] = []
+
+        component: str
+        future: Future
+        for component, future in zip(components, futures):
+            try:
+                component_df: pd.DataFrame = future.result()
+            except HTTPError as http_error:
+                LOG.warning("Fetching %s for component %s failed with status "
+                            "code %s", metric_description, component,
+                            str(http_error.response.status_code))
+                failed.append(component)
+            else:
+                if component_df is not None:
+                    output.append(component_df)
+
+        return output, failed
+
+    def _max_requests(self) -> int:
+        """ Returns the maximum number of Heron Tracker requests this client
+        issues concurrently for a single query. """
+
+        return self.fetch_workers
+
+    def _complete_latencies_available(self, topology_id: str, cluster: str,
+                                      environ: str) -> bool:
+        """ Checks that the supplied topology will actually have complete
+        latencies. Only ATLEAST_ONCE and EXACTLY_ONCE will have complete
+        latency values as acking is disabled for ATMOST_ONCE.
+
+        Raises:
+            RuntimeWarning: If the specified topology has a reliability mode
+                            that does not enable complete latency.
+        """
+
+        physical_plan: Dict[str, Any] = tracker.get_physical_plan(
+            self.tracker_url, cluster, environ, topology_id)
+
+        return check_reliability_mode(physical_plan, topology_id)
+
+    def get_component_metric_families(
+            self, topology_id: str, cluster: str, environ: str,
+            component_name: str, start: int, end: int, families: List[str],
+            logical_plan: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+        """ Gets the timeseries of each of the supplied metric families for
+        every instance of the specified component, using a single request to
+        the Heron Tracker metrics timeline endpoint. The start and end times
+        define the window over which to gather the metrics.
+
+        Arguments:
+            topology_id (str):    The topology identification string.
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            component_name (str):   The name of the component whose metrics are
+                                    required.
+            start (int):    Start time for the time period the query is run
+                            against. This should be a UTC POSIX time integer
+                            (seconds since epoch).
+            end (int):  End time for the time period the query is run against.
+                        This should be a UTC POSIX time integer (seconds since
+                        epoch).
+            families (list):    The names of the metric families (keys of
+                                METRIC_FAMILIES) to be fetched.
+            logical_plan (dict):    Optional dictionary logical plan returned
+                                    by the Heron Tracker API. If not supplied
+                                    this method will call the API to get the
+                                    logical plan.
+
+        Returns:
+            dict:   A dictionary mapping from metric family name to a DataFrame
+            containing that family's measurements as a timeseries, in the same
+            format as returned by the individual get_component_* methods.
+
+        Raises:
+            RuntimeError:   If an unknown metric family is supplied.
+        """
+
+        _check_families(families)
+
+        if not logical_plan:
+            LOG.debug("Logical plan not supplied, fetching from Heron Tracker")
+            logical_plan = tracker.get_logical_plan(self.tracker_url, cluster,
+                                                    environ, topology_id)
+
+        metrics, prefixes = family_metric_names(logical_plan, component_name,
+                                                families)
+
+        results: Optional[Dict[str, Any]] = None
+
+        if metrics:
+            results = tracker.get_metrics_timeline(
+                self.tracker_url, cluster, environ, topology_id,
+                component_name, start, end, metrics)
+
+        return timelines_to_families(results, families, prefixes)
+
+    def get_metric_families(self, topology_id: str, cluster: str,
+                            environ: str, start: dt.datetime,
+                            end: dt.datetime, families: List[str],
+                            **kwargs: Union[str, int, float]
+                            ) -> Dict[str, pd.DataFrame]:
+        """ Gets the timeseries of each of the supplied metric families for
+        every instance of the components that report them. All the families
+        for a component are fetched with a single Heron Tracker request. The
+        start and end times define the window over which to gather the
+        metrics.
+
+        Windows longer than the Topology Master's retention period (the
+        "heron.tmaster.metrics.max.hours" key) are split into retention
+        aligned sub windows which are fetched concurrently and stitched back
+        together. If the "heron.tmaster.metrics.cache.dir" key is set, the
+        fetched metrics are also kept in a local Parquet store and only the
+        minutes missing from the store are requested. As the Topology Master
+        only holds its retention period of metrics, older minutes can only be
+        returned from the store.
+
+        Arguments:
+            topology_id (str):    The topology identification string.
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            start (datetime):    utc datetime instance for the start of the
+                                    metrics gathering period.
+            end (datetime):  utc datetime instance for the end of the
+                                metrics gathering period.
+            families (list):    The names of the metric families (keys of
+                                METRIC_FAMILIES) to be fetched.
+
+        Returns:
+            dict:   A dictionary mapping from metric family name to a DataFrame
+            containing that family's measurements, in the same format as
+            returned by the corresponding get_* method (eg. get_service_times
+            for "service_times").
+
+        Raises:
+            RuntimeError:   If an unknown metric family is supplied or if no
+                            cache is configured and the window is entirely
+                            outside of the Topology Master's retention period.
+            RuntimeWarning: If part of the window is outside of the retention
+                            period and not in the cache.
+        """
+
+        _check_families(families)
+
+        if (self.cache_store is None and
+                (end - start).total_seconds() <= self.retention_secs):
+            return self._get_window_families(topology_id, cluster, environ,
+                                             start, end, families)[0]
+
+        start_secs: int = to_epoch_secs(start)
+        end_secs: int = to_epoch_secs(end)
+
+        keys: Dict[str, MetricKey] = {
+            family_name: MetricKey(topology_id, cluster, environ,
+                                   "tmaster-" + family_name)
+            for family_name in families}
+
+        if self.cache_store:
+            missing_minutes: np.ndarray = np.empty(0, dtype=np.int64)
+            for key in keys.values():
+                for window_start, window_end in \
+                        self.cache_store.missing_windows(key, start, end):
+                    missing_minutes = np.union1d(
+                        missing_minutes,
+                        np.arange(window_start, window_end, MINUTE_SECS))
+            # Missing minutes are fetched up to the end of the window
+            missing: List[Tuple[int, int]] = [
+                (max(window_start, start_secs),
+                 min(window_end - MINUTE_SECS, end_secs))
+                for window_start, window_end
+                in contiguous_windows(missing_minutes)]
+        else:
+            time_check(start, end, self.time_limit_hrs)
+            missing = [(start_secs, end_secs)]
+
+        # Sub windows start a minute after the retention limit so they are
+        # still retained by the time their requests are made
+        limit_secs: int = ((int(time.time()) - self.retention_secs) //
+                           MINUTE_SECS * MINUTE_SECS + 2 * MINUTE_SECS)
+
+        windows: List[Tuple[int, int]] = []
+        unavailable: List[Tuple[int, int]] = []
+
+        for window_start, window_end in missing:
+            if window_end < limit_secs:
+                unavailable.append((window_start, window_end))
+                continue
+            if window_start < limit_secs:
+                unavailable.append((window_start, limit_secs))
+                window_start = limit_secs
+            windows.extend(split_retention_windows(window_start, window_end,
+                                                   self.retention_secs))
+
+        if unavailable and self.cache_store:
+            unavailable_msg: str = (
+                f"{len(unavailable)} period(s) of the window from "
+                f"{start.isoformat()} to {end.isoformat()}, starting at "
+                f"{from_epoch_secs(unavailable[0][0]).isoformat()}, are "
+                f"beyond the {self.time_limit_hrs} hours stored by the "
+                f"Topology Master and are not in the local cache. Results "
+                f"will not include these periods.")
+            LOG.warning(unavailable_msg)
+            warnings.warn(unavailable_msg, RuntimeWarning)
+
+        LOG.info("Fetching metric families: %s for topology %s in %d sub "
+                 "window(s)", str(families), topology_id, len(windows))
+
+        # The request budget is split between the concurrently fetched sub
+        # windows, so the Heron Tracker never sees more than the configured
+        # number of requests at once
+        window_workers: int = min(self._max_requests(), max(len(windows), 1))
+        component_workers: int = max(1,
+                                     self._max_requests() // window_workers)
+
+        def fetch_window(window: Tuple[int, int]
+                         ) -> Tuple[float, Dict[str, pd.DataFrame],
+                                    List[str]]:
+            fetched_at: float = time.time()
+            frames, failed = self._get_window_families(
+                topology_id, cluster, environ, from_epoch_secs(window[0]),
+                from_epoch_secs(window[1]), families, component_workers)
+            return fetched_at, frames, failed
+
+        if len(windows) > 1:
+            with ThreadPoolExecutor(max_workers=window_workers) as executor:
+                results: List[Tuple[float, Dict[str, pd.DataFrame],
+                                    List[str]]] = \
+                    list(executor.map(fetch_window, windows))
+        else:
+            results = [fetch_window(window) for window in windows]
+
+        if not self.cache_store:
+            return {family_name: schema.deduplicate(frame)
+                    for family_name, frame in combine_families(
+                        families, [frames for _, frames, _ in results]
+                    ).items()}
+
+        for (window_start, window_end), (fetched_at, frames, failed) in \
+                zip(windows, results):
+
+            settled_before: int = int(fetched_at) - DEFAULT_CACHE_SETTLE_SECS
+
+            if failed:
+                # The measurements that were fetched are stored but none of
+                # the window is marked as covered, so the whole window is
+                # requested again by the next query
+                LOG.warning("Not caching the window from %s to %s as covered "
+                            "as the requests for components %s failed",
+                            from_epoch_secs(window_start).isoformat(),
+                            from_epoch_secs(window_end).isoformat(),
+                            str(failed))
+                settled_before = window_start // MINUTE_SECS * MINUTE_SECS
+
+            for family_name, frame in frames.items():
+                self.cache_store.write(
+                    keys[family_name], frame,
+                    window_start // MINUTE_SECS * MINUTE_SECS,
+                    window_end // MINUTE_SECS * MINUTE_SECS + MINUTE_SECS,
+                    settled_before)
+
+        return {family_name: schema.deduplicate(schema.validate(
+            self.cache_store.read(key, start, end), "get_" + family_name))
+                for family_name, key in keys.items()}
+
+    def _get_window_families(self, topology_id: str, cluster: str,
+                             environ: str, start: dt.datetime,
+                             end: dt.datetime, families: List[str],
+                             workers: Optional[int] = None
+                             ) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+        """ Gets the timeseries of each of the supplied metric families for
+        every instance of the components that report them, over a single
+        window. The window duration should be less than 3 hours as this is
+        the limit of what the Topology master stores.
+
+        Arguments:
+            topology_id (str):    The topology identification string.
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in (eg.
+                            prod, devel, test, etc).
+            start (datetime):    utc datetime instance for the start of the
+                                    metrics gathering period.
+            end (datetime):  utc datetime instance for the end of the
+                                metrics gathering period.
+            families (list):    The names of the metric families (keys of
+                                METRIC_FAMILIES) to be fetched.
+            workers (int):  Optional maximum number of concurrent Heron
+                            Tracker requests. Defaults to the configured
+                            number of fetch workers.
+
+        Returns:
+            tuple:  A dictionary mapping from metric family name to a
+            DataFrame containing that family's measurements, in the same
+            format as returned by the corresponding get_* method (eg.
+            get_service_times for "service_times"), and a list of the names of
+            the components whose requests failed and so are missing from the
+            measurements.
+
+        Raises:
+            RuntimeError:   If an unknown metric family is supplied.
+        """
+
+        _check_families(families)
+
+        LOG.info("Getting metric families: %s for topology %s over a %d "
+                 "second period from %s to %s", str(families), topology_id,
+                 (end-start).total_seconds(), start.isoformat(),
+                 end.isoformat())
+
+        logical_plan, start_time, end_time = self._query_setup(
+            topology_id, cluster, environ, start, end)
+
+        fetch_families: List[str] = list(families)
+
+        if ("complete_latencies" in fetch_families and
+                not self._complete_latencies_available(topology_id, cluster,
+                                                       environ)):
+            fetch_families.remove("complete_latencies")
+
+        comp_families: Dict[str, List[str]] = component_families(
+            logical_plan, fetch_families)
+
+        def fetch_component(topology_id: str, cluster: str, environ: str,
+                            component: str, start: int, end: int,
+                            logical_plan: Dict[str, Any]
+                            ) -> Dict[str, pd.DataFrame]:
+            return self.get_component_metric_families(
+                topology_id, cluster, environ, component, start, end,
+                comp_families[component], logical_plan)
+
+        output, failed = self._fetch_components(
+            fetch_component, ", ".join(fetch_families), topology_id, cluster,
+            environ, list(comp_families), start_time, end_time, logical_plan,
+            workers)
+
+        return combine_families(families, output), failed
+
     def get_component_service_times(self, topology_id: str, cluster: str,
                                     environ: str, component_name: str,
                                     start: int, end: int, logical_plan:
@@ -255,38 +942,9 @@ class HeronTMasterClient(HeronMetricsClient):
         LOG.info("Getting service time metrics for component %s of topology "
                  "%s", component_name, topology_id)
 
-        if not logical_plan:
-            LOG.debug("Logical plan not supplied, fetching from Heron Tracker")
-            logical_plan = tracker.get_logical_plan(self.tracker_url, cluster,
-                                                    environ, topology_id)
-
-        incoming_streams: List[Tuple[str, str]] = \
-            tracker.incoming_sources_and_streams(logical_plan, component_name)
-
-        metrics: List[str] = ["__execute-latency/" + source + "/" + stream
-                              for source, stream in incoming_streams]
-
-        results: Dict[str, Any] = tracker.get_metrics_timeline(
-            self.tracker_url, cluster, environ, topology_id, component_name,
-            start, end, metrics)
-
-        output: pd.DataFrame = None
-
-        for stream_metric, instance_timelines in results["timeline"].items():
-            metric_list: List[str] = stream_metric.split("/")
-            incoming_source: str = metric_list[1]
-            incoming_stream: str = metric_list[2]
-
-            instance_tls_df: pd.DataFrame = instance_timelines_to_dataframe(
-                instance_timelines, incoming_stream, "latency_ms",
-                str_nano_to_float_milli, incoming_source)
-
-            if output is None:
-                output = instance_tls_df
-            else:
-                output = output.append(instance_tls_df, ignore_index=True)
-
-        return output
+        return self.get_component_metric_families(
+            topology_id, cluster, environ, component_name, start, end,
+            ["service_times"], logical_plan)["service_times"]
 
     def get_service_times(self, topology_id: str, cluster: str, environ: str,
                           start: dt.datetime, end: dt.datetime,
@@ -328,34 +986,9 @@ class HeronTMasterClient(HeronMetricsClient):
                  (end-start).total_seconds(), start.isoformat(),
                  end.isoformat())
 
-        logical_plan, start_time, end_time = self._query_setup(
-            topology_id, cluster, environ, start, end)
-
-        output: pd.DataFrame = None
-
-        bolts: Dict[str, Any] = logical_plan["bolts"]
-        bolt_component: str
-        for bolt_component in bolts:
-
-            try:
-                bolt_service_times: pd.DataFrame = \
-                        self.get_component_service_times(topology_id,
-                                                         cluster, environ,
-                                                         bolt_component,
-                                                         start_time, end_time,
-                                                         logical_plan)
-            except HTTPError as http_error:
-                LOG.warning("Fetching execute latencies  for component %s "
-                            "failed with status code %s", bolt_component,
-                            str(http_error.response.status_code))
-            else:
-                if output is None:
-                    output = bolt_service_times
-                else:
-                    output = output.append(bolt_service_times,
-                                           ignore_index=True)
-
-        return output
+        return self.get_metric_families(
+            topology_id, cluster, environ, start, end,
+            ["service_times"])["service_times"]
 
     def get_component_emission_counts(self, topology_id: str, cluster: str,
                                       environ: str, component_name: str,
@@ -404,36 +1037,9 @@ class HeronTMasterClient(HeronMetricsClient):
         LOG.info("Getting emit count metrics for component %s of topology "
                  "%s", component_name, topology_id)
 
-        if not logical_plan:
-            LOG.debug("Logical plan not supplied, fetching from Heron Tracker")
-            logical_plan = tracker.get_logical_plan(self.tracker_url, cluster,
-                                                    environ, topology_id)
-
-        outgoing_streams: List[str] = tracker.get_outgoing_streams(
-            logical_plan, component_name)
-
-        metrics: List[str] = ["__emit-count/" + stream
-                              for stream in outgoing_streams]
-
-        results: Dict[str, Any] = tracker.get_metrics_timeline(
-            self.tracker_url, cluster, environ, topology_id, component_name,
-            start, end, metrics)
-
-        output: pd.DataFrame = None
-
-        for stream_metric, instance_timelines in results["timeline"].items():
-            outgoing_stream: str = stream_metric.split("/")[-1]
-
-            instance_tls_df: pd.DataFrame = instance_timelines_to_dataframe(
-                instance_timelines, outgoing_stream, "emit_count",
-                lambda m: int(float(m)))
-
-            if output is None:
-                output = instance_tls_df
-            else:
-                output = output.append(instance_tls_df, ignore_index=True)
-
-        return output
+        return self.get_component_metric_families(
+            topology_id, cluster, environ, component_name, start, end,
+            ["emit_counts"], logical_plan)["emit_counts"]
 
     def get_emit_counts(self, topology_id: str, cluster: str, environ: str,
                         start: dt.datetime, end: dt.datetime,
@@ -473,32 +1079,9 @@ class HeronTMasterClient(HeronMetricsClient):
                  (end-start).total_seconds(), start.isoformat(),
                  end.isoformat())
 
-        logical_plan, start_time, end_time = self._query_setup(
-            topology_id, cluster, environ, start, end)
-
-        output: pd.DataFrame = None
-
-        components: List[str] = (list(logical_plan["spouts"].keys()) +
-                                 list(logical_plan["bolts"].keys()))
-
-        for component in components:
-
-            try:
-                comp_emit_counts: pd.DataFrame = \
-                        self.get_component_emission_counts(
-                            topology_id, cluster, environ, component,
-                            start_time, end_time, logical_plan)
-            except HTTPError as http_error:
-                LOG.warning("Fetching emit counts for component %s failed with"
-                            " status code %s", component,
-                            str(http_error.response.status_code))
-
-            if output is None:
-                output = comp_emit_counts
-            else:
-                output = output.append(comp_emit_counts, ignore_index=True)
-
-        return output
+        return self.get_metric_families(
+            topology_id, cluster, environ, start, end,
+            ["emit_counts"])["emit_counts"]
 
     def get_component_execute_counts(self, topology_id: str, cluster: str,
                                      environ: str, component_name: str,
@@ -547,38 +1130,9 @@ class HeronTMasterClient(HeronMetricsClient):
         LOG.info("Getting execute count metrics for component %s of topology "
                  "%s", component_name, topology_id)
 
-        if not logical_plan:
-            LOG.debug("Logical plan not supplied, fetching from Heron Tracker")
-            logical_plan = tracker.get_logical_plan(self.tracker_url, cluster,
-                                                    environ, topology_id)
-
-        incoming_streams: List[Tuple[str, str]] = \
-            tracker.incoming_sources_and_streams(logical_plan, component_name)
-
-        metrics: List[str] = ["__execute-count/" + source + "/" + stream
-                              for source, stream in incoming_streams]
-
-        results: Dict[str, Any] = tracker.get_metrics_timeline(
-            self.tracker_url, cluster, environ, topology_id, component_name,
-            start, end, metrics)
-
-        output: pd.DataFrame = None
-
-        for stream_metric, instance_timelines in results["timeline"].items():
-            metric_list: List[str] = stream_metric.split("/")
-            incoming_source: str = metric_list[1]
-            incoming_stream: str = metric_list[2]
-
-            instance_tls_df: pd.DataFrame = instance_timelines_to_dataframe(
-                instance_timelines, incoming_stream, "execute_count",
-                lambda m: int(float(m)), incoming_source)
-
-            if output is None:
-                output = instance_tls_df
-            else:
-                output = output.append(instance_tls_df, ignore_index=True)
-
-        return output
+        return self.get_component_metric_families(
+            topology_id, cluster, environ, component_name, start, end,
+            ["execute_counts"], logical_plan)["execute_counts"]
 
     def get_execute_counts(self, topology_id: str, cluster: str, environ: str,
                            start: dt.datetime, end: dt.datetime,
@@ -620,30 +1174,9 @@ class HeronTMasterClient(HeronMetricsClient):
                  (end-start).total_seconds(), start.isoformat(),
                  end.isoformat())
 
-        logical_plan, start_time, end_time = self._query_setup(
-            topology_id, cluster, environ, start, end)
-
-        output: pd.DataFrame = None
-
-        for component in logical_plan["bolts"].keys():
-
-            try:
-                comp_execute_counts: pd.DataFrame = \
-                        self.get_component_execute_counts(topology_id, cluster,
-                                                          environ, component,
-                                                          start_time, end_time,
-                                                          logical_plan)
-            except HTTPError as http_error:
-                LOG.warning("Fetching execute counts for component %s failed "
-                            "with status code %s", component,
-                            str(http_error.response.status_code))
-
-            if output is None:
-                output = comp_execute_counts
-            else:
-                output = output.append(comp_execute_counts, ignore_index=True)
-
-        return output
+        return self.get_metric_families(
+            topology_id, cluster, environ, start, end,
+            ["execute_counts"])["execute_counts"]
 
     def get_spout_complete_latencies(self, topology_id: str, cluster: str,
                                      environ: str, component_name: str,
@@ -693,37 +1226,9 @@ class HeronTMasterClient(HeronMetricsClient):
         LOG.info("Getting complete latency metrics for component %s of "
                  "topology %s", component_name, topology_id)
 
-        if not logical_plan:
-            LOG.debug("Logical plan not supplied, fetching from Heron Tracker")
-            logical_plan = tracker.get_logical_plan(self.tracker_url, cluster,
-                                                    environ, topology_id)
-
-        outgoing_streams: List[str] = \
-            tracker.get_outgoing_streams(logical_plan, component_name)
-
-        metrics: List[str] = ["__complete-latency/" + stream
-                              for stream in outgoing_streams]
-
-        results: Dict[str, Any] = tracker.get_metrics_timeline(
-            self.tracker_url, cluster, environ, topology_id, component_name,
-            start, end, metrics)
-
-        output: pd.DataFrame = None
-
-        for stream_metric, instance_timelines in results["timeline"].items():
-            metric_list: List[str] = stream_metric.split("/")
-            outgoing_stream: str = metric_list[1]
-
-            instance_tls_df: pd.DataFrame = instance_timelines_to_dataframe(
-                instance_timelines, outgoing_stream, "latency_ms",
-                str_nano_to_float_milli)
-
-            if output is None:
-                output = instance_tls_df
-            else:
-                output = output.append(instance_tls_df, ignore_index=True)
-
-        return output
+        return self.get_component_metric_families(
+            topology_id, cluster, environ, component_name, start, end,
+            ["complete_latencies"], logical_plan)["complete_latencies"]
 
     def get_complete_latencies(self, topology_id: str, cluster: str,
                                environ: str, start: dt.datetime,
@@ -770,47 +1275,9 @@ class HeronTMasterClient(HeronMetricsClient):
                  (end-start).total_seconds(), start.isoformat(),
                  end.isoformat())
 
-        logical_plan, start_time, end_time = self._query_setup(
-            topology_id, cluster, environ, start, end)
-
-        # First we need to check that the supplied topology will actually have
-        # complete latencies. Only ATLEAST_ONCE and EXACTLY_ONCE will have
-        # complete latency values as acking is disabled for ATMOST_ONCE.
-        physical_plan: Dict[str, Any] = tracker.get_physical_plan(
-            self.tracker_url, cluster, environ, topology_id)
-        if (physical_plan["config"]
-                ["topology.reliability.mode"] == "ATMOST_ONCE"):
-            rm_msg: str = (f"Topology {topology_id} reliability mode is set "
-                           f"to ATMOST_ONCE. Complete latency is not "
-                           f"available for these types of topologies")
-            LOG.warning(rm_msg)
-            warnings.warn(rm_msg, RuntimeWarning)
-            return pd.DataFrame()
-
-        output: pd.DataFrame = None
-
-        spouts: Dict[str, Any] = logical_plan["spouts"]
-        for spout_component in spouts:
-
-            try:
-                spout_complete_latencies: pd.DataFrame = \
-                        self.get_spout_complete_latencies(topology_id,
-                                                          cluster, environ,
-                                                          spout_component,
-                                                          start_time, end_time,
-                                                          logical_plan)
-            except HTTPError as http_error:
-                LOG.warning("Fetching execute latencies  for component %s "
-                            "failed with status code %s", spout_component,
-                            str(http_error.response.status_code))
-
-            if output is None:
-                output = spout_complete_latencies
-            else:
-                output = output.append(spout_complete_latencies,
-                                       ignore_index=True)
-
-        return output
+        return self.get_metric_families(
+            topology_id, cluster, environ, start, end,
+            ["complete_latencies"])["complete_latencies"]
 
     def get_calculated_arrival_rates(self, topology_id: str, cluster: str, environ: str,
                                      start: dt.datetime, end: dt.datetime,
@@ -855,7 +1322,8 @@ class HeronTMasterClient(HeronMetricsClient):
             topology_id, cluster, environ, start, end)
 
         arrivals: pd.DataFrame = \
-            (execute_counts.groupby(["task", "component", "timestamp"])
+            (execute_counts.groupby(["task", "component", "timestamp"],
+                                    observed=True)["execute_count"]
              .sum().reset_index()
              .rename(index=str, columns={"execute_count": "arrival_count"}))
 
@@ -913,3 +1381,31 @@ class HeronTMasterClient(HeronMetricsClient):
         msg: str = "Unimplemented"
         LOG.error(msg)
         raise NotImplementedError(msg)
+
+    def get_end_to_end_latency(self, topology_id: str, cluster: str, environ: str, sink: str,
+                               start: [dt.datetime] = None, end: [dt.datetime] = None,
+                               **kwargs: Union[str, int, float]) -> pd.DataFrame:
+        msg: str = "Unimplemented"
+        LOG.error(msg)
+        raise NotImplementedError(msg)
+
+    def get_outgoing_queue_processing_rate(self, topology_id: str, cluster: str, environ: str,
+                                           start: [dt.datetime] = None, end: [dt.datetime] = None,
+                                           **kwargs: Union[str, int, float]) -> pd.DataFrame:
+        msg: str = "Unimplemented"
+        LOG.error(msg)
+        raise NotImplementedError(msg)
+
+    def get_out_going_queue_arrival_rate(self, topology_id: str, cluster: str, environ: str,
+                                         start: [dt.datetime] = None, end: [dt.datetime] = None,
+                                         **kwargs: Union[str, int, float]) -> pd.DataFrame:
+        msg: str = "Unimplemented"
+        LOG.error(msg)
+        raise NotImplementedError(msg)
+
+    def get_average_tuple_set_size_added_to_outgoing_queue(self, topology_id: str, cluster: str, environ: str,
+                                                           start: [dt.datetime] = None, end: [dt.datetime] = None,
+                                                           **kwargs: Union[str, int, float]) -> pd.DataFrame:
+        msg: str = "Unimplemented"
+        LOG.error(msg)
+        raise NotImplementedError(msg)
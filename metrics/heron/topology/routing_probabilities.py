@@ -62,16 +62,16 @@ def calculate_inter_instance_rps(metrics_client: HeronMetricsClient,
 
     # Get the instance to instance transfers
     transfer_counts: pd.DataFrame = rec_counts.groupby(
-        ["source_component", "source_task", "stream", "component", "task"]
-        )["receive_count"].sum().reset_index()
+        ["source_component", "source_task", "stream", "component", "task"],
+        observed=True)["receive_count"].sum().reset_index()
     transfer_counts.rename(index=str,
                            columns={"receive_count": "transfer_count"},
                            inplace=True)
 
     # Get the total emitted by each instance onto each stream
     total_emissions: pd.DataFrame = rec_counts.groupby(
-        ["source_component", "source_task", "stream", "component"]
-        )["receive_count"].sum().reset_index()
+        ["source_component", "source_task", "stream", "component"],
+        observed=True)["receive_count"].sum().reset_index()
     total_emissions.rename(index=str,
                            columns={"receive_count": "total_emitted"},
                            inplace=True)
@@ -152,7 +152,8 @@ def calculate_ISAP(metrics_client: HeronMetricsClient, topology_id: str,
 
     ex_counts_totals: pd.DataFrame = execute_counts.merge(
         execute_counts.groupby(
-            ["component", "stream", "source_component", "timestamp"])
+            ["component", "stream", "source_component", "timestamp"],
+            observed=True)
         .execute_count.sum().reset_index()
         .rename(index=str, columns={"execute_count": "component_total"}),
         on=["component", "stream", "source_component", "timestamp"])
@@ -248,7 +249,7 @@ def calc_current_inter_instance_rps(
     # time series for each instance
     # TODO: Look at other summary methods for ISAP time series
     r_probs: pd.DataFrame = (isap.groupby(["task", "component", "stream",
-                                           "source_component"])
+                                           "source_component"], observed=True)
                              .ISAP
                              .mean()
                              .reset_index()
@@ -0,0 +1,241 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" This module contains a base class for Heron metrics clients that wrap
+another Heron metrics client, adding behaviour (caching, recording etc) around
+its queries. """
+
+import logging
+
+import datetime as dt
+
+from typing import Dict, Any, Union, Optional
+
+from pandas import DataFrame
+
+from caladrius import loader
+from caladrius.config.keys import ConfKeys
+from caladrius.metrics.heron.client import HeronMetricsClient
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+
+def load_wrapped_client(config: Dict[str, Any]) -> HeronMetricsClient:
+    """ Creates the wrapped metrics client defined in the supplied wrapper
+    client configuration.
+
+    Arguments:
+        config (dict):  The wrapper client configuration. This should contain
+                        the class path of the wrapped client under the
+                        "wrapped.client" key and the configuration to be
+                        passed to it under the "wrapped.client.config" key.
+
+    Returns:
+        HeronMetricsClient: The wrapped client instance.
+
+    Raises:
+        KeyError:   If the wrapped client class path is not in the supplied
+                    configuration.
+    """
+
+    try:
+        class_path: str = config[ConfKeys.WRAPPED_CLIENT.value]
+    except KeyError:
+        msg: str = (f"Wrapper metrics client configuration requires the "
+                    f"class path of the wrapped client under the "
+                    f"'{ConfKeys.WRAPPED_CLIENT.value}' key")
+        LOG.error(msg)
+        raise KeyError(msg)
+
+    client_config: Dict[str, Any] = \
+        config.get(ConfKeys.WRAPPED_CLIENT_CONFIG.value, {})
+
+    return loader.get_class(class_path)(client_config)
+
+
+class HeronMetricsClientWrapper(HeronMetricsClient):
+    """ Base class for Heron metrics clients that wrap another Heron metrics
+    client. Every query method is routed through the _dispatch method, which
+    by default passes the query on to the wrapped client unchanged. Sub classes
+    override _dispatch to add their behaviour around the wrapped client.
+
+    Attributes not defined by the wrapper (for example client specific methods
+    like HeronTMasterClient.get_metric_families) are looked up on the wrapped
+    client.
+    """
+
+    def __init__(self, config: dict,
+                 client: Optional[HeronMetricsClient] = None) -> None:
+        """ Arguments:
+                config (dict):  The wrapper client configuration.
+                client (HeronMetricsClient):    Optional client instance to be
+                                                wrapped. If not supplied the
+                                                client is created from the
+                                                "wrapped.client" and
+                                                "wrapped.client.config" keys
+                                                of the supplied config.
+        """
+        super().__init__(config)
+
+        if client is None:
+            client = load_wrapped_client(config)
+
+        self.client: HeronMetricsClient = client
+
+    def __getattr__(self, name: str) -> Any:
+
+        # Only called when normal lookup fails. The guard stops infinite
+        # recursion if the client attribute has not been set yet.
+        if name == "client":
+            raise AttributeError(name)
+
+        return getattr(self.client, name)
+
+    def __hash__(self) -> int:
+
+        return hash((type(self).__name__, hash(self.client)))
+
+    def __eq__(self, other: object) -> bool:
+
+        if not isinstance(other, type(self)):
+            return False
+
+        return self.client == other.client
+
+    def _dispatch(self, metric: str, topology_id: str, cluster: str,
+                  environ: str, start: Optional[dt.datetime],
+                  end: Optional[dt.datetime],
+                  **kwargs: Any) -> DataFrame:
+        """ Runs the named query method of the wrapped client.
+
+        Arguments:
+            metric (str):   The name of the query method (eg.
+                            "get_service_times").
+            topology_id (str):    The topology identification string.
+            cluster (str):  The cluster the topology is running in.
+            environ (str):  The environment the topology is running in.
+            start (datetime):   The start of the query window.
+            end (datetime): The end of the query window.
+            **kwargs:   Any additional keyword arguments for the query.
+
+        Returns:
+            pandas.DataFrame:   The result of the query.
+        """
+
+        return getattr(self.client, metric)(topology_id, cluster, environ,
+                                            start=start, end=end, **kwargs)
+
+    def get_service_times(self, topology_id: str, cluster: str, environ: str,
+                          start: dt.datetime, end: dt.datetime,
+                          **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_service_times", topology_id, cluster,
+                              environ, start, end, **kwargs)
+
+    def get_receive_counts(self, topology_id: str, cluster: str, environ: str,
+                           start: dt.datetime, end: dt.datetime,
+                           **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_receive_counts", topology_id, cluster,
+                              environ, start, end, **kwargs)
+
+    def get_emit_counts(self, topology_id: str, cluster: str, environ: str,
+                        start: dt.datetime, end: dt.datetime,
+                        **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_emit_counts", topology_id, cluster,
+                              environ, start, end, **kwargs)
+
+    def get_execute_counts(self, topology_id: str, cluster: str, environ: str,
+                           start: dt.datetime, end: dt.datetime,
+                           **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_execute_counts", topology_id, cluster,
+                              environ, start, end, **kwargs)
+
+    def get_complete_latencies(self, topology_id: str, cluster: str,
+                               environ: str, start: dt.datetime,
+                               end: dt.datetime,
+                               **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_complete_latencies", topology_id, cluster,
+                              environ, start, end, **kwargs)
+
+    def get_calculated_arrival_rates(self, topology_id: str, cluster: str,
+                                     environ: str, start: dt.datetime,
+                                     end: dt.datetime,
+                                     **kwargs: Union[str, int, float]
+                                     ) -> DataFrame:
+        return self._dispatch("get_calculated_arrival_rates", topology_id,
+                              cluster, environ, start, end, **kwargs)
+
+    def get_incoming_queue_sizes(self, topology_id: str, cluster: str,
+                                 environ: str, start: dt.datetime = None,
+                                 end: dt.datetime = None,
+                                 **kwargs: Union[str, int, float]
+                                 ) -> DataFrame:
+        return self._dispatch("get_incoming_queue_sizes", topology_id,
+                              cluster, environ, start, end, **kwargs)
+
+    def get_cpu_load(self, topology_id: str, cluster: str, environ: str,
+                     start: dt.datetime = None, end: dt.datetime = None,
+                     **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_cpu_load", topology_id, cluster, environ,
+                              start, end, **kwargs)
+
+    def get_gc_time(self, topology_id: str, cluster: str, environ: str,
+                    start: dt.datetime = None, end: dt.datetime = None,
+                    **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_gc_time", topology_id, cluster, environ,
+                              start, end, **kwargs)
+
+    def get_num_packets_received(self, topology_id: str, cluster: str,
+                                 environ: str, start: dt.datetime = None,
+                                 end: dt.datetime = None,
+                                 **kwargs: Union[str, int, float]
+                                 ) -> DataFrame:
+        return self._dispatch("get_num_packets_received", topology_id,
+                              cluster, environ, start, end, **kwargs)
+
+    def get_packet_arrival_rate(self, topology_id: str, cluster: str,
+                                environ: str, start: dt.datetime = None,
+                                end: dt.datetime = None,
+                                **kwargs: Union[str, int, float]
+                                ) -> DataFrame:
+        return self._dispatch("get_packet_arrival_rate", topology_id, cluster,
+                              environ, start, end, **kwargs)
+
+    def get_tuple_arrivals_at_stmgr(self, topology_id: str, cluster: str,
+                                    environ: str, start: dt.datetime = None,
+                                    end: dt.datetime = None,
+                                    **kwargs: Union[str, int, float]
+                                    ) -> DataFrame:
+        return self._dispatch("get_tuple_arrivals_at_stmgr", topology_id,
+                              cluster, environ, start, end, **kwargs)
+
+    def get_end_to_end_latency(self, topology_id: str, cluster: str,
+                               environ: str, sink: str,
+                               start: dt.datetime = None,
+                               end: dt.datetime = None,
+                               **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_end_to_end_latency", topology_id, cluster,
+                              environ, start, end, sink=sink, **kwargs)
+
+    def get_outgoing_queue_processing_rate(
+            self, topology_id: str, cluster: str, environ: str,
+            start: dt.datetime = None, end: dt.datetime = None,
+            **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_outgoing_queue_processing_rate",
+                              topology_id, cluster, environ, start, end,
+                              **kwargs)
+
+    def get_out_going_queue_arrival_rate(
+            self, topology_id: str, cluster: str, environ: str,
+            start: dt.datetime = None, end: dt.datetime = None,
+            **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch("get_out_going_queue_arrival_rate", topology_id,
+                              cluster, environ, start, end, **kwargs)
+
+    def get_average_tuple_set_size_added_to_outgoing_queue(
+            self, topology_id: str, cluster: str, environ: str,
+            start: dt.datetime = None, end: dt.datetime = None,
+            **kwargs: Union[str, int, float]) -> DataFrame:
+        return self._dispatch(
+            "get_average_tuple_set_size_added_to_outgoing_queue", topology_id,
+            cluster, environ, start, end, **kwargs)
@@ -8,7 +8,7 @@ from abc import ABC, abstractmethod
 from typing import Any
 
 from caladrius.metrics.client import MetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 
 
 class Model(ABC):
@@ -24,8 +24,8 @@ class Model(ABC):
 
     @abstractmethod
     def __init__(self, config: dict, metrics_client: MetricsClient,
-                 graph_client: GremlinClient, **kwargs: Any) -> None:
+                 graph_client: GraphClient, **kwargs: Any) -> None:
 
         self.config: dict = config
         self.metrics_client: MetricsClient = metrics_client
-        self.graph_client: GremlinClient = graph_client
+        self.graph_client: GraphClient = graph_client
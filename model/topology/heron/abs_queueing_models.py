@@ -7,19 +7,22 @@
 from abc import abstractmethod
 import datetime as dt
 import pandas as pd
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from caladrius.metrics.client import MetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
+from caladrius.graph.analysis.heron import latency
+from caladrius.graph.utils.heron import get_spout_adjacency
+from caladrius.model.topology.heron.helpers import task_latencies
 
 
 class QueueingModels:
     """ Abstract base class for different queueing theory models """
-    def __init__(self, graph_client: GremlinClient, metrics_client: MetricsClient, paths: List,
+    def __init__(self, graph_client: GraphClient, metrics_client: MetricsClient, paths: Optional[List],
                  topology_id: str, cluster: str, environ: str,
                  start: dt.datetime, end: dt.datetime, kwargs: dict):
         self.metrics_client: MetricsClient = metrics_client
-        self.graph_client: GremlinClient = graph_client
+        self.graph_client: GraphClient = graph_client
         self.topology_id = topology_id
         self.paths = paths
         self.cluster = cluster
@@ -29,6 +32,7 @@ class QueueingModels:
         self.kwargs = kwargs
         self.service_rate: pd.DataFrame
         self.arrival_rate: pd.DataFrame
+        self.service_times: pd.DataFrame
 
     @abstractmethod
     def average_waiting_time(self) -> pd.DataFrame:
@@ -50,3 +54,24 @@ class QueueingModels:
         across all paths of a topology
         """
         pass
+
+    def end_to_end_latency_summary(self, top_k: int = 0) -> Dict[str, Any]:
+        """ Totals up execute latency and waiting times over the topology graph
+        to find the minimum, mean and maximum end to end latency and the critical
+        path for each sink and spout of the topology, without enumerating its paths.
+
+        Arguments:
+            top_k (int):    The number of the highest latency paths to include.
+
+        Returns:
+            A dictionary with "sinks" and "spouts" keys holding the latency summary
+            of each instance, and a "paths" key holding the top_k highest latency
+            paths in the same format as returned by end_to_end_latencies.
+        """
+        adjacency, spouts = get_spout_adjacency(self.graph_client, self.topology_id)
+        task_costs: Dict[int, float] = task_latencies(self.average_waiting_time(), self.service_times)
+
+        summary: Dict[str, Any] = latency.summarise_latencies(adjacency, spouts, task_costs)
+        summary["paths"] = latency.longest_paths(adjacency, spouts, task_costs, top_k)
+
+        return summary
@@ -7,7 +7,7 @@ performance model classes"""
 
 from abc import abstractmethod
 import datetime as dt
-from typing import Any, Dict
+from typing import Any, Dict, Union
 
 from caladrius.model.base import Model
 from caladrius.traffic_provider.trafficprovider import TrafficProvider
@@ -20,7 +20,7 @@ class HeronTopologyModel(Model):
     @abstractmethod
     def find_current_instance_waiting_times(self, topology_id: str, cluster: str,
                                             environ: str, traffic_source: TrafficProvider, start: dt.datetime,
-                                            end: dt.datetime, **kwargs: Any) -> list:
+                                            end: dt.datetime, **kwargs: Any) -> Union[list, Dict[str, Any]]:
         """ Applies queueing theory concepts to find the end to end latency of the
          specified topology.
         Arguments:
@@ -1,10 +1,14 @@
 """ This file contains helper functions. """
 
+import itertools
 import logging
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Union
+
+from caladrius.common.frames import FrameAccumulator
+from caladrius.graph.utils.path_store import PathSet
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
@@ -12,66 +16,67 @@ LOG: logging.Logger = logging.getLogger(__name__)
 def convert_throughput_to_inter_arr_times(arrivals_per_min: pd.DataFrame) -> pd.DataFrame:
     task_arrivals: pd.DataFrame = arrivals_per_min.groupby(["task"])
 
-    df: pd.DataFrame = pd.DataFrame(columns=['task', 'mean_inter_arrival_time', 'std_inter_arrival_time'])
+    df: FrameAccumulator = FrameAccumulator(columns=['task', 'mean_inter_arrival_time', 'std_inter_arrival_time'])
 
     for row in task_arrivals:
         data = row[1]
         # inter-arrival time = time in ms divided by number of tuples received in that time
         time = (60.0 * 1000)/data["num-tuples"]
-        df = df.append({'task': row[1]["task"].iloc[0],
-                       'mean_inter_arrival_time': time.mean(), 'std_inter_arrival_time': time.std()},
-                       ignore_index=True)
+        df.append_row({'task': row[1]["task"].iloc[0],
+                       'mean_inter_arrival_time': time.mean(), 'std_inter_arrival_time': time.std()})
 
-    return df
+    return df.to_frame()
 
 
 def process_execute_latencies(execute_latencies: pd.DataFrame) -> pd.DataFrame:
     latencies: pd.DataFrame = execute_latencies.groupby(["task"])
 
-    df: pd.DataFrame = pd.DataFrame(columns=['task', 'mean_service_time', 'std_service_time'])
+    df: FrameAccumulator = FrameAccumulator(columns=['task', 'mean_service_time', 'std_service_time'])
 
     for row in latencies:
         data = row[1]
         latencies = data["latency_ms"]
-        df = df.append({'task': row[1]["task"].iloc[0],
-                        'mean_service_time': latencies.mean(), 'std_service_time': latencies.std()},
-                       ignore_index=True)
+        df.append_row({'task': row[1]["task"].iloc[0],
+                       'mean_service_time': latencies.mean(), 'std_service_time': latencies.std()})
 
-    return df
+    return df.to_frame()
 
 
 def convert_service_times_to_rates(latencies: pd.DataFrame) -> pd.DataFrame:
     grouped_latencies: pd.DataFrame = latencies.groupby(["task"])
-    df: pd.DataFrame = pd.DataFrame(columns=['task', 'mean_service_rate'])
+    df: FrameAccumulator = FrameAccumulator(columns=['task', 'mean_service_rate'])
 
     for row in grouped_latencies:
         data = row[1]
         latencies = data["latency_ms"]
-        df = df.append({'task': row[1]["task"].iloc[0],
-                        'mean_service_rate': 1/latencies.mean()}, ignore_index=True)
+        df.append_row({'task': row[1]["task"].iloc[0],
+                       'mean_service_rate': 1/latencies.mean()})
 
-    return df
+    return df.to_frame()
 
 
 def convert_arr_rate_to_mean_arr_rate(throughput: pd.DataFrame) -> pd.DataFrame:
     grouped_throughput: pd.DataFrame = throughput.groupby(["task"])
-    df: pd.DataFrame = pd.DataFrame(columns=['task', 'mean_arrival_rate'])
+    df: FrameAccumulator = FrameAccumulator(columns=['task', 'mean_arrival_rate'])
     # per minute
     for row in grouped_throughput:
         data = row[1]
         throughput = data["num-tuples"]/(60.0 * 1000)
-        df = df.append({'task': row[1]["task"].iloc[0],
-                        'mean_arrival_rate': throughput.mean()}, ignore_index=True)
+        df.append_row({'task': row[1]["task"].iloc[0],
+                       'mean_arrival_rate': throughput.mean()})
 
-    return df
+    return df.to_frame()
 
 
-def find_end_to_end_latencies(paths: List[List[str]], waiting_times: pd.DataFrame, service_times: pd.DataFrame) -> list:
+def find_end_to_end_latencies(paths: Union[PathSet, List[List[int]]], waiting_times: pd.DataFrame, service_times: pd.DataFrame) -> list:
     """
     This function goes through all end to end paths in the
     topology (from source to sink) and calculates the total end to
     end latency for each path. This end to end latency is a summation of
     execute latency + queue waiting time for each bolt in the path.
+    Task ids are mapped to dense indices once and the paths are flattened
+    into a single array with offsets to the start of each path, so all the
+    path latencies are found with one gather and one np.add.reduceat.
     :param paths: All end to end topology paths from source to sink
     :param waiting_times: The amount of time each tuple has to wait
     in an instance's queue
@@ -81,18 +86,58 @@ def find_end_to_end_latencies(paths: List[List[str]], waiting_times: pd.DataFram
     """
     averaged_execute_latency = service_times[["task", "latency_ms"]].groupby("task").mean().reset_index()
     merged = averaged_execute_latency.merge(waiting_times, on=["task"])[["task", "mean_waiting_time", "latency_ms"]]
+    # only the first row for each task was used when looking up the tasks of a path
+    merged = merged.drop_duplicates(subset="task").sort_values("task")
+
+    tasks: np.ndarray = merged["task"].values.astype(np.int64)
+    task_latency: np.ndarray = (merged["latency_ms"] + merged["mean_waiting_time"]).values.astype(np.float64)
+
+    hops: np.ndarray
+    lengths: np.ndarray
+    if isinstance(paths, PathSet):
+        # stored paths are already flattened
+        hops, lengths = paths.tasks.astype(np.int64), paths.lengths()
+    else:
+        lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+        hops = np.fromiter(itertools.chain.from_iterable(paths), dtype=np.int64, count=int(lengths.sum()))
+
+    non_empty: np.ndarray = lengths > 0
+    if not non_empty.any():
+        return remap_keys({tuple(path): 0.0 for path in paths})
 
-    result = dict()
+    offsets: np.ndarray = np.cumsum(lengths) - lengths
 
-    for path in paths:
-        end_to_end_latency: np.float64 = 0.0
-        for x in range(len(path)):
-            row = merged.loc[(merged["task"] == path[x])]
-            end_to_end_latency = row["latency_ms"].tolist()[0] + row["mean_waiting_time"].tolist()[0] + end_to_end_latency
+    # map each task id on the paths to its dense index in the sorted tasks
+    indices: np.ndarray = np.searchsorted(tasks, hops)
+    indices[indices == len(tasks)] = 0
+    unknown: np.ndarray = tasks[indices] != hops if len(tasks) else np.ones(len(hops), dtype=bool)
+    if unknown.any():
+        msg: str = (f"No execute latency or waiting time available for tasks: "
+                    f"{sorted(set(hops[unknown].tolist()))}")
+        LOG.error(msg)
+        raise RuntimeError(msg)
 
-        result[tuple(path)] = end_to_end_latency
+    latencies: np.ndarray = np.zeros(len(paths), dtype=np.float64)
+    latencies[non_empty] = np.add.reduceat(task_latency[indices], offsets[non_empty])
+
+    return remap_keys(dict(zip(map(tuple, paths), latencies.tolist())))
+
+
+def task_latencies(waiting_times: pd.DataFrame, service_times: pd.DataFrame) -> Dict[int, float]:
+    """
+    This function calculates the latency each instance adds to a tuple passing
+    through it, which is its average execute latency + queue waiting time.
+    :param waiting_times: The amount of time each tuple has to wait
+    in an instance's queue
+    :param service_times: The amount of time it takes an instance
+    to process a tuple
+    :return: a dictionary mapping from task id to the instance's latency
+    """
+    averaged_execute_latency = service_times[["task", "latency_ms"]].groupby("task").mean().reset_index()
+    merged = averaged_execute_latency.merge(waiting_times, on=["task"])[["task", "mean_waiting_time", "latency_ms"]]
 
-    return remap_keys(result)
+    return dict(zip(merged["task"].astype(int).tolist(),
+                    (merged["latency_ms"] + merged["mean_waiting_time"]).tolist()))
 
 
 def remap_keys(latencies_dict: Dict[tuple, np.float64]):
@@ -117,7 +162,7 @@ def validate_queue_size(execute_counts: pd.DataFrame, tuple_arrivals: pd.DataFra
 
     grouped = merged.groupby(["task"])
 
-    df: pd.DataFrame = pd.DataFrame(columns=['task', 'actual-queue-size', 'timestamp'])
+    queue_sizes: FrameAccumulator = FrameAccumulator(columns=['task', 'actual-queue-size', 'timestamp'])
     for row in grouped:
         diff = 0
         for x in range(len(row[1])):
@@ -128,9 +173,9 @@ def validate_queue_size(execute_counts: pd.DataFrame, tuple_arrivals: pd.DataFra
             else:
                 diff = diff + row[1]["num-tuples"].iloc[x] - row[1]["execute_count"].iloc[x].astype(np.float64)
 
-            df = df.append({'task': row[1]["task"].iloc[0],
-                            'timestamp': row[1]["timestamp"].iloc[x],
-                            'actual-queue-size': diff}, ignore_index=True)
+            queue_sizes.append_row({'task': row[1]["task"].iloc[0],
+                                    'timestamp': row[1]["timestamp"].iloc[x],
+                                    'actual-queue-size': diff})
 
-    LOG.info(df.groupby("task")[["actual-queue-size"]].mean())
+    LOG.info(queue_sizes.to_frame().groupby("task")[["actual-queue-size"]].mean())
     return merged
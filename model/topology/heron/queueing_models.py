@@ -6,13 +6,14 @@
 
 import datetime as dt
 from functools import lru_cache
+from typing import List, Optional
 import pandas as pd
 
 from caladrius.metrics.client import MetricsClient
 from caladrius.model.topology.heron.abs_queueing_models import QueueingModels
 from caladrius.model.topology.heron.helpers import *
 from caladrius.traffic_provider.trafficprovider import TrafficProvider
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
@@ -37,18 +38,16 @@ class MMCQueue(QueueingModels):
     distribution. An extension of this model is one with multiple servers (denoted by variable 'c')
     and is called an M/M/c queue.
     """
-    def __init__(self, graph_client: GremlinClient, metrics_client: MetricsClient, paths, topology_id: str,
+    def __init__(self, graph_client: GraphClient, metrics_client: MetricsClient, paths: Optional[List],
+                 topology_id: str,
                  cluster: str, environ: str, start: dt.datetime, end: dt.datetime, other_kwargs: dict):
         """
         This function initializes relevant variables to calculate queue related metrics
         given an M/M/c model.
         """
 
-        super().__init__(metrics_client, paths, topology_id, cluster, environ, start, end, other_kwargs)
-
-        # ensure that paths are populated
-        if len(self.paths) == 0:
-            raise Exception("Topology paths are unavailable")
+        super().__init__(graph_client, metrics_client, paths, topology_id, cluster, environ, start, end,
+                         other_kwargs)
 
         # Get the service time for all elements
         service_times: pd.DataFrame = self.metrics_client.get_service_times(
@@ -80,6 +79,10 @@ class MMCQueue(QueueingModels):
         return merged
 
     def end_to_end_latencies(self) -> list:
+        # ensure that paths are populated
+        if not self.paths:
+            raise Exception("Topology paths are unavailable")
+
         merged: pd.DataFrame = self.average_waiting_time()
         queue_size: pd.DataFrame = self.average_queue_size()
         merged = merged.merge(queue_size, on=["task"])[["utilization", "task", "mean_waiting_time", "queue-size", "mean_arrival_rate_x"]]
@@ -95,7 +98,8 @@ class GGCQueue(QueueingModels):
     more realistic scenarios as arrival rates and processing rates do not necessarily fit probabilistic
     distributions (such as the Poisson distribution, used to describe arrival rates in M/M/1 queues).
     """
-    def __init__(self, graph_client: GremlinClient, metrics_client: MetricsClient, paths: List, topology_id: str,
+    def __init__(self, graph_client: GraphClient, metrics_client: MetricsClient, paths: Optional[List],
+                 topology_id: str,
                  cluster: str, environ: str, start: dt.datetime, end: dt.datetime,
                  traffic_provider: TrafficProvider, other_kwargs: dict):
         """
@@ -110,10 +114,6 @@ class GGCQueue(QueueingModels):
         """
         super().__init__(graph_client, metrics_client, paths, topology_id, cluster, environ, start, end, other_kwargs)
 
-        # ensure that paths are populated
-        if len(self.paths) == 0:
-            raise Exception("Topology paths are unavailable")
-
         self.service_times = traffic_provider.service_times()
         self.service_stats: pd.DataFrame = process_execute_latencies(self.service_times)
         self.arrival_rate = traffic_provider.arrival_rates()
@@ -152,6 +152,10 @@ class GGCQueue(QueueingModels):
         return self.queue_size
 
     def end_to_end_latencies(self) -> list:
+        # ensure that paths are populated
+        if not self.paths:
+            raise Exception("Topology paths are unavailable")
+
         merged: pd.DataFrame = self.average_waiting_time()
         # for validation only
         queue_size: pd.DataFrame = self.average_queue_size()
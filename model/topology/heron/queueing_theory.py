@@ -9,16 +9,16 @@ import logging
 
 import datetime as dt
 import pandas as pd
-from typing import Any, cast, Dict, Tuple
+from typing import Any, cast, Dict, List, Optional, Tuple, Union
 
 
 from caladrius.model.topology.heron.base import HeronTopologyModel
 from caladrius.model.topology.heron.abs_queueing_models import QueueingModels
 from caladrius.model.topology.heron.queueing_models import MMCQueue, GGCQueue
 from caladrius.metrics.heron.client import HeronMetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 from caladrius.graph.analysis.heron import arrival_rates
-from caladrius.graph.utils.heron import graph_check, read_paths
+from caladrius.graph.utils.heron import graph_check, read_paths, explicit_paths_enabled, LATENCY_TOP_K_KEY
 from caladrius.performance_prediction.predictor import Predictor
 from caladrius.performance_prediction.simple_predictor import SimplePredictor
 from caladrius.traffic_provider.trafficprovider import TrafficProvider
@@ -41,7 +41,7 @@ class QTTopologyModel(HeronTopologyModel):
 
     def __init__(self, config: Dict[str, Any],
                  metrics_client: HeronMetricsClient,
-                 graph_client: GremlinClient) -> None:
+                 graph_client: GraphClient) -> None:
         super().__init__(config, metrics_client, graph_client)
 
         self.metrics_client: HeronMetricsClient
@@ -72,10 +72,11 @@ class QTTopologyModel(HeronTopologyModel):
                 self.tracker_url, spout_traffic, **kwargs)
 
         # Sum the arrivals from each source component of each incoming stream
-        instance_ars.groupby(["task", "incoming_stream"]).sum()
+        instance_ars.groupby(["task", "incoming_stream"], observed=True).sum()
 
         in_ars: pd.DataFrame =  \
-            (instance_ars.groupby(["task", "incoming_stream"]).sum()
+            (instance_ars.groupby(["task", "incoming_stream"],
+                                  observed=True).sum()
              .reset_index().rename(index=str,
                                    columns={"incoming_stream": "stream"}))
 
@@ -84,7 +85,7 @@ class QTTopologyModel(HeronTopologyModel):
     def find_current_instance_waiting_times(self, topology_id: str, cluster: str,
                                             environ: str, traffic_source: TrafficProvider,
                                             start: dt.datetime, end: dt.datetime,
-                                            **kwargs: Any) -> list:
+                                            **kwargs: Any) -> Union[list, Dict[str, Any]]:
 
         LOG.info("Calculating end to end performance latency of topology "
                  "%s using queueing theory", topology_id)
@@ -95,11 +96,17 @@ class QTTopologyModel(HeronTopologyModel):
                                         for key, value in kwargs.items()
                                         if key not in ["start", "end"]}
 
-        paths = read_paths(other_kwargs, topology_id, cluster, environ)
+        if explicit_paths_enabled(self.config):
+            paths = read_paths(self.config, topology_id, cluster, environ)
 
-        queue: QueueingModels = GGCQueue(self.graph_client, self.metrics_client, paths,
-                                         topology_id, cluster, environ, start, end, traffic_source, other_kwargs)
-        return queue.end_to_end_latencies()
+            queue: QueueingModels = GGCQueue(self.graph_client, self.metrics_client, paths,
+                                             topology_id, cluster, environ, start, end, traffic_source, other_kwargs)
+            return queue.end_to_end_latencies()
+
+        # Summarise the latencies over the topology graph rather than enumerating every path
+        queue = GGCQueue(self.graph_client, self.metrics_client, None,
+                         topology_id, cluster, environ, start, end, traffic_source, other_kwargs)
+        return queue.end_to_end_latency_summary(int(self.config.get(LATENCY_TOP_K_KEY, 0)))
 
     def predict_current_performance(
             self, topology_id: str, cluster: str, environ: str,
@@ -146,7 +153,8 @@ class QTTopologyModel(HeronTopologyModel):
         # Calculate the median service time and rate
         service_time_summary: pd.DataFrame = \
             (service_times[["task", "stream", "latency_ms", "tuples_per_sec"]]
-             .groupby(["task", "stream"]).median().reset_index())
+             .groupby(["task", "stream"], observed=True).median()
+             .reset_index())
 
         # Get the reference of the latest physical graph entry for this
         # topology, or create a physical graph if there are non.
@@ -181,7 +189,10 @@ class QTTopologyModel(HeronTopologyModel):
                                         for key, value in kwargs.items()
                                         if key not in ["start", "end"]}
 
-        paths = read_paths(other_kwargs, topology_id, cluster, environ)
+        # The predictor only needs the paths in the explicit paths mode
+        paths: Optional[List] = None
+        if explicit_paths_enabled(self.config):
+            paths = read_paths(self.config, topology_id, cluster, environ)
 
         queue: QueueingModels = GGCQueue(self.graph_client, self.metrics_client, paths,
                                          topology_id, cluster, environ,
@@ -18,9 +18,10 @@ import pandas as pd
 from fbprophet import Prophet
 
 from caladrius.common.heron import tracker
+from caladrius.common.frames import FrameAccumulator
 from caladrius.metrics.heron.client import HeronMetricsClient
 from caladrius.model.traffic.heron.base import HeronTrafficModel
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
@@ -63,13 +64,15 @@ def build_component_models(
         raise RuntimeError(err)
 
     spout_comp_emits: pd.DataFrame = \
-        (spout_emits.groupby(["component", "stream", "timestamp"])
-         .mean()["emit_count"].reset_index())
+        (spout_emits.groupby(["component", "stream", "timestamp"],
+                             observed=True)
+         ["emit_count"].mean().reset_index())
 
     output: DefaultDict[str, Dict[str, Prophet]] = defaultdict(dict)
 
     for (spout_comp, stream), data in spout_comp_emits.groupby(["component",
-                                                                "stream"]):
+                                                                "stream"],
+                                                               observed=True):
 
         LOG.info("Creating traffic model for spout %s stream %s", spout_comp,
                  stream)
@@ -98,7 +101,7 @@ def predict_per_component(metric_client: HeronMetricsClient, tracker_url: str,
 
 
 def run_per_component(models: COMPONENT_MODELS, future_mins: int) -> pd.DataFrame:
-    output: pd.DataFrame = None
+    output: FrameAccumulator = FrameAccumulator()
 
     for spout_comp, stream_models in models.items():
         for stream, model in stream_models.items():
@@ -111,12 +114,9 @@ def run_per_component(models: COMPONENT_MODELS, future_mins: int) -> pd.DataFram
             forecast["stream"] = stream
             forecast["component"] = spout_comp
 
-            if output is None:
-                output = forecast
-            else:
-                output = output.append(forecast)
+            output.append(forecast)
 
-    return output
+    return output.to_frame(ignore_index=False)
 
 
 def build_instance_models(
@@ -145,7 +145,7 @@ def build_instance_models(
     spout_groups: pd.core.groupby.DataFrameGroupBy = \
         (spout_emits[["component", "task", "stream", "timestamp",
                       "emit_count"]]
-         .groupby(["component", "task", "stream"]))
+         .groupby(["component", "task", "stream"], observed=True))
 
     output: INSTANCE_MODELS = defaultdict(lambda: defaultdict(dict))
 
@@ -165,7 +165,7 @@ def build_instance_models(
 def run_per_instance_models(models: INSTANCE_MODELS,
                             future_mins: int) -> pd.DataFrame:
 
-    output: pd.DataFrame = None
+    output: FrameAccumulator = FrameAccumulator()
 
     for spout_comp, task_dict in models.items():
         for task, stream_models in task_dict.items():
@@ -180,12 +180,9 @@ def run_per_instance_models(models: INSTANCE_MODELS,
                 forecast["task"] = task
                 forecast["component"] = spout_comp
 
-                if output is None:
-                    output = forecast
-                else:
-                    output = output.append(forecast)
+                output.append(forecast)
 
-    return output
+    return output.to_frame(ignore_index=False)
 
 
 def predict_per_instance(metric_client: HeronMetricsClient, tracker_url: str,
@@ -213,7 +210,7 @@ class ProphetTrafficModel(HeronTrafficModel):
                         "a given amount of time into the future.")
 
     def __init__(self, config: dict, metrics_client: HeronMetricsClient,
-                 graph_client: GremlinClient) -> None:
+                 graph_client: GraphClient) -> None:
 
         super().__init__(config, metrics_client, graph_client)
 
@@ -321,7 +318,8 @@ class ProphetTrafficModel(HeronTrafficModel):
             cluster, environ, source_start, source_end, future_mins)
 
         traffic_by_component: pd.core.groupby.DataFrameGroupBy = \
-            component_traffic.groupby(["component", "stream"])
+            component_traffic.groupby(["component", "stream"],
+                                      observed=True)
 
         components: DefaultDict[str, DefaultDict[str, Dict[str, float]]] = \
             defaultdict(lambda: defaultdict(dict))
@@ -354,7 +352,7 @@ class ProphetTrafficModel(HeronTrafficModel):
             environ, source_start, source_end, future_mins)
 
         traffic_by_task: pd.core.groupby.DataFrameGroupBy = \
-            instance_traffic.groupby(["task", "stream"])
+            instance_traffic.groupby(["task", "stream"], observed=True)
 
         instances: DefaultDict[str, DefaultDict[str, Dict[str, float]]] = \
             defaultdict(lambda: defaultdict(dict))
@@ -17,7 +17,7 @@ import pandas as pd
 from caladrius.common.timestamp import calculate_ts_period
 from caladrius.model.traffic.heron.base import HeronTrafficModel
 from caladrius.metrics.heron.client import HeronMetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
@@ -35,7 +35,7 @@ class StatsSummaryTrafficModel(HeronTrafficModel):
                         "count metrics from the topologies spout instances.")
 
     def __init__(self, config: dict, metrics_client: HeronMetricsClient,
-                 graph_client: GremlinClient) -> None:
+                 graph_client: GraphClient) -> None:
 
         super().__init__(config, metrics_client, graph_client)
 
@@ -111,10 +111,10 @@ class StatsSummaryTrafficModel(HeronTrafficModel):
         end: dt.datetime = dt.datetime.now(dt.timezone.utc)
         start: dt.datetime = end - dt.timedelta(hours=source_hours)
 
-        spout_comps: List[str] = (self.graph_client.graph_traversal.V()
-                                  .has("topology_id", topology_id)
-                                  .hasLabel("spout").values("component")
-                                  .dedup().toList())
+        spout_comps: List[str] = list(dict.fromkeys(
+            str(instance["component"]) for instance
+            in self.graph_client.get_instances(topology_id)
+            if instance["label"] == "spout"))
 
         emit_counts: pd.DataFrame = self.metrics_client.get_emit_counts(
             topology_id, cluster, environ, start, end, **kwargs)
@@ -151,7 +151,8 @@ class StatsSummaryTrafficModel(HeronTrafficModel):
             defaultdict(lambda: defaultdict(dict))
 
         for (comp, stream), comp_data in \
-                spout_emit_counts.groupby(["component", "stream"]):
+                spout_emit_counts.groupby(["component", "stream"],
+                                          observed=True):
 
             LOG.debug("Processing component: %s stream: %s", comp, stream)
 
@@ -178,7 +179,8 @@ class StatsSummaryTrafficModel(HeronTrafficModel):
             defaultdict(lambda: defaultdict(dict))
 
         for (task_id, stream), task_data in \
-                spout_emit_counts.groupby(["task", "stream"]):
+                spout_emit_counts.groupby(["task", "stream"],
+                                          observed=True):
 
             LOG.debug("Processing instance: %d stream: %s", task_id, stream)
 
@@ -12,7 +12,7 @@ from typing import Any
 
 from caladrius.common.heron import tracker
 from caladrius.metrics.client import MetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 from caladrius.model.topology.heron.abs_queueing_models import QueueingModels
 from caladrius.model.topology.heron.helpers import *
 from caladrius.performance_prediction.util import util
@@ -24,10 +24,10 @@ class Predictor(object):
     """ Abstract base class for performance predictors """
     def __init__(self, topology_id: str, cluster: str, environ: str,
                  start: [dt.datetime], end: [dt.datetime], tracker_url: str, metrics_client: MetricsClient,
-                 graph_client: GremlinClient, queue: QueueingModels, **kwargs: Any) -> None:
+                 graph_client: GraphClient, queue: QueueingModels, **kwargs: Any) -> None:
 
         self.metrics_client: MetricsClient = metrics_client
-        self.graph_client: GremlinClient = graph_client
+        self.graph_client: GraphClient = graph_client
         self.topology_id = topology_id
         self.queue = queue
         self.cluster = cluster
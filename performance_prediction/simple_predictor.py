@@ -10,7 +10,7 @@ from typing import Any
 import json
 
 from caladrius.metrics.client import MetricsClient
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 from caladrius.model.topology.heron.abs_queueing_models import QueueingModels
 from caladrius.model.topology.heron.helpers import *
 from caladrius.performance_prediction.predictor import Predictor
@@ -19,7 +19,7 @@ from caladrius.performance_prediction.predictor import Predictor
 class SimplePredictor(Predictor):
     def __init__(self, topology_id: str, cluster: str, environ: str,
                  start: [dt.datetime], end: [dt.datetime], tracker_url: str, metrics_client: MetricsClient,
-                 graph_client: GremlinClient, queue: QueueingModels, **kwargs: Any):
+                 graph_client: GraphClient, queue: QueueingModels, **kwargs: Any):
         super().__init__(topology_id, cluster, environ, start, end, tracker_url,
                          metrics_client, graph_client, queue, **kwargs)
         self.GC_TIME_THRESHOLD = 500  # units --> ms
@@ -37,14 +37,14 @@ class SimplePredictor(Predictor):
                                                                 self.start, self.end, **self.kwargs)
 
         grouped_gc_time: pd.DataFrame = \
-            gc_time.groupby(["component", "task"]).mean().reset_index()[["component", "task", "gc-time"]]
+            gc_time.groupby(["component", "task"], observed=True).mean().reset_index()[["component", "task", "gc-time"]]
 
         grouped_gc_time.rename(index=str, columns={"gc-time": "av-gc-time"}, inplace=True)
 
         cpu_load: pd.DataFrame = self.metrics_client.get_cpu_load(self.topology_id, self.cluster,
                                                                   self.environ, self.start, self.end, **self.kwargs)
         grouped_cpu_load: pd.DataFrame = \
-            cpu_load.groupby(["component", "task"]).mean().reset_index()[["component", "task", "cpu-load"]]
+            cpu_load.groupby(["component", "task"], observed=True).mean().reset_index()[["component", "task", "cpu-load"]]
         grouped_cpu_load.rename(index=str, columns={"cpu-load": "av-cpu-load"}, inplace=True)
         merged: pd.DataFrame = grouped_cpu_load.merge(grouped_gc_time)
 
@@ -67,7 +67,7 @@ class SimplePredictor(Predictor):
         temp_merged["prop-time"] = temp_merged["av-gc-time"]/self.GC_TIME_THRESHOLD
 
         # we find the maximum proportion by which CPU and RAM need to be increased per component
-        maximum: pd.DataFrame = temp_merged.groupby("component").max().reset_index()
+        maximum: pd.DataFrame = temp_merged.groupby("component", observed=True).max().reset_index()
 
         # then, we multiply the resources already provisioned by the max proportion
         # they need to be increased by
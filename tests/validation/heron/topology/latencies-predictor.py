@@ -16,7 +16,7 @@ from typing import Dict, Any
 import pandas as pd
 from caladrius import loader, logs
 from caladrius.graph.gremlin.client import GremlinClient
-from caladrius.graph.utils.heron import graph_check, paths_check
+from caladrius.graph.utils.heron import graph_check, paths_check, LATENCY_MODE_KEY, PATHS_LATENCY_MODE
 from caladrius.metrics.heron.client import HeronMetricsClient
 from caladrius.model.topology.heron.queueing_theory import QTTopologyModel
 from caladrius.traffic_provider.current_traffic import CurrentTraffic
@@ -115,7 +115,10 @@ if __name__ == "__main__":
 
     traffic_provider: CurrentTraffic = CurrentTraffic(metrics_client, graph_client, topology, cluster,
                                                       environ, start, end, {}, **model_kwargs)
-    qt: QTTopologyModel = QTTopologyModel(CONFIG["heron.topology.models.config"], metrics_client, graph_client)
+    # The latency of every path is needed to compare the spread of the predictions
+    model_config: Dict[str, Any] = dict(CONFIG["heron.topology.models.config"])
+    model_config[LATENCY_MODE_KEY] = PATHS_LATENCY_MODE
+    qt: QTTopologyModel = QTTopologyModel(model_config, metrics_client, graph_client)
     results = pd.DataFrame(qt.find_current_instance_waiting_times(topology_id=topology, cluster=cluster, environ=environ,
                                                            traffic_source=traffic_provider, start=start, end=end,
                                                            **model_kwargs))
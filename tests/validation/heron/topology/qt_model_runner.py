@@ -67,7 +67,8 @@ def run(config: Dict[str, Any], metrics_client: HeronMetricsClient,
     last_updated: dt.datetime = zookeeper.last_topo_update_ts_html(
         zk_config["heron.statemgr.connection.string"],
         zk_config["heron.statemgr.root.path"], topology_id,
-        zk_config["zk.time.offset"]).astimezone(dt.timezone.utc)
+        zk_config["zk.time.offset"], cluster,
+        environ).astimezone(dt.timezone.utc)
 
     if start < last_updated:
         update_err: str = (f"The provided total hours ({total_hours}) will "
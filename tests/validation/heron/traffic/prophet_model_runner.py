@@ -266,7 +266,7 @@ def run(config: Dict[str, Any], metrics_client: HeronMetricsClient,
             last_updated: dt.datetime = zookeeper.last_topo_update_ts_html(
                 config["heron.statemgr.connection.string"],
                 config["heron.statemgr.root.path"], row.topology,
-                config["zk.time.offset"])
+                config["zk.time.offset"], row.cluster, row.environ)
         except Exception as zk_err:
             LOG.error("Error fetching last update timestamp from zookeeper for"
                       "topology %s: %s", row.topology, str(zk_err))
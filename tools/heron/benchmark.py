@@ -0,0 +1,889 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" Command line program for benchmarking the performance critical parts of
+caladrius against synthetic heron topology data. Each benchmark compares the
+current implementation with the implementation it replaced, which is kept in
+this script as a reference."""
+
+import sys
+import time
+import uuid
+import logging
+import argparse
+
+import datetime as dt
+
+from typing import Dict, List, Set, Any, Callable, Union, Optional, Tuple, \
+    cast
+
+import numpy as np
+import pandas as pd
+
+from gremlin_python.process.graph_traversal import GraphTraversalSource
+from gremlin_python.structure.graph import Vertex
+
+from caladrius import logs
+from caladrius.common.heron import tracker
+from caladrius.common.frames import FrameAccumulator
+from caladrius.config.keys import ConfKeys
+from caladrius.graph.builder.heron import builder
+from caladrius.graph.client import GraphClient
+from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.memory.client import InMemoryGraphClient
+from caladrius.graph.utils import heron as graph_utils
+from caladrius.graph.utils import paths as path_utils
+from caladrius.graph.utils.path_store import PathSet
+from caladrius.metrics.heron.tmaster import client as tmaster
+from caladrius.model.topology.heron import helpers
+
+LOG: logging.Logger = logging.getLogger("caladrius.tools.heron.benchmark")
+
+ROW_DICT = Dict[str, Union[str, int, float, dt.datetime, None]]
+
+# The graph benchmarks call the graph builder's internal construction steps
+# pylint: disable=protected-access
+
+
+def best_time(func: Callable[..., Any], *args: Any, repeats: int = 3,
+              **kwargs: Any) -> float:
+    """ Runs the supplied function the specified number of times and returns
+    the fastest run time in seconds. """
+
+    times: List[float] = []
+    for _ in range(repeats):
+        start: float = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+###############################################################################
+# Tracker metrics timeline conversion
+###############################################################################
+
+def synthetic_timelines(num_instances: int, num_minutes: int,
+                        nan_fraction: float = 0.01,
+                        seed: int = 42) -> Dict[str, Dict[str, str]]:
+    """ Creates a dictionary of instance metric timelines in the same format as
+    the Heron Tracker metricstimeline endpoint. The timestamps of each
+    instance are shuffled as the Tracker does not guarantee their order. """
+
+    rng: np.random.RandomState = np.random.RandomState(seed)
+
+    start: int = int(dt.datetime(2018, 1, 1).timestamp())
+    timestamps: np.ndarray = start + np.arange(num_minutes) * 60
+
+    timelines: Dict[str, Dict[str, str]] = {}
+    for task in range(num_instances):
+        instance_name: str = (f"container_{task // 4 + 1}_split_sentence_"
+                              f"{task + 1}")
+        measurements: List[str] = \
+            [str(value) for value in rng.uniform(1e5, 1e7, num_minutes)]
+        for i in np.flatnonzero(rng.rand(num_minutes) < nan_fraction):
+            measurements[i] = "nan"
+        shuffled: np.ndarray = rng.permutation(timestamps)
+        timelines[instance_name] = dict(zip(shuffled.astype(str),
+                                            measurements))
+
+    return timelines
+
+
+def legacy_instance_timelines_to_dataframe(
+        instance_timelines: dict, stream: Optional[str], measurement_name: str,
+        conversion_func: Callable[[str], Union[str, int, float]] = None,
+        source_component: str = None) -> pd.DataFrame:
+    """ The original row wise implementation of
+    tmaster.instance_timelines_to_dataframe. """
+
+    output: List[ROW_DICT] = []
+
+    for instance_name, timeline in instance_timelines.items():
+
+        details = tracker.parse_instance_name(instance_name)
+        instance_list: List[ROW_DICT] = []
+
+        for timestamp_str, measurement_str in timeline.items():
+
+            timestamp: dt.datetime = \
+                    dt.datetime.utcfromtimestamp(int(timestamp_str))
+
+            if "nan" in measurement_str:
+                measurement: Union[str, int, float, None] = None
+            else:
+                if conversion_func:
+                    measurement = conversion_func(measurement_str)
+                else:
+                    measurement = measurement_str
+
+            row: ROW_DICT = {
+                "timestamp": timestamp,
+                "container": details["container"],
+                "task": details["task_id"],
+                "component": details["component"],
+                measurement_name: measurement}
+
+            if stream:
+                row["stream"] = stream
+
+            if source_component:
+                row["source_component"] = source_component
+
+            instance_list.append(row)
+
+        instance_list.sort(key=lambda instance: instance["timestamp"])
+
+        output.extend(instance_list)
+
+    return pd.DataFrame(output)
+
+
+def benchmark_timelines(instance_counts: List[int], num_minutes: int,
+                        repeats: int) -> pd.DataFrame:
+    """ Times the legacy and columnar timeline conversions for each of the
+    supplied instance counts and checks that their outputs match. """
+
+    results: List[Dict[str, Union[int, float]]] = []
+
+    for num_instances in instance_counts:
+
+        LOG.info("Benchmarking timeline conversion for %d instances over %d "
+                 "minutes", num_instances, num_minutes)
+
+        timelines: Dict[str, Dict[str, str]] = \
+            synthetic_timelines(num_instances, num_minutes)
+
+        legacy: pd.DataFrame = legacy_instance_timelines_to_dataframe(
+            timelines, "default", "latency_ms",
+            tmaster.str_nano_to_float_milli, "spout")
+        columnar: pd.DataFrame = tmaster.instance_timelines_to_dataframe(
+            timelines, "default", "latency_ms", tmaster.nano_to_milli,
+            "spout")
+        pd.testing.assert_frame_equal(legacy, columnar)
+
+        legacy_time: float = best_time(
+            legacy_instance_timelines_to_dataframe, timelines, "default",
+            "latency_ms", tmaster.str_nano_to_float_milli, "spout",
+            repeats=repeats)
+        columnar_time: float = best_time(
+            tmaster.instance_timelines_to_dataframe, timelines, "default",
+            "latency_ms", tmaster.nano_to_milli, "spout", repeats=repeats)
+
+        results.append({"instances": num_instances,
+                        "points": num_instances * num_minutes,
+                        "legacy_secs": legacy_time,
+                        "columnar_secs": columnar_time,
+                        "speedup": legacy_time / columnar_time})
+
+    return pd.DataFrame(results)
+
+
+###############################################################################
+# DataFrame accumulation
+###############################################################################
+
+def synthetic_latencies(num_instances: int, num_minutes: int,
+                        seed: int = 42) -> pd.DataFrame:
+    """ Creates a service time DataFrame, in the format returned by the metrics
+    clients, for the specified number of instances and minutes. """
+
+    rng: np.random.RandomState = np.random.RandomState(seed)
+
+    tasks: np.ndarray = np.repeat(np.arange(1, num_instances + 1),
+                                  num_minutes)
+    start: int = int(dt.datetime(2018, 1, 1).timestamp())
+
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(
+            start + np.tile(np.arange(num_minutes) * 60, num_instances),
+            unit="s"),
+        "container": tasks // 4 + 1,
+        "task": tasks,
+        "component": "split_sentence",
+        "latency_ms": rng.uniform(0.1, 10.0, len(tasks)),
+        "stream": "default",
+        "source_component": "spout"})
+
+
+def legacy_process_execute_latencies(execute_latencies: pd.DataFrame
+                                     ) -> pd.DataFrame:
+    """ The original implementation of helpers.process_execute_latencies which
+    grows the output one row at a time. Each concat copies the whole frame, as
+    DataFrame.append does. """
+
+    df: pd.DataFrame = pd.DataFrame(columns=["task", "mean_service_time",
+                                             "std_service_time"])
+
+    for task, data in execute_latencies.groupby(["task"]):
+        latencies: pd.Series = data["latency_ms"]
+        df = pd.concat([df, pd.DataFrame([{
+            "task": task, "mean_service_time": latencies.mean(),
+            "std_service_time": latencies.std()}])], ignore_index=True)
+
+    return df
+
+
+def legacy_combine(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """ The original pattern used by the metrics clients for combining per
+    component frames, copying the combined frame for each new part. """
+
+    output: pd.DataFrame = None
+
+    for frame in frames:
+        if output is None:
+            output = frame
+        else:
+            output = pd.concat([output, frame], ignore_index=True)
+
+    return output
+
+
+def accumulator_combine(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """ Combines the supplied frames using the FrameAccumulator. """
+
+    output: FrameAccumulator = FrameAccumulator()
+
+    for frame in frames:
+        output.append(frame)
+
+    return output.to_frame()
+
+
+def benchmark_accumulate(instance_counts: List[int], num_minutes: int,
+                         repeats: int) -> pd.DataFrame:
+    """ Times the per instance helper summaries and the combination of per
+    instance frames, using the legacy repeated append and the
+    FrameAccumulator, for each of the supplied instance counts. The
+    accumulator timings per instance should stay roughly constant as the
+    instance count grows. """
+
+    results: List[Dict[str, Union[int, float]]] = []
+
+    for num_instances in instance_counts:
+
+        LOG.info("Benchmarking DataFrame accumulation for %d instances",
+                 num_instances)
+
+        latencies: pd.DataFrame = synthetic_latencies(num_instances,
+                                                      num_minutes)
+        frames: List[pd.DataFrame] = [data for _, data in
+                                      latencies.groupby("task")]
+
+        legacy_helper: float = best_time(legacy_process_execute_latencies,
+                                         latencies, repeats=repeats)
+        helper: float = best_time(helpers.process_execute_latencies,
+                                  latencies, repeats=repeats)
+        legacy_frames: float = best_time(legacy_combine, frames,
+                                         repeats=repeats)
+        accumulated_frames: float = best_time(accumulator_combine, frames,
+                                              repeats=repeats)
+
+        results.append({
+            "instances": num_instances,
+            "legacy_helper_secs": legacy_helper,
+            "helper_secs": helper,
+            "helper_us_per_instance": helper / num_instances * 1e6,
+            "legacy_combine_secs": legacy_frames,
+            "combine_secs": accumulated_frames,
+            "combine_us_per_instance":
+                accumulated_frames / num_instances * 1e6})
+
+    return pd.DataFrame(results)
+
+
+###############################################################################
+# Physical graph construction
+###############################################################################
+
+
+def synthetic_plans(parallelism: int, num_bolts: int = 1,
+                    instances_per_container: int = 4,
+                    grouping: str = "FIELDS") -> Tuple[Dict[str, Any],
+                                                        Dict[str, Any]]:
+    """ Creates the logical and physical plans, in the Heron Tracker format
+    used by the graph builder, of a linear topology with a single spout
+    followed by a chain of bolts all with the supplied parallelism.
+
+    Arguments:
+        parallelism (int):  The number of instances of each component.
+        num_bolts (int):    The number of bolts in the chain.
+        instances_per_container (int):  The number of instances packed into
+                                        each container.
+        grouping (str): The grouping of every stream.
+
+    Returns:
+        tuple:  The logical plan and physical plan dictionaries.
+    """
+
+    # Component names avoid underscores as they separate the parts of the
+    # instance names
+    components: List[str] = ["spout"] + [f"bolt-{i}"
+                                         for i in range(1, num_bolts + 1)]
+
+    logical_plan: Dict[str, Any] = {
+        "spouts": {"spout": {"spout_type": "kafka",
+                             "spout_source": "benchmark"}},
+        "bolts": {bolt: {"inputs": [{"component_name": source,
+                                     "stream_name": "default",
+                                     "grouping": grouping}]}
+                  for source, bolt in zip(components[:-1], components[1:])}}
+
+    physical_plan: Dict[str, Any] = {"stmgrs": {}, "instances": {},
+                                     "spouts": {}, "bolts": {}}
+
+    task_id: int = 1
+    for component in components:
+        names: List[str] = []
+        for _ in range(parallelism):
+            container: int = (task_id - 1) // instances_per_container + 1
+            stmgr_id: str = f"stmgr-{container}"
+            physical_plan["stmgrs"][stmgr_id] = {
+                "id": stmgr_id, "host": f"host-{container}",
+                "port": 6000 + container}
+            name: str = f"container_{container}_{component}_{task_id}"
+            physical_plan["instances"][name] = {"stmgrId": stmgr_id}
+            names.append(name)
+            task_id += 1
+        physical_plan["spouts" if component == "spout" else "bolts"][
+            component] = names
+
+    return logical_plan, physical_plan
+
+
+def legacy_create_logical_connections(graph_client: GremlinClient,
+                                      topology_id: str, topology_ref: str,
+                                      logical_plan: Dict[str, Any]) -> None:
+    """ The previous implementation of the graph builder's logical connection
+    creation, which issues a round trip for every pair of connected
+    instances. """
+
+    topo_traversal: GraphTraversalSource = \
+        graph_client.topology_subgraph(topology_id, topology_ref)
+
+    for bolt_name, bolt_data in logical_plan["bolts"].items():
+
+        destination_instances: List[Vertex] = (
+            topo_traversal.V()
+            .has("component", bolt_name)
+            .toList())
+
+        for incoming_stream in bolt_data["inputs"]:
+            source_instances: List[Vertex] = (
+                topo_traversal.V()
+                .has("component", incoming_stream["component_name"])
+                .toList())
+
+            for destination in destination_instances:
+                for source in source_instances:
+                    (topo_traversal.V(source)
+                     .addE("logically_connected")
+                     .property("stream",
+                               incoming_stream["stream_name"])
+                     .property("grouping", incoming_stream["grouping"])
+                     .to(destination).next())
+
+
+def time_logical_connections(graph_client: GremlinClient,
+                             create_connections: Callable[..., None],
+                             logical_plan: Dict[str, Any],
+                             physical_plan: Dict[str, Any],
+                             repeats: int) -> Tuple[float, int]:
+    """ Times the supplied logical connection function against a newly built
+    set of instance vertices for each repeat, removing the vertices after
+    each run.
+
+    Returns:
+        tuple:  The fastest run time in seconds and the number of logical
+        connection edges created.
+    """
+
+    times: List[float] = []
+    edges: int = 0
+
+    for _ in range(repeats):
+
+        topology_id: str = "benchmark"
+        topology_ref: str = str(uuid.uuid4())
+
+        builder._create_stream_managers(graph_client, topology_id,
+                                        topology_ref, physical_plan)
+        builder._create_spouts(graph_client, topology_id, topology_ref,
+                               physical_plan, logical_plan)
+        builder._create_bolts(graph_client, topology_id, topology_ref,
+                              physical_plan, logical_plan)
+
+        start: float = time.perf_counter()
+        create_connections(graph_client, topology_id, topology_ref,
+                           logical_plan)
+        times.append(time.perf_counter() - start)
+
+        topo_traversal: GraphTraversalSource = \
+            graph_client.topology_subgraph(topology_id, topology_ref)
+        edges = (topo_traversal.E().hasLabel("logically_connected")
+                 .count().next())
+
+        (graph_client.graph_traversal.V().has("topology_id", topology_id)
+         .has("topology_ref", topology_ref).drop().iterate())
+
+    return min(times), edges
+
+
+def benchmark_logical_edges(gremlin_url: str, parallelisms: List[int],
+                            repeats: int) -> pd.DataFrame:
+    """ Times the creation of the logical connections between a spout and a
+    fields grouped bolt, with every instance of the spout connected to every
+    instance of the bolt, using the legacy per edge round trips and the
+    batched server side traversals, for each of the supplied parallelisms.
+    The graphs are built in the Gremlin Server at the supplied address and
+    removed afterwards. """
+
+    graph_client: GremlinClient = GremlinClient(
+        {ConfKeys.GREMLIN_SERVER_URL.value: gremlin_url})
+
+    results: List[Dict[str, Union[int, float]]] = []
+
+    for parallelism in parallelisms:
+
+        LOG.info("Benchmarking logical connection creation for %d x %d "
+                 "instances", parallelism, parallelism)
+
+        logical_plan, physical_plan = synthetic_plans(parallelism)
+
+        legacy, legacy_edges = time_logical_connections(
+            graph_client, legacy_create_logical_connections, logical_plan,
+            physical_plan, repeats)
+        batched, edges = time_logical_connections(
+            graph_client, builder._create_logical_connections, logical_plan,
+            physical_plan, repeats)
+
+        if legacy_edges != edges:
+            LOG.warning("Legacy implementation created %d edges and batched "
+                        "implementation created %d", legacy_edges, edges)
+
+        results.append({
+            "parallelism": parallelism,
+            "edges": edges,
+            "legacy_secs": legacy,
+            "batched_secs": batched,
+            "speedup": legacy / batched})
+
+    return pd.DataFrame(results)
+
+
+###############################################################################
+# Path enumeration
+###############################################################################
+
+
+class QueryCounter(object):
+    """ Wraps a graph client, counting the queries made of it and adding a
+    simulated network round trip to each. """
+
+    def __init__(self, client: GraphClient, latency: float) -> None:
+        self.client: GraphClient = client
+        self.latency: float = latency
+        self.queries: int = 0
+
+    def __getattr__(self, name: str) -> Any:
+
+        attribute: Any = getattr(self.client, name)
+
+        if not callable(attribute):
+            return attribute
+
+        def query(*args: Any, **kwargs: Any) -> Any:
+            self.queries += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return attribute(*args, **kwargs)
+
+        return query
+
+
+def legacy_get_all_paths(graph_client: GraphClient, topology_id: str
+                         ) -> List[List[int]]:
+    """ The previous implementation of get_all_paths, which walks the graph
+    with a query for the downstream instances of every instance. """
+
+    spouts: List[int] = [
+        cast(int, instance["task_id"])
+        for instance in graph_client.get_instances(topology_id)
+        if instance["label"] == "spout"]
+
+    spout_tasks: List[int] = []
+    parent_to_child: Dict[int, List[int]] = {}
+    visited: Set[int] = set()
+
+    for spout in spouts:
+        downstream_task_ids: List[int] = \
+            graph_client.get_downstream_tasks(topology_id, spout)
+        if not downstream_task_ids:
+            continue
+        spout_tasks.append(spout)
+        parent_to_child[spout] = downstream_task_ids
+        to_visit: List[int] = list(downstream_task_ids)
+        while to_visit:
+            task_id: int = to_visit.pop()
+            if task_id in visited:
+                continue
+            visited.add(task_id)
+            downstream_task_ids = \
+                graph_client.get_downstream_tasks(topology_id, task_id)
+            if downstream_task_ids:
+                parent_to_child[task_id] = downstream_task_ids
+                to_visit.extend(downstream_task_ids)
+
+    return list(path_utils.path_helper(parent_to_child, spout_tasks,
+                                       workers=1))
+
+
+def benchmark_paths(parallelisms: List[int], num_bolts: int,
+                    latency_ms: float, repeats: int,
+                    gremlin_url: Optional[str] = None) -> pd.DataFrame:
+    """ Times the enumeration of every spout to sink path of a synthetic
+    linear topology, using the legacy per instance queries and the single
+    adjacency query, for each of the supplied parallelisms. The graphs are
+    held by the in memory graph client, with the supplied latency added to
+    every query to simulate a remote graph database, unless the address of a
+    Gremlin Server is supplied. """
+
+    results: List[Dict[str, Union[int, float]]] = []
+
+    for parallelism in parallelisms:
+
+        LOG.info("Benchmarking path enumeration for %d bolts with "
+                 "parallelism %d", num_bolts, parallelism)
+
+        logical_plan, physical_plan = synthetic_plans(
+            parallelism, num_bolts, grouping="SHUFFLE")
+
+        client: GraphClient
+        if gremlin_url:
+            client = GremlinClient(
+                {ConfKeys.GREMLIN_SERVER_URL.value: gremlin_url})
+        else:
+            client = InMemoryGraphClient({})
+
+        topology_id: str = f"benchmark-{uuid.uuid4()}"
+        client.build_physical_graph(topology_id, "benchmark", logical_plan,
+                                    physical_plan)
+
+        legacy_counter: QueryCounter = QueryCounter(client, latency_ms / 1000)
+        legacy: float = best_time(legacy_get_all_paths, legacy_counter,
+                                  topology_id, repeats=repeats)
+
+        counter: QueryCounter = QueryCounter(client, latency_ms / 1000)
+        current: float = best_time(graph_utils.get_all_paths, counter,
+                                   topology_id, repeats=repeats)
+
+        paths: PathSet = graph_utils.get_all_paths(client, topology_id)
+        if (sorted(legacy_get_all_paths(client, topology_id)) !=
+                sorted(paths)):
+            LOG.warning("Legacy and current implementations returned "
+                        "different paths")
+
+        if isinstance(client, GremlinClient):
+            (client.graph_traversal.V().has("topology_id", topology_id)
+             .drop().iterate())
+
+        results.append({
+            "parallelism": parallelism,
+            "paths": len(paths),
+            "legacy_queries": legacy_counter.queries // repeats,
+            "queries": counter.queries // repeats,
+            "legacy_secs": legacy,
+            "secs": current,
+            "speedup": legacy / current})
+
+    return pd.DataFrame(results)
+
+
+def synthetic_adjacency(parallelism: int, num_bolts: int
+                        ) -> Tuple[Dict[int, List[int]], List[int]]:
+    """ Creates the task adjacency of a linear topology with a spout and the
+    supplied number of bolts, each with the supplied parallelism and shuffle
+    grouped to the next, along with the spout task IDs. """
+
+    parent_to_child: Dict[int, List[int]] = {}
+
+    for level in range(num_bolts):
+        downstream: List[int] = list(range((level + 1) * parallelism + 1,
+                                           (level + 2) * parallelism + 1))
+        for task in range(level * parallelism + 1,
+                          (level + 1) * parallelism + 1):
+            parent_to_child[task] = downstream
+
+    return parent_to_child, list(range(1, parallelism + 1))
+
+
+def benchmark_enumeration(parallelisms: List[int], num_bolts: int,
+                          workers: List[int], repeats: int) -> pd.DataFrame:
+    """ Times the enumeration of every spout to sink path of a synthetic
+    linear topology, held in memory, in a single process and with each of the
+    supplied numbers of worker processes, for each of the supplied
+    parallelisms. """
+
+    results: List[Dict[str, Union[int, float]]] = []
+
+    for parallelism in parallelisms:
+
+        parent_to_child, spouts = synthetic_adjacency(parallelism, num_bolts)
+
+        LOG.info("Benchmarking the enumeration of %d paths",
+                 parallelism ** (num_bolts + 1))
+
+        single: float = best_time(path_utils.path_helper, parent_to_child,
+                                  spouts, 1, repeats=repeats)
+        expected: PathSet = path_utils.path_helper(parent_to_child, spouts, 1)
+
+        for num_workers in workers:
+
+            parallel: float = best_time(path_utils.path_helper,
+                                        parent_to_child, spouts, num_workers,
+                                        0, repeats=repeats)
+
+            actual: PathSet = path_utils.path_helper(parent_to_child, spouts,
+                                                     num_workers, 0)
+            if not (np.array_equal(expected.tasks, actual.tasks) and
+                    np.array_equal(expected.offsets, actual.offsets)):
+                LOG.warning("Single process and parallel enumerations "
+                            "returned different paths")
+
+            results.append({
+                "parallelism": parallelism,
+                "paths": len(expected),
+                "workers": num_workers,
+                "single_secs": single,
+                "secs": parallel,
+                "speedup": single / parallel})
+
+    return pd.DataFrame(results)
+
+
+###############################################################################
+# Path latencies
+###############################################################################
+
+
+def synthetic_paths(num_paths: int, path_length: int, num_tasks: int,
+                    seed: int = 42) -> List[List[int]]:
+    """ Creates the specified number of random spout to sink paths over the
+    supplied number of tasks. """
+
+    rng: np.random.RandomState = np.random.RandomState(seed)
+
+    return rng.randint(1, num_tasks + 1,
+                       size=(num_paths, path_length)).tolist()
+
+
+def legacy_find_end_to_end_latencies(paths: List[List[int]],
+                                     waiting_times: pd.DataFrame,
+                                     service_times: pd.DataFrame) -> list:
+    """ The previous implementation of helpers.find_end_to_end_latencies,
+    which scans the merged DataFrame with a boolean mask for every hop of
+    every path. """
+
+    averaged_execute_latency: pd.DataFrame = \
+        (service_times[["task", "latency_ms"]].groupby("task").mean()
+         .reset_index())
+    merged: pd.DataFrame = averaged_execute_latency.merge(
+        waiting_times, on=["task"])[["task", "mean_waiting_time",
+                                     "latency_ms"]]
+
+    result: Dict[tuple, float] = dict()
+
+    for path in paths:
+        end_to_end_latency: float = 0.0
+        for task in path:
+            row: pd.DataFrame = merged.loc[(merged["task"] == task)]
+            end_to_end_latency = (row["latency_ms"].tolist()[0] +
+                                  row["mean_waiting_time"].tolist()[0] +
+                                  end_to_end_latency)
+
+        result[tuple(path)] = end_to_end_latency
+
+    return helpers.remap_keys(result)
+
+
+def benchmark_path_latencies(path_counts: List[int], path_length: int,
+                             num_tasks: int, repeats: int) -> pd.DataFrame:
+    """ Times the calculation of the end to end latency of every path, using
+    the legacy per hop DataFrame lookups and the vectorised gather and sum,
+    for each of the supplied path counts. """
+
+    results: List[Dict[str, Union[int, float]]] = []
+
+    service_times: pd.DataFrame = synthetic_latencies(num_tasks, 10)
+    waiting_times: pd.DataFrame = pd.DataFrame({
+        "task": np.arange(1, num_tasks + 1),
+        "mean_waiting_time": np.random.RandomState(7).uniform(
+            0.0, 5.0, num_tasks)})
+
+    for num_paths in path_counts:
+
+        LOG.info("Benchmarking the latencies of %d paths of length %d",
+                 num_paths, path_length)
+
+        paths: List[List[int]] = synthetic_paths(num_paths, path_length,
+                                                 num_tasks)
+
+        legacy: float = best_time(legacy_find_end_to_end_latencies, paths,
+                                  waiting_times, service_times,
+                                  repeats=repeats)
+        current: float = best_time(helpers.find_end_to_end_latencies, paths,
+                                   waiting_times, service_times,
+                                   repeats=repeats)
+
+        expected: list = legacy_find_end_to_end_latencies(
+            paths, waiting_times, service_times)
+        actual: list = helpers.find_end_to_end_latencies(
+            paths, waiting_times, service_times)
+        if ([item["path"] for item in expected] !=
+                [item["path"] for item in actual] or
+                not np.allclose([item["latency"] for item in expected],
+                                [item["latency"] for item in actual])):
+            LOG.warning("Legacy and current implementations returned "
+                        "different path latencies")
+
+        results.append({
+            "paths": num_paths,
+            "legacy_secs": legacy,
+            "secs": current,
+            "us_per_path": current / num_paths * 1e6,
+            "speedup": legacy / current})
+
+    return pd.DataFrame(results)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """ Helper function for creating the command line arguments parser. """
+
+    parser = argparse.ArgumentParser(
+        description=("Benchmarks caladrius components against synthetic "
+                     "heron topology data"))
+    parser.add_argument("-r", "--repeats", type=int, required=False,
+                        default=3,
+                        help="The number of times each timing is repeated.")
+    parser.add_argument("--debug", required=False, action="store_true",
+                        help=("Optional flag indicating if debug logging "
+                              "output should be shown"))
+    parser.add_argument("-q", "--quiet", required=False, action="store_true",
+                        help=("Optional flag indicating if log output should "
+                              "be suppressed."))
+
+    subparsers = parser.add_subparsers(dest="benchmark")
+
+    timelines_parser = subparsers.add_parser(
+        "timelines", help=("Tracker metrics timeline to DataFrame "
+                           "conversion"))
+    timelines_parser.add_argument(
+        "-i", "--instances", type=int, nargs="+", required=False,
+        default=[100, 500, 2000],
+        help="The instance counts to benchmark.")
+    timelines_parser.add_argument(
+        "-m", "--minutes", type=int, required=False, default=180,
+        help="The number of minutes of metrics for each instance.")
+
+    accumulate_parser = subparsers.add_parser(
+        "accumulate", help=("Accumulation of per instance results into "
+                            "DataFrames"))
+    accumulate_parser.add_argument(
+        "-i", "--instances", type=int, nargs="+", required=False,
+        default=[250, 500, 1000, 2000, 4000],
+        help="The instance counts to benchmark.")
+    accumulate_parser.add_argument(
+        "-m", "--minutes", type=int, required=False, default=60,
+        help="The number of minutes of metrics for each instance.")
+
+    logical_edges_parser = subparsers.add_parser(
+        "logical-edges", help=("Creation of the logical connection edges of "
+                               "the physical graph in a Gremlin Server"))
+    logical_edges_parser.add_argument(
+        "-g", "--gremlin-url", required=False, default="localhost:8182",
+        help="The address of the Gremlin Server to build the graphs in.")
+    logical_edges_parser.add_argument(
+        "-p", "--parallelisms", type=int, nargs="+", required=False,
+        default=[25, 50, 100, 200],
+        help="The component parallelisms to benchmark.")
+
+    paths_parser = subparsers.add_parser(
+        "paths", help="Enumeration of all the spout to sink paths")
+    paths_parser.add_argument(
+        "-p", "--parallelisms", type=int, nargs="+", required=False,
+        default=[4, 8, 12], help="The component parallelisms to benchmark.")
+    paths_parser.add_argument(
+        "-b", "--bolts", type=int, required=False, default=3,
+        help="The number of bolts in the chain after the spout.")
+    paths_parser.add_argument(
+        "-l", "--latency-ms", type=float, required=False, default=1.0,
+        help=("The simulated round trip latency, in milliseconds, added to "
+              "each graph query."))
+    paths_parser.add_argument(
+        "-g", "--gremlin-url", required=False, default=None,
+        help=("Optional address of a Gremlin Server to build the graphs in, "
+              "instead of the in memory graph client."))
+
+    enumeration_parser = subparsers.add_parser(
+        "enumeration", help=("Single process and parallel enumeration of "
+                             "all the spout to sink paths"))
+    enumeration_parser.add_argument(
+        "-p", "--parallelisms", type=int, nargs="+", required=False,
+        default=[20, 30, 40], help="The component parallelisms to benchmark.")
+    enumeration_parser.add_argument(
+        "-b", "--bolts", type=int, required=False, default=3,
+        help="The number of bolts in the chain after the spout.")
+    enumeration_parser.add_argument(
+        "-w", "--workers", type=int, nargs="+", required=False,
+        default=[2, 4, 8], help="The numbers of worker processes to use.")
+
+    path_latencies_parser = subparsers.add_parser(
+        "path-latencies", help="End to end latencies of explicit paths")
+    path_latencies_parser.add_argument(
+        "-p", "--paths", type=int, nargs="+", required=False,
+        default=[10000, 100000],
+        help="The path counts to benchmark.")
+    path_latencies_parser.add_argument(
+        "-l", "--length", type=int, required=False, default=5,
+        help="The number of instances on each path.")
+    path_latencies_parser.add_argument(
+        "-t", "--tasks", type=int, required=False, default=500,
+        help="The number of instances in the topology.")
+
+    return parser
+
+
+if __name__ == "__main__":
+
+    PARSER: argparse.ArgumentParser = create_parser()
+    ARGS: argparse.Namespace = PARSER.parse_args()
+
+    if not ARGS.quiet:
+        logs.setup(debug=ARGS.debug)
+
+    if ARGS.benchmark == "timelines":
+        RESULTS: pd.DataFrame = benchmark_timelines(ARGS.instances,
+                                                    ARGS.minutes,
+                                                    ARGS.repeats)
+    elif ARGS.benchmark == "accumulate":
+        RESULTS = benchmark_accumulate(ARGS.instances, ARGS.minutes,
+                                       ARGS.repeats)
+    elif ARGS.benchmark == "paths":
+        RESULTS = benchmark_paths(ARGS.parallelisms, ARGS.bolts,
+                                  ARGS.latency_ms, ARGS.repeats,
+                                  ARGS.gremlin_url)
+    elif ARGS.benchmark == "enumeration":
+        RESULTS = benchmark_enumeration(ARGS.parallelisms, ARGS.bolts,
+                                        ARGS.workers, ARGS.repeats)
+    elif ARGS.benchmark == "path-latencies":
+        RESULTS = benchmark_path_latencies(ARGS.paths, ARGS.length,
+                                           ARGS.tasks, ARGS.repeats)
+    elif ARGS.benchmark == "logical-edges":
+        RESULTS = benchmark_logical_edges(ARGS.gremlin_url, ARGS.parallelisms,
+                                          ARGS.repeats)
+    else:
+        PARSER.print_help()
+        sys.exit(2)
+
+    print(RESULTS.to_string(index=False))
@@ -0,0 +1,293 @@
+# Copyright 2018 Twitter, Inc.
+# Licensed under the Apache License, Version 2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+
+""" A fake Heron Tracker REST API server for testing and benchmarking the
+Heron Tracker clients and Topology Master metrics clients locally. The server
+serves plans for a synthetic linear topology (a spout followed by a chain of
+bolts) and synthetic metrics timelines for any requested window. An optional
+delay is added to every response to simulate the latency of a real Tracker.
+
+The server can be run from the command line or started from within a script::
+
+    with FakeTracker(num_bolts=10, delay=0.1) as fake:
+        client = HeronTMasterClient({"heron.tracker.url": fake.url})
+"""
+
+import sys
+import json
+import zlib
+import time
+import logging
+import argparse
+import threading
+
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from caladrius import logs
+
+LOG: logging.Logger = logging.getLogger("caladrius.tools.heron.fake_tracker")
+
+# Synthetic measurements for each of the Topology Master metric prefixes
+METRIC_RANGES: Dict[str, Any] = {
+    "__execute-latency": (1e5, 1e7),
+    "__complete-latency": (1e6, 1e8),
+    "__execute-count": (1000, 100000),
+    "__emit-count": (1000, 100000),
+}
+
+
+def create_plans(topology: str, num_bolts: int, parallelism: int,
+                 reliability_mode: str = "ATLEAST_ONCE") -> Dict[str, Any]:
+    """ Creates the logical, physical and packing plans of a linear topology
+    with a single spout followed by a chain of bolts, all with the same
+    parallelism and connected by their default streams.
+
+    Arguments:
+        topology (str): The topology name.
+        num_bolts (int):    The number of bolts in the chain.
+        parallelism (int):  The number of instances of each component.
+        reliability_mode (str): The topology reliability mode reported in the
+                                physical plan.
+
+    Returns:
+        dict:   A dictionary mapping from plan type ("logical", "physical" and
+        "packing") to the plan dictionary.
+    """
+
+    components: List[str] = ["spout"] + [f"bolt_{i}"
+                                         for i in range(1, num_bolts + 1)]
+
+    logical: Dict[str, Any] = {
+        "spouts": {"spout": {"outputs": [{"stream_name": "default"}]}},
+        "bolts": {}}
+
+    for source, bolt in zip(components[:-1], components[1:]):
+        logical["bolts"][bolt] = {
+            "inputs": [{"component_name": source, "stream_name": "default",
+                        "grouping": "SHUFFLE"}],
+            "outputs": ([{"stream_name": "default"}]
+                        if bolt != components[-1] else [])}
+
+    instances: Dict[str, List[str]] = {}
+    task_id: int = 1
+    for index, component in enumerate(components):
+        instances[component] = []
+        for _ in range(parallelism):
+            instances[component].append(
+                f"container_{index + 1}_{component}_{task_id}")
+            task_id += 1
+
+    physical: Dict[str, Any] = {
+        "config": {"topology.reliability.mode": reliability_mode},
+        "spouts": {"spout": instances["spout"]},
+        "bolts": {bolt: instances[bolt] for bolt in components[1:]}}
+
+    packing: Dict[str, Any] = {
+        "id": topology,
+        "container_plans": [
+            {"id": index + 1,
+             "instances": [{"component_name": component,
+                            "task_id": int(name.split("_")[-1])}
+                           for name in instances[component]]}
+            for index, component in enumerate(components)]}
+
+    return {"logical": logical, "physical": physical, "packing": packing}
+
+
+def create_timeline(metric: str, instance_names: List[str], start: int,
+                    end: int) -> Dict[str, Dict[str, str]]:
+    """ Creates synthetic minutely measurements of the supplied metric for
+    each of the supplied instances, in the format of the Heron Tracker
+    metricstimeline endpoint. """
+
+    low, high = METRIC_RANGES.get(metric.split("/")[0], (0, 100))
+
+    minutes: np.ndarray = np.arange(start // 60 * 60, end, 60)
+
+    rng: np.random.RandomState = np.random.RandomState(
+        zlib.crc32(f"{metric}/{start}/{end}".encode("utf-8")))
+
+    return {instance: dict(zip(minutes.astype(str),
+                               rng.uniform(low, high, minutes.size)
+                               .astype(int).astype(str)))
+            for instance in instance_names}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+    # Concurrent clients open many connections at once
+    request_queue_size = 128
+
+
+class FakeTracker(object):
+    """ Fake Heron Tracker server for a single synthetic topology. Every
+    cluster and environment is treated as holding the same topology. """
+
+    def __init__(self, topology: str = "fake-topology", num_bolts: int = 5,
+                 parallelism: int = 4, delay: float = 0.0,
+                 host: str = "localhost", port: int = 0,
+                 reliability_mode: str = "ATLEAST_ONCE") -> None:
+        """ Arguments:
+                topology (str): The topology name.
+                num_bolts (int):    The number of bolts in the topology.
+                parallelism (int):  The number of instances per component.
+                delay (float):  Seconds added to every response.
+                host (str): The host name to bind to.
+                port (int): The port to bind to. The default of 0 binds to a
+                            free port.
+                reliability_mode (str): The topology reliability mode.
+        """
+        self.topology: str = topology
+        self.delay: float = delay
+        self.plans: Dict[str, Any] = create_plans(
+            topology, num_bolts, parallelism, reliability_mode)
+
+        self.requests: Dict[str, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        fake: FakeTracker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """ Request handler serving the fake Tracker endpoints. """
+
+            def do_GET(self) -> None:   # pylint: disable=invalid-name
+
+                url = urlsplit(self.path)
+                params: Dict[str, List[str]] = parse_qs(url.query)
+
+                status, body = fake.handle(url.path, params)
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode("utf-8"))
+
+            def log_message(self, *args: Any) -> None:
+
+                LOG.debug(*args)
+
+        self.server: HTTPServer = _ThreadingHTTPServer((host, port), Handler)
+
+    @property
+    def url(self) -> str:
+        """ The base url of the fake Tracker. """
+
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle(self, path: str, params: Dict[str, List[str]]) -> Any:
+        """ Creates the status code and response body for the supplied
+        request path and query parameters. """
+
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        if params.get("topology", [self.topology])[0] != self.topology:
+            return 404, {"status": "failure",
+                         "message": "Topology not found"}
+
+        for plan_type, plan in self.plans.items():
+            if path == f"/topologies/{plan_type}plan":
+                return 200, {"status": "success", "result": plan}
+
+        if path == "/topologies/metricstimeline":
+            component: str = params["component"][0]
+            instances: Dict[str, List[str]] = dict(
+                self.plans["physical"]["spouts"],
+                **self.plans["physical"]["bolts"])
+            if component not in instances:
+                return 404, {"status": "failure",
+                             "message": "Component not found"}
+            start: int = int(params["starttime"][0])
+            end: int = int(params["endtime"][0])
+            return 200, {"status": "success", "result": {
+                "component": component, "starttime": start, "endtime": end,
+                "timeline": {metric: create_timeline(
+                    metric, instances[component], start, end)
+                             for metric in params.get("metricname", [])}}}
+
+        if path == "/topologies/metricsquery":
+            return 200, {"status": "success", "result": {
+                "starttime": int(params["starttime"][0]),
+                "endtime": int(params["endtime"][0]), "timeline": []}}
+
+        return 404, {"status": "failure", "message": "Unknown endpoint"}
+
+    def start(self) -> "FakeTracker":
+        """ Starts serving requests in a background thread. """
+
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+        LOG.info("Fake Heron Tracker serving topology %s at %s",
+                 self.topology, self.url)
+
+        return self
+
+    def stop(self) -> None:
+        """ Stops the server. """
+
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeTracker":
+
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+
+        self.stop()
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """ Helper function for creating the command line arguments parser. """
+
+    parser = argparse.ArgumentParser(
+        description=("Runs a fake Heron Tracker serving a synthetic linear "
+                     "topology"))
+    parser.add_argument("-t", "--topology", required=False,
+                        default="fake-topology", help="The topology name")
+    parser.add_argument("-b", "--bolts", type=int, required=False, default=5,
+                        help="The number of bolts in the topology")
+    parser.add_argument("-p", "--parallelism", type=int, required=False,
+                        default=4, help="The number of instances per component")
+    parser.add_argument("-d", "--delay", type=float, required=False,
+                        default=0.0,
+                        help="Seconds added to every response")
+    parser.add_argument("--port", type=int, required=False, default=8888,
+                        help="The port to serve on")
+    parser.add_argument("--debug", required=False, action="store_true",
+                        help="Enable debug logging")
+
+    return parser
+
+
+if __name__ == "__main__":
+
+    ARGS: argparse.Namespace = create_parser().parse_args()
+
+    logs.setup(console=True, debug=ARGS.debug)
+
+    FAKE: FakeTracker = FakeTracker(ARGS.topology, ARGS.bolts,
+                                    ARGS.parallelism, ARGS.delay,
+                                    port=ARGS.port)
+
+    try:
+        FAKE.server.serve_forever()
+    except KeyboardInterrupt:
+        FAKE.server.server_close()
+        sys.exit(0)
@@ -2,10 +2,9 @@ from caladrius.traffic_provider.trafficprovider import TrafficProvider
 from caladrius.metrics.heron.client import HeronMetricsClient
 from caladrius.model.topology.heron.helpers import convert_arr_rate_to_mean_arr_rate, \
     convert_throughput_to_inter_arr_times
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 
 import datetime as dt
-from gremlin_python.process.graph_traversal import outE
 import pandas as pd
 from typing import Dict, Any
 
@@ -14,7 +13,7 @@ class CurrentTraffic(TrafficProvider):
     """ This module takes in the metrics client and uses it to provide current traffic information.
      As opposed to the predicted traffic provider, it also models the spout information"""
     # we don't need the traffic config but we can add it to make the arguments the same in both traffic providers
-    def __init__(self, metrics_client: HeronMetricsClient, graph_client: GremlinClient, topology_id: str,
+    def __init__(self, metrics_client: HeronMetricsClient, graph_client: GraphClient, topology_id: str,
                  cluster: str, environ: str, start: [dt.datetime], end: [dt.datetime],
                  traffic_config: Dict[str, Any], **other_kwargs) -> None:
         self.graph_client = graph_client
@@ -28,8 +27,11 @@ class CurrentTraffic(TrafficProvider):
         self.tuples = self.metrics_client.get_tuple_arrivals_at_stmgr\
             (self.topology, cluster, environ, start, end, **other_kwargs)
 
-        spouts = graph_client.graph_traversal.V().has("topology_id", self.topology). \
-            hasLabel("spout").where(outE("logically_connected")).properties('component').value().dedup().toList()
+        # The spout components with outgoing logical connections
+        spout_components = {instance["component"] for instance in graph_client.get_instances(self.topology)
+                            if instance["label"] == "spout"}
+        spouts = list(dict.fromkeys(edge["source_component"] for edge in graph_client.get_logical_edges(self.topology)
+                                    if edge["source_component"] in spout_components))
 
         spout_queue_processing_rate = metrics_client.get_outgoing_queue_processing_rate(
             topology_id, cluster, environ, start, end)
@@ -59,13 +61,13 @@ class CurrentTraffic(TrafficProvider):
     def arrival_rates(self):
         bolt_arrival_rates = convert_arr_rate_to_mean_arr_rate(self.tuples)
         spout_arrival_rates = convert_arr_rate_to_mean_arr_rate(self.spout_arrival_rates)
-        arr_rates = spout_arrival_rates.append(bolt_arrival_rates, sort=True)
+        arr_rates = pd.concat([spout_arrival_rates, bolt_arrival_rates], sort=True)
         return arr_rates
 
     def inter_arrival_times(self):
         bolt_inter_arrival_times = convert_throughput_to_inter_arr_times(self.tuples)
         spout_arrival_rates = convert_throughput_to_inter_arr_times(self.spout_arrival_rates)
-        return bolt_inter_arrival_times.append(spout_arrival_rates, sort=True)
+        return pd.concat([bolt_inter_arrival_times, spout_arrival_rates], sort=True)
 
     def service_times(self):
         """
@@ -80,16 +82,15 @@ class CurrentTraffic(TrafficProvider):
             merge(self.num_tuples_added_to_spout_gateway_queue, on=["timestamp", "component", "task", "container"]). \
             merge(self.spout_tuple_set_size, on=["timestamp", "component", "task", "container"])
 
-        df: pd.DataFrame = pd.DataFrame(columns=['task', 'latency_ms', "timestamp", "component", "container"])
-        for index, data in merged.iterrows():
-            # tuples processed in a minute
-            processed_tuples = data["instance-processing-rate"] * data["tuple-set-size"]
-            if (processed_tuples > 0):
-            # these are the number of tuples processed per millisecond
-                latency = (60 * 1000) / processed_tuples
-                df = df.append({'task': data["task"], 'latency_ms': latency,
-                            'component': data["component"], "container": data["container"],
-                            "timestamp": data["timestamp"]}, ignore_index=True)
+        # tuples processed in a minute
+        processed_tuples = merged["instance-processing-rate"] * merged["tuple-set-size"]
+        processing = merged.loc[processed_tuples > 0]
+        # these are the number of tuples processed per millisecond
+        df: pd.DataFrame = pd.DataFrame({'task': processing["task"],
+                                         'latency_ms': (60 * 1000) / processed_tuples[processed_tuples > 0],
+                                         'timestamp': processing["timestamp"],
+                                         'component': processing["component"],
+                                         'container': processing["container"]}).reset_index(drop=True)
 
         bolt_service_times = self.metrics_client.get_service_times(self.topology, self.cluster,
                                                                    self.environ, self.start, self.end, **self.kwargs)
@@ -98,4 +99,4 @@ class CurrentTraffic(TrafficProvider):
 
         bolt_service_times.drop(["stream"], axis=1, inplace=True)
 
-        return df.append(bolt_service_times, sort=True)
+        return pd.concat([df, bolt_service_times], sort=True)
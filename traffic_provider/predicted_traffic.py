@@ -3,8 +3,9 @@ import logging
 import pandas as pd
 from typing import Any, Dict
 
+from caladrius.common.frames import FrameAccumulator
 from caladrius.traffic_provider.trafficprovider import TrafficProvider
-from caladrius.graph.gremlin.client import GremlinClient
+from caladrius.graph.client import GraphClient
 from caladrius.metrics.heron.client import HeronMetricsClient
 from caladrius.model.traffic.heron.base import HeronTrafficModel
 from caladrius.model.traffic.heron.prophet import ProphetTrafficModel
@@ -19,7 +20,7 @@ class PredictedTraffic(TrafficProvider):
     about traffic in future.
     """
 
-    def __init__(self, metrics_client: HeronMetricsClient, graph_client: GremlinClient,
+    def __init__(self, metrics_client: HeronMetricsClient, graph_client: GraphClient,
                  topology_id: str, cluster: str, environ: str, start: [dt.datetime],
                  end: [dt.datetime], traffic_config: Dict[str, Any], **other_kwargs) -> None:
 
@@ -29,7 +30,7 @@ class PredictedTraffic(TrafficProvider):
         self.start = start
         self.end = end
         self.kwargs = other_kwargs
-        self.graph_client: GremlinClient = graph_client
+        self.graph_client: GraphClient = graph_client
         self.metrics_client: HeronMetricsClient = metrics_client
         self.arrival_rate = None
         self.inter_arrival_time = None
@@ -55,7 +56,7 @@ class PredictedTraffic(TrafficProvider):
 
     def arrival_rates(self) -> pd.DataFrame:
         """This function returns the number of tuples arrived at an instance per ms"""
-        df: pd.DataFrame = pd.DataFrame(columns=['task', 'mean_arrival_rate'])
+        df: FrameAccumulator = FrameAccumulator(columns=['task', 'mean_arrival_rate'])
         # this function returns arrival rates as number of tuples that arrive per millisecond
         # as prediction_results data is in seconds, we need to divide to get data for millseconds
         # format --> task  mean_arrival_rate
@@ -64,10 +65,10 @@ class PredictedTraffic(TrafficProvider):
             data_across_streams = 0
             for _, value in rates.items():
                 data_across_streams = data_across_streams + value
-            df = df.append({'task': task,
-                            'mean_arrival_rate': data_across_streams / 1000}, ignore_index=True)
-        self.arrival_rate = df
-        return df
+            df.append_row({'task': task,
+                           'mean_arrival_rate': data_across_streams / 1000})
+        self.arrival_rate = df.to_frame()
+        return self.arrival_rate
 
     def inter_arrival_times(self):
         """This function returns the time between the arrival of two subsequent tuples in ms"""